@@ -0,0 +1,32 @@
+"""Helper functions shared by the benchmark scripts in this directory."""
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+
+def measure_time(func: Callable, *args, repeat: int = 3) -> Tuple[Any, float]:
+    """Call func(*args) repeatedly, and return the result and the best wall time in
+    seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - tic)
+    return result, best
+
+
+def measure_peak_memory(func: Callable, *args) -> int:
+    """Call func(*args) once, and return the peak memory allocated during the call,
+    in bytes, as traced by tracemalloc.
+
+    Tracing slows down the call, thus the time and the memory are measured in
+    separate calls.
+    """
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
@@ -0,0 +1,78 @@
+"""Benchmark of Grid.cell_diameters on 3d simplex grids.
+
+The vectorized implementation in pp.Grid, on first call and on cached calls, is
+compared with the previous implementation, which looped over the cells and formed
+all node pairs with itertools.combinations.
+
+Usage:
+    python benchmarks/bench_cell_diameters.py [--sizes N1 N2 ...]
+
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+import porepy as pp
+from _measure import measure_time
+
+
+def cell_diameters_loop(g: pp.Grid) -> np.ndarray:
+    """The implementation of Grid.cell_diameters before vectorization."""
+
+    def comb(n):
+        return np.fromiter(
+            itertools.chain.from_iterable(itertools.combinations(n, 2)), n.dtype
+        ).reshape((2, -1), order="F")
+
+    def diam(n):
+        return np.amax(
+            np.linalg.norm(g.nodes[:, n[0, :]] - g.nodes[:, n[1, :]], axis=0)
+        )
+
+    cn = g.cell_nodes()
+    return np.array(
+        [
+            diam(comb(cn.indices[cn.indptr[c] : cn.indptr[c + 1]]))
+            for c in np.arange(g.num_cells)
+        ]
+    )
+
+
+def first_call(g: pp.Grid) -> np.ndarray:
+    # Reset the stored diameters, so that they are computed from scratch
+    g.compute_geometry()
+    return g.cell_diameters()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 20],
+        help="Number of cubes per direction of StructuredTetrahedralGrid",
+    )
+    args = parser.parse_args()
+
+    print(f"{'cells':>10s} {'loop':>10s} {'first call':>12s} {'cached':>10s}")
+    for n in args.sizes:
+        g = pp.StructuredTetrahedralGrid([n, n, n])
+        g.compute_geometry()
+
+        known, t_loop = measure_time(cell_diameters_loop, g, repeat=1)
+        computed, t_first = measure_time(first_call, g)
+        # The time of compute_geometry should not be counted
+        _, t_geometry = measure_time(g.compute_geometry)
+        _, t_cached = measure_time(g.cell_diameters)
+
+        assert np.array_equal(known, computed)
+        print(
+            f"{g.num_cells:10d} {t_loop:9.3f}s {t_first - t_geometry:11.4f}s "
+            f"{t_cached:9.1e}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
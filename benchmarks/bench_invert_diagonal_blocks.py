@@ -0,0 +1,86 @@
+"""Benchmark of the inverters of block diagonal matrices used by Mpfa.
+
+The local systems of Mpfa are formed for a structured and a simplex grid, and
+inverted by pp.matrix_operations.invert_diagonal_blocks with each of the methods
+'python', 'numba' and 'batched'. The numba method is skipped if numba is not
+available, the python method is skipped for large grids unless asked for.
+
+Usage:
+    python benchmarks/bench_invert_diagonal_blocks.py [--size N] [--python]
+
+"""
+import argparse
+
+import numpy as np
+import scipy.sparse as sps
+
+import porepy as pp
+from _measure import measure_time
+
+
+def _local_systems(g: pp.Grid):
+    """Form the block diagonal matrix and block sizes inverted by Mpfa on the grid.
+
+    The matrix is captured by running an Mpfa discretization with an inverter
+    that records its arguments.
+    """
+    captured = []
+    original = pp.matrix_operations.invert_diagonal_blocks
+
+    def record(mat, sz, method=None):
+        captured.append((mat.copy(), sz.copy()))
+        return original(mat, sz, method="batched")
+
+    data = pp.initialize_default_data(g, {}, "flow", {"mpfa_inverter": "batched"})
+    pp.matrix_operations.invert_diagonal_blocks = record
+    try:
+        pp.Mpfa("flow").discretize(g, data)
+    finally:
+        pp.matrix_operations.invert_diagonal_blocks = original
+    mat = sps.block_diag([m for m, _ in captured], format="csr")
+    sz = np.hstack([s for _, s in captured]).astype("i8")
+    return mat, sz
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--size", type=int, default=20, help="Cells per direction")
+    parser.add_argument(
+        "--python", action="store_true", help="Also time the pure python inverter"
+    )
+    args = parser.parse_args()
+    n = args.size
+
+    grids = {
+        f"CartGrid {n}x{n}x{n}": pp.CartGrid([n, n, n]),
+        f"StructuredTetrahedralGrid {n // 2}^3": pp.StructuredTetrahedralGrid(
+            [n // 2] * 3
+        ),
+    }
+    methods = ["batched", "numba"]
+    if args.python:
+        methods.append("python")
+
+    for name, g in grids.items():
+        g.compute_geometry()
+        mat, sz = _local_systems(g)
+        sizes, counts = np.unique(sz, return_counts=True)
+        print(f"{name}: {sz.size} blocks, sizes {dict(zip(sizes, counts))}")
+
+        reference = None
+        for method in methods:
+            try:
+                inv, t = measure_time(
+                    pp.matrix_operations.invert_diagonal_blocks, mat, sz, method
+                )
+            except ImportError:
+                print(f"  {method:8s} not available")
+                continue
+            if reference is None:
+                reference = inv
+            error = abs(inv - reference).max()
+            print(f"  {method:8s} {t:8.3f} s  (max deviation {error:.1e})")
+
+
+if __name__ == "__main__":
+    main()
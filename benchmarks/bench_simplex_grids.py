@@ -0,0 +1,73 @@
+"""Benchmark of the construction of simplex grids.
+
+The construction time and the peak memory are measured for structured triangle and
+tetrahedral grids, and for tetrahedral grids from a Delaunay triangulation of
+random points, for a range of sizes. The construction is dominated by the
+identification of the unique faces of the cells.
+
+Usage:
+    python benchmarks/bench_simplex_grids.py [--sizes N1 N2 ...] [--no-memory]
+
+"""
+import argparse
+
+import numpy as np
+import scipy.spatial
+
+import porepy as pp
+from _measure import measure_peak_memory, measure_time
+
+
+def structured_triangle_grid(n: int):
+    return pp.StructuredTriangleGrid, ([8 * n, 8 * n],)
+
+
+def structured_tetrahedral_grid(n: int):
+    return pp.StructuredTetrahedralGrid, ([n, n, n],)
+
+
+def delaunay_tetrahedral_grid(n: int):
+    # Roughly the same number of nodes as the structured tetrahedral grid. The
+    # triangulation is done here, so that it is not included in the measurements.
+    p = np.random.default_rng(0).random((3, (n + 1) ** 3))
+    tet = scipy.spatial.Delaunay(p.T).simplices.T
+    return pp.TetrahedralGrid, (p, tet)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 20, 40],
+        help="Grid sizes, measured in cubes per direction of the 3d grids. The 2d "
+        "grid has 8 times as many squares per direction",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the measurement of memory"
+    )
+    args = parser.parse_args()
+
+    # Each setup returns a grid class and the arguments to its constructor
+    setups = {
+        "StructuredTriangleGrid": structured_triangle_grid,
+        "StructuredTetrahedralGrid": structured_tetrahedral_grid,
+        "TetrahedralGrid (Delaunay)": delaunay_tetrahedral_grid,
+    }
+
+    for name, setup in setups.items():
+        print(name)
+        print(f"{'cells':>12s} {'faces':>12s} {'time':>10s} {'peak memory':>14s}")
+        for n in args.sizes:
+            grid_class, grid_args = setup(n)
+            g, t = measure_time(grid_class, *grid_args)
+            peak = None
+            if not args.no_memory:
+                peak = measure_peak_memory(grid_class, *grid_args)
+            memory = "" if peak is None else f"{peak / 2**20:11.1f} MB"
+            print(f"{g.num_cells:12d} {g.num_faces:12d} {t:9.3f}s {memory:>14s}")
+
+
+if __name__ == "__main__":
+    main()
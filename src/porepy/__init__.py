@@ -54,6 +54,7 @@ from porepy.utils.interpolation_tables import (
     AdaptiveInterpolationTable,
 )
 from porepy.numerics.linalg import matrix_operations
+from porepy.numerics.linalg.factorization_cache import SparseLUCache
 
 from porepy.geometry import (
     intersections,
@@ -125,6 +126,10 @@ from porepy.numerics.fv.tpfa import Tpfa
 from porepy.numerics.fv.mpfa import Mpfa
 from porepy.numerics.fv.biot import Biot, GradP, DivU, BiotStabilization
 from porepy.numerics.fv.source import ScalarSource
+from porepy.numerics.discretization_cache import (
+    DiscretizationCache,
+    CachedDiscretization,
+)
 
 # Virtual elements, elliptic
 from porepy.numerics.vem.dual_elliptic import project_flux
@@ -145,6 +150,10 @@ from porepy.numerics.interface_laws.elliptic_interface_laws import (
 from porepy.numerics.interface_laws.cell_dof_face_dof_map import CellDofFaceDofMap
 from porepy.numerics.mixed_dim import assembler_filters
 from porepy.numerics.mixed_dim.dof_manager import DofManager
+from porepy.numerics.mixed_dim.discretization_scheduler import (
+    DiscretizationScheduler,
+    DiscretizationTimings,
+)
 from porepy.numerics.mixed_dim.assembler import Assembler
 
 import porepy.numerics
@@ -337,6 +337,8 @@ def dfm_from_gmsh(file_name: str, dim: int, **kwargs) -> pp.GridBucket:
         gmsh.initialize()
         # Reduce verbosity
         gmsh.option.setNumber("General.Verbosity", 3)
+        # Write the mesh in the binary format, which is faster to read.
+        gmsh.option.setNumber("Mesh.Binary", 1)
         # read the specified file.
         gmsh.merge(in_file)
 
@@ -6,8 +6,13 @@ The model relies heavily on functions in the computational geometry library.
 """
 import copy
 import csv
+import hashlib
 import logging
+import os
+import pickle
 import time
+import uuid
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
 import meshio
@@ -17,6 +22,7 @@ from scipy.spatial import ConvexHull
 
 import porepy as pp
 from porepy.utils import setmembership, sort_points
+from porepy.utils.hashing import update_hash
 
 from .gmsh_interface import GmshData3d, GmshWriter, Tags
 
@@ -621,6 +627,8 @@ class FractureNetwork3d(object):
         tags_to_transfer: Optional[List[str]] = None,
         finalize_gmsh: bool = True,
         clear_gmsh: bool = False,
+        cache_dir: Optional[Union[str, Path]] = None,
+        num_threads: Optional[int] = None,
         **kwargs,
     ) -> pp.GridBucket:
         """Mesh the fracture network, and generate a mixed-dimensional grid.
@@ -655,6 +663,11 @@ class FractureNetwork3d(object):
                 is deleted when meshing is completed. This is of use only if finalize_gmsh
                 is set to False, in which case it may be desirable to delete the old
                 geometry before adding a new one. Defaults to False.
+            cache_dir (str or Path, optional): Directory used to cache the processed
+                geometry between calls, see prepare_for_gmsh() for details. If not
+                provided (default), no caching is done.
+            num_threads (int, optional): Number of threads used by gmsh. Defaults to
+                the number of processors available.
 
         Returns:
             GridBucket: Mixed-dimensional mesh.
@@ -664,9 +677,7 @@ class FractureNetwork3d(object):
             file_name = "gmsh_frac_file.msh"
 
         gmsh_repr = self.prepare_for_gmsh(
-            mesh_args,
-            dfn,
-            constraints,
+            mesh_args, dfn, constraints, cache_dir=cache_dir
         )
 
         gmsh_writer = GmshWriter(gmsh_repr)
@@ -682,6 +693,7 @@ class FractureNetwork3d(object):
             write_geo=write_geo,
             finalize=finalize_gmsh,
             clear_gmsh=clear_gmsh,
+            num_threads=num_threads,
         )
 
         if dfn:
@@ -702,7 +714,9 @@ class FractureNetwork3d(object):
         gb = pp.meshing.grid_list_to_grid_bucket(grid_list, **kwargs)
         return gb
 
-    def prepare_for_gmsh(self, mesh_args, dfn=False, constraints=None) -> GmshData3d:
+    def prepare_for_gmsh(
+        self, mesh_args, dfn=False, constraints=None, cache_dir=None
+    ) -> GmshData3d:
         """Process network intersections and write a gmsh .geo configuration file,
         ready to be processed by gmsh.
 
@@ -723,41 +737,83 @@ class FractureNetwork3d(object):
             constraints (np.array): Index list of elements in the fracture list that
                 should be treated as constraints in meshing, but not added as separate
                 fracture grids (no splitting of nodes etc).
+            cache_dir (str or Path, optional): Directory used to cache the processed
+                geometry on disk. If provided, the state of the network after the
+                computation of intersections is stored under a key computed from the
+                fractures, the domain and the tolerance, and the full geometry
+                representation is stored under a key which in addition accounts for
+                the constraints and the mesh sizes at the fractures. Later calls with
+                the same network, also from other Python processes, then skip the
+                geometry processing that is not affected by the changed arguments.
+                The far-field mesh size, mesh_size_bound, does not enter the key.
+                The entries are stored with pickle, thus the directory should not be
+                shared with untrusted sources. Defaults to None, in which case no
+                caching is done.
 
         Returns:
-            str: Name of .geo file.
+            GmshData3d: Geometry representation, ready to be passed to GmshWriter.
 
         """
 
         # The implementation in this function is fairly straightforward, all
         # technical difficulties are hidden in other functions.
 
+        if "mesh_size_frac" not in mesh_args.keys():
+            raise ValueError("Meshing algorithm needs argument mesh_size_frac")
+        if "mesh_size_min" not in mesh_args.keys():
+            raise ValueError("Meshing algorithm needs argument mesh_size_min")
+
+        if constraints is None:
+            constraints = np.array([], dtype=int)
+
+        mesh_size_frac = mesh_args.get("mesh_size_frac", None)
+        mesh_size_min = mesh_args.get("mesh_size_min", None)
+        mesh_size_bound = mesh_args.get("mesh_size_bound", None)
+
+        if cache_dir is not None:
+            cache_dir = Path(cache_dir)
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # Both keys are computed from the state of the network before processing.
+            geometry_key = self._cache_key(dfn)
+            full_key = self._cache_key(
+                dfn, np.sort(constraints), mesh_size_frac, mesh_size_min
+            )
+
+            cached = _load_cached_state(cache_dir / full_key)
+            if cached is not None:
+                # The full geometry is known. Only the mesh size, which depends on
+                # mesh_size_bound, is recomputed.
+                state, gmsh_repr = cached
+                self.__dict__.update(state)
+                self.mesh_size_bound = mesh_size_bound
+                gmsh_repr.mesh_size = self._determine_mesh_size(
+                    point_tags=self.decomposition["point_tags"]
+                )
+                logger.info("Use cached geometry representation")
+                return gmsh_repr
+
+            cached = _load_cached_state(cache_dir / geometry_key)
+            if cached is not None:
+                self.__dict__.update(cached)
+                logger.info("Use cached fracture intersections")
+
         # Impose the boundary of the domain. This may cut and split fractures.
         # FIXME: When fractures are split or deleted, there will likely be
         # mapping errors between fracture indices.
         if not dfn and not self.bounding_box_imposed:
             self.impose_external_boundary(self.domain)
 
-        if constraints is None:
-            constraints = np.array([], dtype=int)
-
         # Find intersections between fractures
         if not self.has_checked_intersections:
             self.find_intersections()
+            if cache_dir is not None:
+                _store_cached_state(cache_dir, geometry_key, self.__dict__)
         else:
             logger.info("Use existing intersections")
 
-        if "mesh_size_frac" not in mesh_args.keys():
-            raise ValueError("Meshing algorithm needs argument mesh_size_frac")
-        if "mesh_size_min" not in mesh_args.keys():
-            raise ValueError("Meshing algorithm needs argument mesh_size_min")
-
         # Insert auxiliary points for mesh size control. This is done after the
         # intersections are found, but before the fractures are collected into a
         # set of edges (see split_intersecions).
-        mesh_size_frac = mesh_args.get("mesh_size_frac", None)
-        mesh_size_min = mesh_args.get("mesh_size_min", None)
-        mesh_size_bound = mesh_args.get("mesh_size_bound", None)
         self._insert_auxiliary_points(mesh_size_frac, mesh_size_min, mesh_size_bound)
 
         # Process intersections to get a description of the geometry in non-
@@ -996,8 +1052,25 @@ class FractureNetwork3d(object):
         self.decomposition["domain_boundary_points"] = boundary_points
         self.decomposition["point_tags"] = point_tags
 
+        if cache_dir is not None:
+            _store_cached_state(cache_dir, full_key, (self.__dict__, gmsh_repr))
+
         return gmsh_repr
 
+    def _cache_key(self, *args) -> str:
+        """Compute a key for the cache of the processed geometry.
+
+        The key is computed from the full state of the network, that is, the
+        fractures, the domain, the tolerance, and any processing already done,
+        together with the given arguments.
+
+        """
+        h = hashlib.sha256()
+        update_hash(h, (pp.__version__, type(self).__qualname__))
+        update_hash(h, vars(self))
+        update_hash(h, args)
+        return h.hexdigest()
+
     def __getitem__(self, position):
         return self._fractures[position]
 
@@ -3018,3 +3091,35 @@ class FractureNetwork3d(object):
                 ip = np.append(ip, tmp_p[:2], axis=1)
 
         return p_2d, ip, other_frac, rot, cp
+
+
+def _store_cached_state(directory: Path, key: str, value) -> None:
+    """Store a pickled representation of a value in the cache directory.
+
+    The value is written to a temporary file, which is then renamed. Thus other
+    processes never observe a partially written entry.
+
+    """
+    tmp = directory / f".{key}.{uuid.uuid4().hex}"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, directory / key)
+    except OSError as err:
+        logger.warning(f"Could not store cached geometry {key}: {err}")
+        tmp.unlink(missing_ok=True)
+
+
+def _load_cached_state(entry: Path):
+    """Load a value stored by _store_cached_state. Return None if there is no
+    readable entry.
+    """
+    if not entry.is_file():
+        return None
+    try:
+        with open(entry, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as err:
+        # A corrupted entry is treated as a miss, and will be overwritten
+        logger.warning(f"Could not read cached geometry {entry.name}: {err}")
+        return None
@@ -13,6 +13,7 @@ Content:
         gmsh model. Can also mesh.
 
 """
+import os
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Union
@@ -218,7 +219,7 @@ class GmshWriter:
         if options is None:
             options = {}
 
-        for key, val in options:
+        for key, val in options.items():
             if isinstance(val, (int, float)):
                 try:
                     gmsh.option.setNumber(key, val)
@@ -300,6 +301,7 @@ class GmshWriter:
         write_geo: bool = False,
         clear_gmsh: bool = True,
         finalize: bool = True,
+        num_threads: Optional[int] = None,
     ) -> None:
         """Make gmsh generate a mesh and write it to specified mesh size.
 
@@ -324,6 +326,9 @@ class GmshWriter:
                 finalized by a direct call to gmsh.finalize(); note however that if this
                 is done, Gmsh cannot be accessed either from the outside or by an
                 instance of the GmshWriter class before gmsh.initialize() is called.
+            num_threads (int, optional): Number of threads used by gmsh in the meshing.
+                Defaults to the number of processors available. Set to 1 to mesh in
+                serial. See _set_num_threads() for details.
 
         """
         if ndim == -1:
@@ -334,6 +339,8 @@ class GmshWriter:
             fn = file_name[:-4] + ".geo_unrolled"
             gmsh.write(fn)
 
+        self._set_num_threads(num_threads)
+
         for dim in range(1, ndim + 1):
             try:
                 gmsh.model.mesh.generate(dim=dim)
@@ -350,6 +357,34 @@ class GmshWriter:
             gmsh.finalize()
             GmshWriter.gmsh_initialized = False
 
+    def _set_num_threads(self, num_threads: Optional[int] = None) -> None:
+        """Set the number of threads used by gmsh in mesh generation.
+
+        The options only have an effect if gmsh is compiled with OpenMP support, and
+        the meshing algorithms set in gmsh are parallelized (for 3d meshes, this is
+        the case for the HXT algorithm). The algorithms themselves are not changed
+        here. Options that are not known to the installed version of gmsh are
+        ignored.
+
+        Parameters:
+            num_threads (int, optional): Number of threads. Defaults to the number of
+                processors available.
+
+        """
+        if num_threads is None:
+            num_threads = os.cpu_count() or 1
+
+        for key in (
+            "General.NumThreads",
+            "Mesh.MaxNumThreads1D",
+            "Mesh.MaxNumThreads2D",
+            "Mesh.MaxNumThreads3D",
+        ):
+            try:
+                gmsh.option.setNumber(key, num_threads)
+            except Exception:
+                pass
+
     def _add_points(self) -> List[int]:
         """Add points to gmsh. Also set physical names for points if required."""
         point_tags = []
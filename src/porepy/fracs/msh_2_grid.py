@@ -6,6 +6,7 @@ from typing import Dict, List, Tuple, Union
 import numpy as np
 
 import porepy as pp
+from porepy.utils import setmembership
 
 from .gmsh_interface import PhysicalNames
 
@@ -96,8 +97,9 @@ def create_2d_grids(
         # Tags of all triangle grids
         tri_tags = cell_info["triangle"]
 
-        # Loop over all gmsh tags associated with triangle grids
-        for pn_ind in np.unique(tri_tags):
+        # Loop over all gmsh tags associated with triangle grids, together with the
+        # cells of each tag
+        for pn_ind, loc_cells in zip(*_group_by_tag(tri_tags)):
 
             # Split the physical name into a category and a number - which will become
             # the fracture number
@@ -112,7 +114,6 @@ def create_2d_grids(
                 continue
 
             # Cells of this surface
-            loc_cells = np.where(tri_tags == pn_ind)[0]
             loc_tri_cells = tri_cells[loc_cells, :].astype(int)
 
             # Find unique points, and a mapping from local to global points
@@ -145,33 +146,15 @@ def create_2d_grids(
         # relation we need to recover the corresponding face-line map.
         # First find the nodes of each face
         faces = np.reshape(g_2d.face_nodes.indices, (2, -1), order="F")
+        # Sort the nodes of faces and lines, so that they have the same node ordering
         faces = np.sort(faces, axis=0)
-
-        # Then we do a bunch of sorting to make sure faces and lines has the same
-        # node ordering:
-        idxf = np.lexsort(faces)
-
         line = np.sort(cells["line"].T, axis=0)
-        idxl = np.lexsort(line)
-        IC = np.empty(line.shape[1], dtype=int)
-        IC[idxl] = np.arange(line.shape[1])
-
-        # Next change the faces and line to string format ("node_idx0,node_idx1").
-        # The reason to do so is because we want to compare faces and line columnwise,
-        # i.e., is_line[i] should be true iff faces[:, i] == line[:, j] for ONE j. If
-        # you can make numpy do this, you can remove the string formating.
-        tmp = np.char.add(faces[0, idxf].astype(str), ",")
-        facestr = np.char.add(tmp, faces[1, idxf].astype(str))
-        tmp = np.char.add(line[0, idxl].astype(str), ",")
-        linestr = np.char.add(tmp, line[1, idxl].astype(str))
-
-        is_line = np.isin(facestr, linestr, assume_unique=True)
 
         # Now find the face index that correspond to each line. line2face is of length
         # line.shape[1] and we have: face[:, line2face] == line.
-        line2face = idxf[is_line][IC]
+        is_line, line2face = setmembership.ismember_rows(line, faces, sort=False)
         # Sanity check
-        if not np.allclose(faces[:, line2face], line):
+        if not is_line.all() or not np.allclose(faces[:, line2face], line):
             raise RuntimeError(
                 "Could not find mapping from gmsh lines to pp.Grid faces"
             )
@@ -265,12 +248,13 @@ def create_1d_grids(
     gmsh_tip_num = []
     tip_pts = np.empty(0)
 
-    for i, pn_ind in enumerate(np.unique(line_tags)):
+    # Loop over all gmsh tags associated with lines, together with the cells of each
+    # tag
+    for i, (pn_ind, loc_line_cell_num) in enumerate(zip(*_group_by_tag(line_tags))):
         # Index of the final underscore in the physical name. Chars before this
         # will identify the line type, the one after will give index
         pn = phys_names[pn_ind]
         offset_index = pn.rfind("_")
-        loc_line_cell_num = np.where(line_tags == pn_ind)[0]
         loc_line_pts = line_cells[loc_line_cell_num, :]
 
         assert loc_line_pts.size > 1
@@ -388,6 +372,23 @@ def create_0d_grids(
     return g_0d
 
 
+def _group_by_tag(tags: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Group the cells of a gmsh tessalation by their physical tags.
+
+    Parameters:
+        tags (np.ndarray): Physical tag of each cell.
+
+    Returns:
+        np.ndarray: Unique tags, sorted.
+        list of np.ndarray: For each unique tag, the indices of the cells with this
+            tag, in increasing order.
+
+    """
+    sort_ind = np.argsort(tags, kind="stable")
+    unique_tags, start = np.unique(tags[sort_ind], return_index=True)
+    return unique_tags, np.split(sort_ind, start[1:])
+
+
 def create_embedded_line_grid(
     loc_coord: np.ndarray, glob_id: np.ndarray, tol: float = 1e-4
 ) -> pp.Grid:
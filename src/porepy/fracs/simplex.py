@@ -2,8 +2,9 @@
 Module for creating simplex grids with fractures.
 """
 import logging
+import shlex
 import time
-from typing import Any, Dict, Tuple
+from typing import Any, BinaryIO, Dict, List, Tuple
 
 import meshio
 import numpy as np
@@ -281,6 +282,10 @@ def _read_gmsh_file(
     Read a gmsh .msh file, and convert the result to a format that is compatible with
     the porepy functionality for mesh processing.
 
+    Binary files of version 4.1, which is the default in recent versions of gmsh if
+    the option Mesh.Binary is set, are read by _read_binary_msh41(). Other files are
+    read by meshio.
+
     Args:
         file_name (str): Name of the file to be processed.
 
@@ -294,6 +299,11 @@ def _read_gmsh_file(
             gmsh .geo file.
 
     """
+    with open(file_name, "rb") as f:
+        header = f.readline().strip(), f.readline().split()
+    if header[0] == b"$MeshFormat" and header[1][:2] == [b"4.1", b"1"]:
+        return _read_binary_msh41(file_name)
+
     mesh = meshio.read(file_name)
 
     pts = mesh.points
@@ -347,3 +357,203 @@ def _read_gmsh_file(
             cell_info[k] = v["gmsh:physical"]
 
     return pts, cells, cell_info, phys_names
+
+
+# Element types in gmsh which can be read by _read_binary_msh41, with the name of the
+# type in meshio and the number of nodes per element. Only linear elements are
+# included, since higher order elements are not supported by the grid constructors.
+_GMSH_ELEMENT_TYPES: Dict[int, Tuple[str, int]] = {
+    1: ("line", 2),
+    2: ("triangle", 3),
+    3: ("quad", 4),
+    4: ("tetra", 4),
+    5: ("hexahedron", 8),
+    6: ("wedge", 6),
+    7: ("pyramid", 5),
+    15: ("vertex", 1),
+}
+
+
+def _read_binary_msh41(
+    file_name: str,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[int, str]]:
+    """Read a binary gmsh .msh file of version 4.1.
+
+    The file is streamed, and the node and element blocks are read directly into
+    arrays preallocated for all blocks of the same type. The element blocks are first
+    scanned to count the number of elements of each type, and then read in a second
+    pass. Thus the cost of the reading is dominated by the I/O, also for meshes with
+    many cells.
+
+    The output is on the same format as that of _read_gmsh_file() for files read by
+    meshio: The cells of each element type are given in the order of the blocks in
+    the file, and the tag of each cell is the first physical tag of its geometric
+    entity. Cells of entities without a physical tag are assigned the tag -1.
+
+    Args:
+        file_name (str): Name of the file to be processed.
+
+    Returns:
+        See _read_gmsh_file().
+
+    Raises:
+        ValueError: If the file is not a binary .msh file of version 4.1, if it
+            contains elements of an unsupported type, or if it is truncated.
+
+    """
+    phys_names: Dict[int, str] = {}
+    # Physical tag of each geometric entity, for each dimension of entities
+    entity_tags: List[Dict[int, int]] = [{}, {}, {}, {}]
+
+    with open(file_name, "rb") as f:
+        if f.readline().strip() != b"$MeshFormat":
+            raise ValueError(f"File {file_name} is not a gmsh .msh file")
+        version, file_type, data_size = f.readline().split()
+        if version != b"4.1" or file_type != b"1":
+            raise ValueError(f"File {file_name} is not a binary .msh file of v4.1")
+        # The integer 1 is written in binary to determine the endianness.
+        byte_order = "<" if f.read(4) == b"\x01\x00\x00\x00" else ">"
+        int_t = np.dtype(byte_order + "i4")
+        size_t = np.dtype(byte_order + "u" + data_size.decode())
+        double_t = np.dtype(byte_order + "f8")
+        _skip_to_end_of_section(f, b"MeshFormat")
+
+        pts = np.empty((0, 3), dtype=double_t)
+        node_tags = np.empty(0, dtype=size_t)
+        raw_cells: Dict[str, np.ndarray] = {}
+        cell_info: Dict[str, np.ndarray] = {}
+
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            section = line.strip()
+            if not section:
+                continue
+
+            if section == b"$PhysicalNames":
+                num_names = int(f.readline())
+                for _ in range(num_names):
+                    # Line on the form: dim tag "name"
+                    _, tag, name = shlex.split(f.readline().decode())
+                    phys_names[int(tag)] = name
+
+            elif section == b"$Entities":
+                num_entities = _read_array(f, size_t, 4)
+                for dim, num in enumerate(num_entities):
+                    for _ in range(num):
+                        tag = int(_read_array(f, int_t, 1)[0])
+                        # Skip the coordinates of points and the bounding boxes of
+                        # other entities
+                        f.seek(double_t.itemsize * (3 if dim == 0 else 6), 1)
+                        num_phys = int(_read_array(f, size_t, 1)[0])
+                        phys = _read_array(f, int_t, num_phys)
+                        entity_tags[dim][tag] = int(phys[0]) if num_phys > 0 else -1
+                        if dim > 0:
+                            # Skip the bounding entities
+                            num_bounding = int(_read_array(f, size_t, 1)[0])
+                            f.seek(int_t.itemsize * num_bounding, 1)
+
+            elif section == b"$Nodes":
+                num_blocks, num_nodes = _read_array(f, size_t, 4)[:2]
+                node_tags = np.empty(num_nodes, dtype=size_t)
+                pts = np.empty((num_nodes, 3), dtype=double_t)
+                ind = 0
+                for _ in range(num_blocks):
+                    dim, _, parametric = _read_array(f, int_t, 3)
+                    num = int(_read_array(f, size_t, 1)[0])
+                    _read_into(f, node_tags[ind : ind + num])
+                    if parametric:
+                        # The coordinates are followed by dim parametric coordinates
+                        coord = np.empty((num, 3 + dim), dtype=double_t)
+                        _read_into(f, coord)
+                        pts[ind : ind + num] = coord[:, :3]
+                    else:
+                        _read_into(f, pts[ind : ind + num])
+                    ind += num
+
+            elif section == b"$Elements":
+                num_blocks = _read_array(f, size_t, 4)[0]
+                # First pass: Find the position, type and size of all blocks
+                blocks = []
+                num_cells: Dict[str, int] = {}
+                num_cell_nodes: Dict[str, int] = {}
+                for _ in range(num_blocks):
+                    dim, entity, gmsh_type = (int(i) for i in _read_array(f, int_t, 3))
+                    num = int(_read_array(f, size_t, 1)[0])
+                    if gmsh_type not in _GMSH_ELEMENT_TYPES:
+                        raise ValueError(f"Unsupported gmsh element type {gmsh_type}")
+                    cell_type, num_nodes_of_type = _GMSH_ELEMENT_TYPES[gmsh_type]
+                    blocks.append((f.tell(), dim, entity, cell_type, num))
+                    num_cells[cell_type] = num_cells.get(cell_type, 0) + num
+                    num_cell_nodes[cell_type] = num_nodes_of_type
+                    # Each element is represented by its tag, followed by its nodes
+                    f.seek(size_t.itemsize * num * (1 + num_nodes_of_type), 1)
+                end_of_blocks = f.tell()
+
+                for cell_type, num in num_cells.items():
+                    width = 1 + num_cell_nodes[cell_type]
+                    raw_cells[cell_type] = np.empty((num, width), dtype=size_t)
+                    cell_info[cell_type] = np.empty(num, dtype=int)
+
+                # Second pass: Read the blocks into the preallocated arrays
+                offset = dict.fromkeys(num_cells, 0)
+                for pos, dim, entity, cell_type, num in blocks:
+                    start = offset[cell_type]
+                    f.seek(pos)
+                    _read_into(f, raw_cells[cell_type][start : start + num])
+                    cell_info[cell_type][start : start + num] = entity_tags[dim].get(
+                        entity, -1
+                    )
+                    offset[cell_type] += num
+                f.seek(end_of_blocks)
+
+            else:
+                # Sections that are not needed, such as $Periodic, are skipped.
+                _skip_to_end_of_section(f, section[1:])
+                continue
+
+            _skip_to_end_of_section(f, section[1:])
+
+    # Map from node tags to the index of the node in pts. Node tags are usually
+    # contiguous and ordered, in which case the map is a shift, but gmsh allows for
+    # arbitrary tags.
+    node_tags = node_tags.astype(int)
+    if np.array_equal(node_tags, np.arange(1, node_tags.size + 1)):
+        tag_map = None
+    else:
+        tag_map = np.full(node_tags.max(initial=0) + 1, -1, dtype=int)
+        tag_map[node_tags] = np.arange(node_tags.size)
+
+    cells: Dict[str, np.ndarray] = {}
+    for cell_type, raw in raw_cells.items():
+        # The first column contains the element tags, which are not needed
+        nodes = raw[:, 1:].astype(int)
+        cells[cell_type] = nodes - 1 if tag_map is None else tag_map[nodes]
+
+    return pts.astype(float), cells, cell_info, phys_names
+
+
+def _read_array(f: BinaryIO, dtype: np.dtype, num: int) -> np.ndarray:
+    """Read a given number of items of a given type from a binary file."""
+    buffer = f.read(dtype.itemsize * num)
+    if len(buffer) != dtype.itemsize * num:
+        raise ValueError("Unexpected end of gmsh .msh file")
+    return np.frombuffer(buffer, dtype=dtype)
+
+
+def _read_into(f: BinaryIO, arr: np.ndarray) -> None:
+    """Fill a contiguous array with data from a binary file, without copying."""
+    if f.readinto(memoryview(arr).cast("B")) != arr.nbytes:
+        raise ValueError("Unexpected end of gmsh .msh file")
+
+
+def _skip_to_end_of_section(f: BinaryIO, section: bytes) -> None:
+    """Move the file position to after the end of a section in a .msh file."""
+    end = b"$End" + section
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError(f"Could not find {end.decode()} in gmsh .msh file")
+        if line.strip() == end:
+            return
@@ -449,6 +449,11 @@ def compute_well_rock_matrix_intersections(
     We are assuming convex cells and a single high dimensional grid.
     To speed up the geometrical computation we construct an ADTree.
 
+    The segments of all wells are treated together: The candidate cells of all segments
+    are found by a single search in the ADTree, and the part of each segment inside each
+    of its candidate cells is computed for all pairs of segments and cells at once, see
+    _segment_cell_ratios().
+
     Parameters:
         gb (pp.GridBucket): the grid bucket containing all the elements
         cells (np.ndarray, optional): a set of cells that might be considered to construct the
@@ -466,76 +471,55 @@ def compute_well_rock_matrix_intersections(
     # Construct an ADTree for fast computation
     tree = pp.adtree.ADTree(2 * g_max.dim, g_max.dim)
     tree.from_grid(g_max, cells)
+    # The key of each ad node is a cell index of the grid
+    cell_of_adnode = np.asarray(tree.keys, dtype=int)
 
     # Extract the grids of the wells of co-dimension 2
     gs_w: List[pp.Grid] = [
         g for g in gb.grids_of_dimension(dim_max - 2) if hasattr(g, "well_num")
     ]
+    if len(gs_w) == 0:
+        return
 
-    # Pre-compute some well informations
-    nodes_w = []
+    # Collect the segments of all the wells, as (start, end)
+    start, end = [], []
     for g_w in gs_w:
         g_w_cn = g_w.cell_nodes()
         g_w_cells = np.arange(g_w.num_cells)
         # get the cells of the 0d as segments (start, end)
         first = g_w_cn.indptr[g_w_cells]
         second = g_w_cn.indptr[g_w_cells + 1]
+        n_w = g_w_cn.indices[pp.utils.mcolon.mcolon(first, second)].reshape((-1, 2)).T
+
+        start.append(g_w.nodes[:, n_w[0]])
+        end.append(g_w.nodes[:, n_w[1]])
+    start_all = np.hstack(start)
+    end_all = np.hstack(end)
+    # Offset of the segments of each well in the collected arrays
+    offset = np.cumsum([0] + [g_w.num_cells for g_w in gs_w])
+
+    # Create the boxes for the segments by ordering their start and end, and find
+    # the ad nodes, thus cells, that may intersect each of them
+    boxes = np.hstack(
+        (np.minimum(start_all, end_all).T, np.maximum(start_all, end_all).T)
+    )
+    candidates = tree.search_many(boxes).tocoo()
+    seg_ind = candidates.row
+    cell_ind = cell_of_adnode[candidates.col]
 
-        nodes_w.append(
-            g_w_cn.indices[pp.utils.mcolon.mcolon(first, second)].reshape((-1, 2)).T
-        )
-
-    # Operate on the rock matrix grid
-    faces, cells, _ = sps.find(g_max.cell_faces.tocsc())
-    cells_order = np.argsort(cells)  # type: ignore
-    faces = faces[cells_order]
-
-    nodes, *_ = sps.find(g_max.face_nodes)
-    indptr = g_max.face_nodes.indptr
+    # Compute the part of the segments inside the candidate cells
+    ratio = _segment_cell_ratios(g_max, start_all, end_all, seg_ind, cell_ind, tol)
+    found = ratio > min_length
+    seg_ind, cell_ind, ratio = seg_ind[found], cell_ind[found], ratio[found]
 
     # Loop on all the well grids
-    for g_w, n_w in zip(gs_w, nodes_w):
-        # extract the start and end point of the segments
-        start = g_w.nodes[:, n_w[0]]
-        end = g_w.nodes[:, n_w[1]]
-
-        # Lists for the cell_cell_map
-        primary_secondary_I, primary_secondary_J, primary_secondary_data = [], [], []
-
-        # Operate on the segments
-        for seg_id, (seg_start, seg_end) in enumerate(zip(start.T, end.T)):
-            # Create the box for the segment by ordering its start and end
-            box = np.sort(np.vstack((seg_start, seg_end)), axis=0).ravel()
-            # extract the id of the ad nodes
-            seg_adnodes = tree.search(pp.adtree.ADTNode("dummy_node", box))
-            # extract the key of the ad nodes which is the cell id
-            seg_cells = [tree.nodes[n].key for n in seg_adnodes]
-            # Loop on all the higher dimensional cells
-            for c in seg_cells:
-                # For the current cell retrieve its faces
-                loc = slice(g_max.cell_faces.indptr[c], g_max.cell_faces.indptr[c + 1])
-                faces_loc = faces[loc]
-                # Get the local nodes, face based
-                poly = np.array(
-                    [
-                        g_max.nodes[:, nodes[indptr[f] : indptr[f + 1]]]
-                        for f in faces_loc
-                    ]
-                )
-                # Compute the intersections between the segment and the current higher
-                # dimensional cell
-                _, _, _, ratio = pp.intersections.segments_polyhedron(
-                    seg_start, seg_end, poly, tol
-                )
-                # Store the requested information to build the projection operator
-                if ratio > min_length:
-                    primary_secondary_I += [seg_id]
-                    primary_secondary_J += [c]
-                    primary_secondary_data += ratio.tolist()
+    for ind, g_w in enumerate(gs_w):
+        # Segments belonging to the current well, with local numbering
+        loc = np.logical_and(seg_ind >= offset[ind], seg_ind < offset[ind + 1])
 
         # primary to secondary map
         primary_secondary_map = sps.csc_matrix(
-            (primary_secondary_data, (primary_secondary_I, primary_secondary_J)),
+            (ratio[loc], (seg_ind[loc] - offset[ind], cell_ind[loc])),
             shape=(g_w.num_cells, g_max.num_cells),
         )
 
@@ -557,6 +541,77 @@ def compute_well_rock_matrix_intersections(
         d_e["mortar_grid"] = mg
 
 
+def _segment_cell_ratios(
+    g: pp.Grid,
+    start: np.ndarray,
+    end: np.ndarray,
+    seg_ind: np.ndarray,
+    cell_ind: np.ndarray,
+    tol: float,
+) -> np.ndarray:
+    """Compute the fraction of segments that lies inside convex cells of a grid.
+
+    For each pair of segment and cell, the segment is clipped by the half spaces
+    bounded by the planes of the cell faces (Cyrus-Beck clipping). The computations
+    are done for all pairs at once.
+
+    Parameters:
+        g (pp.Grid): The grid, with cells assumed convex and faces planar.
+        start (np.ndarray, 3 x num_segments): Start points of the segments.
+        end (np.ndarray, 3 x num_segments): End points of the segments.
+        seg_ind (np.ndarray): Segment index of each pair.
+        cell_ind (np.ndarray): Cell index of each pair.
+        tol (float): Geometric tolerance. A segment parallel to a face, and closer to
+            the face than tol, is considered inside the half space of the face.
+
+    Returns:
+        np.ndarray: For each pair, the fraction of the segment length inside the cell.
+
+    """
+    if seg_ind.size == 0:
+        return np.zeros(0)
+
+    cell_faces = g.cell_faces.tocsc()
+    indptr = cell_faces.indptr
+    num_faces = np.diff(indptr)[cell_ind]
+
+    # Expand the pairs to one row per face of the cell
+    rows = pp.utils.mcolon.mcolon(indptr[cell_ind], indptr[cell_ind + 1])
+    faces = cell_faces.indices[rows]
+    pair = np.repeat(np.arange(seg_ind.size), num_faces)
+    seg = seg_ind[pair]
+
+    # Outwards unit normal vectors of the faces
+    normals = g.face_normals[:, faces] * cell_faces.data[rows] / g.face_areas[faces]
+    direction = end[:, seg] - start[:, seg]
+
+    # A point start + t * direction is inside the half space of the face if
+    # t * den <= num
+    num = np.sum(normals * (g.face_centers[:, faces] - start[:, seg]), axis=0)
+    den = np.sum(normals * direction, axis=0)
+    seg_length = np.linalg.norm(direction, axis=0)
+
+    parallel = np.abs(den) <= tol * seg_length
+    t = np.zeros(num.size)
+    t[~parallel] = num[~parallel] / den[~parallel]
+
+    # Entering the half space gives a lower bound, leaving an upper bound. A parallel
+    # segment outside the half space has an empty interval.
+    t_low = np.where(np.logical_and(~parallel, den < 0), t, 0.0)
+    t_high = np.where(np.logical_and(~parallel, den > 0), t, 1.0)
+    t_high[np.logical_and(parallel, num < -tol)] = -1.0
+
+    # Combine the bounds of all faces of each pair
+    start_pair = np.cumsum(num_faces) - num_faces
+    low = np.maximum(np.maximum.reduceat(t_low, start_pair), 0.0)
+    high = np.minimum(np.minimum.reduceat(t_high, start_pair), 1.0)
+
+    ratio = np.maximum(high - low, 0.0)
+    # Segments of zero length are not inside any cell
+    ratio[np.linalg.norm(end - start, axis=0)[seg_ind] == 0] = 0.0
+    return ratio
+
+
 def _argsort_points_along_line_segment(
     seg: np.ndarray,
 ) -> Tuple[np.ndarray, np.ndarray]:
@@ -3,7 +3,7 @@ Module with functions for computing intersections between geometric objects.
 
 """
 import logging
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import scipy.sparse as sps
@@ -444,11 +444,19 @@ def polygons_3d(
     # Identify overlapping bounding boxes: First, use a fast method to find
     # overlapping rectangles in the xy-plane.
     pairs_xy = _identify_overlapping_rectangles(x_min, x_max, y_min, y_max)
-    # Next, find overlapping intervals in the z-directien
-    pairs_z = _identify_overlapping_intervals(z_min, z_max)
-
-    # Finally, do the intersection
-    pairs = _intersect_pairs(pairs_xy, pairs_z)
+    # Next, keep the pairs that also overlap in the z-direction. This gives the same
+    # result as intersecting with the overlapping intervals in the z-direction, but
+    # avoids identifying all pairs of overlapping z-intervals, which can be many.
+    if pairs_xy.size > 0:
+        overlap_z = np.logical_and(
+            z_max[pairs_xy[1]] >= z_min[pairs_xy[0]],
+            z_min[pairs_xy[1]] <= z_max[pairs_xy[0]],
+        )
+        pairs = pairs_xy[:, overlap_z]
+        # Sort the columns so that the first row is non-decreasing
+        pairs = pairs[:, np.argsort(pairs[0])]
+    else:
+        pairs = np.empty((2, 0))
 
     # Various utility functions
     def center(p):
@@ -531,10 +539,21 @@ def polygons_3d(
     # Store index of pairs of intersecting polygons
     polygon_pairs = []
 
-    # Pre-compute polygon normals to save computational time
-    polygon_normals = [
-        pp.map_geometry.compute_normal(poly, tol=tol).reshape((-1, 1)) for poly in polys
-    ]
+    # Pre-compute polygon normals to save computational time. Only polygons that are
+    # part of a candidate pair are needed, but all polygons are checked for a well
+    # defined normal vector, so that degenerate polygons raise an error as before.
+    _check_polygon_normals(polys, tol)
+    polygon_normals = {
+        ind: pp.map_geometry.compute_normal(polys[ind], tol=tol).reshape((-1, 1))
+        for ind in np.unique(pairs).astype(int)
+    }
+
+    # Remove pairs where one polygon is clearly on one side of the plane of the
+    # other. This is done for all pairs at once; the remaining pairs are processed
+    # one by one below.
+    pairs = pairs[:, _polygons_crossing_planes(polys, pairs, polygon_normals)]
+    pairs_start = np.searchsorted(pairs[0], start_inds, side="left")
+    pairs_end = np.searchsorted(pairs[0], start_inds, side="right")
 
     # Loop over all fracture pairs (taking more than one simultaneously if an index
     # occurs several times in pairs[0]), and look for intersections
@@ -548,8 +567,7 @@ def polygons_3d(
         main = line_ind
 
         # Find the other fracture of all pairs starting with the main one
-        hit = np.where(pairs[0] == main)
-        other = pairs[1, hit][0]
+        other = pairs[1, pairs_start[di] : pairs_end[di]]
 
         # Center point and normal vector of the main fracture
         main_center = center(polys[main])
@@ -1359,6 +1377,145 @@ def polygons_3d(
     )
 
 
+def _check_polygon_normals(polys: List[np.ndarray], tol: float) -> None:
+    """Check that the normal vectors of polygons can be computed.
+
+    The check is the same as in pp.map_geometry.compute_normal(), but done for all
+    polygons with the same number of vertexes at once.
+
+    Parameters:
+        polys (list of np.array): Polygons, see polygons_3d().
+        tol (double): Geometric tolerance, as passed to compute_normal().
+
+    Raises:
+        ValueError if a polygon has less than three vertexes.
+        RuntimeError if the vertexes of a polygon are collinear.
+
+    """
+    num_vertexes = np.array([p.shape[1] for p in polys], dtype=int)
+    degenerate = num_vertexes <= 2
+
+    for nv in np.unique(num_vertexes[~degenerate]):
+        ind = np.where(num_vertexes == nv)[0]
+        # Vectors from the center to the vertexes, num_polys x 3 x num_vertexes
+        pts = np.array([polys[i] for i in ind], dtype=float)
+        v = pts - pts.mean(axis=2)[:, :, np.newaxis]
+        nrm = np.linalg.norm(v, axis=1)
+        # Cross products between the longest vector and all vectors
+        rows = np.arange(ind.size)
+        v1 = v[rows, :, np.argmax(nrm, axis=1)][:, :, np.newaxis]
+        cross = np.stack(
+            (
+                v1[:, 1] * v[:, 2] - v1[:, 2] * v[:, 1],
+                v1[:, 2] * v[:, 0] - v1[:, 0] * v[:, 2],
+                v1[:, 0] * v[:, 1] - v1[:, 1] * v[:, 0],
+            ),
+            axis=1,
+        )
+        cross_ind = np.argmax(np.linalg.norm(cross, axis=1), axis=1)
+        normal = cross[rows, :, cross_ind]
+        scaling = nrm[rows, np.argmax(nrm, axis=1)] * nrm[rows, cross_ind]
+        degenerate[ind] = np.all(np.abs(normal) <= tol * scaling[:, np.newaxis], axis=1)
+
+    # Let compute_normal raise the error for the first degenerate polygon
+    for i in np.where(degenerate)[0]:
+        pp.map_geometry.compute_normal(polys[i], tol=tol)
+
+
+def _polygons_crossing_planes(
+    polys: List[np.ndarray], pairs: np.ndarray, normals: Dict[int, np.ndarray]
+) -> np.ndarray:
+    """For pairs of polygons, identify those where both polygons may cross the plane
+    of the other polygon.
+
+    The test is conservative: A pair is only discarded if the vertexes of one polygon
+    are on the same side of the plane of the other polygon, with a margin that
+    accounts for the tolerance used in polygons_3d(), and for polygons that are not
+    exactly planar. Pairs which are discarded here would thus also have been discarded
+    by the more detailed test in polygons_3d().
+
+    Parameters:
+        polys (list of np.array): Polygons, see polygons_3d().
+        pairs (np.array, 2 x num_pairs): Index of polygon pairs.
+        normals (dict): Normal vectors of the polygons in pairs.
+
+    Returns:
+        np.array of bool, size num_pairs: True if the pair may intersect.
+
+    """
+    if pairs.shape[1] == 0:
+        return np.zeros(0, dtype=bool)
+
+    pairs = pairs.astype(int)
+    ind = np.unique(pairs)
+
+    # Vertexes, centers and normals of the polygons, and the deviation of the
+    # vertexes from the plane of each polygon.
+    num_vertexes = np.zeros(len(polys), dtype=int)
+    num_vertexes[ind] = [polys[i].shape[1] for i in ind]
+    vertex_start = np.hstack((0, np.cumsum(num_vertexes)))
+    vertexes = np.hstack([polys[i] for i in ind])
+    centers = np.zeros((3, len(polys)))
+    centers[:, ind] = np.vstack([polys[i].mean(axis=1) for i in ind]).T
+    normal = np.zeros((3, len(polys)))
+    normal[:, ind] = np.hstack([normals[i] for i in ind])
+
+    x_min, x_max, y_min, y_max, z_min, z_max = _axis_aligned_bounding_box_3d(
+        [polys[i] for i in ind]
+    )
+    box_min = np.zeros((3, len(polys)))
+    box_max = np.zeros((3, len(polys)))
+    box_min[:, ind] = np.vstack((x_min, y_min, z_min))
+    box_max[:, ind] = np.vstack((x_max, y_max, z_max))
+
+    def signed_distances(plane: np.ndarray, points: np.ndarray) -> np.ndarray:
+        # Distances (scaled with the norm of the normal vector) of the vertexes of
+        # polygons in points from the planes of the polygons in plane, one row
+        # per vertex.
+        counts = num_vertexes[points]
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        vertex = vertex_start[points].repeat(counts) + offset
+        plane_rep = plane.repeat(counts)
+        return np.sum(
+            normal[:, plane_rep] * (vertexes[:, vertex] - centers[:, plane_rep]),
+            axis=0,
+        )
+
+    def on_one_side(plane: np.ndarray, points: np.ndarray) -> np.ndarray:
+        # Check if all vertexes of points are on the same side of the plane
+        start = np.hstack((0, np.cumsum(num_vertexes[points])[:-1]))
+        dist = signed_distances(plane, points)
+        dist_min = np.minimum.reduceat(dist, start)
+        dist_max = np.maximum.reduceat(dist, start)
+
+        # Deviation of the plane polygon from planarity
+        planarity = np.maximum.reduceat(
+            np.abs(signed_distances(plane, plane)),
+            np.hstack((0, np.cumsum(num_vertexes[plane])[:-1])),
+        )
+        # polygons_3d() considers the sign of the normal vector dotted with unit
+        # vectors from a vertex of the plane polygon, with a tolerance of 1e-8. The
+        # length of these vectors is bounded by the diagonal of the joint bounding
+        # box. A safety factor of 2 is applied.
+        diagonal = np.sqrt(
+            np.sum(
+                (
+                    np.maximum(box_max[:, plane], box_max[:, points])
+                    - np.minimum(box_min[:, plane], box_min[:, points])
+                )
+                ** 2,
+                axis=0,
+            )
+        )
+        margin = planarity + 2e-8 * diagonal
+        return np.logical_or(dist_min > margin, dist_max < -margin)
+
+    separated = np.logical_or(
+        on_one_side(pairs[0], pairs[1]), on_one_side(pairs[1], pairs[0])
+    )
+    return np.logical_not(separated)
+
+
 def segments_polygon(
     start: np.ndarray, end: np.ndarray, poly: np.ndarray, tol: float = 1e-5
 ) -> Tuple[np.ndarray, np.ndarray]:
@@ -2287,22 +2444,17 @@ def _axis_aligned_bounding_box_3d(
 
     polys = list(polys)
 
-    num_poly = len(polys)
+    if len(polys) == 0:
+        empty = np.empty(0)
+        return empty, empty.copy(), empty.copy(), empty.copy(), empty.copy(), empty
 
-    x_min = np.empty(num_poly)
-    x_max = np.empty_like(x_min)
-    y_min = np.empty_like(x_min)
-    y_max = np.empty_like(x_min)
-    z_min = np.empty_like(x_min)
-    z_max = np.empty_like(x_min)
+    # Reduce over the vertexes of all polygons at once.
+    num_vertexes = np.array([p.shape[1] for p in polys])
+    start = np.hstack((0, np.cumsum(num_vertexes)[:-1]))
+    all_vertexes = np.hstack(polys).astype(float)
 
-    for ind, p in enumerate(polys):
-        x_min[ind] = np.min(p[0])
-        x_max[ind] = np.max(p[0])
-        y_min[ind] = np.min(p[1])
-        y_max[ind] = np.max(p[1])
-        z_min[ind] = np.min(p[2])
-        z_max[ind] = np.max(p[2])
+    x_min, y_min, z_min = np.minimum.reduceat(all_vertexes, start, axis=1)[:3]
+    x_max, y_max, z_max = np.maximum.reduceat(all_vertexes, start, axis=1)[:3]
 
     return x_min, x_max, y_min, y_max, z_min, z_max
 
@@ -2327,52 +2479,12 @@ def _identify_overlapping_intervals(left: np.ndarray, right: np.ndarray) -> np.n
     if left.size < 2:
         return np.empty((2, 0))
 
-    # Sort the coordinates
-    sort_ind_left = np.argsort(left)
-    sort_ind_right = np.argsort(right)
-
-    # pointers to the next start and end point of an interval
-    next_right = 0
-    next_left = 0
-
-    # List of pairs we have found
-    pairs: List = []
-    # List of intervals we are currently in. All intervals will join and leave this set.
-    active: List = []
-
-    num_lines = left.size
-
-    # Loop through the line, add and remove intervals as we come across them.
-    while True:
-        # Check if the next start (left) point is before the next endpoint,
-        # But only if there are more left points available.
-        # Less or equal is critical here, or else cases where a point interval
-        # is combined with the start of another interval may not be discovered.
-        if (
-            next_left < num_lines
-            and left[sort_ind_left[next_left]] <= right[sort_ind_right[next_right]]
-        ):
-            # We have started a new interval. This will be paired with
-            # all active intervals
-            for a in active:
-                pairs.append([a, sort_ind_left[next_left]])
-            # Also join the new intervals to the active set.
-            active.append(sort_ind_left[next_left])
-            # Increase the index
-            next_left += 1
-        else:
-            # We have reached the end of the interval - remove it from the
-            # active ones.
-            active.remove(sort_ind_right[next_right])
-            next_right += 1
-            # Check if we have come to the end
-            if next_right == num_lines:
-                break
-
-    if len(pairs) == 0:
+    pairs = _sweep_overlapping_boxes([left], [right])
+
+    if pairs.shape[1] == 0:
         return np.empty((2, 0))
     else:
-        final_pairs = np.asarray(pairs).T
+        final_pairs = pairs
         # First sort the pairs themselves
         final_pairs.sort(axis=0)
         # Next, sort the columns so that the first row is non-decreasing
@@ -2413,58 +2525,12 @@ def _identify_overlapping_rectangles(
     if xmin.size < 2:
         return np.empty((2, 0))
 
-    # Sort the coordinates
-    sort_ind_min = np.argsort(xmin)
-    sort_ind_max = np.argsort(xmax)
-
-    # pointers to the next start and end point of an interval
-    next_min = 0
-    next_max = 0
-
-    # List of pairs we have found
-    pairs = []
-    # List of intervals we are currently in. All intervals will join and leave this set.
-    active: List = []
-
-    num_lines = xmax.size
-
-    # Pass along the x-axis, identify the start and end of rectangles as we go.
-    # The idea is then for each new interval to check which of the active intervals
-    # also have overlap along the y-axis. These will be identified as pairs.
-    while True:
-        # Check if the next start (xmin) point is before the next endpoint,
-        # but only if there are more left points available.
-        # Less or equal is critical here, or else cases where a point interval
-        # is combined with the start of another interval may not be discovered.
-        if (
-            next_min < num_lines
-            and xmin[sort_ind_min[next_min]] <= xmax[sort_ind_max[next_max]]
-        ):
-            # Find active rectangles where the y-interval is also overlapping
-            between = np.where(
-                np.logical_and(
-                    ymax[sort_ind_min[next_min]] >= ymin[active],
-                    ymin[sort_ind_min[next_min]] <= ymax[active],
-                )
-            )[0]
-            # For all identified overlaps, add the new pairs
-            for a in between:
-                pairs.append([active[a], sort_ind_min[next_min]])
-            # Add this to the active rectangles, and increase the index
-            active.append(sort_ind_min[next_min])
-            next_min += 1
-        else:
-            # We are leaving a rectangle.
-            active.remove(sort_ind_max[next_max])
-            next_max += 1
-            # Check if we have come to the end
-            if next_max == num_lines:
-                break
-
-    if len(pairs) == 0:
+    pairs = _sweep_overlapping_boxes([xmin, ymin], [xmax, ymax])
+
+    if pairs.shape[1] == 0:
         return np.empty((2, 0))
     else:
-        final_pairs = np.asarray(pairs).T
+        final_pairs = pairs
         # First sort the pairs themselves
         final_pairs.sort(axis=0)
         # Next, sort the columns so that the first row is non-decreasing
@@ -2473,6 +2539,81 @@ def _identify_overlapping_rectangles(
         return final_pairs
 
 
+def _sweep_overlapping_boxes(
+    box_min: List[np.ndarray], box_max: List[np.ndarray], max_candidates: int = 10**7
+) -> np.ndarray:
+    """Identify pairs of overlapping axis-aligned boxes by a sweep along the first
+    axis.
+
+    The boxes are sorted according to their minimum coordinate along the first axis.
+    Each box is paired with the boxes that start later in the sorted order, but not
+    after the box ends. Among these candidates, pairs are kept if the boxes also
+    overlap along the remaining axes. Boxes are considered closed, thus boxes that
+    only touch are overlapping.
+
+    Parameters:
+        box_min (list of np.array): Minimum coordinates of the boxes, one array per
+            axis.
+        box_max (list of np.array): Maximum coordinates of the boxes, one array per
+            axis.
+        max_candidates (int, optional): Maximum number of candidate pairs processed
+            at once. Limits the memory consumption.
+
+    Returns:
+        np.array, 2 x num_overlaps: Each column contains a pair of overlapping
+            boxes. The pairs are ordered according to the start of the second box,
+            and next the start of the first box, along the first axis. This is the
+            order in which a sweep line algorithm would find them.
+
+    """
+    # Sort the boxes along the first axis
+    order = np.argsort(box_min[0])
+    sorted_min = box_min[0][order]
+    sorted_max = box_max[0][order]
+
+    # The candidates of box i (in sorted order) are the boxes i + 1, ..., end[i] - 1
+    first_candidate = np.arange(order.size) + 1
+    end = np.searchsorted(sorted_min, sorted_max, side="right")
+    num_candidates = np.maximum(end - first_candidate, 0)
+
+    # Process the candidates in chunks of boxes, to limit memory consumption.
+    cum_candidates = np.hstack((0, np.cumsum(num_candidates)))
+
+    first_pos: List[np.ndarray] = []
+    second_pos: List[np.ndarray] = []
+    start = 0
+    while start < order.size:
+        stop = np.searchsorted(
+            cum_candidates, cum_candidates[start] + max_candidates, side="right"
+        )
+        stop = min(max(stop - 1, start + 1), order.size)
+
+        counts = num_candidates[start:stop]
+        first = np.repeat(np.arange(start, stop), counts)
+        # Position of the candidates, relative to their first box
+        offset = np.arange(first.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = first + 1 + offset
+
+        # Keep candidates that overlap along the other axes
+        ind_first, ind_second = order[first], order[second]
+        keep = np.ones(first.size, dtype=bool)
+        for cmin, cmax in zip(box_min[1:], box_max[1:]):
+            keep = np.logical_and(keep, cmax[ind_second] >= cmin[ind_first])
+            keep = np.logical_and(keep, cmin[ind_second] <= cmax[ind_first])
+        first_pos.append(first[keep])
+        second_pos.append(second[keep])
+        start = stop
+
+    if len(first_pos) == 0:
+        return np.empty((2, 0), dtype=order.dtype)
+
+    first_all = np.hstack(first_pos)
+    second_all = np.hstack(second_pos)
+    # Order by the second box, then the first one
+    sort_ind = np.lexsort((first_all, second_all))
+    return np.vstack((order[first_all[sort_ind]], order[second_all[sort_ind]]))
+
+
 def _intersect_pairs(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
     """For two lists containing pair of indices, find the intersection.
 
@@ -12,11 +12,11 @@ Acknowledgements:
 """
 from __future__ import annotations
 
-import itertools
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from scipy import sparse as sps
+from scipy.spatial import cKDTree
 
 import porepy as pp
 from porepy.utils import mcolon, tags
@@ -160,6 +160,16 @@ class Grid:
 
         self.frac_pairs: np.ndarray = np.array([[]], dtype=int)
 
+        # Spatial index of the cell centers, constructed on demand by closest_cell(),
+        # together with the cell center array it was built from.
+        self._cell_center_tree: Optional[Tuple[np.ndarray, cKDTree]] = None
+        # Cell diameters computed by cell_diameters(), with the node array they were
+        # computed from.
+        self._cell_diameters: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # Topological maps computed from cell_faces and face_nodes, stored together
+        # with the matrices and arrays they were computed from, see _topology_cache().
+        self._topology: Optional[Tuple[List[Any], Dict[str, Any]]] = None
+
         # Add tag for the boundary faces
         if external_tags is None:
             self.tags: Dict[str, np.ndarray] = {}
@@ -265,6 +275,11 @@ class Grid:
 
         self.history.append("Compute geometry")
 
+        # The cell centers will be recomputed, thus the spatial index and the cell
+        # diameters are outdated
+        self._cell_center_tree = None
+        self._cell_diameters = None
+
         if self.dim == 0:
             self._compute_geometry_0d()
         elif self.dim == 1:
@@ -611,13 +626,19 @@ class Grid:
         """
         Obtain mapping between cells and nodes.
 
+        The mapping is computed at the first call, and stored until cell_faces or
+        face_nodes are modified, see _topology_cache().
+
         Returns:
             sps.csc_matrix, size num_nodes x num_cells: Value 1 indicates a
                 connection between cell and node.
 
         """
-        mat = (self.face_nodes * np.abs(self.cell_faces)) > 0
-        return mat
+        cache = self._topology_cache()
+        if "cell_nodes" not in cache:
+            mat = (self.face_nodes * np.abs(self.cell_faces)) > 0
+            cache["cell_nodes"] = _compact_indices(mat)
+        return cache["cell_nodes"].copy()
 
     def num_cell_nodes(self) -> np.ndarray:
         """Number of nodes per cell.
@@ -626,7 +647,10 @@ class Grid:
             np.ndarray, size num_cells: Number of nodes per cell.
 
         """
-        return self.cell_nodes().sum(axis=0).A.ravel("F")
+        cache = self._topology_cache()
+        if "num_cell_nodes" not in cache:
+            cache["num_cell_nodes"] = self.cell_nodes().sum(axis=0).A.ravel("F")
+        return cache["num_cell_nodes"].copy()
 
     def get_internal_nodes(self) -> np.ndarray:
         """
@@ -743,6 +767,12 @@ class Grid:
         """
         Compute the cell diameters. If self.dim == 0, return 0
 
+        The diameter of a cell is the maximum distance between two of its nodes. The
+        cells are grouped by their number of nodes, and the node distances are
+        computed for all cells in a group at once. The result is stored on the grid
+        and reused until compute_geometry() is called, the node array is reassigned,
+        or cn is provided.
+
         Parameters:
             cn (optional): cell nodes map, previously already computed.
             Otherwise a call to self.cell_nodes is provided.
@@ -754,24 +784,47 @@ class Grid:
         if self.dim == 0:
             return np.zeros(1)
 
-        def comb(n):
-            return np.fromiter(
-                itertools.chain.from_iterable(itertools.combinations(n, 2)), n.dtype
-            ).reshape((2, -1), order="F")
-
-        def diam(n):
-            return np.amax(
-                np.linalg.norm(self.nodes[:, n[0, :]] - self.nodes[:, n[1, :]], axis=0)
-            )
-
         if cn is None:
+            cached = getattr(self, "_cell_diameters", None)
+            if (
+                cached is not None
+                and cached[0] is self.nodes
+                and cached[1].size == self.num_cells
+            ):
+                return cached[1].copy()
             cn = self.cell_nodes()
-        return np.array(
-            [
-                diam(comb(cn.indices[cn.indptr[c] : cn.indptr[c + 1]]))
-                for c in np.arange(self.num_cells)
-            ]
-        )
+            store = True
+        else:
+            store = False
+
+        cn = sps.csc_matrix(cn)
+        num_nodes = np.diff(cn.indptr)
+        diams = np.zeros(self.num_cells)
+
+        # Upper limit on the number of node pairs treated at once, to limit memory
+        # consumption for grids with many nodes per cell.
+        max_pairs = 10**6
+
+        for n in np.unique(num_nodes):
+            if n < 2:
+                continue
+            cells = np.where(num_nodes == n)[0]
+            # All pairs of nodes in a cell with n nodes
+            first, second = np.triu_indices(n, k=1)
+            chunk = max(1, max_pairs // first.size)
+            for start in range(0, cells.size, chunk):
+                ci = cells[start : start + chunk]
+                # Node indices of the cells, one row per cell
+                nodes = cn.indices[cn.indptr[ci].reshape((-1, 1)) + np.arange(n)]
+                dist = np.linalg.norm(
+                    self.nodes[:, nodes[:, first]] - self.nodes[:, nodes[:, second]],
+                    axis=0,
+                )
+                diams[ci] = np.amax(dist, axis=1)
+
+        if store:
+            self._cell_diameters = (self.nodes, diams.copy())
+        return diams
 
     def cell_face_as_dense(self) -> np.ndarray:
         """
@@ -815,19 +868,48 @@ class Grid:
 
         """
 
-        # Create a copy of the cell-face relation, so that we can modify it at
-        # will
-        cell_faces = self.cell_faces.copy()
+        cache = self._topology_cache()
+        if "cell_connection_map" not in cache:
+            # Create a copy of the cell-face relation, so that we can modify it at
+            # will
+            cell_faces = self.cell_faces.copy()
+
+            # Direction of normal vector does not matter here, only 0s and 1s
+            cell_faces.data = np.abs(cell_faces.data)
 
-        # Direction of normal vector does not matter here, only 0s and 1s
-        cell_faces.data = np.abs(cell_faces.data)
+            # Find connection between cells via the cell-face map
+            c2c = cell_faces.transpose() * cell_faces
+            # Only care about absolute values
+            c2c.data = np.clip(c2c.data, 0, 1).astype("bool")
+            cache["cell_connection_map"] = _compact_indices(c2c)
 
-        # Find connection between cells via the cell-face map
-        c2c = cell_faces.transpose() * cell_faces
-        # Only care about absolute values
-        c2c.data = np.clip(c2c.data, 0, 1).astype("bool")
+        return cache["cell_connection_map"].copy()
 
-        return c2c
+    def _topology_cache(self) -> Dict[str, Any]:
+        """Get the storage of topological maps derived from cell_faces and face_nodes.
+
+        The maps are stored together with the matrices cell_faces and face_nodes, and
+        their index and data arrays. If any of these have been replaced since the maps
+        were stored, as is done when the matrices are reassigned or their sparsity
+        pattern is changed (e.g. by fracture splitting or propagation), the stored maps
+        are discarded. Changes of the values in the index arrays, without replacing
+        the arrays, are not detected.
+
+        Returns:
+            dict: Topological maps, identified by the name of the method computing them.
+
+        """
+        key = []
+        for mat in (self.cell_faces, self.face_nodes):
+            key += [mat] + [
+                getattr(mat, a, None) for a in ("indices", "indptr", "data")
+            ]
+
+        cached = self._topology
+        if cached is None or any(a is not b for a, b in zip(cached[0], key)):
+            cached = (key, {})
+            self._topology = cached
+        return cached[1]
 
     def signs_and_cells_of_boundary_faces(
         self, faces: np.ndarray
@@ -887,35 +969,47 @@ class Grid:
         For dim < 3, no checks are made if the point is in the plane / line
         of the grid.
 
+        The search uses a KD-tree of the cell centers, which is constructed at the
+        first call and reused in subsequent calls. The tree is reconstructed if
+        compute_geometry() is called or the cell centers are reassigned, but not if
+        the cell center array is modified in place.
+
         Parameters:
             p (np.ndarray, 3xn): Point coordinates. If p.shape[0] < 3,
                 additional points will be treated as zeros.
+            return_distance (bool, optional): If True, also the distance between the
+                points and the closest cell centers are returned. Defaults to False.
 
         Returns:
             np.ndarray of ints: For each point, index of the cell with center
                 closest to the point.
+            np.ndarray: For each point, distance to the closest cell center. Only
+                returned if return_distance is True.
         """
         p = np.atleast_2d(p)
         if p.shape[0] < 3:
             z = np.zeros((3 - p.shape[0], p.shape[1]))
             p = np.vstack((p, z))
 
-        def min_dist(pts):
-            c = self.cell_centers
-            d = np.sum(np.power(c - pts, 2), axis=0)
-            min_id = np.argmin(d)
-            return min_id, np.sqrt(d[min_id])
-
-        ci = np.empty(p.shape[1], dtype=int)
-        di = np.empty(p.shape[1])
-        for i in range(p.shape[1]):
-            ci[i], di[i] = min_dist(p[:, i].reshape((3, -1)))
+        di, ci = self._cell_center_kdtree().query(p.T)
+        ci = np.asarray(ci, dtype=int)
+        di = np.asarray(di, dtype=float)
 
         if return_distance:
             return ci, di
         else:
             return ci
 
+    def _cell_center_kdtree(self) -> cKDTree:
+        # Get the KD-tree of the cell centers, construct it if necessary.
+        # Grids which bypass the constructor may lack the attribute.
+        cached = getattr(self, "_cell_center_tree", None)
+        if cached is None or cached[0] is not self.cell_centers:
+            tree = cKDTree(self.cell_centers.T)
+            cached = (self.cell_centers, tree)
+            self._cell_center_tree = cached
+        return cached[1]
+
     def initiate_face_tags(self) -> None:
         keys = tags.standard_face_tags()
         values = [np.zeros(self.num_faces, dtype=bool) for _ in keys]
@@ -945,3 +1039,13 @@ class Grid:
     def _indices(true_false: np.ndarray) -> np.ndarray:
         """Shorthand for np.argwhere."""
         return np.argwhere(true_false).ravel("F")
+
+
+def _compact_indices(mat: sps.spmatrix) -> sps.spmatrix:
+    """Use 32 bit integers for the index arrays of a compressed sparse matrix, if
+    the size of the matrix allows.
+    """
+    if max(mat.shape) < np.iinfo(np.int32).max and mat.nnz < np.iinfo(np.int32).max:
+        mat.indices = mat.indices.astype(np.int32, copy=False)
+        mat.indptr = mat.indptr.astype(np.int32, copy=False)
+    return mat
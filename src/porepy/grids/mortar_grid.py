@@ -115,6 +115,9 @@ class MortarGrid:
         self.cell_centers: np.ndarray = np.hstack(
             [g.cell_centers for g in self.side_grids.values()]
         )
+        # Projections for vector quantities, computed on demand.
+        self._vector_projections: Dict[Tuple[str, int], sps.spmatrix] = {}
+
         # Set projections
         if not (primary_secondary is None):
             self._init_projections(primary_secondary, face_duplicate_ind)
@@ -489,7 +492,7 @@ class MortarGrid:
                 Size: g_primary.num_faces x mortar_grid.num_cells.
 
         """
-        return self._convert_to_vector_variable(self._primary_to_mortar_int, nd)
+        return self._convert_to_vector_variable("_primary_to_mortar_int", nd)
 
     def secondary_to_mortar_int(self, nd: int = 1) -> sps.spmatrix:
         """Project values from cells on the secondary side to the mortar, by
@@ -510,7 +513,7 @@ class MortarGrid:
                 Size: g_secondary.num_cells x mortar_grid.num_cells.
 
         """
-        return self._convert_to_vector_variable(self._secondary_to_mortar_int, nd)
+        return self._convert_to_vector_variable("_secondary_to_mortar_int", nd)
 
     def primary_to_mortar_avg(self, nd: int = 1) -> sps.spmatrix:
         """Project values from faces of primary to the mortar, by averaging quantities
@@ -532,7 +535,7 @@ class MortarGrid:
                 Size: g_primary.num_faces x mortar_grid.num_cells.
 
         """
-        return self._convert_to_vector_variable(self._primary_to_mortar_avg, nd)
+        return self._convert_to_vector_variable("_primary_to_mortar_avg", nd)
 
     def secondary_to_mortar_avg(self, nd: int = 1) -> sps.spmatrix:
         """Project values from cells at the secondary to the mortar, by averaging
@@ -553,7 +556,7 @@ class MortarGrid:
             sps.matrix: Projection matrix with row sum unity.
                 Size: g_secondary.num_cells x mortar_grid.num_cells.
         """
-        return self._convert_to_vector_variable(self._secondary_to_mortar_avg, nd)
+        return self._convert_to_vector_variable("_secondary_to_mortar_avg", nd)
 
     # IMPLEMENTATION NOTE: The reverse projections, from mortar to primary/secondary are
     # found by taking transposes, and switching average and integration (since we are
@@ -578,7 +581,7 @@ class MortarGrid:
                 Size: mortar_grid.num_cells x g_primary.num_faces.
 
         """
-        return self._convert_to_vector_variable(self._mortar_to_primary_int, nd)
+        return self._convert_to_vector_variable("_mortar_to_primary_int", nd)
 
     def mortar_to_secondary_int(self, nd: int = 1) -> sps.spmatrix:
         """Project values from the mortar to cells at the secondary, by summing quantities
@@ -600,7 +603,7 @@ class MortarGrid:
 
 
         """
-        return self._convert_to_vector_variable(self._mortar_to_secondary_int, nd)
+        return self._convert_to_vector_variable("_mortar_to_secondary_int", nd)
 
     def mortar_to_primary_avg(self, nd: int = 1) -> sps.spmatrix:
         """Project values from the mortar to faces of primary, by averaging
@@ -622,7 +625,7 @@ class MortarGrid:
                 Size: mortar_grid.num_cells x g_primary.num_faces.
 
         """
-        return self._convert_to_vector_variable(self._mortar_to_primary_avg, nd)
+        return self._convert_to_vector_variable("_mortar_to_primary_avg", nd)
 
     def mortar_to_secondary_avg(self, nd: int = 1) -> sps.spmatrix:
         """Project values from the mortar to secondary, by averaging quantities from the
@@ -644,20 +647,25 @@ class MortarGrid:
                 Size: mortar_grid.num_cells x g_secondary.num_faces.
 
         """
-        return self._convert_to_vector_variable(self._mortar_to_secondary_avg, nd)
-
-    def _convert_to_vector_variable(
-        self, matrix: sps.spmatrix, nd: int
-    ) -> sps.spmatrix:
-        """Convert the scalar projection to a vector quantity. If the prescribed
-        dimension is 1 (default for all the above methods), the projection matrix
-        will in effect not be altered.
+        return self._convert_to_vector_variable("_mortar_to_secondary_avg", nd)
+
+    def _convert_to_vector_variable(self, name: str, nd: int) -> sps.spmatrix:
+        """Convert the scalar projection stored in the attribute name to a vector
+        quantity. If the prescribed dimension is 1 (default for all the above methods),
+        the projection matrix will in effect not be altered.
+
+        The expanded projections are cached, the cache is reset when the scalar
+        projections are updated (see self._set_projections()).
         """
+        matrix = getattr(self, name)
         if nd == 1:
             # No need to do expansion for 1d variables.
             return matrix
-        else:
-            return sps.kron(matrix, sps.eye(nd)).tocsc()
+
+        key = (name, nd)
+        if key not in self._vector_projections:
+            self._vector_projections[key] = sps.kron(matrix, sps.eye(nd)).tocsc()
+        return self._vector_projections[key]
 
     def sign_of_mortar_sides(self, nd: int = 1) -> sps.spmatrix:
         """Assign positive or negative weight to the two sides of a mortar grid.
@@ -826,6 +834,8 @@ class MortarGrid:
         """Set projections to and from primary from the current state of
         self._primary_to_mortar_int and self._secondary_to_mortar_int.
         """
+        # The projections for vector quantities must be recomputed.
+        self._vector_projections = {}
 
         # IMPLEMENTATION NOTE: Use optimized storage to minimize memory consumption.
         if primary:
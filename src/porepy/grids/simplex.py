@@ -6,14 +6,15 @@ Acknowledgements:
     Toolbox (MRST) developed by SINTEF ICT, see www.sintef.no/projectweb/mrst/
 
 """
-from typing import Optional
+import sys
+from typing import List, Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
 import scipy.spatial
 
 from porepy.grids.grid import Grid
-from porepy.utils import accumarray, setmembership
+from porepy.utils import accumarray
 
 
 class TriangleGrid(Grid):
@@ -69,16 +70,38 @@ class TriangleGrid(Grid):
 
         assert num_nodes > 2  # Check of transposes of point array
 
-        # Face node relations
-        face_nodes = np.hstack((tri[[0, 1]], tri[[1, 2]], tri[[2, 0]])).transpose()
-        face_nodes.sort(axis=1)
-        face_nodes, _, cell_faces = setmembership.unique_rows(face_nodes)
-
-        num_faces = face_nodes.shape[0]
         num_cells = tri.shape[1]
+        tri = tri.astype(_index_dtype(num_nodes), copy=False)
+
+        # Face node relations. The faces are ordered cell-wise, with the faces of each
+        # cell given by nodes (0, 1), (1, 2) and (2, 0).
+        face_nodes = np.empty((2, num_cells, 3), dtype=tri.dtype)
+        for fi, (n0, n1) in enumerate([(0, 1), (1, 2), (2, 0)]):
+            face_nodes[0, :, fi] = tri[n0]
+            face_nodes[1, :, fi] = tri[n1]
+        face_nodes = face_nodes.reshape((2, -1))
+        face_nodes.sort(axis=0)
+
+        # Identify the unique faces from integer keys. The faces are ordered by the
+        # byte representation of their nodes, as is done by setmembership.unique_rows
+        # on the rows of node pairs. On little endian systems, this corresponds to
+        # sorting on the byte swapped nodes.
+        if sys.byteorder == "little":
+            swapped = face_nodes.astype(np.uint32).byteswap()
+            keys = swapped[0].astype(np.uint64) << np.uint64(32)
+            keys |= swapped[1]
+            del swapped
+        else:
+            keys = face_nodes[0].astype(np.uint64) << np.uint64(32)
+            keys |= face_nodes[1].astype(np.uint64)
+        new_2_old, cell_faces = _group_faces([keys])
+        del keys
+
+        face_nodes = face_nodes[:, new_2_old]
+        num_faces = face_nodes.shape[1]
 
         num_nodes_per_face = 2
-        face_nodes = face_nodes.ravel("C")
+        face_nodes = face_nodes.ravel("F")
         indptr = np.hstack(
             (
                 np.arange(0, num_nodes_per_face * num_faces, num_nodes_per_face),
@@ -92,16 +115,16 @@ class TriangleGrid(Grid):
 
         # Cell face relation
         num_faces_per_cell = 3
-        cell_faces = cell_faces.reshape(num_faces_per_cell, num_cells).ravel("F")
         indptr = np.hstack(
             (
                 np.arange(0, num_faces_per_cell * num_cells, num_faces_per_cell),
                 num_faces_per_cell * num_cells,
             )
         )
+        # The first occurrence of each face has a positive sign, the second a
+        # negative sign.
         data = -np.ones(cell_faces.shape)
-        _, sgns = np.unique(cell_faces, return_index=True)
-        data[sgns] = 1
+        data[new_2_old] = 1
         cell_faces = sps.csc_matrix(
             (data, cell_faces, indptr), shape=(num_faces, num_cells)
         )
@@ -179,15 +202,10 @@ class StructuredTriangleGrid(TriangleGrid):
         tri_base = np.vstack((ind_1, ind_2, ind_3, ind_1, ind_3, ind_4)).reshape(
             (3, -1), order="F"
         )
-        # Initialize array of triangles. For the moment, we will append the
-        # cells here, but we do know how many cells there are in advance,
-        # so pre-allocation is possible if this turns out to be a bottleneck
-        tri = tri_base
-
-        # Loop over all remaining rows in the y-direction.
-        for iter1 in range(nx[1].astype(int) - 1):
-            # The node numbers are increased by nx[0] + 1 for each row
-            tri = np.hstack((tri, tri_base + (iter1 + 1) * (nx[0] + 1)))
+        # Add the cells of all rows in the y-direction. The node numbers are increased
+        # by nx[0] + 1 for each row
+        increment = np.arange(nx[1]) * (nx[0] + 1)
+        tri = (tri_base[:, np.newaxis] + increment[:, np.newaxis]).reshape((3, -1))
 
         super().__init__(p, tri, name="StructuredTriangleGrid")
 
@@ -241,18 +259,44 @@ class TetrahedralGrid(Grid):
         # This is apparently needed to appease mypy
         assert tet is not None
 
+        # The numbering of the faces depends on the type of the cell-node array, see
+        # below.
+        sort_faces = issubclass(tet.dtype.type, np.int_)
+
         # Define face-nodes so that the first column contains fn of cell 0,
         # etc.
         face_nodes = np.vstack(
             (tet[[1, 0, 2]], tet[[0, 1, 3]], tet[[2, 0, 3]], tet[[1, 2, 3]])
-        )
+        ).astype(_index_dtype(num_nodes), copy=False)
         # Reshape face-nodes into a 3x 4*num_cells-matrix, with the four first
         # columns belonging to cell 0.
         face_nodes = face_nodes.reshape((3, 4 * num_cells), order="F")
-        sort_ind = np.squeeze(np.argsort(face_nodes, axis=0))
-        face_nodes_sorted = np.sort(face_nodes, axis=0)
-        face_nodes, _, cell_faces = setmembership.unique_columns_tol(face_nodes_sorted)
 
+        # The orientation of the face relative to the cell is given by the parity of
+        # the permutation that sorts the face nodes: Even permutations give negative
+        # signs, odd permutations positive.
+        odd_permutation = np.greater(face_nodes[0], face_nodes[1])
+        odd_permutation ^= face_nodes[0] > face_nodes[2]
+        odd_permutation ^= face_nodes[1] > face_nodes[2]
+
+        face_nodes.sort(axis=0)
+
+        # Identify the unique faces from integer keys. If possible, the nodes are
+        # packed into a single key, otherwise the first node forms a separate key.
+        # The faces are numbered as by setmembership.unique_columns_tol: For cell-node
+        # arrays of the default integer type, the faces are sorted lexicographically
+        # by their nodes, otherwise they are numbered in order of first occurrence.
+        if num_nodes < 2**21:
+            keys = [face_nodes[0].astype(np.int64) * num_nodes + face_nodes[1]]
+            keys[0] *= num_nodes
+            keys[0] += face_nodes[2]
+        else:
+            keys = [face_nodes[1].astype(np.int64) * num_nodes, face_nodes[0]]
+            keys[0] += face_nodes[2]
+        new_2_old, cell_faces = _group_faces(keys, sort=sort_faces)
+        del keys
+
+        face_nodes = face_nodes[:, new_2_old]
         num_faces = face_nodes.shape[1]
 
         num_nodes_per_face = 3
@@ -276,9 +320,7 @@ class TetrahedralGrid(Grid):
                 num_faces_per_cell * num_cells,
             )
         )
-        data = np.ones(cell_faces.shape)
-        sgn_change = np.where(np.any(np.diff(sort_ind, axis=0) == 1, axis=0))[0]
-        data[sgn_change] = -1
+        data = np.where(odd_permutation, 1.0, -1.0)
         cell_faces = sps.csc_matrix(
             (data, cell_faces, indptr), shape=(num_faces, num_cells)
         )
@@ -405,17 +447,62 @@ class StructuredTetrahedralGrid(TetrahedralGrid):
                 ind_8,
             )
         ).reshape((4, -1), order="F")
-        # Initialize array of triangles. For the moment, we will append the
-        # cells here, but we do know how many cells there are in advance,
-        # so pre-allocation is possible if this turns out to be a bottleneck
-
-        # Loop over all remaining rows in the y-direction.
-        for iter2 in range(nx[2].astype(int)):
-            for iter1 in range(nx[1].astype(int)):
-                increment = iter2 * nxy + iter1 * (nx[0] + 1)
-                if iter2 == 0 and iter1 == 0:
-                    tet = tet_base + increment
-                else:
-                    tet = np.hstack((tet, tet_base + increment))
+        # Add the cells of all rows in the y- and z-directions, with the row in the
+        # y-direction running fastest.
+        increment = np.add.outer(np.arange(nx[2]) * nxy, np.arange(nx[1]) * (nx[0] + 1))
+        increment = increment.ravel()
+        tet = (tet_base[:, np.newaxis] + increment[:, np.newaxis]).reshape((4, -1))
 
         super().__init__(p, tet=tet, name="StructuredTetrahedralGrid")
+
+
+def _index_dtype(num_nodes: int) -> type:
+    """Integer type used for node indices in the construction of the topology."""
+    return np.int32 if num_nodes < np.iinfo(np.int32).max else np.int64
+
+
+def _group_faces(
+    keys: List[np.ndarray], sort: bool = True
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Identify equal faces from integer keys that represent their nodes.
+
+    Parameters:
+        keys (list of np.ndarray): Keys of the faces. If more than one key is given,
+            the faces are sorted lexicographically, with the last key as the primary
+            sort key, as in np.lexsort.
+        sort (boolean, optional): If True (default), the unique faces are numbered
+            in the sorted order of their keys. If False, they are numbered in the
+            order of their first occurrence.
+
+    Returns:
+        np.ndarray: Index of the first occurrence of each unique face.
+        np.ndarray: Index of the unique face of each face.
+
+    """
+    # The sorting is stable, thus the first face in each group of equal faces is
+    # the first occurrence of that face.
+    if len(keys) == 1:
+        order = np.argsort(keys[0], kind="stable")
+    else:
+        order = np.lexsort(keys)
+
+    is_new = np.zeros(order.size, dtype=bool)
+    is_new[:1] = True
+    for key in keys:
+        sorted_key = key[order]
+        is_new[1:] |= sorted_key[1:] != sorted_key[:-1]
+        del sorted_key
+
+    new_2_old = order[is_new]
+    group = np.cumsum(is_new) - 1
+    if not sort:
+        # Renumber the groups by their first occurrence
+        group_order = np.argsort(new_2_old)
+        new_2_old = new_2_old[group_order]
+        rank = np.empty(group_order.size, dtype=group.dtype)
+        rank[group_order] = np.arange(group_order.size)
+        group = rank[group]
+
+    old_2_new = np.empty(order.size, dtype=group.dtype)
+    old_2_new[order] = group
+    return new_2_old, old_2_new
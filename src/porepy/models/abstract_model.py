@@ -57,6 +57,9 @@ class AbstractModel:
         # we should have an enum here.
         self.convergence_status: bool = False
         self.linear_solver = self.params["linear_solver"]
+        # Factorizations of the linear system, reused by the direct solver when the
+        # sparsity pattern of the system matrix is unchanged.
+        self._factorization_cache = pp.SparseLUCache()
 
         self._nonlinear_iteration: int = 0
         assert isinstance(self.params["use_ad"], bool)
@@ -1339,14 +1339,12 @@ class ContactMechanicsBiot(pp.ContactMechanics):
         solver = self.params.get("linear_solver", "direct")
 
         if solver == "direct":
-            """In theory, it should be possible to instruct SuperLU to reuse the
-            symbolic factorization from one iteration to the next. However, it seems
-            the scipy wrapper around SuperLU has not implemented the necessary
-            functionality, as discussed in
-
-                https://github.com/scipy/scipy/issues/8227
-
-            We will therefore pass here, and pay the price of long computation times.
+            """The system is solved by SuperLU, through the factorization cache
+            self._factorization_cache. The cache reuses the column ordering computed
+            for the previous system matrix if the sparsity pattern is unchanged, and
+            the full factorization if the matrix is identical. The scipy wrapper
+            around SuperLU does not allow reuse of the symbolic factorization itself,
+            see pp.SparseLUCache for details.
             """
             self.linear_solver = "direct"
         elif solver == "pypardiso":
@@ -17,7 +17,6 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
-import scipy.sparse.linalg as spla
 
 import porepy as pp
 from porepy.models.abstract_model import AbstractModel
@@ -287,7 +286,7 @@ class ContactMechanics(AbstractModel):
             + f" {np.min(np.sum(np.abs(A), axis=1)):.2e} A sum."
         )
         if self.linear_solver == "direct":
-            return spla.spsolve(A, b)
+            return self._factorization_cache.solve(A, b)
         else:
             raise NotImplementedError("Not that far yet")
 
@@ -1346,14 +1345,12 @@ class ContactMechanics(AbstractModel):
     def _initialize_linear_solver(self) -> None:
         solver: str = self.params.get("linear_solver", "direct")
         if solver == "direct":
-            """In theory, it should be possible to instruct SuperLU to reuse the
-            symbolic factorization from one iteration to the next. However, it seems
-            the scipy wrapper around SuperLU has not implemented the necessary
-            functionality, as discussed in
-
-                https://github.com/scipy/scipy/issues/8227
-
-            We will therefore pass here, and pay the price of long computation times.
+            """The system is solved by SuperLU, through the factorization cache
+            self._factorization_cache. The cache reuses the column ordering computed
+            for the previous system matrix if the sparsity pattern is unchanged, and
+            the full factorization if the matrix is identical. The scipy wrapper
+            around SuperLU does not allow reuse of the symbolic factorization itself,
+            see pp.SparseLUCache for details.
 
             """
             self.linear_solver = "direct"
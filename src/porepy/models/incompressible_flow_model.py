@@ -8,7 +8,6 @@ import time
 from typing import Dict, List, Optional, Union
 
 import numpy as np
-import scipy.sparse as sps
 
 import porepy as pp
 
@@ -405,7 +404,7 @@ class IncompressibleFlow(pp.models.abstract_model.AbstractModel):
             + f" {np.min(np.sum(np.abs(A), axis=1)):.2e} A sum."
         )
         tic = time.time()
-        x = sps.linalg.spsolve(A, b)
+        x = self._factorization_cache.solve(A, b)
         logger.info("Solved linear system in {} seconds".format(time.time() - tic))
         return x
 
@@ -156,12 +156,30 @@ def uniquify_discretization_list(all_discr):
 def discretize_from_list(
     discretizations: Dict,
     gb: pp.GridBucket,
-) -> None:
+    cache: Optional["pp.DiscretizationCache"] = None,
+    num_workers: int = 1,
+    executor: str = "thread",
+) -> "pp.DiscretizationTimings":
     """For a list of (ideally uniquified) discretizations, perform the actual
     discretization.
+
+    The discretizations are executed by a pp.DiscretizationScheduler, which runs
+    discretizations on interfaces after those on the neighboring subdomains, and
+    independent discretizations concurrently if num_workers > 1.
+
+    If a cache is given, discretizations on the nodes of the GridBucket are passed
+    through the cache, see pp.DiscretizationCache.
+
+    Returns:
+        pp.DiscretizationTimings: Time spent on each discretization.
+
     """
+    scheduler = pp.DiscretizationScheduler(gb, num_workers, executor)
     for discr in discretizations:
         # discr is a discretization (on node or interface in the GridBucket sense)
+        term = discr.__class__.__name__
+        if hasattr(discr, "keyword"):
+            term += f"({discr.keyword})"
 
         # Loop over all grids (or GridBucket edges), do discretization.
         for g in discretizations[discr]:
@@ -170,14 +188,31 @@ def discretize_from_list(
                 g_primary, g_secondary = g
                 d_primary = gb.node_props(g_primary)
                 d_secondary = gb.node_props(g_secondary)
-                discr.discretize(g_primary, g_secondary, d_primary, d_secondary, data)
+                scheduler.add(
+                    discr.discretize,
+                    (g_primary, g_secondary, d_primary, d_secondary, data),
+                    [g, g_primary, g_secondary],
+                    term,
+                    coupling=True,
+                )
             else:
                 data = gb.node_props(g)
-                try:
-                    discr.discretize(g, data)
-                except NotImplementedError:
-                    # This will likely be GradP and other Biot discretizations
-                    pass
+                scheduler.add(_discretize_node, (discr, g, data, cache), [g], term)
+
+    return scheduler.run()
+
+
+def _discretize_node(
+    discr, g: pp.Grid, data: Dict, cache: Optional["pp.DiscretizationCache"]
+) -> None:
+    try:
+        if cache is None:
+            discr.discretize(g, data)
+        else:
+            cache.discretize(discr, g, data)
+    except NotImplementedError:
+        # This will likely be GradP and other Biot discretizations
+        pass
 
 
 class MergedOperator(operators.Operator):
@@ -247,33 +282,13 @@ class MergedOperator(operators.Operator):
 
         """
 
-        # Data structure for matrices
-        mat = []
-
         if len(self.mat_dict_grids) == 0:
             # The underlying discretization is constructed on an empty grid list, quite
             # likely on a mixed-dimensional grid containing no mortar grids.
             # We can return an empty matrix.
             return sps.csc_matrix((0, 0))
 
-        # Loop over all grid-discretization combinations, get hold of the discretization
-        # matrix for this grid quantity
-        for g in self.mat_dict_grids:
-
-            # Get data dictionary for either grid or interface
-            if isinstance(g, pp.Grid):
-                data = gb.node_props(g)
-            else:
-                data = gb.edge_props(g)
-
-            mat_dict: Dict[str, sps.spmatrix] = data[pp.DISCRETIZATION_MATRICES][
-                self.mat_dict_key
-            ]
-
-            # Get the submatrix for the right discretization
-            key = self.key
-            mat_key = getattr(self.discr, key + "_matrix_key")
-            mat.append(mat_dict[mat_key])
+        mat = self.discretization_matrices(gb)
 
         if all([isinstance(m, np.ndarray) for m in mat]):
             if all([m.ndim == 1 for m in mat]):
@@ -296,3 +311,38 @@ class MergedOperator(operators.Operator):
         else:
             # This is a standard term; wrap it in a diagonal sparse matrix
             return sps.block_diag(mat, format="csr")
+
+    def discretization_matrices(self, gb: pp.GridBucket) -> List:
+        """Get the discretization matrices of this operator on the individual grids or
+        interfaces.
+
+        Parameters:
+            gb (pp.GridBucket): Mixed-dimensional grid where the matrices are stored.
+
+        Returns:
+            list: The discretization matrices, as stored in the data dictionaries, in
+                the order of the grids or interfaces of this operator.
+
+        """
+        # Data structure for matrices
+        mat = []
+
+        # Loop over all grid-discretization combinations, get hold of the discretization
+        # matrix for this grid quantity
+        for g in self.mat_dict_grids:
+            # Get data dictionary for either grid or interface
+            if isinstance(g, pp.Grid):
+                data = gb.node_props(g)
+            else:
+                data = gb.edge_props(g)
+
+            mat_dict: Dict[str, sps.spmatrix] = data[pp.DISCRETIZATION_MATRICES][
+                self.mat_dict_key
+            ]
+
+            # Get the submatrix for the right discretization
+            key = self.key
+            mat_key = getattr(self.discr, key + "_matrix_key")
+            mat.append(mat_dict[mat_key])
+
+        return mat
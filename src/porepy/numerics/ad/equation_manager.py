@@ -4,14 +4,14 @@ EquationManager: representation of a set of equations on Ad form.
 from __future__ import annotations
 
 from collections import Counter
-from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import numpy as np
 import scipy.sparse as sps
 
 import porepy as pp
 
-from . import _ad_utils, operators
+from . import _ad_utils, grid_operators, operators
 
 __all__ = ["EquationManager"]
 
@@ -45,6 +45,16 @@ class EquationManager:
             be recovered by np.arange(row_bl..[i], row_bl..[i+1]). The user must relate the
             indices to equations (either in self.equations or the equation list given to the
             relevant assembly method). This information is intended for diagnostic usage.
+        block_jacobian (bool): If True, equations are evaluated with the Jacobian
+            represented by blocks of columns (see pp.ad.BlockJacobian), which are
+            combined into a single matrix only during assembly. This can save memory and
+            time for mixed-dimensional problems with many subdomains.
+        linear_equations (set of str): Names of equations that are linear in the
+            variables, with coefficients that do not change between evaluations. The
+            Jacobian matrices of these equations are computed once, and reused in
+            later assembly as long as the equation and its discretization matrices are
+            unchanged. Only the residuals are evaluated anew. See also
+            identify_linear_equations().
 
     """
 
@@ -54,6 +64,8 @@ class EquationManager:
         dof_manager: pp.DofManager,
         equations: Optional[Dict[str, "pp.ad.Operator"]] = None,
         secondary_variables: Optional[Sequence["pp.ad.Variable"]] = None,
+        block_jacobian: bool = False,
+        linear_equations: Optional[Sequence[str]] = None,
     ) -> None:
         """Initialize the EquationManager.
 
@@ -63,9 +75,24 @@ class EquationManager:
             equations (List, Optional): List of equations. Defaults to empty list.
             secondary_variables (List of Ad Variable or MergedVariable): Variables
                 to be considered secondary for this EquationManager.
+            block_jacobian (bool, optional): Use a block representation of the Jacobian
+                matrices during evaluation of the equations. Defaults to False.
+            linear_equations (Sequence of str, optional): Names of equations that are
+                linear, with frozen coefficients. The Jacobian matrices of these
+                equations are reused between assembly. Defaults to an empty list.
 
         """
         self.gb = gb
+        self.block_jacobian = block_jacobian
+        self.linear_equations: Set[str] = set(linear_equations or [])
+
+        # Jacobian matrices of the linear equations, together with the equation and
+        # its discretization matrices at the time of evaluation.
+        self._linear_jacobians: Dict[str, Tuple[operators.Operator, List, sps.spmatrix]]
+        self._linear_jacobians = {}
+        # Preallocated matrices for assembly of the Jacobian, one per combination of
+        # equations and variables.
+        self._stacked_jacobians: Dict[Tuple, _StackedJacobian] = {}
 
         # Inform mypy about variables, and then set them by a dedicated method.
         self.variables: Dict[GridLike, Dict[str, "pp.ad.Variable"]]
@@ -122,6 +149,9 @@ class EquationManager:
         # Defaults to None, will be overwritten by assembly methods.
         self.row_block_indices_last_assembled: Optional[np.ndarray] = None
 
+        # Time spent on discretization, set by self.discretize()
+        self.discretization_timings: Optional[pp.DiscretizationTimings] = None
+
     def _set_variables(self, gb):
         # Define variables as specified in the GridBucket
         variables = {}
@@ -208,27 +238,10 @@ class EquationManager:
                 as found in self.gb. Scaled with -1 (moved to rhs).
 
         """
-        # Data structures for building the Jacobian matrix and residual vector
-        mat: List[sps.spmatrix] = []
-        rhs: List[np.ndarray] = []
-
-        # Keep track of first row index for each equation/block
-        ind_start: List[int] = [0]
-
-        # Iterate over equations, assemble.
-        for eq in self.equations.values():
-            ad = eq.evaluate(self.dof_manager, state)
-            # Append matrix and rhs
-            mat.append(ad.jac)
-            # Multiply by -1 to move to the rhs
-            rhs.append(-ad.val)
-            ind_start.append(ind_start[-1] + ad.val.size)
-
-        # The system assembled in the for-loop above contains derivatives for both
-        # primary and secondary variables, where the primary is understood as the
-        # complement of the secondary ones. Columns relating to secondary variables
-        # should therefore be removed. Construct a projection matrix onto the set
-        # of primary variables and right multiply the Jacobian matrix.
+        # The Jacobian matrices of the equations contain derivatives for both primary
+        # and secondary variables, where the primary is understood as the complement of
+        # the secondary ones. Columns relating to secondary variables are removed during
+        # assembly, while the right hand side vector has contributions from both.
 
         # Define primary variables as the complement of the secondary ones
         # This operation we do on atomic variables (not merged), or else there may
@@ -236,18 +249,10 @@ class EquationManager:
         primary_variables = self._variable_set_complement(
             self._variables_as_list(self.secondary_variables)
         )
-        proj = self._column_projection(primary_variables)
-
-        # Concatenate matrix and remove columns of secondary variables
-        A = sps.bmat([[m] for m in mat], format="csr") * proj
-
-        # The right hand side vector. This should have contributions form both primary
-        # and secondary variables, thus no need to modify it before concatenation.
-        rhs_cat = np.hstack([vec for vec in rhs])
-
-        # Store information on start of each block
-        self.row_block_indices_last_assembled = np.array(ind_start)
 
+        A, rhs_cat = self._assemble_equations(
+            list(self.equations.keys()), primary_variables, state
+        )
         return A, rhs_cat
 
     def assemble_subsystem(
@@ -290,43 +295,12 @@ class EquationManager:
         if eq_names is None:
             eq_names = list(self.equations.keys())
 
-        # Data structures for building matrix and residual vector
-        mat: List[sps.spmatrix] = []
-        rhs: List[np.ndarray] = []
-
-        # Projection to the subset of active variables
-        projection = self._column_projection(variables)
-
-        ind_start = [0]
-
-        # Iterate over equations, assemble.
-        for name in eq_names:
-            eq = self.equations[name]
-            ad = eq.evaluate(self.dof_manager)
-
-            # ad contains derivatives with respect to all variables, while
-            # we need a subset. Project the columns to get the right size.
-            mat.append(ad.jac * projection)
-
-            # The residuals can be stored without reordering.
-            # Multiply by -1 to move to the rhs
-            rhs.append(-ad.val)
-
-            ind_start.append(ind_start[-1] + ad.val.size)
-
-        # Concatenate results.
-        if len(mat) > 0:
-            A = sps.bmat([[m] for m in mat], format="csr")
-            rhs_cat = np.hstack([vec for vec in rhs])
-        else:
+        if len(eq_names) == 0:
             # Special case if the restriction produced an empty system.
-            A = sps.csr_matrix((0, 0))
-            rhs_cat = np.empty(0)
-
-        # Store information on start of each block
-        self.row_block_indices_last_assembled = np.array(ind_start)
+            self.row_block_indices_last_assembled = np.array([0])
+            return sps.csr_matrix((0, 0)), np.empty(0)
 
-        return A, rhs_cat
+        return self._assemble_equations(eq_names, variables)
 
     def assemble_schur_complement_system(
         self,
@@ -450,9 +424,17 @@ class EquationManager:
             equations=sub_eqs,
             dof_manager=self.dof_manager,
             secondary_variables=secondary_variables,
+            block_jacobian=self.block_jacobian,
+            linear_equations=[n for n in eq_names if n in self.linear_equations],
         )
 
-    def discretize(self, gb: pp.GridBucket) -> None:
+    def discretize(
+        self,
+        gb: pp.GridBucket,
+        cache: Optional[pp.DiscretizationCache] = None,
+        num_workers: int = 1,
+        executor: str = "thread",
+    ) -> None:
         """Loop over all discretizations in self.equations, find all unique discretizations
         and discretize.
 
@@ -460,9 +442,21 @@ class EquationManager:
         discretizations which occur more than once in a set of equations will be
         identified and only discretized once.
 
+        The time spent on each discretization is stored in the attribute
+        discretization_timings.
+
         Parameters:
             gb (pp.GridBucket): Mixed-dimensional grid from which parameters etc. will
                 be taken and where discretization matrices will be stored.
+            cache (pp.DiscretizationCache, optional): If given, discretization
+                matrices on the subdomains are loaded from, or stored in, this
+                cache.
+            num_workers (int, optional): Number of discretizations to run
+                concurrently. Discretizations on interfaces are run after those on
+                the neighboring subdomains. Defaults to 1.
+            executor (str, optional): Type of worker pool used if num_workers > 1,
+                either 'thread' or 'process'. See pp.DiscretizationScheduler for
+                details. Defaults to 'thread'.
 
         """
         # Somehow loop over all equations, discretize identified objects
@@ -478,7 +472,128 @@ class EquationManager:
 
         # Uniquify to save computational time, then discretize.
         unique_discr = _ad_utils.uniquify_discretization_list(discr)
-        _ad_utils.discretize_from_list(unique_discr, gb)
+        self.discretization_timings = _ad_utils.discretize_from_list(
+            unique_discr, gb, cache, num_workers, executor
+        )
+
+    def identify_linear_equations(self) -> List[str]:
+        """Identify equations that are linear, with frozen coefficients.
+
+        An equation is considered linear if the variables enter only through sums, and
+        through products with (or division by) coefficients that do not depend on
+        the variables. The coefficients are considered frozen if they are formed by
+        discretization matrices, by grid operators such as projections and
+        divergences, or by Matrix, Array and Scalar operators. Coefficients formed by
+        parameters (ParameterArray, ParameterMatrix, BoundaryCondition), by functions
+        or by variables at the previous iteration or time step may change between
+        evaluations, and equations that multiply these with variables are not
+        considered linear. These may still be flagged as linear by the user, by adding
+        them to self.linear_equations.
+
+        The identified equations are added to self.linear_equations.
+
+        NOTE: Frozen coefficients that are modified in place, rather than replaced,
+        are not detected. If, for instance, the values of an Array are modified
+        directly, the equation should be removed from self.linear_equations.
+
+        Returns:
+            list of str: Names of the equations identified as linear.
+
+        """
+        linear = []
+        for name, eq in self.equations.items():
+            _, is_linear, _ = _linearity(eq, {})
+            if is_linear:
+                linear.append(name)
+                self.linear_equations.add(name)
+        return linear
+
+    def _assemble_equations(
+        self,
+        eq_names: Sequence[str],
+        variables: Sequence["pp.ad.Variable"],
+        state: Optional[np.ndarray] = None,
+    ) -> Tuple[sps.spmatrix, np.ndarray]:
+        """Assemble Jacobian matrix and residual vector for a set of equations, with
+        columns restricted to a set of atomic variables.
+
+        The Jacobian matrices of linear equations are taken from storage, if
+        possible, and the blocks of all equations are written into a preallocated
+        matrix.
+
+        """
+        key = (tuple(eq_names), frozenset(v.id for v in variables))
+        stacked = self._stacked_jacobians.get(key, None)
+        if stacked is None:
+            stacked = _StackedJacobian(self._column_projection(variables))
+            self._stacked_jacobians[key] = stacked
+
+        # Data structures for building matrix and residual vector
+        mat: List[sps.spmatrix] = []
+        reused: List[bool] = []
+        rhs: List[np.ndarray] = []
+
+        # Keep track of first row index for each equation/block
+        ind_start: List[int] = [0]
+
+        # Iterate over equations, assemble.
+        for name in eq_names:
+            jac, val, is_reused = self._evaluate_equation(name, state)
+            mat.append(jac)
+            reused.append(is_reused)
+            # Multiply by -1 to move to the rhs
+            rhs.append(-val)
+            ind_start.append(ind_start[-1] + val.size)
+
+        # Concatenate matrix and remove columns of variables not included
+        A = stacked.stack(mat, reused)
+        rhs_cat = np.hstack([vec for vec in rhs])
+
+        # Store information on start of each block
+        self.row_block_indices_last_assembled = np.array(ind_start)
+
+        return A, rhs_cat
+
+    def _evaluate_equation(
+        self, name: str, state: Optional[np.ndarray]
+    ) -> Tuple[sps.csr_matrix, np.ndarray, bool]:
+        """Evaluate the Jacobian matrix and residual of an equation.
+
+        Returns:
+            sps.csr_matrix: Jacobian matrix, with derivatives for all variables.
+            np.ndarray: Residual vector.
+            bool: True if the Jacobian was reused from a previous evaluation.
+
+        """
+        eq = self.equations[name]
+
+        if name in self.linear_equations and name in self._linear_jacobians:
+            known_eq, known_coefficients, jac = self._linear_jacobians[name]
+            coefficients = _discretization_matrices(eq, self.gb)
+            if (
+                known_eq is eq
+                and len(coefficients) == len(known_coefficients)
+                and all(a is b for a, b in zip(coefficients, known_coefficients))
+            ):
+                val = eq.evaluate(self.dof_manager, state, values_only=True)
+                return jac, val, True
+
+        ad = eq.evaluate(self.dof_manager, state, self.block_jacobian)
+        jac = self._full_jacobian(ad).tocsr()
+        jac.sum_duplicates()
+        if name in self.linear_equations:
+            self._linear_jacobians[name] = (
+                eq,
+                _discretization_matrices(eq, self.gb),
+                jac,
+            )
+        return jac, ad.val, False
+
+    def _full_jacobian(self, ad: "pp.ad.Ad_array") -> sps.spmatrix:
+        """Get the Jacobian of an evaluated equation as a single sparse matrix."""
+        if isinstance(ad.jac, pp.ad.BlockJacobian):
+            return ad.jac.tocsr()
+        return ad.jac
 
     def _column_projection(self, variables: Sequence["pp.ad.Variable"]) -> sps.spmatrix:
         """Create a projection matrix from the full variable set to a subset.
@@ -686,3 +801,204 @@ class EquationManager:
         for name, eq in equation_dictionary.items():
             eq.set_name(name)
             self.equations.update({name: eq})
+
+
+class _StackedJacobian:
+    """Jacobian matrix formed by stacking the Jacobians of several equations, with
+    columns restricted to a subset of the variables.
+
+    The sparsity pattern of the stacked matrix is computed once. In subsequent calls,
+    the values of the blocks are written directly into the data array of the stacked
+    matrix, provided the sparsity patterns of the blocks are unchanged. Blocks that are
+    reused from a previous call (e.g. Jacobians of linear equations) are not copied.
+
+    """
+
+    def __init__(self, projection: sps.spmatrix) -> None:
+        # Projection onto the active columns
+        self._projection = projection.tocsr()
+
+        # Blocks that were reused from the previous call, or None.
+        self._blocks: List[Optional[sps.csr_matrix]] = []
+        # Sparsity patterns of the blocks, as indptr and indices
+        self._patterns: List[Tuple[np.ndarray, np.ndarray]] = []
+        # For each block, the items in its data array that are kept after projection,
+        # in the order of the data of the stacked matrix.
+        self._data_maps: List[np.ndarray] = []
+        # Start of the data of each block in the stacked matrix
+        self._offsets: np.ndarray = np.zeros(1, dtype=int)
+
+        # The stacked matrix
+        self._data: np.ndarray = np.zeros(0)
+        self._indices: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._indptr: np.ndarray = np.zeros(1, dtype=np.int32)
+        self._shape: Tuple[int, int] = (0, self._projection.shape[1])
+
+    def stack(self, blocks: List[sps.csr_matrix], reused: List[bool]) -> sps.csr_matrix:
+        """Stack the blocks, and restrict the columns.
+
+        Parameters:
+            blocks (list of sps.csr_matrix): Jacobian matrices of the equations, in
+                canonical format (sorted indices, no duplicates).
+            reused (list of bool): Whether each block was reused from the previous
+                call.
+
+        Returns:
+            sps.csr_matrix: The stacked matrix. The returned matrix is not referenced
+                by this object, and can be modified.
+
+        """
+        if self._same_pattern(blocks):
+            for i, block in enumerate(blocks):
+                if block is self._blocks[i]:
+                    continue
+                start, end = self._offsets[i], self._offsets[i + 1]
+                self._data[start:end] = block.data[self._data_maps[i]]
+        else:
+            self._new_pattern(blocks)
+
+        self._blocks = [b if r else None for b, r in zip(blocks, reused)]
+
+        return sps.csr_matrix(
+            (self._data.copy(), self._indices.copy(), self._indptr.copy()),
+            shape=self._shape,
+        )
+
+    def _same_pattern(self, blocks: List[sps.csr_matrix]) -> bool:
+        if len(blocks) != len(self._patterns):
+            return False
+        for block, known, (indptr, indices) in zip(
+            blocks, self._blocks, self._patterns
+        ):
+            if block is known:
+                continue
+            if not (
+                np.array_equal(block.indptr, indptr)
+                and np.array_equal(block.indices, indices)
+            ):
+                return False
+        return True
+
+    def _new_pattern(self, blocks: List[sps.csr_matrix]) -> None:
+        # Find how the data of each block is mapped to the stacked matrix, by
+        # projecting a matrix with the data array enumerated. The enumeration starts
+        # at 1, so that no element is an explicit zero.
+        index_blocks = []
+        self._data_maps = []
+        for block in blocks:
+            index = sps.csr_matrix(
+                (np.arange(1, block.nnz + 1), block.indices, block.indptr),
+                shape=block.shape,
+            )
+            projected = (index * self._projection).tocsr()
+            projected.sort_indices()
+            self._data_maps.append(projected.data.astype(int) - 1)
+            index_blocks.append(projected)
+
+        stacked = sps.vstack(index_blocks, format="csr")
+        self._indices = stacked.indices
+        self._indptr = stacked.indptr
+        self._shape = stacked.shape
+        self._offsets = np.cumsum([0] + [m.size for m in self._data_maps])
+
+        self._data = np.hstack(
+            [np.zeros(0)] + [b.data[m] for b, m in zip(blocks, self._data_maps)]
+        )
+        self._patterns = [(b.indptr, b.indices) for b in blocks]
+
+
+def _linearity(
+    op: operators.Operator, memo: Dict[int, Tuple[bool, bool, bool]]
+) -> Tuple[bool, bool, bool]:
+    """Analyze the dependency of an operator on the variables.
+
+    Returns:
+        bool: True if the operator depends on the (current) variables.
+        bool: True if the operator is an affine function of the variables, with frozen
+            coefficients.
+        bool: True if the operator is frozen, that is, it does not depend on the
+            variables, and its value does not change between evaluations.
+
+    """
+    if id(op) in memo:
+        return memo[id(op)]
+    if isinstance(op, pp.ad.Ad_array):
+        # Pre-evaluated operator
+        return (True, False, False)
+
+    tree = op.tree
+    children = tree.children
+    Operation = operators.Operation
+
+    if len(children) == 0:
+        if isinstance(op, operators.Variable):
+            if op.prev_time or op.prev_iter:
+                result = (False, True, False)
+            else:
+                result = (True, True, False)
+        elif isinstance(
+            op,
+            (
+                _ad_utils.MergedOperator,
+                operators.Matrix,
+                operators.Array,
+                operators.Scalar,
+                grid_operators.Divergence,
+                grid_operators.Trace,
+            ),
+        ):
+            result = (False, True, True)
+        else:
+            result = (False, True, False)
+
+    elif tree.op == Operation.evaluate:
+        # Functions are only considered linear if their arguments are independent of
+        # the variables.
+        dependent = any(_linearity(c, memo)[0] for c in children[1:])
+        result = (dependent, not dependent, False)
+
+    else:
+        (d_0, l_0, f_0), (d_1, l_1, f_1) = [_linearity(c, memo) for c in children]
+        if tree.op in (Operation.add, Operation.sub):
+            result = (d_0 or d_1, l_0 and l_1, f_0 and f_1)
+        elif tree.op == Operation.mul:
+            if d_0 and d_1:
+                result = (True, False, False)
+            elif d_0:
+                result = (True, l_0 and f_1, False)
+            elif d_1:
+                result = (True, l_1 and f_0, False)
+            else:
+                result = (False, True, f_0 and f_1)
+        elif tree.op == Operation.div:
+            if d_1:
+                result = (True, False, False)
+            elif d_0:
+                result = (True, l_0 and f_1, False)
+            else:
+                result = (False, True, f_0 and f_1)
+        else:
+            result = (d_0 or d_1, False, False)
+
+    memo[id(op)] = result
+    return result
+
+
+def _discretization_matrices(op: operators.Operator, gb: pp.GridBucket) -> List:
+    """Get all discretization matrices used in an operator tree, as stored in the
+    data dictionaries of the GridBucket.
+    """
+    matrices: List = []
+    visited: Set[int] = set()
+    stack = [op]
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        if isinstance(node, _ad_utils.MergedOperator):
+            if len(node.mat_dict_grids) > 0:
+                matrices += node.discretization_matrices(gb)
+        else:
+            stack += node.tree.children
+    return matrices
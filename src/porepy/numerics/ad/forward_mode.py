@@ -1,7 +1,9 @@
+from typing import Dict, Optional, Tuple
+
 import numpy as np
 import scipy.sparse as sps
 
-__all__ = ["initAdArrays", "Ad_array"]
+__all__ = ["initAdArrays", "Ad_array", "BlockJacobian", "IndexProjection"]
 
 
 def initAdArrays(variables):
@@ -32,7 +34,7 @@ class Ad_array:
 
     def __repr__(self) -> str:
         s = f"Ad array of size {self.val.size}\n"
-        s += f"Jacobian is of size {self.jac.shape} and has {self.jac.data.size} elements"
+        s += f"Jacobian is of size {self.jac.shape} and has {self.jac.nnz} elements"
         return s
 
     def __add__(self, other):
@@ -221,6 +223,440 @@ class Ad_array:
         return self.jac * other
 
 
+class BlockJacobian:
+    """Jacobian matrix of an Ad_array, represented by blocks of columns.
+
+    The columns of the Jacobian are split into blocks, typically according to the
+    blocks of a DofManager (one block per combination of grid and variable). Only the
+    blocks with non-zero derivatives are stored, thus the Jacobian of a variable that
+    lives on a single subdomain consists of a single block, and arithmetic operations
+    on the Jacobian do not involve the full set of columns.
+
+    The active blocks are stored side by side in a single csr matrix, so that each
+    arithmetic operation amounts to a single sparse matrix operation. When two
+    Jacobians with different active blocks are added, the columns of both are mapped
+    to the union of the blocks; since the ordering of the columns is preserved, this
+    only requires a reindexing of the column indices.
+
+    The class implements the operations on Jacobian matrices needed by Ad_array:
+    Addition and subtraction, multiplication with scalars, and left multiplication
+    with sparse matrices (including diagonal scaling). Operations with a sparse matrix
+    that spans all columns (such as addition) convert the Jacobian to a single csr
+    matrix first, and return a sparse matrix.
+
+    Attributes:
+        mat (sps.csr_matrix): The active blocks, stored side by side.
+        block_indices (np.ndarray): Indices of the active blocks, sorted.
+        block_sizes (np.ndarray): Number of columns in each of the blocks, active or
+            not, e.g. DofManager.full_dof.
+
+    """
+
+    # Make numpy arrays defer to the methods in this class for binary operations.
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        mat: sps.spmatrix,
+        block_indices: np.ndarray,
+        block_sizes: np.ndarray,
+        block_start: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Parameters:
+            mat (sps.spmatrix): The active blocks, stored side by side. The number of
+                columns should equal block_sizes[block_indices].sum().
+            block_indices (np.ndarray): Indices of the active blocks, sorted.
+            block_sizes (np.ndarray): Number of columns in each of the blocks.
+            block_start (np.ndarray, optional): Index of the first column of each block,
+                with the total number of columns as the last element. Computed from
+                block_sizes if not provided.
+
+        """
+        if block_start is None:
+            block_start = np.hstack((0, np.cumsum(block_sizes))).astype(int)
+        if not isinstance(mat, sps.csr_matrix):
+            mat = sps.csr_matrix(mat)
+        self.mat: sps.csr_matrix = mat
+        self.block_indices: np.ndarray = np.asarray(block_indices, dtype=int)
+        self.block_sizes: np.ndarray = block_sizes
+        self._block_start: np.ndarray = block_start
+
+        if self.mat.shape[1] != self.block_sizes[self.block_indices].sum():
+            raise ValueError("Matrix size is incompatible with the active blocks")
+
+    @classmethod
+    def from_blocks(
+        cls, blocks: Dict[int, sps.spmatrix], num_rows: int, block_sizes: np.ndarray
+    ) -> "BlockJacobian":
+        """Form a Jacobian from a dictionary of blocks.
+
+        Parameters:
+            blocks (Dict[int, sps.spmatrix]): Blocks of the Jacobian, identified by their
+                index. Block i should be of size num_rows x block_sizes[i].
+            num_rows (int): Number of rows in the Jacobian.
+            block_sizes (np.ndarray): Number of columns in each of the blocks.
+
+        Returns:
+            BlockJacobian: Block representation of the Jacobian.
+
+        """
+        block_indices = np.array(sorted(blocks.keys()), dtype=int)
+        if block_indices.size == 0:
+            mat = sps.csr_matrix((num_rows, 0))
+        else:
+            mat = sps.hstack([blocks[bi] for bi in block_indices], format="csr")
+        return cls(mat, block_indices, block_sizes)
+
+    @classmethod
+    def from_matrix(cls, mat: sps.spmatrix, block_sizes: np.ndarray) -> "BlockJacobian":
+        """Split a matrix into column blocks. Blocks without non-zeros are dropped.
+
+        Parameters:
+            mat (sps.spmatrix): Matrix to be split, with block_sizes.sum() columns.
+            block_sizes (np.ndarray): Number of columns in each of the blocks.
+
+        Returns:
+            BlockJacobian: Block representation of the matrix.
+
+        """
+        block_start = np.hstack((0, np.cumsum(block_sizes))).astype(int)
+        if mat.shape[1] != block_start[-1]:
+            raise ValueError("Matrix size is incompatible with the block sizes")
+        mat = sps.csc_matrix(mat)
+        # Blocks with at least one non-zero
+        nnz_in_block = np.diff(mat.indptr[block_start])
+        block_indices = np.where(nnz_in_block > 0)[0]
+        cols = np.hstack(
+            [np.arange(block_start[bi], block_start[bi + 1]) for bi in block_indices]
+            + [np.zeros(0, dtype=int)]
+        )
+        return cls(mat[:, cols].tocsr(), block_indices, block_sizes, block_start)
+
+    def __repr__(self) -> str:
+        return (
+            f"Block Jacobian of size {self.shape}, with {self.block_indices.size} "
+            f"active blocks out of {self.block_sizes.size} and {self.nnz} elements"
+        )
+
+    @property
+    def shape(self):
+        return (self.mat.shape[0], self._block_start[-1])
+
+    @property
+    def nnz(self) -> int:
+        return self.mat.nnz
+
+    @property
+    def blocks(self) -> Dict[int, sps.csr_matrix]:
+        """The active blocks, identified by their index."""
+        local_start = self._local_start(self.block_indices)
+        return {
+            bi: self.mat[:, local_start[i] : local_start[i + 1]]
+            for i, bi in enumerate(self.block_indices.tolist())
+        }
+
+    def _local_start(self, block_indices: np.ndarray) -> np.ndarray:
+        # Start of the given blocks when they are stored side by side
+        return np.hstack((0, np.cumsum(self.block_sizes[block_indices]))).astype(int)
+
+    def _expand(
+        self, block_indices: np.ndarray, block_start: np.ndarray
+    ) -> sps.csr_matrix:
+        # Map the columns of self.mat to a set of blocks that contains the active blocks
+        # of self. The start of the blocks in the new column numbering is given by
+        # block_start, which is indexed by position in block_indices.
+        if np.array_equal(block_indices, self.block_indices):
+            return self.mat
+        pos = np.searchsorted(block_indices, self.block_indices)
+        sizes = self.block_sizes[self.block_indices]
+        offset = block_start[pos] - self._local_start(self.block_indices)[:-1]
+        col_map = np.arange(self.mat.shape[1]) + np.repeat(offset, sizes)
+        # The column map preserves the ordering of columns, thus sorted indices are
+        # still sorted.
+        return sps.csr_matrix(
+            (self.mat.data, col_map[self.mat.indices], self.mat.indptr),
+            shape=(self.mat.shape[0], block_start[-1]),
+        )
+
+    def tocsr(self) -> sps.csr_matrix:
+        """Assemble the Jacobian as a single csr matrix with all columns."""
+        return self._expand(np.arange(self.block_sizes.size), self._block_start).copy()
+
+    def toarray(self) -> np.ndarray:
+        return self.tocsr().toarray()
+
+    def copy(self) -> "BlockJacobian":
+        return self._new(self.mat.copy(), self.block_indices)
+
+    def _new(self, mat: sps.spmatrix, block_indices: np.ndarray) -> "BlockJacobian":
+        # New Jacobian with the same block structure
+        return BlockJacobian(mat, block_indices, self.block_sizes, self._block_start)
+
+    def _is_compatible(self, other: "BlockJacobian") -> bool:
+        return self.shape == other.shape and (
+            self._block_start is other._block_start
+            or np.array_equal(self._block_start, other._block_start)
+        )
+
+    def __neg__(self) -> "BlockJacobian":
+        return self._new(-self.mat, self.block_indices)
+
+    def __add__(self, other):
+        if isinstance(other, BlockJacobian):
+            if not self._is_compatible(other):
+                raise ValueError(
+                    f"Inconsistent shapes {self.shape} and {other.shape}, or block sizes"
+                )
+            if np.array_equal(self.block_indices, other.block_indices):
+                return self._new(self.mat + other.mat, self.block_indices)
+            block_indices = np.union1d(self.block_indices, other.block_indices)
+            local_start = self._local_start(block_indices)
+            mat = self._expand(block_indices, local_start) + other._expand(
+                block_indices, local_start
+            )
+            return self._new(mat, block_indices)
+        elif sps.issparse(other):
+            return self.tocsr() + other
+        elif np.isscalar(other):
+            # Follow scipy: Only addition of zero is permitted.
+            if other == 0:
+                return self.copy()
+            raise NotImplementedError(
+                "Adding a nonzero scalar to a sparse matrix is not supported"
+            )
+        return NotImplemented
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        if (
+            isinstance(other, BlockJacobian)
+            or sps.issparse(other)
+            or np.isscalar(other)
+        ):
+            return self.__add__(-other)
+        return NotImplemented
+
+    def __rsub__(self, other):
+        return (-self).__add__(other)
+
+    def __mul__(self, other):
+        # Right multiplication
+        if np.isscalar(other):
+            return self._new(self.mat * other, self.block_indices)
+        elif sps.issparse(other):
+            return self.tocsr() * other
+        return NotImplemented
+
+    def __rmul__(self, other):
+        # Left multiplication
+        if np.isscalar(other):
+            return self.__mul__(other)
+        elif sps.issparse(other):
+            if other.shape[1] != self.mat.shape[0]:
+                raise ValueError(f"Dimension mismatch: {other.shape} and {self.shape}")
+            return self._new(other * self.mat, self.block_indices)
+        return NotImplemented
+
+    def __matmul__(self, other):
+        if np.isscalar(other):
+            raise ValueError("Scalar operands are not allowed, use '*' instead")
+        return self.__mul__(other)
+
+    def __rmatmul__(self, other):
+        if np.isscalar(other):
+            raise ValueError("Scalar operands are not allowed, use '*' instead")
+        return self.__rmul__(other)
+
+
+class IndexProjection:
+    """Sparse matrix represented by gather and scatter index arrays and weights.
+
+    The matrix has the non-zero elements weights[i] at positions (rows[i], cols[i]).
+    This is the typical structure of projections between subdomains, mortar grids and
+    their unions, where each row and column has few (often a single) non-zeros. The
+    product with a vector is computed by gathering the vector at cols, and scattering
+    the weighted values to rows; the product with a (Jacobian) matrix is formed
+    similarly, by gathering and scattering rows of the matrix. This avoids the general
+    sparse matrix-matrix product.
+
+    Products with numpy arrays, sparse matrices, BlockJacobians and Ad_arrays are
+    computed by indexing. Other operations are delegated to the csr representation of
+    the matrix, available through tocsr().
+
+    Attributes:
+        shape (Tuple of ints): Shape of the matrix.
+        rows (np.ndarray): Row index of each non-zero, sorted.
+        cols (np.ndarray): Column index of each non-zero.
+        weights (np.ndarray): Value of each non-zero.
+
+    """
+
+    # Make numpy arrays defer to the methods in this class for binary operations.
+    __array_ufunc__ = None
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        weights: np.ndarray,
+        shape: Tuple[int, int],
+    ) -> None:
+        """
+        Parameters:
+            rows (np.ndarray): Row index of each non-zero.
+            cols (np.ndarray): Column index of each non-zero.
+            weights (np.ndarray): Value of each non-zero.
+            shape (Tuple of ints): Shape of the matrix.
+
+        """
+        rows = np.asarray(rows, dtype=int)
+        # Sort the non-zeros by row. Use a stable sort to preserve the ordering of the
+        # columns within each row.
+        order = np.argsort(rows, kind="stable")
+        self.rows: np.ndarray = rows[order]
+        self.cols: np.ndarray = np.asarray(cols, dtype=int)[order]
+        self.weights: np.ndarray = np.asarray(weights, dtype=float)[order]
+        self.shape: Tuple[int, int] = (int(shape[0]), int(shape[1]))
+
+        # If all rows have at most one non-zero, values are scattered by assignment
+        # rather than summation.
+        self._unique_rows: bool = bool(np.all(np.diff(self.rows) > 0))
+        self._unit_weights: bool = bool(np.all(self.weights == 1))
+        # Index of the first non-zero of each row, with nnz as the last element.
+        self._row_start: np.ndarray = np.searchsorted(
+            self.rows, np.arange(self.shape[0] + 1)
+        )
+        self._csr: Optional[sps.csr_matrix] = None
+
+    @classmethod
+    def from_matrix(cls, mat: sps.spmatrix) -> "IndexProjection":
+        """Represent a sparse matrix by its non-zeros.
+
+        Parameters:
+            mat (sps.spmatrix): Matrix to be represented.
+
+        Returns:
+            IndexProjection: Index representation of the matrix.
+
+        """
+        rows, cols, weights = sps.find(mat)
+        return cls(rows, cols, weights, mat.shape)
+
+    def __repr__(self) -> str:
+        return f"Index projection of size {self.shape} with {self.nnz} elements"
+
+    @property
+    def nnz(self) -> int:
+        return self.rows.size
+
+    @property
+    def T(self) -> "IndexProjection":
+        return self.transpose()
+
+    def transpose(self) -> "IndexProjection":
+        return IndexProjection(self.cols, self.rows, self.weights, self.shape[::-1])
+
+    def tocsr(self) -> sps.csr_matrix:
+        """Assemble the projection as a csr matrix."""
+        if self._csr is None:
+            self._csr = sps.csr_matrix(
+                (self.weights, (self.rows, self.cols)), shape=self.shape
+            )
+        return self._csr
+
+    def toarray(self) -> np.ndarray:
+        return self.tocsr().toarray()
+
+    def _apply_to_vector(self, x: np.ndarray) -> np.ndarray:
+        # Gather the vector at the columns, scatter the weighted values to the rows.
+        if x.size != self.shape[1]:
+            raise ValueError(f"Dimension mismatch: {self.shape} and {x.shape}")
+        vals = x[self.cols]
+        if not self._unit_weights:
+            vals = self.weights * vals
+        if self._unique_rows:
+            result = np.zeros(self.shape[0], dtype=np.result_type(vals, float))
+            result[self.rows] = vals
+            return result
+        return np.bincount(self.rows, weights=vals, minlength=self.shape[0])
+
+    def _apply_to_rows(self, mat: sps.spmatrix) -> sps.csr_matrix:
+        # Gather the rows of the matrix, scatter the weighted rows. The rows gathered
+        # for a row of the result are stored contiguously, thus the result can be
+        # formed directly in csr format.
+        if mat.shape[0] != self.shape[1]:
+            raise ValueError(f"Dimension mismatch: {self.shape} and {mat.shape}")
+        gathered = sps.csr_matrix(mat)[self.cols]
+        data = gathered.data.astype(
+            np.result_type(gathered.data, self.weights), copy=False
+        )
+        if not self._unit_weights:
+            data *= np.repeat(self.weights, np.diff(gathered.indptr))
+        result = sps.csr_matrix(
+            (data, gathered.indices, gathered.indptr[self._row_start]),
+            shape=(self.shape[0], mat.shape[1]),
+        )
+        if not self._unique_rows:
+            result.sum_duplicates()
+        return result
+
+    def __neg__(self) -> "IndexProjection":
+        return IndexProjection(self.rows, self.cols, -self.weights, self.shape)
+
+    def __mul__(self, other):
+        # Right multiplication
+        if isinstance(other, Ad_array):
+            return Ad_array(self * other.val, self * other.jac)
+        elif np.isscalar(other):
+            return IndexProjection(
+                self.rows, self.cols, self.weights * other, self.shape
+            )
+        elif isinstance(other, np.ndarray) and other.ndim == 1:
+            return self._apply_to_vector(other)
+        elif isinstance(other, BlockJacobian):
+            return other._new(self._apply_to_rows(other.mat), other.block_indices)
+        elif isinstance(other, IndexProjection):
+            return self.tocsr() * other.tocsr()
+        elif sps.issparse(other):
+            return self._apply_to_rows(other)
+        return self.tocsr() * other
+
+    def __rmul__(self, other):
+        # Left multiplication
+        if np.isscalar(other):
+            return self.__mul__(other)
+        return other * self.tocsr()
+
+    def __matmul__(self, other):
+        if np.isscalar(other):
+            raise ValueError("Scalar operands are not allowed, use '*' instead")
+        return self.__mul__(other)
+
+    def __rmatmul__(self, other):
+        if np.isscalar(other):
+            raise ValueError("Scalar operands are not allowed, use '*' instead")
+        return self.__rmul__(other)
+
+    def __add__(self, other):
+        if isinstance(other, IndexProjection):
+            other = other.tocsr()
+        return self.tocsr() + other
+
+    def __radd__(self, other):
+        return other + self.tocsr()
+
+    def __sub__(self, other):
+        if isinstance(other, IndexProjection):
+            other = other.tocsr()
+        return self.tocsr() - other
+
+    def __rsub__(self, other):
+        return other - self.tocsr()
+
+
 def _cast(variables):
     if isinstance(variables, list):
         out_var = []
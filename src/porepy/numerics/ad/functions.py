@@ -338,19 +338,20 @@ def maximum(
 
     """
     vals = [var0.val.copy()]
-    jacs = [var0.jac.copy()]
     if isinstance(var1, np.ndarray):
         vals.append(var1.copy())
-        jacs.append(sps.csr_matrix(var0.jac.shape))
     else:
         vals.append(var1.val.copy())
-        jacs.append(var1.jac.copy())
     inds = vals[1] >= vals[0]
 
     max_val = vals[0].copy()
     max_val[inds] = vals[1][inds]
-    max_jac = jacs[0].copy()
-    max_jac[inds] = jacs[1][inds].copy()
+    # Pick the rows of the Jacobian from the argument attaining the maximum. This is
+    # done by row scaling, which also works for block representations of the Jacobian.
+    # If var1 is constant, its Jacobian is zero.
+    max_jac = sps.diags(np.logical_not(inds).astype(float)) * var0.jac
+    if not isinstance(var1, np.ndarray):
+        max_jac = max_jac + sps.diags(inds.astype(float)) * var1.jac
     return pp.ad.Ad_array(max_val, max_jac)
 
 
@@ -379,5 +380,9 @@ def characteristic_function(tol: float, var: pp.ad.Ad_array):
     vals = np.zeros(var.val.size)
     zero_inds = np.isclose(var.val, 0, atol=tol)
     vals[zero_inds] = 1
-    jac = sps.csr_matrix(var.jac.shape)
+    if isinstance(var.jac, pp.ad.BlockJacobian):
+        # Zero Jacobian with the same block structure
+        jac = pp.ad.BlockJacobian.from_blocks({}, var.jac.shape[0], var.jac.block_sizes)
+    else:
+        jac = sps.csr_matrix(var.jac.shape)
     return pp.ad.Ad_array(vals, jac)
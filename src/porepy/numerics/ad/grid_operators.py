@@ -9,7 +9,7 @@ import scipy.sparse as sps
 
 import porepy as pp
 
-from .operators import Matrix, Operator
+from .operators import Matrix, Operator, Projection
 
 __all__ = [
     "MortarProjections",
@@ -62,11 +62,9 @@ class SubdomainProjections(Operator):
         self._tot_num_cells: int = sum([g.num_cells for g in grids])
         self._tot_num_faces: int = sum([g.num_faces for g in grids])
 
-        self._cell_projection, self._face_projection = _subgrid_projections(
-            grids, self._nd
-        )
+        self._cell_offset, self._face_offset = _subgrid_offsets(grids, self._nd)
 
-    def cell_restriction(self, grids: List[pp.Grid]) -> Matrix:
+    def cell_restriction(self, grids: List[pp.Grid]) -> Projection:
         """Construct restrictions from global to subdomain cell quantities.
 
         Parameters:
@@ -74,31 +72,14 @@ class SubdomainProjections(Operator):
                 the projection should apply.
 
         Returns:
-            pp.ad.Matrix: Matrix operator (in the Ad sense) that represents the
+            pp.ad.Projection: Projection operator (in the Ad sense) that represents the
                 projection.
 
         """
-        if isinstance(grids, pp.Grid):
-            return pp.ad.Matrix(self._cell_projection[grids].T, name="CellRestriction")
-        elif isinstance(grids, list):
-            if len(grids) > 0:
-                # A key error will be raised if a grid in g is not known to
-                # self._cell_projection
-                # IMPLEMENTATION NOTE: Use csr format, since the number of rows can
-                # be much less than the number of columns.
-                mat = sps.bmat([[self._cell_projection[g].T] for g in grids]).tocsr()
-            else:
-                # If the grid list is empty, we project from the full set of cells to
-                # nothing.
-                mat = sps.csr_matrix((0, self._tot_num_cells * self._nd))
-            return pp.ad.Matrix(
-                mat,
-                name="CellRestriction",
-            )
-        else:
-            raise ValueError("Argument should be a grid or a list of grids")
+        ind = self._cell_indices(grids)
+        return _restriction(ind, self._tot_num_cells * self._nd, "CellRestriction")
 
-    def cell_prolongation(self, grids: List[pp.Grid]) -> Matrix:
+    def cell_prolongation(self, grids: List[pp.Grid]) -> Projection:
         """Construct prolongation from subdomain to global cell quantities.
 
         Parameters:
@@ -106,31 +87,14 @@ class SubdomainProjections(Operator):
                 the prolongation should apply.
 
         Returns:
-            pp.ad.Matrix: Matrix operator (in the Ad sense) that represent the
+            pp.ad.Projection: Projection operator (in the Ad sense) that represent the
                 prolongation.
 
         """
-        if isinstance(grids, pp.Grid):
-            return pp.ad.Matrix(self._cell_projection[grids], name="CellProlongation")
-        elif isinstance(grids, list):
-            if len(grids) > 0:
-                # A key error will be raised if a grid in g is not known to
-                # self._cell_projection
-                # IMPLEMENTATION NOTE: Use csc format, since the number of columns can
-                # be much less than the number of rows.
-                mat = sps.bmat([[self._cell_projection[g] for g in grids]]).tocsc()
-            else:
-                # If the grid list is empty, we project from nothing to the full set of
-                # cells
-                mat = sps.csc_matrix((self._tot_num_cells * self._nd, 0))
-            return pp.ad.Matrix(
-                mat,
-                name="CellProlongation",
-            )
-        else:
-            raise ValueError("Argument should be a grid or a list of grids")
+        ind = self._cell_indices(grids)
+        return _prolongation(ind, self._tot_num_cells * self._nd, "CellProlongation")
 
-    def face_restriction(self, grids: List[pp.Grid]) -> Matrix:
+    def face_restriction(self, grids: List[pp.Grid]) -> Projection:
         """Construct restrictions from global to subdomain face quantities.
 
         Parameters:
@@ -138,33 +102,14 @@ class SubdomainProjections(Operator):
                 the projection should apply.
 
         Returns:
-            pp.ad.Matrix: Matrix operator (in the Ad sense) that represent the
+            pp.ad.Projection: Projection operator (in the Ad sense) that represent the
                 projection.
 
         """
-        if isinstance(grids, pp.Grid):
-            if "mortar_grid" in grids.name:
-                raise ValueError("Argument should be a regular grid, not mortar grid")
-            return pp.ad.Matrix(self._face_projection[grids].T, name="FaceRestriction")
-        elif isinstance(grids, list):
-            if len(grids) > 0:
-                # A key error will be raised if a grid in grids is not known to
-                # self._face_projection
-                # IMPLEMENTATION NOTE: Use csr format, since the number of rows can
-                # be much less than the number of columns.
-                mat = sps.bmat([[self._face_projection[g].T] for g in grids]).tocsr()
-            else:
-                # If the grid list is empty, we project from the full set of faces to
-                # nothing.
-                mat = sps.csr_matrix((0, self._tot_num_faces * self._nd))
-            return pp.ad.Matrix(
-                mat,
-                name="FaceRestriction",
-            )
-        else:
-            raise ValueError("Argument should be a grid or a list of grids")
+        ind = self._face_indices(grids)
+        return _restriction(ind, self._tot_num_faces * self._nd, "FaceRestriction")
 
-    def face_prolongation(self, grids: List[pp.Grid]) -> Matrix:
+    def face_prolongation(self, grids: List[pp.Grid]) -> Projection:
         """Construct prolongation from subdomain to global face quantities.
 
         Parameters:
@@ -172,29 +117,38 @@ class SubdomainProjections(Operator):
                 the prolongation should apply.
 
         Returns:
-            pp.ad.Matrix: Matrix operator (in the Ad sense) that represent the
+            pp.ad.Projection: Projection operator (in the Ad sense) that represent the
                 prolongation.
 
         """
+        ind = self._face_indices(grids)
+        return _prolongation(ind, self._tot_num_faces * self._nd, "FaceProlongation")
+
+    def _cell_indices(self, grids: List[pp.Grid]) -> np.ndarray:
+        # Global indices of the cells of one or several subdomains.
         if isinstance(grids, pp.Grid):
-            return pp.ad.Matrix(self._face_projection[grids], name="FaceProlongation")
-        elif isinstance(grids, list):
-            if len(grids) > 0:
-                # A key error will be raised if a grid in grids is not known to
-                # self._face_projection
-                # IMPLEMENTATION NOTE: Use csc format, since the number of columns can
-                # be much less than the number of rows.
-                mat = sps.bmat([[self._face_projection[g] for g in grids]]).tocsc()
-            else:
-                # If the grid list is empty, we project from nothing to the full set of
-                # faces
-                mat = sps.csc_matrix((self._tot_num_faces * self._nd, 0))
-            return pp.ad.Matrix(
-                mat,
-                name="FaceProlongation",
-            )
-        else:
+            grids = [grids]
+        elif not isinstance(grids, list):
             raise ValueError("Argument should be a grid or a list of grids")
+        # A key error will be raised if a grid is not known to self._cell_offset
+        return _global_indices(
+            [self._cell_offset[g] for g in grids],
+            [g.num_cells * self._nd for g in grids],
+        )
+
+    def _face_indices(self, grids: List[pp.Grid]) -> np.ndarray:
+        # Global indices of the faces of one or several subdomains.
+        if isinstance(grids, pp.Grid):
+            if "mortar_grid" in grids.name:
+                raise ValueError("Argument should be a regular grid, not mortar grid")
+            grids = [grids]
+        elif not isinstance(grids, list):
+            raise ValueError("Argument should be a grid or a list of grids")
+        # A key error will be raised if a grid is not known to self._face_offset
+        return _global_indices(
+            [self._face_offset[g] for g in grids],
+            [g.num_faces * self._nd for g in grids],
+        )
 
     def __repr__(self) -> str:
         s = (
@@ -266,189 +220,173 @@ class MortarProjections(Operator):
         self._num_edges: int = len(edges)
         self._nd: int = nd
 
-        # Initialize projections
-        cell_projection, face_projection = _subgrid_projections(grids, self._nd)
-
-        # IMPLEMENTATION NOTE:
-        # sparse blocks are slow; it should be possible to do a right multiplication
-        # of local-to-global mortar indices instead of the block.
-
-        # Data structures for constructing the projection operators
-        mortar_to_primary_int, mortar_to_primary_avg = [], []
-        primary_to_mortar_int, primary_to_mortar_avg = [], []
-
-        mortar_to_secondary_int, mortar_to_secondary_avg = [], []
-        secondary_to_mortar_int, secondary_to_mortar_avg = [], []
-
-        # The goal is to construct global projections between grids and mortar grids.
-        # The construction takes two stages, and is different for projections to and
-        # from the mortar grid:
-        # For projections from the mortar grid, a mapping is first made from local
-        # mortar numbering global grid ordering. In the second stage, the mappings from
-        # mortar are stacked to make a global mapping.
-        # Projections to the mortar grid are made by first defining projections from
-        # global grid numbering to local mortar grids, and then stack the latter.
-
-        # Special treatment is needed for the case of empty lists - see below
-        if len(edges) > 0:
-            for e in edges:
-                g_primary, g_secondary = e
-                mg = gb.edge_props(e, "mortar_grid")
-                assert isinstance(mg, pp.MortarGrid)  # Appease mypy
-                if (g_primary.dim != mg.dim + mg.codim) or g_secondary.dim != mg.dim:
-                    # This will correspond to DD of sorts; we could handle this
-                    # by using cell_projections for g_primary and/or
-                    # face_projection for g_secondary, depending on the exact
-                    # configuration
-                    raise NotImplementedError("Non-standard interface.")
-                primary_projection = (
-                    face_projection[g_primary]
-                    if mg.codim < 2
-                    else cell_projection[g_primary]
-                )
-                # Create all projection matrices for this MortarGrid and append them to
-                # the list. The use of optimized storage is of importance here, since
-                # for small subdomain grids in problems with many cells in total, the
-                # projection matrices may have many more rows than columns, or oposite.
-
-                # Projections to primary
-                mortar_to_primary_int.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        primary_projection * mg.mortar_to_primary_int(nd)
-                    )
-                )
-                mortar_to_primary_avg.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        primary_projection * mg.mortar_to_primary_avg(nd)
-                    )
-                )
-
-                # Projections from primary
-                primary_to_mortar_int.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        mg.primary_to_mortar_int(nd) * primary_projection.T
-                    )
-                )
-                primary_to_mortar_avg.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        mg.primary_to_mortar_avg(nd) * primary_projection.T
-                    )
-                )
+        # Offsets of the individual grids in the global cell and face numbering.
+        cell_offset, face_offset = _subgrid_offsets(grids, self._nd)
+        num_cells = sum([g.num_cells for g in grids]) * nd
+        num_faces = sum([g.num_faces for g in grids]) * nd
+
+        # The global projections are represented by their non-zeros, in the form of
+        # row and column indices and weights. These are collected from the projections
+        # of the individual mortar grids, and shifted according to the position of the
+        # subdomain and mortar grids in the global numbering. The projections are
+        # applied by indexing (see pp.ad.Projection); there is no need to form the
+        # sparse matrices.
+        projections: Dict[str, List[Tuple[np.ndarray, np.ndarray, np.ndarray]]] = {
+            name: []
+            for name in (
+                "mortar_to_primary_int",
+                "mortar_to_primary_avg",
+                "primary_to_mortar_int",
+                "primary_to_mortar_avg",
+                "mortar_to_secondary_int",
+                "mortar_to_secondary_avg",
+                "secondary_to_mortar_int",
+                "secondary_to_mortar_avg",
+                "sign_of_mortar_sides",
+            )
+        }
 
-                # Projections to secondary
-                mortar_to_secondary_int.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        cell_projection[g_secondary] * mg.mortar_to_secondary_int(nd)
-                    )
-                )
-                mortar_to_secondary_avg.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        cell_projection[g_secondary] * mg.mortar_to_secondary_avg(nd)
-                    )
-                )
+        def add_nonzeros(name, mat, row_offset, col_offset):
+            rows, cols, vals = sps.find(mat)
+            projections[name].append((rows + row_offset, cols + col_offset, vals))
 
-                # Projections from secondary.
-                # IMPLEMENTATION NOTE: For some reason, forcing csr format here
-                # decreased the runtime with a factor of 5, while this was not important
-                # while creating the other projection matrices. Experimentation showed no
-                # similar pattern when flipping between csc and csr formats, so it probably
-                # just has to be in this way, or this was case-dependent behavior (the
-                # relevant test case was the field case in the 3d flow benchmark).
-                secondary_to_mortar_int.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        mg.secondary_to_mortar_int(nd).tocsr()
-                        * cell_projection[g_secondary].T
-                    )
-                )
-                secondary_to_mortar_avg.append(
-                    pp.matrix_operations.optimized_compressed_storage(
-                        mg.secondary_to_mortar_avg(nd).tocsr()
-                        * cell_projection[g_secondary].T
-                    )
-                )
-        else:
-            # FIXME: The assumption here is that a GridBucket with a single grid
-            # (no fractures) have been constructed. In this case, the projection
-            # to primary should have g.num_faces rows, while there are no
-            # secondary grids to project to. If the mortar projection is constructed
-            # for a different case (hard to imagine what, but who knows), it is not
-            # clear what to do, so we'll raise an error.
-            assert len(grids) == 1
+        # The projections to the primary grids are defined on the faces of the grids
+        # for interfaces of codimension 1, and on the cells for codimension 2.
+        codims = {gb.edge_props(e, "mortar_grid").codim < 2 for e in edges}
+        if len(codims) > 1:
+            raise ValueError("Cannot combine interfaces of codimension 1 and 2")
+        num_primary = num_cells if codims == {False} else num_faces
 
-            num_cells_lower_dimension = sum([g.num_cells for g in grids]) * nd
-            num_faces_higher_dimension = sum([g.num_faces for g in grids]) * nd
-
-            # Projections to and from the grid
-            to_face = sps.csc_matrix((num_faces_higher_dimension, 0))
-            from_face = sps.csr_matrix((0, num_faces_higher_dimension))
-            to_cells = sps.csc_matrix((num_cells_lower_dimension, 0))
-            from_cells = sps.csr_matrix((0, num_cells_lower_dimension))
+        mortar_offset = 0
+        for e in edges:
+            g_primary, g_secondary = e
+            mg = gb.edge_props(e, "mortar_grid")
+            assert isinstance(mg, pp.MortarGrid)  # Appease mypy
+            if (g_primary.dim != mg.dim + mg.codim) or g_secondary.dim != mg.dim:
+                # This will correspond to DD of sorts; we could handle this
+                # by using cell_projections for g_primary and/or
+                # face_projection for g_secondary, depending on the exact
+                # configuration
+                raise NotImplementedError("Non-standard interface.")
+            primary_offset = (
+                face_offset[g_primary] if mg.codim < 2 else cell_offset[g_primary]
+            )
+            secondary_offset = cell_offset[g_secondary]
 
             # Projections to primary
-            mortar_to_primary_int.append(to_face)
-            mortar_to_primary_avg.append(to_face)
-
+            add_nonzeros(
+                "mortar_to_primary_int",
+                mg.mortar_to_primary_int(nd),
+                primary_offset,
+                mortar_offset,
+            )
+            add_nonzeros(
+                "mortar_to_primary_avg",
+                mg.mortar_to_primary_avg(nd),
+                primary_offset,
+                mortar_offset,
+            )
             # Projections from primary
-            primary_to_mortar_int.append(from_face)
-            primary_to_mortar_avg.append(from_face)
+            add_nonzeros(
+                "primary_to_mortar_int",
+                mg.primary_to_mortar_int(nd),
+                mortar_offset,
+                primary_offset,
+            )
+            add_nonzeros(
+                "primary_to_mortar_avg",
+                mg.primary_to_mortar_avg(nd),
+                mortar_offset,
+                primary_offset,
+            )
+            # Projections to secondary
+            add_nonzeros(
+                "mortar_to_secondary_int",
+                mg.mortar_to_secondary_int(nd),
+                secondary_offset,
+                mortar_offset,
+            )
+            add_nonzeros(
+                "mortar_to_secondary_avg",
+                mg.mortar_to_secondary_avg(nd),
+                secondary_offset,
+                mortar_offset,
+            )
+            # Projections from secondary
+            add_nonzeros(
+                "secondary_to_mortar_int",
+                mg.secondary_to_mortar_int(nd),
+                mortar_offset,
+                secondary_offset,
+            )
+            add_nonzeros(
+                "secondary_to_mortar_avg",
+                mg.secondary_to_mortar_avg(nd),
+                mortar_offset,
+                secondary_offset,
+            )
+            # Merged version of MortarGrid.sign_of_mortar_sides
+            add_nonzeros(
+                "sign_of_mortar_sides",
+                mg.sign_of_mortar_sides(nd),
+                mortar_offset,
+                mortar_offset,
+            )
 
-            mortar_to_secondary_int.append(to_cells)
-            mortar_to_secondary_avg.append(to_cells)
+            mortar_offset += mg.num_cells * nd
 
-            secondary_to_mortar_int.append(from_cells)
-            secondary_to_mortar_avg.append(from_cells)
+        # FIXME: If there are no edges, the assumption is that a GridBucket with a
+        # single grid (no fractures) have been constructed. In this case, the
+        # projection to primary should have g.num_faces rows, while there are no
+        # secondary grids to project to. If the mortar projection is constructed for a
+        # different case (hard to imagine what, but who knows), it is not clear what to
+        # do, so we'll raise an error.
+        if len(edges) == 0:
+            assert len(grids) == 1
+        num_mortar_cells = mortar_offset
 
-        # Stack mappings from the mortar horizontally.
-        # The projections are wrapped by a pp.ad.Matrix to be compatible with the
+        # Wrap the projections in pp.ad.Projection to be compatible with the
         # requirements for processing of Ad operators.
-        def bmat(matrices, name):
-            # Create block matrix, convert it to optimized storage format
-            block_matrix = pp.matrix_operations.optimized_compressed_storage(
-                sps.bmat(matrices)
-            )
-            return Matrix(block_matrix, name=name)
+        def projection(name, shape, ad_name):
+            nonzeros = projections[name]
+            if len(nonzeros) > 0:
+                rows, cols, vals = [np.hstack(arrays) for arrays in zip(*nonzeros)]
+            else:
+                rows, cols, vals = np.zeros(0), np.zeros(0), np.zeros(0)
+            return Projection(rows, cols, vals, shape, name=ad_name)
 
-        self.mortar_to_primary_int = bmat(
-            [mortar_to_primary_int], name="MortarToPrimaryInt"
+        to_primary = (num_primary, num_mortar_cells)
+        to_secondary = (num_cells, num_mortar_cells)
+
+        self.mortar_to_primary_int = projection(
+            "mortar_to_primary_int", to_primary, "MortarToPrimaryInt"
         )
-        self.mortar_to_primary_avg = bmat(
-            [mortar_to_primary_avg], name="MortarToPrimaryAvg"
+        self.mortar_to_primary_avg = projection(
+            "mortar_to_primary_avg", to_primary, "MortarToPrimaryAvg"
         )
-        self.mortar_to_secondary_int = bmat(
-            [mortar_to_secondary_int], name="MortarToSecondaryInt"
+        self.mortar_to_secondary_int = projection(
+            "mortar_to_secondary_int", to_secondary, "MortarToSecondaryInt"
         )
-        self.mortar_to_secondary_avg = bmat(
-            [mortar_to_secondary_avg], name="MortarToSecondaryAvg"
+        self.mortar_to_secondary_avg = projection(
+            "mortar_to_secondary_avg", to_secondary, "MortarToSecondaryAvg"
         )
-
-        # Vertical stacking of the projections
-        self.primary_to_mortar_int = bmat(
-            [[m] for m in primary_to_mortar_int], name="PrimaryToMortarInt"
+        self.primary_to_mortar_int = projection(
+            "primary_to_mortar_int", to_primary[::-1], "PrimaryToMortarInt"
         )
-        self.primary_to_mortar_avg = bmat(
-            [[m] for m in primary_to_mortar_avg], name="PrimaryToMortarAvg"
+        self.primary_to_mortar_avg = projection(
+            "primary_to_mortar_avg", to_primary[::-1], "PrimaryToMortarAvg"
         )
-        self.secondary_to_mortar_int = bmat(
-            [[m] for m in secondary_to_mortar_int], name="SecondaryToMortarInt"
+        self.secondary_to_mortar_int = projection(
+            "secondary_to_mortar_int", to_secondary[::-1], "SecondaryToMortarInt"
         )
-        self.secondary_to_mortar_avg = bmat(
-            [[m] for m in secondary_to_mortar_avg], name="SecondaryToMortarAvg"
+        self.secondary_to_mortar_avg = projection(
+            "secondary_to_mortar_avg", to_secondary[::-1], "SecondaryToMortarAvg"
+        )
+        self.sign_of_mortar_sides = projection(
+            "sign_of_mortar_sides",
+            (num_mortar_cells, num_mortar_cells),
+            "SignOfMortarSides",
         )
-
-        # Also generate a merged version of MortarGrid.sign_of_mortar_sides:
-        mats = []
-        for e in edges:
-            mg = gb.edge_props(e, "mortar_grid")
-            assert isinstance(mg, pp.MortarGrid)  # Appease mypy
-            mats.append(mg.sign_of_mortar_sides(nd))
-        if len(edges) == 0:
-            self.sign_of_mortar_sides = Matrix(
-                sps.bmat([[None]]), name="SignOfMortarSides"
-            )
-        else:
-            self.sign_of_mortar_sides = Matrix(
-                sps.block_diag(mats), name="SignOfMortarSides"
-            )
 
     def __repr__(self) -> str:
         s = (
@@ -920,3 +858,49 @@ def _subgrid_projections(
                 face_offset = face_ind[-1] + 1
 
     return cell_projection, face_projection
+
+
+def _subgrid_offsets(
+    grids: List[pp.Grid], nd: int
+) -> Tuple[Dict[pp.Grid, int], Dict[pp.Grid, int]]:
+    """Find the offsets of the cells and faces of individual grids in the global
+    numbering of a set of grids.
+
+    The global cell and face numbering is set according to the order of the
+    input grids, with nd degrees of freedom per cell and face. Mortar grids have no
+    face offsets.
+
+    """
+    cell_offset: Dict[pp.Grid, int] = {}
+    face_offset: Dict[pp.Grid, int] = {}
+    num_cells, num_faces = 0, 0
+    for g in grids:
+        cell_offset[g] = num_cells
+        num_cells += g.num_cells * nd
+        if "mortar_grid" not in g.name:
+            face_offset[g] = num_faces
+            num_faces += g.num_faces * nd
+    return cell_offset, face_offset
+
+
+def _global_indices(offsets: List[int], sizes: List[int]) -> np.ndarray:
+    """Global indices of a sequence of blocks of consecutive indices."""
+    sizes_arr = np.array(sizes, dtype=int)
+    # Index of each element relative to the start of its block, plus block offset
+    local_start = np.cumsum(np.hstack((0, sizes_arr)))
+    shift = np.repeat(np.array(offsets, dtype=int) - local_start[:-1], sizes_arr)
+    return np.arange(local_start[-1]) + shift
+
+
+def _restriction(ind: np.ndarray, num_global: int, name: str) -> Projection:
+    """Restriction from a global numbering to the given global indices."""
+    return Projection(
+        np.arange(ind.size), ind, np.ones(ind.size), (ind.size, num_global), name=name
+    )
+
+
+def _prolongation(ind: np.ndarray, num_global: int, name: str) -> Projection:
+    """Prolongation from the given global indices to the global numbering."""
+    return Projection(
+        ind, np.arange(ind.size), np.ones(ind.size), (num_global, ind.size), name=name
+    )
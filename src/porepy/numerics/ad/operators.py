@@ -14,11 +14,11 @@ import porepy as pp
 from porepy.params.tensor import SecondOrderTensor
 
 from . import _ad_utils
-from .forward_mode import initAdArrays
 
 __all__ = [
     "Operator",
     "Matrix",
+    "Projection",
     "Array",
     "Scalar",
     "Variable",
@@ -77,6 +77,8 @@ class Operator:
             self.tree = Tree(Operation.void)
         else:
             self.tree = tree
+        # A new tree invalidates any stored plan for the evaluation of the operator.
+        self._evaluation_plan: Optional[_EvaluationPlan] = None
 
     def _set_grids_or_edges(
         self, grids: Union[List[pp.Grid], None], edges: Union[List[Edge], None]
@@ -277,6 +279,23 @@ class Operator:
         #    and then perform the operation on the result.
 
         # Check for case 1 or 2
+        if (
+            isinstance(op, pp.ad.Variable)
+            or isinstance(op, Variable)
+            or isinstance(op, pp.ad.Ad_array)
+            or op.is_leaf()
+        ):
+            return self._parse_leaf(op, gb)
+
+        # This is not an atomic operator. First parse its children, then combine them
+        tree = op.tree
+        results = [self._parse_operator(child, gb) for child in tree.children]
+        return self._combine_results(tree, results)
+
+    def _parse_leaf(self, op: "Operator", gb: pp.GridBucket):
+        """Parse an operator which has no children, that is, a Variable, an Ad_array
+        or an atomic operator. See _parse_operator() for the strategy.
+        """
         if isinstance(op, pp.ad.Variable) or isinstance(op, Variable):
             # Case 1: Variable
 
@@ -306,16 +325,15 @@ class Operator:
             # Just return it.
             return op
 
-        elif op.is_leaf():
+        else:
             # Case 2
             # EK: Is this correct after moving from Expression?
             return op.parse(gb)  # type:ignore
 
-        # This is not an atomic operator. First parse its children, then combine them
-        tree = op.tree
-        results = [self._parse_operator(child, gb) for child in tree.children]
-
-        # Combine the results
+    def _combine_results(self, tree: "Tree", results: list):
+        """Perform the operation of a tree on the parsed representations of its
+        children.
+        """
         if tree.op == Operation.add:
             # To add we need two objects
             assert len(results) == 2
@@ -591,6 +609,8 @@ class Operator:
         self,
         dof_manager: "pp.DofManager",
         state: Optional[np.ndarray] = None,
+        block_jacobian: bool = False,
+        values_only: bool = False,
     ):
         """Evaluate the residual and Jacobian matrix for a given state.
 
@@ -601,87 +621,51 @@ class Operator:
                 derivatives should be formed. If not provided, the state will be pulled from
                 the previous iterate (if this exists), or alternatively from the state
                 at the previous time step.
+            block_jacobian (bool, optional): If True, the Jacobian matrices of the
+                variables are represented as pp.ad.BlockJacobian, with one block per
+                block in the dof_manager. Unless the operator combines these with
+                matrices that span all degrees of freedom, the Jacobian of the returned
+                Ad-array will also be a BlockJacobian. Defaults to False.
+            values_only (bool, optional): If True, the variables are represented by
+                their values, without derivatives, and only the residual is computed.
+                This is considerably cheaper than the full evaluation. Defaults to
+                False.
 
         Returns:
             An Ad-array representation of the residual and Jacobian. Note that the Jacobian
                 matrix need not be invertible, or ever square; this depends on the operator.
+                If values_only is True, the residual is returned as a numpy array.
 
         """
         # Get the mixed-dimensional grids used for the dof-manager.
         gb = dof_manager.gb
 
-        # Identify all variables in the Operator tree. This will include real variables,
-        # and representation of previous time steps and iterations.
-        (
-            variable_dofs,
-            variable_ids,
-            is_prev_time,
-            is_prev_iter,
-        ) = self._identify_variables(dof_manager)
-
-        # Split variable dof indices and ids into groups of current variables (those
-        # of the current iteration step), and those from the previous time steps and
-        # iterations.
-        current_indices = []
-        current_ids = []
-        prev_indices = []
-        prev_ids = []
-        prev_iter_indices = []
-        prev_iter_ids = []
-        for ind, var_id, is_prev, is_prev_it in zip(
-            variable_dofs, variable_ids, is_prev_time, is_prev_iter
-        ):
-            if is_prev:
-                prev_indices.append(ind)
-                prev_ids.append(var_id)
-            elif is_prev_it:
-                prev_iter_indices.append(ind)
-                prev_iter_ids.append(var_id)
-            else:
-                current_indices.append(ind)
-                current_ids.append(var_id)
+        # Identify all variables in the Operator tree, and the order in which the
+        # operators in the tree should be parsed. This information is independent of the
+        # state, and is reused between evaluations for the same DofManager.
+        plan = self._get_evaluation_plan(dof_manager)
 
         # Save information.
         # IMPLEMENTATION NOTE: Storage in a separate data class could have
         # been a more elegant option.
-        self._variable_dofs = current_indices
-        self._variable_ids = current_ids
-        self._prev_time_dofs = prev_indices
-        self._prev_time_ids = prev_ids
-        self._prev_iter_dofs = prev_iter_indices
-        self._prev_iter_ids = prev_iter_ids
+        self._variable_dofs = plan.current_dofs
+        self._variable_ids = plan.current_ids
+        self._prev_time_dofs = plan.prev_time_dofs
+        self._prev_time_ids = plan.prev_time_ids
+        self._prev_iter_dofs = plan.prev_iter_dofs
+        self._prev_iter_ids = plan.prev_iter_ids
 
         # Parsing in two stages: First make a forward Ad-representation of the variable
         # state (this must be done jointly for all variables of the operator to get all
         # derivatives represented). Then parse the operator by traversing its
         # tree-representation, and parse and combine individual operators.
 
-        # Initialize variables
-        prev_vals = np.zeros(dof_manager.num_dofs())
-
-        populate_state = state is None
-        if populate_state:
-            state = np.zeros(dof_manager.num_dofs())
-
-        assert state is not None
-        for (g, var) in dof_manager.block_dof:
-            ind = dof_manager.grid_and_variable_to_dofs(g, var)
-            if isinstance(g, tuple):
-                prev_vals[ind] = gb.edge_props(g, pp.STATE)[var]
-            else:
-                prev_vals[ind] = gb.node_props(g, pp.STATE)[var]
-
-            if populate_state:
-                if isinstance(g, tuple):
-                    try:
-                        state[ind] = gb.edge_props(g, pp.STATE)[pp.ITERATE][var]
-                    except KeyError:
-                        prev_vals[ind] = gb.edge_props(g, pp.STATE)[var]
-                else:
-                    try:
-                        state[ind] = gb.node_props(g, pp.STATE)[pp.ITERATE][var]
-                    except KeyError:
-                        state[ind] = gb.node_props(g, pp.STATE)[var]
+        # Gather the values at the previous time step and, if no state is given, the
+        # most recent iterate. The DofManager falls back to the previous time step for
+        # variables without iterates.
+        prev_vals = dof_manager.assemble_variable(from_iterate=False)
+        if state is None:
+            state = dof_manager.assemble_iterate()
 
         # Initialize Ad variables with the current iterates
 
@@ -692,28 +676,32 @@ class Operator:
         # matrix of this Expression will require restricting the columns of
         # this matrix.
 
-        # First generate an Ad array (ready for forward Ad) for the full set.
-        ad_vars = initAdArrays([state])[0]
-
-        # Next, the Ad array must be split into variables of the right size
-        # (splitting impacts values and number of rows in the Jacobian, but
-        # the Jacobian columns must stay the same to preserve all cross couplings
-        # in the derivatives).
+        # The Ad array of each variable has as Jacobian the restriction from the full
+        # set of variables to the variable (the columns of the Jacobian must cover all
+        # variables to preserve all cross couplings in the derivatives). This is
+        # equivalent to restricting an Ad array for the full set, as generated by
+        # initAdArrays, but avoids the construction of the full identity matrix.
 
         # Dictionary which maps from Ad variable ids to Ad_array.
-        self._ad: Dict[int, pp.ad.Ad_array] = {}
-
-        # Loop over all variables, restrict to an Ad array corresponding to
-        # this variable.
-        for (var_id, dof) in zip(self._variable_ids, self._variable_dofs):
-            ncol = state.size
-            nrow = np.unique(dof).size
-            # Restriction matrix from full state (in Forward Ad) to the specific
-            # variable.
-            R = sps.coo_matrix(
-                (np.ones(nrow), (np.arange(nrow), dof)), shape=(nrow, ncol)
-            ).tocsr()
-            self._ad[var_id] = R * ad_vars
+        self._ad: Dict[int, Union[pp.ad.Ad_array, np.ndarray]] = {}
+        if values_only:
+            for (var_id, dof) in zip(self._variable_ids, self._variable_dofs):
+                self._ad[var_id] = state[dof]
+        elif block_jacobian:
+            for (var_id, dof, (block_indices, R)) in zip(
+                self._variable_ids, self._variable_dofs, plan.block_restrictions()
+            ):
+                jac = pp.ad.BlockJacobian(
+                    R.copy(), block_indices, plan.full_dof, plan.block_start
+                )
+                self._ad[var_id] = pp.ad.Ad_array(state[dof], jac)
+        else:
+            for (var_id, dof, R) in zip(
+                self._variable_ids, self._variable_dofs, plan.restrictions
+            ):
+                # Copy the restriction matrix, since the Ad array is exposed to the user
+                # if the operator is a single variable.
+                self._ad[var_id] = pp.ad.Ad_array(state[dof], R.copy())
 
         # Also make mappings from the previous iteration.
         # This is simpler, since it is only a matter of getting the residual vector
@@ -731,11 +719,38 @@ class Operator:
             var_id: val for (var_id, val) in zip(self._prev_time_ids, prev_vals_list)
         }
 
-        # Parse operators. This is left to a separate function to facilitate the
-        # necessary recursion for complex operators.
-        eq = self._parse_operator(self, gb)
+        # Parse operators. The operators in the tree are visited in the precomputed
+        # order, so that all children are parsed before their parents. Subtrees that
+        # are shared between several parents are parsed only once.
+        results: List[Any] = []
+        for node, child_indices in zip(plan.nodes, plan.children):
+            if child_indices is None:
+                results.append(self._parse_leaf(node, gb))
+            else:
+                # Pass a new list; _combine_results may modify its argument
+                results.append(
+                    self._combine_results(
+                        node.tree, [results[i] for i in child_indices]
+                    )
+                )
+
+        if values_only and isinstance(results[-1], pp.ad.Ad_array):
+            # The operator contains Ad arrays that were evaluated beforehand.
+            return results[-1].val
+        return results[-1]
+
+    def _get_evaluation_plan(self, dof_manager: "pp.DofManager") -> "_EvaluationPlan":
+        """Get the plan for evaluation of this operator with the given DofManager.
+
+        The plan is stored, and reused as long as the evaluation is done with the same
+        DofManager, and the number of degrees of freedom is unchanged.
 
-        return eq
+        """
+        plan = getattr(self, "_evaluation_plan", None)
+        if plan is None or not plan.is_valid_for(dof_manager):
+            plan = _EvaluationPlan(self, dof_manager)
+            self._evaluation_plan = plan
+        return plan
 
     def _parse_other(self, other):
         if isinstance(other, float) or isinstance(other, int):
@@ -804,6 +819,85 @@ class Matrix(Operator):
         return Matrix(self._mat.transpose())
 
 
+class Projection(Matrix):
+    """Ad representation of a projection matrix, such as the restrictions and
+    prolongations between subdomains and mortar grids.
+
+    The projection is stored as gather and scatter index arrays and weights (see
+    pp.ad.IndexProjection), and is applied during parsing by indexing of the values
+    and Jacobian rows of the projected quantity, rather than by sparse matrix
+    products. The sparse matrix representation is formed on demand.
+
+    Attributes:
+        shape (Tuple of ints): Shape of the projection matrix.
+
+    """
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        weights: np.ndarray,
+        shape: Tuple[int, int],
+        name: Optional[str] = None,
+    ) -> None:
+        """Construct an Ad representation of a projection.
+
+        Parameters:
+            rows (np.ndarray): Row index of each non-zero of the projection matrix.
+            cols (np.ndarray): Column index of each non-zero.
+            weights (np.ndarray): Value of each non-zero.
+            shape (Tuple of ints): Shape of the projection matrix.
+            name (str, optional): Name of the projection.
+
+        """
+        Operator.__init__(self, name=name)
+        self._projection = pp.ad.IndexProjection(rows, cols, weights, shape)
+        self.shape = self._projection.shape
+
+    @classmethod
+    def from_matrix(cls, mat: sps.spmatrix, name: Optional[str] = None):
+        """Construct an Ad projection from the non-zeros of a sparse matrix.
+
+        Parameters:
+            mat (sps.spmatrix): Projection matrix.
+            name (str, optional): Name of the projection.
+
+        """
+        rows, cols, weights = sps.find(mat)
+        return cls(rows, cols, weights, mat.shape, name=name)
+
+    @property
+    def _mat(self) -> sps.csr_matrix:
+        return self._projection.tocsr()
+
+    def __repr__(self) -> str:
+        return f"Projection with shape {self.shape} and {self._projection.nnz} elements"
+
+    def __str__(self) -> str:
+        s = "Projection "
+        if self._name is not None:
+            s += self._name
+        return s
+
+    def parse(self, gb) -> "pp.ad.IndexProjection":
+        """Convert the Ad projection into its index representation.
+
+        Pameteres:
+            gb (pp.GridBucket): Mixed-dimensional grid. Not used, but it is needed as
+                input to be compatible with parse methods for other operators.
+
+        Returns:
+            pp.ad.IndexProjection: The wrapped projection.
+
+        """
+        return self._projection
+
+    def transpose(self) -> "Projection":
+        p = self._projection
+        return Projection(p.cols, p.rows, p.weights, p.shape[::-1])
+
+
 class Array(Operator):
     """Ad representation of a numpy array.
 
@@ -1228,6 +1322,152 @@ class SecondOrderTensorAd(SecondOrderTensor, Operator):
         return self.values
 
 
+class _EvaluationPlan:
+    """Information needed to evaluate an operator which does not depend on the state.
+
+    When an operator is evaluated repeatedly, e.g. in the iterations of a Newton
+    method, the variables in the operator tree, their degrees of freedom, the
+    restriction matrices used to initialize the forward Ad representation of the
+    variables, and the order in which the tree is traversed are all unchanged. The plan
+    computes this information once, so that repeated evaluations only do the numerical
+    work.
+
+    Attributes:
+        dof_manager (pp.DofManager): The DofManager the plan is computed for.
+        full_dof (np.ndarray): Copy of the number of degrees of freedom per block in
+            the DofManager when the plan was computed.
+        current_dofs, current_ids: Dofs and ids of variables of the current iterate.
+        prev_time_dofs, prev_time_ids: Dofs and ids of variables at the previous time
+            step.
+        prev_iter_dofs, prev_iter_ids: Dofs and ids of variables at the previous
+            iteration.
+        restrictions (list of sps.csr_matrix): Restriction from the full set of
+            degrees of freedom to each of the current variables.
+        nodes (list): The unique nodes (operators and Ad_arrays) in the operator tree,
+            sorted so that a node comes after all its children. The last node is the
+            top of the tree.
+        children (list): For each node, the indices in nodes of its children, or None
+            if the node is a leaf.
+
+    """
+
+    def __init__(self, operator: Operator, dof_manager: "pp.DofManager") -> None:
+        self.dof_manager = dof_manager
+        self.full_dof: np.ndarray = dof_manager.full_dof.copy()
+
+        (
+            variable_dofs,
+            variable_ids,
+            is_prev_time,
+            is_prev_iter,
+        ) = operator._identify_variables(dof_manager)
+
+        # Split variable dof indices and ids into groups of current variables (those
+        # of the current iteration step), and those from the previous time steps and
+        # iterations.
+        self.current_dofs: List[np.ndarray] = []
+        self.current_ids: List[int] = []
+        self.prev_time_dofs: List[np.ndarray] = []
+        self.prev_time_ids: List[int] = []
+        self.prev_iter_dofs: List[np.ndarray] = []
+        self.prev_iter_ids: List[int] = []
+        for ind, var_id, is_prev, is_prev_it in zip(
+            variable_dofs, variable_ids, is_prev_time, is_prev_iter
+        ):
+            if is_prev:
+                self.prev_time_dofs.append(ind)
+                self.prev_time_ids.append(var_id)
+            elif is_prev_it:
+                self.prev_iter_dofs.append(ind)
+                self.prev_iter_ids.append(var_id)
+            else:
+                self.current_dofs.append(ind)
+                self.current_ids.append(var_id)
+
+        # Restriction matrices from the full state to the current variables.
+        ncol = dof_manager.num_dofs()
+        self.restrictions: List[sps.csr_matrix] = []
+        for dof in self.current_dofs:
+            nrow = np.unique(dof).size
+            self.restrictions.append(
+                sps.coo_matrix(
+                    (np.ones(nrow), (np.arange(nrow), dof)), shape=(nrow, ncol)
+                ).tocsr()
+            )
+
+        # Restrictions split into blocks according to the DofManager, computed on
+        # demand by block_restrictions().
+        self.block_start: np.ndarray = np.hstack((0, np.cumsum(self.full_dof))).astype(
+            int
+        )
+        self._block_restrictions: Optional[
+            List[Tuple[np.ndarray, sps.csr_matrix]]
+        ] = None
+
+        # Post-order traversal of the tree.
+        self.nodes: List[Any] = []
+        self.children: List[Optional[List[int]]] = []
+        self._add_node(operator, {})
+
+    def _add_node(self, node: Any, visited: Dict[int, int]) -> int:
+        # Add a node after its children, return the index of the node in self.nodes.
+        # Nodes are identified by object identity, which is safe since all nodes are
+        # referenced by self.nodes for the lifetime of the plan.
+        if id(node) in visited:
+            return visited[id(node)]
+
+        if (
+            isinstance(node, pp.ad.Variable)
+            or isinstance(node, Variable)
+            or isinstance(node, pp.ad.Ad_array)
+            or node.is_leaf()
+        ):
+            child_indices = None
+        else:
+            child_indices = [
+                self._add_node(child, visited) for child in node.tree.children
+            ]
+
+        visited[id(node)] = len(self.nodes)
+        self.nodes.append(node)
+        self.children.append(child_indices)
+        return visited[id(node)]
+
+    def block_restrictions(self) -> List[Tuple[np.ndarray, sps.csr_matrix]]:
+        """Restriction matrices of the current variables, in the format used by
+        pp.ad.BlockJacobian: For each variable, the indices of the DofManager blocks that
+        contain dofs of the variable, and the restriction matrix with columns for these
+        blocks only.
+        """
+        if self._block_restrictions is None:
+            self._block_restrictions = []
+            for dof in self.current_dofs:
+                # Block index of each dof, and the active blocks
+                block = np.searchsorted(self.block_start, dof, side="right") - 1
+                block_indices = np.unique(block)
+                local_start = np.hstack(
+                    (0, np.cumsum(self.full_dof[block_indices]))
+                ).astype(int)
+                # Column of each dof when the active blocks are stored side by side
+                cols = (
+                    dof
+                    - self.block_start[block]
+                    + local_start[np.searchsorted(block_indices, block)]
+                )
+                R = sps.coo_matrix(
+                    (np.ones(dof.size), (np.arange(dof.size), cols)),
+                    shape=(dof.size, local_start[-1]),
+                ).tocsr()
+                self._block_restrictions.append((block_indices, R))
+        return self._block_restrictions
+
+    def is_valid_for(self, dof_manager: "pp.DofManager") -> bool:
+        """Check if the plan can be used for evaluation with a DofManager."""
+        return dof_manager is self.dof_manager and np.array_equal(
+            dof_manager.full_dof, self.full_dof
+        )
+
+
 class Tree:
     """Simple implementation of a Tree class. Used to represent combinations of
     Ad operators.
@@ -0,0 +1,395 @@
+"""
+Persistent storage of discretization matrices on local disk.
+
+The setup of multi-point discretizations (Mpfa, Mpsa, Biot) is often the most expensive
+part of a simulation, and is repeated whenever a study is restarted, or a parameter
+sweep is run over quantities that do not enter the discretization, such as the time
+step size or source terms. The class DiscretizationCache avoids this repetition: The
+discretization matrices are stored on disk, under a key computed from
+
+    1) The class and configuration of the discretization object.
+    2) The geometry and topology of the grid.
+    3) The entries in data[pp.PARAMETERS] for the keywords of the discretization.
+
+If a discretization with the same key is requested later, also in another Python
+process, the matrices are loaded from disk instead of being recomputed.
+
+The matrices are stored in the compressed sparse row or column format, with the arrays
+data, indices and indptr as separate npy-files. This allows for loading by memory
+mapping, so that only the parts of the matrices that are actually used are read from
+disk. The memory mapping is copy-on-write; modifications of a loaded matrix are not
+written back to the cache.
+
+Usage:
+    >>> cache = pp.DiscretizationCache()
+    >>> cache.discretize(pp.Biot("mechanics", "flow"), g, data)
+
+or, to use the cache with the Assembler,
+
+    >>> discr = pp.CachedDiscretization(pp.Mpsa("mechanics"), cache)
+    >>> data[pp.DISCRETIZATION] = {"u": {"stress_divergence": discr}}
+
+For Ad-based models, the cache can be passed to EquationManager.discretize().
+
+NOTE: The key is computed from the parameters as they are stored in the data
+dictionary. Parameters given as functions are represented by their identity, thus they
+will never lead to a cache hit in a new process. Discretizations that update an
+existing discretization (signified by the parameter 'update_discretization') are not
+cached.
+
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+import numpy as np
+import scipy.sparse as sps
+
+import porepy as pp
+from porepy.utils.hashing import update_hash
+
+# Module-wide logger
+logger = logging.getLogger(__name__)
+
+# Grid attributes that determine the discretization. Other attributes, like the grid
+# history, do not influence the discretization matrices.
+_GRID_ATTRIBUTES: List[str] = [
+    "dim",
+    "nodes",
+    "face_nodes",
+    "cell_faces",
+    "face_areas",
+    "face_normals",
+    "face_centers",
+    "cell_centers",
+    "cell_volumes",
+    "periodic_face_map",
+    "tags",
+]
+
+# Parameters that control the execution of the discretization, or are set during the
+# discretization, but do not influence its result.
+_EXECUTION_PARAMETERS: Set[str] = {
+    "report_memory",
+    "num_workers",
+    "active_cells",
+    "active_faces",
+}
+
+# Parameters that are used by the finite volume discretizations only when the right
+# hand side, or other terms than the discretization matrices, are assembled.
+_FV_ASSEMBLY_PARAMETERS: Set[str] = {
+    "bc_values",
+    "bc_values_previous_timestep",
+    "source",
+    "time_step",
+    "mass_weight",
+    "vector_source",
+}
+
+# Name of the file that lists the matrices of a cache entry.
+_INDEX_FILE = "index.json"
+
+
+class DiscretizationCache:
+    """Cache of discretization matrices, stored on local disk.
+
+    Attributes:
+        directory (Path): Directory where the discretization matrices are stored.
+        ignore_parameters (set of str): Parameters that are not included in the cache
+            key, in addition to the parameters that are known not to enter the
+            discretization matrices of the finite volume methods.
+        num_hits (int): Number of discretizations loaded from the cache.
+        num_misses (int): Number of discretizations that were computed, and stored in
+            the cache.
+
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        ignore_parameters: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Set up the cache.
+
+        Parameters:
+            directory (str or Path, optional): Directory of the cache. Will be created
+                if it does not exist. Defaults to the subdirectory
+                porepy/discretizations of the user's cache directory, that is,
+                $XDG_CACHE_HOME or ~/.cache.
+            ignore_parameters (iterable of str, optional): Parameters to exclude from
+                the cache key. Should only contain parameters that do not influence
+                the discretization matrices; if a parameter that does is ignored,
+                outdated matrices will be returned from the cache.
+
+        """
+        if directory is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+            directory = Path(cache_home) / "porepy" / "discretizations"
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.ignore_parameters: Set[str] = set(ignore_parameters or [])
+
+        self.num_hits: int = 0
+        self.num_misses: int = 0
+
+    def __repr__(self) -> str:
+        s = (
+            f"Discretization cache in directory {self.directory}\n"
+            f"Number of cache hits: {self.num_hits}\n"
+            f"Number of cache misses: {self.num_misses}\n"
+        )
+        return s
+
+    def discretize(self, discr: "pp.Discretization", g: pp.Grid, data: Dict) -> None:
+        """Discretize, or load the discretization matrices from the cache.
+
+        On return, the discretization matrices are available in
+        data[pp.DISCRETIZATION_MATRICES], just as after a call to discr.discretize().
+
+        Parameters:
+            discr (pp.Discretization): Discretization object.
+            g (pp.Grid): Grid to be discretized.
+            data (dictionary): With discretization parameters.
+
+        """
+        keywords = self._keywords(discr)
+        if self._is_update(data, keywords):
+            discr.discretize(g, data)
+            return
+
+        key = self.key(discr, g, data)
+        entry = self.directory / key
+
+        matrix_dictionary = data.setdefault(pp.DISCRETIZATION_MATRICES, {})
+        if (entry / _INDEX_FILE).is_file():
+            try:
+                matrices = _load_entry(entry)
+            except (OSError, ValueError, KeyError) as err:
+                # A corrupted entry is treated as a miss, and will be overwritten
+                logger.warning(f"Could not read cached discretization {key}: {err}")
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                for kw, mat_key, mat in matrices:
+                    matrix_dictionary.setdefault(kw, {})[mat_key] = mat
+                self.num_hits += 1
+                logger.debug(f"Loaded discretization {key} from cache")
+                return
+
+        # Take note of the matrices present before the discretization, so that only
+        # those computed by this discretization are stored.
+        previous = {kw: dict(matrix_dictionary.get(kw, {})) for kw in keywords}
+        discr.discretize(g, data)
+        self.num_misses += 1
+
+        computed = []
+        for kw in keywords:
+            for mat_key, mat in matrix_dictionary.get(kw, {}).items():
+                if previous[kw].get(mat_key, None) is not mat:
+                    computed.append((kw, mat_key, mat))
+
+        if all(isinstance(m[2], (sps.spmatrix, np.ndarray)) for m in computed):
+            _store_entry(self.directory, key, computed)
+            logger.debug(f"Stored discretization {key} in cache")
+        else:
+            logger.debug(f"Discretization {key} has matrices that cannot be cached")
+
+    def key(self, discr: "pp.Discretization", g: pp.Grid, data: Dict) -> str:
+        """Compute the cache key of a discretization.
+
+        Parameters:
+            discr (pp.Discretization): Discretization object.
+            g (pp.Grid): Grid to be discretized.
+            data (dictionary): With discretization parameters.
+
+        Returns:
+            str: Key of the discretization. Consists of the name of the discretization
+                class, and a hash of the grid, the parameters, and the configuration
+                of the discretization object.
+
+        """
+        h = hashlib.sha256()
+        cls = discr.__class__
+        update_hash(h, (pp.__version__, cls.__module__, cls.__qualname__))
+        # Attributes of the discretization object with simple values, such as
+        # keywords and options. Objects computed during discretization are left out.
+        config = {
+            k: v
+            for k, v in vars(discr).items()
+            if isinstance(v, (str, bool, int, float))
+        }
+        update_hash(h, config)
+
+        for attr in _GRID_ATTRIBUTES:
+            update_hash(h, (attr, getattr(g, attr, None)))
+
+        ignore = self.ignore_parameters | _EXECUTION_PARAMETERS
+        if isinstance(discr, (pp.Tpfa, pp.Mpfa, pp.Mpsa, pp.Biot)):
+            ignore = ignore | _FV_ASSEMBLY_PARAMETERS
+        parameters = data.get(pp.PARAMETERS, {})
+        for kw in self._keywords(discr):
+            param = parameters.get(kw, {})
+            update_hash(h, (kw, {k: v for k, v in param.items() if k not in ignore}))
+
+        return f"{cls.__name__}_{h.hexdigest()}"
+
+    def clear(self) -> None:
+        """Remove all entries in the cache directory."""
+        for entry in self.directory.iterdir():
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _keywords(self, discr: "pp.Discretization") -> List[str]:
+        # Parameter and matrix keywords of the discretization. In addition to the
+        # standard attribute keyword, discretizations of coupled problems (e.g. Biot)
+        # identify their keywords by attributes ending with '_keyword'.
+        keywords: List[str] = []
+        for attr in sorted(vars(discr)):
+            value = getattr(discr, attr)
+            if (attr == "keyword" or attr.endswith("_keyword")) and isinstance(
+                value, str
+            ):
+                if value not in keywords:
+                    keywords.append(value)
+        return keywords
+
+    def _is_update(self, data: Dict, keywords: List[str]) -> bool:
+        # An update of an existing discretization depends on the matrices already in
+        # the data dictionary, thus it cannot be cached.
+        if "update_discretization" in data:
+            return True
+        parameters = data.get(pp.PARAMETERS, {})
+        return any(
+            parameters.get(kw, {}).get("update_discretization", False)
+            for kw in keywords
+        )
+
+
+class CachedDiscretization(pp.numerics.discretization.Discretization):
+    """Wrapper that adds a DiscretizationCache to a discretization object.
+
+    The wrapper can be used in place of the discretization object, e.g. in the
+    Assembler. Calls to discretize() are passed through the cache, all other methods
+    and attributes are those of the wrapped discretization.
+
+    Attributes:
+        discretization (pp.Discretization): The wrapped discretization.
+        cache (DiscretizationCache): Cache of discretization matrices.
+
+    """
+
+    def __init__(
+        self, discretization: "pp.Discretization", cache: DiscretizationCache
+    ) -> None:
+        # The keyword is available from the wrapped object, do not call the
+        # constructor of the superclass.
+        self.discretization = discretization
+        self.cache = cache
+
+    def __repr__(self) -> str:
+        return f"Cached {self.discretization}"
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called if the attribute is not found on the wrapper itself
+        if name in ("discretization", "cache"):
+            raise AttributeError(name)
+        return getattr(self.discretization, name)
+
+    def ndof(self, g: pp.Grid) -> int:
+        return self.discretization.ndof(g)
+
+    def discretize(self, g: pp.Grid, data: Dict) -> None:
+        """Discretize, or load the discretization matrices from the cache.
+
+        Parameters:
+            g (pp.Grid): Grid to be discretized.
+            data (dictionary): With discretization parameters.
+
+        """
+        self.cache.discretize(self.discretization, g, data)
+
+    def update_discretization(self, g: pp.Grid, data: Dict) -> None:
+        self.discretization.update_discretization(g, data)
+
+    def assemble_matrix_rhs(self, g: pp.Grid, data: Dict):
+        return self.discretization.assemble_matrix_rhs(g, data)
+
+    def assemble_matrix(self, g: pp.Grid, data: Dict) -> sps.spmatrix:
+        return self.discretization.assemble_matrix(g, data)
+
+    def assemble_rhs(self, g: pp.Grid, data: Dict) -> np.ndarray:
+        return self.discretization.assemble_rhs(g, data)
+
+
+def _store_entry(directory: Path, key: str, matrices: List) -> None:
+    """Store discretization matrices as an entry in the cache directory.
+
+    The entry is written to a temporary directory, which is then renamed. Thus other
+    processes never observe a partially written entry.
+
+    """
+    tmp = directory / f".{key}.{uuid.uuid4().hex}"
+    tmp.mkdir()
+    index = []
+    try:
+        for i, (kw, mat_key, mat) in enumerate(matrices):
+            if sps.issparse(mat):
+                fmt = "csc" if mat.format == "csc" else "csr"
+                mat = mat.asformat(fmt)
+                if not mat.has_canonical_format:
+                    mat = mat.copy()
+                    mat.sum_duplicates()
+                arrays = {
+                    "data": mat.data,
+                    "indices": mat.indices,
+                    "indptr": mat.indptr,
+                }
+            else:
+                fmt = "array"
+                arrays = {"data": mat}
+            for name, arr in arrays.items():
+                np.save(tmp / f"{i}_{name}.npy", arr, allow_pickle=False)
+            index.append(
+                {
+                    "keyword": kw,
+                    "key": mat_key,
+                    "format": fmt,
+                    "shape": list(mat.shape),
+                }
+            )
+        with open(tmp / _INDEX_FILE, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, directory / key)
+    except OSError:
+        # Most likely, another process has stored the same entry in the meantime.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _load_entry(entry: Path) -> List:
+    """Load the discretization matrices of a cache entry, by memory mapping."""
+    with open(entry / _INDEX_FILE) as f:
+        index = json.load(f)
+
+    matrices = []
+    for i, item in enumerate(index):
+
+        def load(name: str) -> np.ndarray:
+            return np.load(entry / f"{i}_{name}.npy", mmap_mode="c", allow_pickle=False)
+
+        fmt = item["format"]
+        if fmt == "array":
+            mat = load("data")
+        else:
+            constructor = sps.csc_matrix if fmt == "csc" else sps.csr_matrix
+            mat = constructor(
+                (load("data"), load("indices"), load("indptr")),
+                shape=tuple(item["shape"]),
+            )
+        matrices.append((item["keyword"], item["key"], mat))
+    return matrices
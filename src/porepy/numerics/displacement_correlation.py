@@ -231,13 +231,14 @@ def identify_correlation_points(g_h, g_l, rm, u, face_cells):
     rm_vectors = np.multiply(normals_l, rm)
     optimal_points = g_l.face_centers[:, faces_l] - rm_vectors
 
+    # Cells with center closest to the optimal points
+    closest_cells = g_l.closest_cell(optimal_points)
+
     cells_l = []
     actual_rm = []
     normal_rm = []
     for i in range(n_tips):
-        p = optimal_points[:, i]
-        distances = pp.cg.dist_point_pointset(p, g_l.cell_centers)
-        cell_ind = np.argmin(distances)
+        cell_ind = closest_cells[i]
         dist = pp.cg.dist_point_pointset(
             g_l.face_centers[:, faces_l[i]], g_l.cell_centers[:, cell_ind]
         )
@@ -295,115 +295,93 @@ class ColoumbContact(
             c_num_tangential,
         )
 
-        # Structures for storing the computed coefficients.
-        displacement_weight = []  # Multiplies displacement jump
-        traction_weight = []  # Multiplies the normal forces
-        rhs: np.ndarray = np.array([], dtype=float)  # Goes to the right hand side.
-
-        # Zero vectors of the size of the tangential space and the full space,
-        # respectively. These are needed to complement the discretization
-        # coefficients to be determined below.
-        zer = np.array([0] * (self.dim - 1))
-        zer1 = np.array([0] * (self.dim))
-        zer1[-1] = 1
-
-        # Loop over all mortar cells, discretize according to the current state of
-        # the contact
-        # The loop computes three parameters:
-        # L will eventually multiply the displacement jump, and be associated with
-        #   the coefficient in a Robin boundary condition (using the terminology of
-        #   the mpsa implementation)
-        # r is the right hand side term
-
-        for i in range(num_cells):
-            if sliding_bc[i] & penetration_bc[i]:  # in contact and sliding
-                # This is Eq (31) in Berge et al, including the regularization
-                # described in (32) and onwards. The expressions are somewhat complex,
-                # and are therefore moved to subfunctions.
-                loc_displacement_tangential, r, v = self._sliding_coefficients(
-                    contact_force_tangential[:, i],
-                    displacement_jump_tangential[:, i],
-                    friction_bound[i],
-                    c_num_tangential[i],
-                )
-
-                # There is no interaction between displacement jumps in normal and
-                # tangential direction. Opposite sign compared to Berge because
-                # of jump conventions being opposite.
-                L = -np.hstack((loc_displacement_tangential, np.atleast_2d(zer).T))
-                normal_displacement = np.hstack((-d_gap[:, i], 1))
-                loc_displacement_weight = np.vstack((L, normal_displacement))
-                # Right hand side is computed from (24-25). In the normal
-                # direction, a contribution from the previous iterate enters to cancel
-                # the gap
-                r_n = gap[i] - np.dot(d_gap[:, i], cumulative_tangential_jump[:, i].T)
-
-                r_t = r + friction_bound[i] * v
-                r = np.vstack((r_t, r_n))
-                # Unit contribution from tangential force
-                loc_traction_weight = np.eye(self.dim)
-                # Zero weight on normal force
-                loc_traction_weight[-1, -1] = 0
-                # Contribution from normal force
-                # NOTE: The sign is different from Berge (31); the paper is wrong
-                loc_traction_weight[:-1, -1] = -friction_coefficient[i] * v.ravel()
-
-            elif ~sliding_bc[i] & penetration_bc[i]:  # In contact and sticking
-                # Weight for contact force computed according to (30) in Berge.
-                # NOTE: There is a sign error in the paper, the coefficient for the
-                # normal contact force should have a minus in front of it
-                loc_traction_tangential = (
-                    -friction_coefficient[i]  # The minus sign is correct
-                    * displacement_jump_tangential[:, i].ravel("F")
-                    / friction_bound[i]
-                )
-                # Unit coefficient for all displacement jumps
-                loc_displacement_weight = np.eye(self.dim)
-                # For non-constant gap, relate normal and tangential jumps
-                loc_displacement_weight[-1, :-1] = -d_gap[:, i]
-
-                # Tangential traction dependent on normal one
-                loc_traction_weight = np.zeros((self.dim, self.dim))
-                loc_traction_weight[:-1, -1] = loc_traction_tangential
-
-                # The right hand side is the previous tangential jump, and the gap
-                # value in the normal direction.
-                r_t = displacement_jump_tangential[:, i]
-                r_n = gap[i] - np.dot(d_gap[:, i], cumulative_tangential_jump[:, i].T)
-                # assert np.isclose(r_n, initial_gap[i])
-                r = np.hstack((r_t, r_n)).T
-
-            elif ~penetration_bc[i]:  # not in contact
-                # This is a free boundary, no conditions on displacement
-                loc_displacement_weight = np.zeros((self.dim, self.dim))
-
-                # Free boundary conditions on the forces.
-                loc_traction_weight = np.eye(self.dim)
-                r = np.zeros(self.dim)
-
-            else:  # should never happen
-                raise AssertionError("Should not get here")
-
-            # Depending on the state of the system, the weights in the tangential direction may
-            # become huge or tiny compared to the other equations. This will
-            # impede convergence of an iterative solver for the linearized
-            # system. As a partial remedy, rescale the condition to become
-            # closer to unity.
-            w_diag = np.diag(loc_displacement_weight) + np.diag(loc_traction_weight)
-            W_inv = np.diag(1 / w_diag)
-            loc_displacement_weight = W_inv.dot(loc_displacement_weight)
-            loc_traction_weight = W_inv.dot(loc_traction_weight)
-            r = r.ravel() / w_diag
-
-            # Append to the list of global coefficients.
-            displacement_weight.append(loc_displacement_weight)
-            traction_weight.append(loc_traction_weight)
-            rhs = np.hstack((rhs, r))
-
-        num_blocks = len(traction_weight)
-        data_traction = np.array(traction_weight).ravel(order="C")
-
-        data_displacement = np.array(displacement_weight).ravel(order="C")
+        # Classify the cells according to the state of the contact. Cells that are
+        # not in contact are free, independent of the sliding criterion.
+        sliding = np.where(np.logical_and(sliding_bc, penetration_bc))[0]
+        sticking = np.where(np.logical_and(~sliding_bc, penetration_bc))[0]
+        free = np.where(~penetration_bc)[0]
+
+        # The coefficients of all mortar cells are computed simultaneously, and stored
+        # as stacks of local (self.dim x self.dim) blocks, one per cell:
+        # displacement_weight will eventually multiply the displacement jump, and be
+        #   associated with the coefficient in a Robin boundary condition (using the
+        #   terminology of the mpsa implementation)
+        # traction_weight multiplies the contact force.
+        # rhs is the right hand side term.
+        displacement_weight = np.zeros((num_cells, self.dim, self.dim))
+        traction_weight = np.zeros((num_cells, self.dim, self.dim))
+        rhs = np.zeros((num_cells, self.dim))
+
+        # The right hand side in the normal direction for cells in contact. A
+        # contribution from the previous iterate enters to cancel the gap.
+        rhs_normal = gap - np.sum(d_gap * cumulative_tangential_jump, axis=0)
+
+        # Cells in contact and sliding.
+        # This is Eq (31) in Berge et al, including the regularization described in
+        # (32) and onwards. The expressions are somewhat complex, and are therefore
+        # moved to subfunctions.
+        loc_displacement_tangential, r, v = self._sliding_coefficients(
+            contact_force_tangential[:, sliding],
+            displacement_jump_tangential[:, sliding],
+            friction_bound[sliding],
+            c_num_tangential[sliding],
+        )
+        # There is no interaction between displacement jumps in normal and tangential
+        # direction. Opposite sign compared to Berge because of jump conventions being
+        # opposite.
+        displacement_weight[sliding, :-1, :-1] = -loc_displacement_tangential
+        displacement_weight[sliding, -1, :-1] = -d_gap[:, sliding].T
+        displacement_weight[sliding, -1, -1] = 1
+        # Unit contribution from tangential force, zero weight on normal force.
+        traction_weight[sliding, :-1, :-1] = np.eye(self.dim - 1)
+        # Contribution from normal force
+        # NOTE: The sign is different from Berge (31); the paper is wrong
+        traction_weight[sliding, :-1, -1] = -friction_coefficient[sliding, None] * v
+        # Right hand side is computed from (24-25).
+        rhs[sliding, :-1] = r + friction_bound[sliding, None] * v
+        rhs[sliding, -1] = rhs_normal[sliding]
+
+        # Cells in contact and sticking.
+        # Unit coefficient for all displacement jumps
+        displacement_weight[sticking] = np.eye(self.dim)
+        # For non-constant gap, relate normal and tangential jumps
+        displacement_weight[sticking, -1, :-1] = -d_gap[:, sticking].T
+        # Tangential traction dependent on normal one. The weight for contact force is
+        # computed according to (30) in Berge.
+        # NOTE: There is a sign error in the paper, the coefficient for the normal
+        # contact force should have a minus in front of it
+        traction_weight[sticking, :-1, -1] = (
+            -friction_coefficient[sticking, None]  # The minus sign is correct
+            * displacement_jump_tangential[:, sticking].T
+            / friction_bound[sticking, None]
+        )
+        # The right hand side is the previous tangential jump, and the gap value in
+        # the normal direction.
+        rhs[sticking, :-1] = displacement_jump_tangential[:, sticking].T
+        rhs[sticking, -1] = rhs_normal[sticking]
+
+        # Cells not in contact.
+        # This is a free boundary, no conditions on displacement, and free boundary
+        # conditions on the forces.
+        traction_weight[free] = np.eye(self.dim)
+
+        # Depending on the state of the system, the weights in the tangential direction
+        # may become huge or tiny compared to the other equations. This will impede
+        # convergence of an iterative solver for the linearized system. As a partial
+        # remedy, rescale the condition to become closer to unity.
+        w_diag = np.diagonal(displacement_weight, axis1=1, axis2=2) + np.diagonal(
+            traction_weight, axis1=1, axis2=2
+        )
+        w_inv = 1 / w_diag
+        displacement_weight *= w_inv[:, :, None]
+        traction_weight *= w_inv[:, :, None]
+        rhs /= w_diag
+
+        # The blocks are stored row-wise, as expected by csr_matrix_from_blocks.
+        data_traction = traction_weight.ravel(order="C")
+        data_displacement = displacement_weight.ravel(order="C")
+        rhs = rhs.ravel()
+        num_blocks = num_cells
 
         data_l[pp.DISCRETIZATION_MATRICES][self.keyword][
             self.traction_matrix_key
@@ -476,35 +454,9 @@ class ColoumbContact(
         return (-Tn - cn * (un - gap)) > self.tol
 
     #####
-    ## Below here are different help function for calculating the Newton step
+    ## Below here are help functions for calculating the Newton step
     #####
 
-    def _e(self, Tt: np.ndarray, cut: np.ndarray, bf: np.ndarray) -> np.ndarray:
-        # Compute part of (32) in Berge et al.
-        return bf / self._l2(-Tt - cut)
-
-    def _Q(self, Tt: np.ndarray, cut: np.ndarray, bf: np.ndarray) -> np.ndarray:
-        # Implementation of the term Q involved in the calculation of (32) in Berge
-        # et al.
-        # This is the regularized Q
-        numerator = -Tt.dot((-Tt - cut).T)
-
-        # Regularization to avoid issues during the iterations to avoid dividing by
-        # zero if the faces are not in contact durign iterations.
-        denominator = max(bf, self._l2(-Tt)) * self._l2(-Tt - cut)
-
-        return numerator / denominator
-
-    def _M(self, Tt: np.ndarray, cut: np.ndarray, bf: np.ndarray) -> np.ndarray:
-        """Compute the coefficient M used in Eq. (32) in Berge et al."""
-        Id = np.eye(Tt.shape[0])
-        # M = e * (I - Q)
-        return self._e(Tt, cut, bf) * (Id - self._Q(Tt, cut, bf))
-
-    def _hf(self, Tt: np.ndarray, cut: np.ndarray, bf: np.ndarray) -> np.ndarray:
-        # This is the product e * Q * (-Tt + cut), used in computation of r in (32)
-        return self._e(Tt, cut, bf) * self._Q(Tt, cut, bf).dot(-Tt - cut)
-
     def _sliding_coefficients(
         self, Tt: np.ndarray, ut: np.ndarray, bf: np.ndarray, c: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
@@ -512,60 +464,83 @@ class ColoumbContact(
         Compute the regularized versions of coefficients L, v and r, defined in
         Eq. (32) and section 3.2.1 in Berge et al. and used in Eq. (31).
 
+        The coefficients are computed for a set of mortar cells simultaneously.
+
         Arguments:
-            Tt: Tangential forces. np array, one or two elements
-            ut: Tangential displacement increment. Same size as Tt.
-            bf: Friction bound for this mortar cell.
-            c: Numerical parameter
+            Tt (np.array, nd-1 x num_cells): Tangential forces.
+            ut (np.array, nd-1 x num_cells): Tangential displacement increments.
+            bf (np.array, num_cells): Friction bound for the mortar cells.
+            c (np.array, num_cells): Numerical parameter.
 
         Returns:
-            L: Weights for tangential displacement increment.
-            v: Weights for normal traction.
-            r: rhs contribution.
+            L (np.array, num_cells x nd-1 x nd-1): Weights for tangential displacement
+                increment.
+            r (np.array, num_cells x nd-1): rhs contribution.
+            v (np.array, num_cells x nd-1): Weights for normal traction.
 
         """
-        if Tt.ndim <= 1:
-            Tt = np.atleast_2d(Tt).T
-            ut = np.atleast_2d(ut).T
+        # Store the vectors of each cell as rows.
+        Tt = Tt.T
+        cut = c[:, None] * ut.T
+        num_cells, nt = Tt.shape
 
-        cut = c * ut
         # Identity matrix
-        Id = np.eye(Tt.shape[0])
+        Id = np.eye(nt)
+
+        L = np.zeros((num_cells, nt, nt))
+        r = np.zeros((num_cells, nt))
+        v = np.zeros((num_cells, nt))
+
+        # The vector -Tt - cut, and norms, which enter most of the expressions below.
+        w = -Tt - cut
+        l2_w = self._l2(w.T)
+        l2_Tt = self._l2(-Tt.T)
 
         # Shortcut if the friction coefficient is effectively zero.
         # Numerical tolerance here is likely somewhat arbitrary.
-        if bf <= self.tol:
-            return (
-                0 * Id,
-                bf * np.ones((Id.shape[0], 1)),
-                (-Tt - cut) / self._l2(-Tt - cut),
-            )
-
-        # Compute the coefficient M
-        coeff_M = self._M(Tt, cut, bf)
+        zero_bound = bf <= self.tol
+        r[zero_bound] = bf[zero_bound, None]
+        v[zero_bound] = w[zero_bound] / l2_w[zero_bound, None]
+
+        ind = np.where(~zero_bound)[0]
+        Tt, w, bf, c = Tt[ind], w[ind], bf[ind], c[ind]
+        l2_w, l2_Tt = l2_w[ind], l2_Tt[ind]
+
+        # Part of (32) in Berge et al.
+        e = bf / l2_w
+        # The term Q involved in the calculation of (32) in Berge et al. This is the
+        # regularized Q; the regularization avoids dividing by zero if the faces are
+        # not in contact during iterations.
+        numerator = -(Tt[:, :, None] * w[:, None, :])
+        denominator = np.maximum(bf, l2_Tt) * l2_w
+        Q = numerator / denominator[:, None, None]
+        # The coefficient M = e * (I - Q)
+        coeff_M = e[:, None, None] * (Id - Q)
+        # The product e * Q * (-Tt + cut), used in computation of r in (32)
+        hf = e[:, None] * np.sum(Q * w[:, None, :], axis=2)
 
         # Regularization during the iterations requires computations of parameters
         # alpha, beta, delta. In degenerate cases, use
-        beta = 1
+        beta = np.ones(ind.size)
         # Avoid division by zero:
-        l2_Tt = self._l2(-Tt)
-        if l2_Tt > self.tol:
-            alpha = -Tt.T.dot(-Tt - cut) / (l2_Tt * self._l2(-Tt - cut))
-            # Parameter delta.
-            # NOTE: The denominator bf is correct. The definition given in Berge is wrong.
-            delta = min(l2_Tt / bf, 1)
-
-            if alpha < 0:
-                beta = 1 / (1 - alpha * delta)
+        nonzero = np.where(l2_Tt > self.tol)[0]
+        alpha = -np.sum(Tt[nonzero] * w[nonzero], axis=1) / (
+            l2_Tt[nonzero] * l2_w[nonzero]
+        )
+        # Parameter delta.
+        # NOTE: The denominator bf is correct. The definition given in Berge is wrong.
+        delta = np.minimum(l2_Tt[nonzero] / bf[nonzero], 1)
+        negative = alpha < 0
+        beta[nonzero[negative]] = 1 / (1 - alpha[negative] * delta[negative])
 
         # The expression (I - beta * M)^-1
         # NOTE: In the definition of \tilde{L} in Berge, the inverse on the inner
         # paranthesis is missing.
-        IdM_inv = np.linalg.inv(Id - beta * coeff_M)
+        IdM_inv = np.linalg.inv(Id - beta[:, None, None] * coeff_M)
 
-        L = c * (IdM_inv - Id)
-        r = -IdM_inv.dot(self._hf(Tt, cut, bf))
-        v = IdM_inv.dot(-Tt - cut) / self._l2(-Tt - cut)
+        L[ind] = c[:, None, None] * (IdM_inv - Id)
+        r[ind] = -np.sum(IdM_inv * hf[:, None, :], axis=2)
+        v[ind] = np.sum(IdM_inv * w[:, None, :], axis=2) / l2_w[:, None]
 
         return L, r, v
 
@@ -23,7 +23,7 @@ turn into a standard poro-elasticity equation for non-fractured domains).
 """
 import logging
 from time import time
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
@@ -307,6 +307,21 @@ class Biot(pp.Mpsa):
                     options.
                 mpfa_eta (double): Location of continuity point in MPSA.
                     Defaults to 1/3 for simplex grids, 0 otherwise.
+                max_memory (float): Memory limit, in bytes, used to partition the
+                    grid into regions that are discretized separately. Defaults to a
+                    fraction of the memory available on the machine.
+                memory_fraction (float): Fraction of the available memory used if
+                    max_memory is not given. Defaults to 0.5.
+                num_workers (int): Number of processes used to discretize the
+                    partition regions in parallel. Defaults to 1 (serial).
+                max_memory_per_worker (float): Memory limit, in bytes, of each
+                    partition region for parallel discretization. Defaults to
+                    max_memory / num_workers. See pp.fvutils.subproblem_memory().
+                report_memory (bool): If True, the peak memory of the discretization
+                    of each partition region is measured, and reported together with
+                    the estimate, in a pp.fvutils.PeakMemoryReport stored in the
+                    matrix dictionary of the mechanics keyword, under the key
+                    'peak_memory_report'. Defaults to False.
 
         The discretization is stored in the data dictionary, in the form of
         several matrices representing different coupling terms. For details,
@@ -335,8 +350,6 @@ class Biot(pp.Mpsa):
 
         alpha: float = parameter_dictionary["biot_alpha"]
 
-        max_memory: int = parameter_dictionary.get("max_memory", 1e9)
-
         # Whether to update an existing discretization, or construct a new one.
         # If True, either specified_cells, _faces or _nodes should also be given, or
         # else a full new discretization will be computed
@@ -382,32 +395,59 @@ class Biot(pp.Mpsa):
         active_bound_displacement_face = sps.csr_matrix((nf * nd, nf * nd))
         active_bound_displacement_pressure = sps.csr_matrix((nf * nd, nc))
 
-        # Find an estimate of the peak memory need
+        # Find an estimate of the peak memory need, and use this to decide on the
+        # size of the partition regions
         peak_memory_estimate = self._estimate_peak_memory_mpsa(active_grid)
+        max_memory, num_workers = pp.fvutils.subproblem_memory(
+            parameter_dictionary, peak_memory_estimate
+        )
+        # The report, if any, is filled during the discretization of the regions. It is
+        # stored with the discretization matrices of the grid, since the discretization
+        # object may be shared by grids that are discretized concurrently.
+        memory_report: Optional[pp.fvutils.PeakMemoryReport] = None
+        if parameter_dictionary.get("report_memory", False):
+            memory_report = pp.fvutils.PeakMemoryReport()
+            matrices_m["peak_memory_report"] = memory_report
+        else:
+            matrices_m.pop("peak_memory_report", None)
 
-        # Loop over all partition regions, construct local problems, and transfer
-        # discretization to the entire active grid
-        for (
-            reg_i,
-            (sub_g, faces_in_subgrid, cells_in_subgrid, l2g_cells, l2g_faces),
-        ) in enumerate(
-            pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
-        ):
-
-            tic = time()
-            # Copy stiffness tensor, and restrict to local cells
-            loc_c: pp.FourthOrderTensor = self._constit_for_subgrid(
-                active_constit, l2g_cells
+        # Local problems, one per partition region. The stiffness tensor and boundary
+        # conditions are restricted to the region before the problem is passed on to
+        # the (possibly parallel) local discretization
+        tasks = (
+            (
+                sub_g,
+                self._constit_for_subgrid(active_constit, l2g_cells),
+                self._bc_for_subgrid(active_bound, sub_g, l2g_faces),
+                faces_in_subgrid,
+                cells_in_subgrid,
+                l2g_cells,
+                l2g_faces,
+                alpha,
+                eta,
+                inverter,
             )
+            for (
+                sub_g,
+                faces_in_subgrid,
+                cells_in_subgrid,
+                l2g_cells,
+                l2g_faces,
+            ) in pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
+        )
 
-            # Boundary conditions are slightly more complex. Find local faces
-            # that are on the global boundary.
-            # Then transfer boundary condition on those faces.
-            loc_bnd: pp.BoundaryConditionVectorial = self._bc_for_subgrid(
-                active_bound, sub_g, l2g_faces
+        # Loop over all partition regions, construct local problems, and transfer
+        # discretization to the entire active grid
+        tic = time()
+        for reg_i, (l2g_cells, l2g_faces, discr_fields) in enumerate(
+            pp.fvutils.map_subproblems(
+                self._discretize_biot_subproblem,
+                tasks,
+                num_workers,
+                memory_report=memory_report,
+                memory_estimator=self._estimate_peak_memory_mpsa,
             )
-
-            # Discretization of sub-problem
+        ):
             (
                 loc_stress,
                 loc_bound_stress,
@@ -418,33 +458,7 @@ class Biot(pp.Mpsa):
                 loc_bound_displacement_cell,
                 loc_bound_displacement_face,
                 loc_bound_displacement_pressure,
-            ) = self._local_discretization(
-                sub_g, loc_c, loc_bnd, alpha, eta=eta, inverter=inverter
-            )
-
-            # Eliminate contribution from faces already discretized (the dual grids /
-            # interaction regions may be structured so that some faces have previously
-            # been partially discretized even if it has not been their turn until now)
-            eliminate_face = np.where(
-                np.logical_not(np.in1d(l2g_faces, faces_in_subgrid))
-            )[0]
-            pp.fvutils.remove_nonlocal_contribution(
-                eliminate_face,
-                g.dim,
-                loc_stress,
-                loc_bound_stress,
-                loc_bound_displacement_cell,
-                loc_bound_displacement_face,
-                loc_grad_p,
-                loc_bound_displacement_pressure,
-            )
-
-            eliminate_cell = np.where(
-                np.logical_not(np.in1d(l2g_cells, cells_in_subgrid))
-            )[0]
-            pp.fvutils.remove_nonlocal_contribution(
-                eliminate_cell, 1, loc_div_u, loc_bound_div_u, loc_biot_stab
-            )
+            ) = discr_fields
 
             # Next, transfer discretization matrices from the local to the active grid
             # Get a mapping from the local to the active grid
@@ -483,6 +497,8 @@ class Biot(pp.Mpsa):
                 face_map_vec * loc_bound_displacement_pressure * cell_map_scalar
             )
             logger.info(f"Done with subproblem {reg_i}. Elapsed time {time() - tic}")
+            # The next region is computed while the loop advances, time it separately
+            tic = time()
             # Done with this subdomain, move on to the next one
 
         # We are done with the discretization. What remains is to map the computed
@@ -587,6 +603,71 @@ class Biot(pp.Mpsa):
             matrices_f[self.bound_div_u_matrix_key] = bound_div_u
             matrices_f[self.stabilization_matrix_key] = stabilization
 
+    def _discretize_biot_subproblem(
+        self,
+        sub_g: pp.Grid,
+        loc_c: pp.FourthOrderTensor,
+        loc_bnd: pp.BoundaryConditionVectorial,
+        faces_in_subgrid: np.ndarray,
+        cells_in_subgrid: np.ndarray,
+        l2g_cells: np.ndarray,
+        l2g_faces: np.ndarray,
+        alpha: float,
+        eta: float,
+        inverter: str,
+    ) -> Tuple[np.ndarray, np.ndarray, Tuple[sps.spmatrix, ...]]:
+        """Discretize a single partition region.
+
+        The method is run by worker processes if the discretization is parallelized,
+        see pp.fvutils.map_subproblems().
+
+        Returns:
+            np.ndarray: Local to active grid map of cells.
+            np.ndarray: Local to active grid map of faces.
+            tuple of sps.spmatrix: Local discretization matrices, as returned from
+                self._local_discretization(), with contributions from faces and
+                cells that do not belong to this region eliminated.
+
+        """
+        discr_fields = self._local_discretization(
+            sub_g, loc_c, loc_bnd, alpha, eta=eta, inverter=inverter
+        )
+        (
+            loc_stress,
+            loc_bound_stress,
+            loc_div_u,
+            loc_bound_div_u,
+            loc_grad_p,
+            loc_biot_stab,
+            loc_bound_displacement_cell,
+            loc_bound_displacement_face,
+            loc_bound_displacement_pressure,
+        ) = discr_fields
+
+        # Eliminate contribution from faces already discretized (the dual grids /
+        # interaction regions may be structured so that some faces have previously
+        # been partially discretized even if it has not been their turn until now)
+        is_local_face = np.in1d(l2g_faces, faces_in_subgrid)
+        eliminate_face = np.where(np.logical_not(is_local_face))[0]
+        pp.fvutils.remove_nonlocal_contribution(
+            eliminate_face,
+            sub_g.dim,
+            loc_stress,
+            loc_bound_stress,
+            loc_bound_displacement_cell,
+            loc_bound_displacement_face,
+            loc_grad_p,
+            loc_bound_displacement_pressure,
+        )
+
+        is_local_cell = np.in1d(l2g_cells, cells_in_subgrid)
+        eliminate_cell = np.where(np.logical_not(is_local_cell))[0]
+        pp.fvutils.remove_nonlocal_contribution(
+            eliminate_cell, 1, loc_div_u, loc_bound_div_u, loc_biot_stab
+        )
+
+        return l2g_cells, l2g_faces, discr_fields
+
     def _local_discretization(
         self,
         g: pp.Grid,
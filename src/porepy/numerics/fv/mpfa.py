@@ -2,7 +2,7 @@
 Implementation of the multi-point flux approximation O-method.
 
 """
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
@@ -60,7 +60,22 @@ class Mpfa(pp.FVElliptic):
                 pressure continuity point. If not given, porepy tries to set an optimal
                 value.
             mpfa_inverter (str): Optional. Inverter to apply for local problems.
-                Can take values 'numba' (default), 'cython' or 'python'.
+                Can take values 'numba' (default), 'batched' or 'python'; see
+                pp.matrix_operations.invert_diagonal_blocks.
+            max_memory (float): Optional. Memory limit, in bytes, used to partition
+                the grid into regions that are discretized separately. Defaults to a
+                fraction of the memory available on the machine.
+            memory_fraction (float): Optional. Fraction of the available memory used
+                if max_memory is not given. Defaults to 0.5.
+            num_workers (int): Optional. Number of processes used to discretize the
+                partition regions in parallel. Defaults to 1 (serial).
+            max_memory_per_worker (float): Optional. Memory limit, in bytes, of each
+                partition region for parallel discretization. Defaults to
+                max_memory / num_workers. See pp.fvutils.subproblem_memory().
+            report_memory (bool): Optional. If True, the peak memory of the
+                discretization of each partition region is measured, and reported
+                together with the estimate, in a pp.fvutils.PeakMemoryReport stored
+                in matrix_dictionary["peak_memory_report"]. Defaults to False.
 
         matrix_dictionary will be updated with the following entries:
             flux: sps.csc_matrix (g.num_faces, g.num_cells)
@@ -113,8 +128,6 @@ class Mpfa(pp.FVElliptic):
         eta: float = parameter_dictionary.get("mpfa_eta", None)
         inverter: str = parameter_dictionary.get("mpfa_inverter", "numba")
 
-        max_memory: int = parameter_dictionary.get("max_memory", 1e9)
-
         # Whether to update an existing discretization, or construct a new one.
         # If True, either specified_cells, _faces or _nodes should also be given, or
         # else a full new discretization will be computed
@@ -177,44 +190,51 @@ class Mpfa(pp.FVElliptic):
         active_vector_source = sps.csr_matrix((nf, nc * cell_vector_dim))
         active_bound_pressure_vector_source = sps.csr_matrix((nf, nc * cell_vector_dim))
 
-        # Find an estimate of the peak memory need
+        # Find an estimate of the peak memory need, and use this to decide on the
+        # size of the partition regions
         peak_memory_estimate = self._estimate_peak_memory(active_grid)
+        max_memory, num_workers = pp.fvutils.subproblem_memory(
+            parameter_dictionary, peak_memory_estimate
+        )
+        # The report, if any, is filled during the discretization of the regions. It is
+        # stored with the discretization matrices of the grid, since the discretization
+        # object may be shared by grids that are discretized concurrently.
+        memory_report: Optional[pp.fvutils.PeakMemoryReport] = None
+        if parameter_dictionary.get("report_memory", False):
+            memory_report = pp.fvutils.PeakMemoryReport()
+            matrix_dictionary["peak_memory_report"] = memory_report
+        else:
+            matrix_dictionary.pop("peak_memory_report", None)
 
-        # Loop over all partition regions, construct local problems, and transfer
-        # discretization to the entire active grid
-        for reg_i, (sub_g, faces_in_subgrid, _, l2g_cells, l2g_faces) in enumerate(
-            pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
-        ):
-
-            # Copy stiffness tensor, and restrict to local cells
-            loc_c: pp.SecondOrderTensor = self._constit_for_subgrid(
-                active_constit, l2g_cells
-            )
-
-            # Boundary conditions are slightly more complex. Find local faces
-            # that are on the global boundary.
-            # Then transfer boundary condition on those faces.
-            loc_bnd: pp.BoundaryCondition = self._bc_for_subgrid(
-                active_bound, sub_g, l2g_faces, active_grid
-            )
-            discr_fields = self._flux_discretization(
+        # Local problems, one per partition region. The constitutive laws and boundary
+        # conditions are restricted to the region before the problem is passed on to
+        # the (possibly parallel) local discretization
+        tasks = (
+            (
                 sub_g,
-                loc_c,
-                loc_bnd,
-                eta=eta,
-                inverter=inverter,
-                ambient_dimension=vector_source_dim,
+                self._constit_for_subgrid(active_constit, l2g_cells),
+                self._bc_for_subgrid(active_bound, sub_g, l2g_faces, active_grid),
+                faces_in_subgrid,
+                l2g_cells,
+                l2g_faces,
+                eta,
+                inverter,
+                vector_source_dim,
             )
+            for sub_g, faces_in_subgrid, _, l2g_cells, l2g_faces in (
+                pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
+            )
+        )
 
-            # Eliminate contribution from faces already discretized (the dual grids /
-            # interaction regions may be structured so that some faces have previously
-            # been partially discretized even if it has not been their turn until now)
-            eliminate_face = np.where(
-                np.logical_not(np.in1d(l2g_faces, faces_in_subgrid))
-            )[0]
-
-            pp.fvutils.remove_nonlocal_contribution(eliminate_face, 1, *discr_fields)
-
+        # Loop over all partition regions, construct local problems, and transfer
+        # discretization to the entire active grid
+        for l2g_cells, l2g_faces, discr_fields in pp.fvutils.map_subproblems(
+            self._discretize_subproblem,
+            tasks,
+            num_workers,
+            memory_report=memory_report,
+            memory_estimator=self._estimate_peak_memory,
+        ):
             # Split the discretization.
             (
                 loc_flux,
@@ -227,10 +247,7 @@ class Mpfa(pp.FVElliptic):
 
             # Next, transfer discretization matrices from the local to the active grid
 
-            if (
-                sub_g.num_cells == active_grid.num_cells
-                and sub_g.num_faces == active_grid.num_faces
-            ):
+            if l2g_cells.size == active_grid.num_cells and l2g_faces.size == nf:
                 # Shortcut
                 active_flux = loc_flux
                 active_bound_flux = loc_bound_flux
@@ -406,6 +423,50 @@ class Mpfa(pp.FVElliptic):
                 self.bound_pressure_vector_source_matrix_key
             ] = bound_pressure_vector_source_glob
 
+    def _discretize_subproblem(
+        self,
+        sub_g: pp.Grid,
+        loc_c: pp.SecondOrderTensor,
+        loc_bnd: pp.BoundaryCondition,
+        faces_in_subgrid: np.ndarray,
+        l2g_cells: np.ndarray,
+        l2g_faces: np.ndarray,
+        eta: float,
+        inverter: str,
+        vector_source_dim: int,
+    ) -> Tuple[np.ndarray, np.ndarray, Tuple[sps.spmatrix, ...]]:
+        """Discretize a single partition region.
+
+        The method is run by worker processes if the discretization is parallelized,
+        see pp.fvutils.map_subproblems().
+
+        Returns:
+            np.ndarray: Local to active grid map of cells.
+            np.ndarray: Local to active grid map of faces.
+            tuple of sps.spmatrix: Local discretization matrices, as returned from
+                self._flux_discretization(), with contributions from faces that do
+                not belong to this region eliminated.
+
+        """
+        discr_fields = self._flux_discretization(
+            sub_g,
+            loc_c,
+            loc_bnd,
+            eta=eta,
+            inverter=inverter,
+            ambient_dimension=vector_source_dim,
+        )
+
+        # Eliminate contribution from faces already discretized (the dual grids /
+        # interaction regions may be structured so that some faces have previously
+        # been partially discretized even if it has not been their turn until now)
+        is_local_face = np.in1d(l2g_faces, faces_in_subgrid)
+        eliminate_face = np.where(np.logical_not(is_local_face))[0]
+
+        pp.fvutils.remove_nonlocal_contribution(eliminate_face, 1, *discr_fields)
+
+        return l2g_cells, l2g_faces, discr_fields
+
     def update_discretization(self, g, data):
         """Update discretization.
 
@@ -1145,41 +1206,12 @@ class Mpfa(pp.FVElliptic):
     documented.
     """
 
-    def _estimate_peak_memory(self, g):
-        """
-        Rough estimate of peak memory need
-        """
-        nd = g.dim
-        if nd == 0:
-            return 0
-
-        num_cell_nodes = g.cell_nodes().sum(axis=1)
-
-        # Number of unknowns around a vertex: nd per cell that share the vertex for
-        # pressure gradients, and one per cell (cell center pressure)
-        num_grad_unknowns = nd * num_cell_nodes
-
-        # The most expensive field is the storage of igrad, which is block diagonal
-        # with num_grad_unknowns sized blocks
-        igrad_size = num_grad_unknowns.sum()
+    def _estimate_peak_memory(self, g: pp.Grid) -> int:
+        """Estimate of the peak memory need, in bytes, for mpfa discretization.
 
-        # The discretization of Darcy's law will require nd (that is, a gradient)
-        # per sub-face.
-        num_sub_face = g.face_nodes.sum()
-        darcy_size = nd * num_sub_face
-
-        # Balancing of fluxes will require 2*nd (gradient on both sides) fields per
-        # sub-face
-        nk_grad_size = 2 * nd * num_sub_face
-        # Similarly, pressure continuity requires 2 * (nd+1) (gradient on both
-        # sides, and cell center pressures) numbers
-        pr_cont_size = 2 * (nd + 1) * num_sub_face
-
-        total_size = igrad_size + darcy_size + nk_grad_size + pr_cont_size
-
-        # Not covered yet is various fields on subcell topology, mapping matrices
-        # between local and block ordering etc.
-        return total_size
+        See pp.fvutils.estimate_peak_memory() for details.
+        """
+        return pp.fvutils.estimate_peak_memory(g, num_components=1)
 
     def _block_diagonal_structure(
         self, sub_cell_index, cell_node_blocks, nno, bound_exclusion
@@ -1442,10 +1474,9 @@ class Mpfa(pp.FVElliptic):
     def _constit_for_subgrid(
         self, constit: pp.SecondOrderTensor, loc_cells: np.ndarray
     ) -> pp.SecondOrderTensor:
-        # Copy stiffness tensor, and restrict to local cells
-        loc_c = constit.copy()
-        loc_c.values = loc_c.values[::, ::, loc_cells]
-        return loc_c
+        # Restrict to local cells. Unless the full tensor has been formed, this only
+        # involves the parameters defining the tensor.
+        return constit.restrict(loc_cells)
 
 
 def reconstruct_presssure(g, subcell_topology, eta):
@@ -9,7 +9,7 @@ The implementation is based on the weakly symmetric version of MPSA, described i
 """
 import logging
 from time import time
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 import scipy.sparse as sps
@@ -153,6 +153,20 @@ class Mpsa(Discretization):
                 value. If a float is given this value is set to all subfaces, except the
                 boundary (where, 0 is used). If eta is a np.ndarray its size should
                 equal SubcellTopology(g).num_subfno.
+            max_memory (float): Optional. Memory limit, in bytes, used to partition
+                the grid into regions that are discretized separately. Defaults to a
+                fraction of the memory available on the machine.
+            memory_fraction (float): Optional. Fraction of the available memory used
+                if max_memory is not given. Defaults to 0.5.
+            num_workers (int): Optional. Number of processes used to discretize the
+                partition regions in parallel. Defaults to 1 (serial).
+            max_memory_per_worker (float): Optional. Memory limit, in bytes, of each
+                partition region for parallel discretization. Defaults to
+                max_memory / num_workers. See pp.fvutils.subproblem_memory().
+            report_memory (bool): Optional. If True, the peak memory of the
+                discretization of each partition region is measured, and reported
+                together with the estimate, in a pp.fvutils.PeakMemoryReport stored
+                in matrix_dictionary["peak_memory_report"]. Defaults to False.
 
         matrix_dictionary will be updated with the following entries:
             stress: sps.csc_matrix (g.dim * g.num_faces, g.dim * g.num_cells)
@@ -184,7 +198,6 @@ class Mpsa(Discretization):
         hf_eta: float = parameter_dictionary.get("reconstruction_eta", None)
 
         inverter: str = parameter_dictionary.get("inverter", None)
-        max_memory: int = parameter_dictionary.get("max_memory", 1e9)
 
         # Whether to update an existing discretization, or construct a new one.
         # If True, either specified_cells, _faces or _nodes should also be given, or
@@ -227,52 +240,60 @@ class Mpsa(Discretization):
         active_bound_displacement_cell = sps.csr_matrix((nf * nd, nc * nd))
         active_bound_displacement_face = sps.csr_matrix((nf * nd, nf * nd))
 
-        # Find an estimate of the peak memory need
+        # Find an estimate of the peak memory need, and use this to decide on the
+        # size of the partition regions
         peak_memory_estimate = self._estimate_peak_memory_mpsa(active_grid)
+        max_memory, num_workers = pp.fvutils.subproblem_memory(
+            parameter_dictionary, peak_memory_estimate
+        )
+        # The report, if any, is filled during the discretization of the regions. It is
+        # stored with the discretization matrices of the grid, since the discretization
+        # object may be shared by grids that are discretized concurrently.
+        memory_report: Optional[pp.fvutils.PeakMemoryReport] = None
+        if parameter_dictionary.get("report_memory", False):
+            memory_report = pp.fvutils.PeakMemoryReport()
+            matrix_dictionary["peak_memory_report"] = memory_report
+        else:
+            matrix_dictionary.pop("peak_memory_report", None)
 
-        # Loop over all partition regions, construct local problems, and transfer
-        # discretization to the entire active grid
-        for reg_i, (sub_g, faces_in_subgrid, _, l2g_cells, l2g_faces) in enumerate(
-            pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
-        ):
-            tic = time()
-
-            # Copy stiffness tensor, and restrict to local cells
-            loc_c: pp.FourthOrderTensor = self._constit_for_subgrid(
-                active_constit, l2g_cells
+        # Local problems, one per partition region. The stiffness tensor and boundary
+        # conditions are restricted to the region before the problem is passed on to
+        # the (possibly parallel) local discretization
+        tasks = (
+            (
+                sub_g,
+                self._constit_for_subgrid(active_constit, l2g_cells),
+                self._bc_for_subgrid(active_bound, sub_g, l2g_faces),
+                faces_in_subgrid,
+                l2g_cells,
+                l2g_faces,
+                eta,
+                inverter,
+                hf_eta,
             )
-
-            # Boundary conditions are slightly more complex. Find local faces
-            # that are on the global boundary.
-            # Then transfer boundary condition on those faces.
-            loc_bnd: pp.BoundaryConditionVectorial = self._bc_for_subgrid(
-                active_bound, sub_g, l2g_faces
+            for sub_g, faces_in_subgrid, _, l2g_cells, l2g_faces in (
+                pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
             )
+        )
 
-            # Discretization of sub-problem
-            (
-                loc_stress,
-                loc_bound_stress,
-                loc_bound_displacement_cell,
-                loc_bound_displacement_face,
-            ) = self._stress_disrcetization(
-                sub_g, loc_c, loc_bnd, eta=eta, inverter=inverter, hf_eta=hf_eta
+        # Loop over all partition regions, construct local problems, and transfer
+        # discretization to the entire active grid
+        tic = time()
+        for reg_i, (l2g_cells, l2g_faces, discr_fields) in enumerate(
+            pp.fvutils.map_subproblems(
+                self._discretize_subproblem,
+                tasks,
+                num_workers,
+                memory_report=memory_report,
+                memory_estimator=self._estimate_peak_memory_mpsa,
             )
-
-            # Eliminate contribution from faces already discretized (the dual grids /
-            # interaction regions may be structured so that some faces have previously
-            # been partially discretized even if it has not been their turn until now)
-            eliminate_face = np.where(
-                np.logical_not(np.in1d(l2g_faces, faces_in_subgrid))
-            )[0]
-            pp.fvutils.remove_nonlocal_contribution(
-                eliminate_face,
-                g.dim,
+        ):
+            (
                 loc_stress,
                 loc_bound_stress,
                 loc_bound_displacement_cell,
                 loc_bound_displacement_face,
-            )
+            ) = discr_fields
 
             # Next, transfer discretization matrices from the local to the active grid
             # Get a mapping from the local to the active grid
@@ -292,6 +313,8 @@ class Mpsa(Discretization):
                 face_map * loc_bound_displacement_face * face_map.transpose()
             )
             logger.info(f"Done with subproblem {reg_i}. Elapsed time {time() - tic}")
+            # The next region is computed while the loop advances, time it separately
+            tic = time()
 
         # We have reached the end of the discretization, what remains is to map the
         # discretization back from the active grid to the entire grid
@@ -343,6 +366,46 @@ class Mpsa(Discretization):
                 self.bound_displacment_face_matrix_key
             ] = bound_displacement_face_glob
 
+    def _discretize_subproblem(
+        self,
+        sub_g: pp.Grid,
+        loc_c: pp.FourthOrderTensor,
+        loc_bnd: pp.BoundaryConditionVectorial,
+        faces_in_subgrid: np.ndarray,
+        l2g_cells: np.ndarray,
+        l2g_faces: np.ndarray,
+        eta: float,
+        inverter: str,
+        hf_eta: float,
+    ) -> Tuple[np.ndarray, np.ndarray, Tuple[sps.spmatrix, ...]]:
+        """Discretize a single partition region.
+
+        The method is run by worker processes if the discretization is parallelized,
+        see pp.fvutils.map_subproblems().
+
+        Returns:
+            np.ndarray: Local to active grid map of cells.
+            np.ndarray: Local to active grid map of faces.
+            tuple of sps.spmatrix: Local discretization matrices, as returned from
+                self._stress_disrcetization(), with contributions from faces that do
+                not belong to this region eliminated.
+
+        """
+        discr_fields = self._stress_disrcetization(
+            sub_g, loc_c, loc_bnd, eta=eta, inverter=inverter, hf_eta=hf_eta
+        )
+
+        # Eliminate contribution from faces already discretized (the dual grids /
+        # interaction regions may be structured so that some faces have previously
+        # been partially discretized even if it has not been their turn until now)
+        is_local_face = np.in1d(l2g_faces, faces_in_subgrid)
+        eliminate_face = np.where(np.logical_not(is_local_face))[0]
+        pp.fvutils.remove_nonlocal_contribution(
+            eliminate_face, sub_g.dim, *discr_fields
+        )
+
+        return l2g_cells, l2g_faces, discr_fields
+
     def update_discretization(self, g, data):
         """Update discretization.
 
@@ -1170,38 +1233,11 @@ class Mpsa(Discretization):
     # -----------------------------------------------------------------------------
 
     def _estimate_peak_memory_mpsa(self, g: pp.Grid) -> int:
-        """Rough estimate of peak memory need for mpsa discretization."""
-        nd = g.dim
-        num_cell_nodes = g.cell_nodes().sum(axis=1).A
-
-        # Number of unknowns around a vertex: nd^2 per cell that share the vertex
-        # for pressure gradients, and one per cell (cell center pressure)
-        num_grad_unknowns = nd**2 * num_cell_nodes
+        """Estimate of the peak memory need, in bytes, for mpsa discretization.
 
-        # The most expensive field is the storage of igrad, which is block diagonal
-        # with num_grad_unknowns sized blocks. The number of elements is the square
-        # of the local system size. The factor 2 accounts for matrix storage in
-        # sparse format (rows and data; ignore columns since this is in compressed
-        # format)
-        igrad_size = np.power(num_grad_unknowns, 2).sum() * 2
-
-        # The discretization of Hook's law will require nd^2 (that is, a gradient)
-        # per sub-face per dimension
-        num_sub_face = g.face_nodes.sum()
-        hook_size = nd * num_sub_face * nd**2
-
-        # Balancing of stresses will require 2*nd**2 (gradient on both sides)
-        # fields per sub-face per dimension
-        nk_grad_size = 2 * nd * num_sub_face * nd**2
-        # Similarly, pressure continuity requires 2 * (nd+1) (gradient on both
-        # sides, and cell center pressures) numbers
-        pr_cont_size = 2 * (nd**2 + 1) * num_sub_face * nd
-
-        total_size = igrad_size + hook_size + nk_grad_size + pr_cont_size
-
-        # Not covered yet is various fields on subcell topology, mapping matrices
-        # between local and block ordering etc.
-        return total_size
+        See pp.fvutils.estimate_peak_memory() for details.
+        """
+        return pp.fvutils.estimate_peak_memory(g, num_components=g.dim)
 
     def _get_displacement_submatrices(
         self,
@@ -1882,11 +1918,6 @@ class Mpsa(Discretization):
     def _constit_for_subgrid(
         self, constit: pp.FourthOrderTensor, loc_cells: np.ndarray
     ) -> pp.FourthOrderTensor:
-        # Copy stiffness tensor, and restrict to local cells
-        loc_c = constit.copy()
-        loc_c.values = loc_c.values[::, ::, loc_cells]
-        # Also restrict the lambda and mu fields; we will copy the stiffness
-        # tensors later.
-        loc_c.lmbda = loc_c.lmbda[loc_cells]
-        loc_c.mu = loc_c.mu[loc_cells]
-        return loc_c
+        # Restrict to local cells. Unless the full tensor has been formed, this only
+        # involves the parameters defining the tensor.
+        return constit.restrict(loc_cells)
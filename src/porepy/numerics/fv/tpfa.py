@@ -157,14 +157,19 @@ class Tpfa(pp.FVElliptic):
         n = g.face_normals[:, fi]
         # Switch signs where relevant
         n *= sgn
-        perm = k.values[::, ::, ci]
 
         # Distance from face center to cell center
         fc_cc = g.face_centers[::, fi] - g.cell_centers[::, ci]
 
-        # Transpose normal vectors to match the shape of K and multiply the two
-        nk = perm * n
-        nk = nk.sum(axis=1)
+        if k.is_isotropic:
+            # The permeability is a scalar times the identity, there is no need to
+            # form the full tensor.
+            nk = k.isotropic_values()[ci] * n
+        else:
+            perm = k.restrict(ci).values
+            # Transpose normal vectors to match the shape of K and multiply the two
+            nk = perm * n
+            nk = nk.sum(axis=1)
 
         if data.get("Aavatsmark_transmissibilities", False):
             # These work better in some cases (possibly if the problem is grid
@@ -0,0 +1,188 @@
+"""
+Direct sparse solver that reuses information from previous factorizations.
+
+In nonlinear and time-dependent simulations, the same linear system is solved many
+times, with a matrix whose sparsity pattern rarely changes. The class SparseLUCache
+wraps SuperLU, as exposed by scipy.sparse.linalg.splu, and avoids recomputing work
+that only depends on the sparsity pattern:
+
+    1) If the matrix is identical to the previous one (as for linear problems with
+       constant coefficients), the stored LU factors are reused directly.
+    2) If only the values have changed, the fill-reducing column ordering computed for
+       the previous matrix is reused, and only the numerical factorization is redone.
+
+Implementation note: The scipy wrapper around SuperLU does not expose the option to
+reuse the symbolic factorization itself, see
+
+    https://github.com/scipy/scipy/issues/8227
+
+Instead, the matrix is permuted by the stored column ordering before factorization,
+and SuperLU is instructed to use the natural ordering. The computation of the ordering,
+which is a substantial part of the cost of the symbolic analysis, is thereby avoided.
+
+"""
+import logging
+import warnings
+from typing import Optional
+
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+
+# Module-wide logger
+logger = logging.getLogger(__name__)
+
+
+class SparseLUCache:
+    """Direct solver for sparse linear systems, with reuse of factorizations.
+
+    Usage:
+        >>> cache = SparseLUCache()
+        >>> x = cache.solve(A, b)  # Full factorization
+        >>> y = cache.solve(A, c)  # Reuse of LU factors
+        >>> z = cache.solve(A_new_values, c)  # Reuse of column ordering
+
+    Attributes:
+        permc_spec (str): Method used by SuperLU to compute the fill-reducing column
+            ordering, when a new sparsity pattern is encountered. See
+            scipy.sparse.linalg.splu for permissible values. Defaults to "COLAMD".
+        num_full_factorizations (int): Number of factorizations that required a new
+            symbolic analysis.
+        num_numerical_factorizations (int): Number of factorizations that reused the
+            column ordering of a previous factorization.
+        num_reused_factorizations (int): Number of solves that reused the LU factors
+            of the previous matrix.
+
+    """
+
+    def __init__(self, permc_spec: str = "COLAMD") -> None:
+        self.permc_spec = permc_spec
+
+        self.num_full_factorizations: int = 0
+        self.num_numerical_factorizations: int = 0
+        self.num_reused_factorizations: int = 0
+
+        self.clear()
+
+    def __repr__(self) -> str:
+        s = (
+            f"Sparse LU factorization cache, with column ordering {self.permc_spec}.\n"
+            f"Number of full factorizations: {self.num_full_factorizations}\n"
+            "Number of factorizations with reused ordering: "
+            f"{self.num_numerical_factorizations}\n"
+            f"Number of reused factorizations: {self.num_reused_factorizations}\n"
+        )
+        return s
+
+    def clear(self) -> None:
+        """Discard the stored factorization and sparsity pattern."""
+        # Sparsity pattern of the last matrix, in csc format.
+        self._indptr: Optional[np.ndarray] = None
+        self._indices: Optional[np.ndarray] = None
+        # Values of the last matrix, used to detect identical matrices.
+        self._data: Optional[np.ndarray] = None
+
+        # Column ordering, in the form of a permutation of the columns of the matrix.
+        self._col_order: Optional[np.ndarray] = None
+        # Mapping from the data array of the original matrix to the data array of the
+        # column-permuted matrix, together with the pattern of the permuted matrix.
+        self._data_map: Optional[np.ndarray] = None
+        self._perm_indptr: Optional[np.ndarray] = None
+        self._perm_indices: Optional[np.ndarray] = None
+
+        # LU factorization of the last matrix. If _lu_is_permuted is True, the
+        # factorization is of the column-permuted matrix.
+        self._lu: Optional[spla.SuperLU] = None
+        self._lu_is_permuted: bool = False
+
+    def solve(self, A: sps.spmatrix, b: np.ndarray) -> np.ndarray:
+        """Solve the linear system A x = b.
+
+        If the matrix is singular, a warning is raised and a solution vector of nans is
+        returned, as is done by scipy.sparse.linalg.spsolve.
+
+        Parameters:
+            A (sps.spmatrix): Square system matrix.
+            b (np.ndarray): Right hand side.
+
+        Returns:
+            np.ndarray: Solution vector.
+
+        """
+        A = sps.csc_matrix(A)
+        A.sum_duplicates()
+        A.sort_indices()
+
+        try:
+            if not self._same_pattern(A):
+                self._factorize_new_pattern(A)
+            elif not np.array_equal(A.data, self._data):
+                self._factorize_known_pattern(A)
+            else:
+                self.num_reused_factorizations += 1
+        except RuntimeError:
+            # SuperLU raises a RuntimeError for singular matrices
+            self.clear()
+            warnings.warn("Matrix is exactly singular", spla.MatrixRankWarning)
+            x = np.empty(b.shape, dtype=np.result_type(A.dtype, b.dtype))
+            x.fill(np.nan)
+            return x
+
+        self._data = A.data.copy()
+
+        if not self._lu_is_permuted:
+            return self._lu.solve(b)
+
+        y = self._lu.solve(b)
+        # Map back from the permuted ordering of the unknowns
+        x = np.empty_like(y)
+        x[self._col_order] = y
+        return x
+
+    def _same_pattern(self, A: sps.csc_matrix) -> bool:
+        return (
+            self._indptr is not None
+            and np.array_equal(A.indptr, self._indptr)
+            and np.array_equal(A.indices, self._indices)
+        )
+
+    def _factorize_new_pattern(self, A: sps.csc_matrix) -> None:
+        """Compute column ordering and factorization for a new sparsity pattern."""
+        self.clear()
+        lu = spla.splu(A, permc_spec=self.permc_spec)
+
+        # SuperLU factorizes Pr * A * Pc, with Pc[i, perm_c[i]] = 1. The factorization
+        # is thus equivalent to that of A[:, col_order], with col_order the inverse of
+        # perm_c.
+        self._col_order = np.argsort(lu.perm_c)
+
+        # Find how the data of A is mapped to the column-permuted matrix. This is done
+        # by permuting a matrix with the same pattern, and the data array enumerated.
+        # The enumeration starts at 1, so that no element is an explicit zero.
+        index_matrix = sps.csc_matrix(
+            (np.arange(1, A.nnz + 1), A.indices, A.indptr), shape=A.shape
+        )
+        permuted = index_matrix[:, self._col_order].tocsc()
+        permuted.sort_indices()
+        self._data_map = permuted.data.astype(int) - 1
+        self._perm_indices = permuted.indices
+        self._perm_indptr = permuted.indptr
+
+        self._lu = lu
+        self._lu_is_permuted = False
+        self._indptr = A.indptr.copy()
+        self._indices = A.indices.copy()
+        self.num_full_factorizations += 1
+        logger.debug("Computed factorization of matrix with new sparsity pattern")
+
+    def _factorize_known_pattern(self, A: sps.csc_matrix) -> None:
+        """Numerical factorization, reusing the column ordering."""
+        permuted = sps.csc_matrix(
+            (A.data[self._data_map], self._perm_indices, self._perm_indptr),
+            shape=A.shape,
+        )
+        # Release the old factors before computing new ones, to limit peak memory
+        self._lu = None
+        self._lu = spla.splu(permuted, permc_spec="NATURAL")
+        self._lu_is_permuted = True
+        self.num_numerical_factorizations += 1
@@ -63,6 +63,9 @@ class Assembler:
         # freedom for each block.
         self._identify_variable_combinations()
 
+        # Time spent on discretization, set by self.discretize()
+        self.discretization_timings: Optional[pp.DiscretizationTimings] = None
+
     @staticmethod
     def _discretization_key(row: str, col: str = None) -> str:
         if col is None or row == col:
@@ -315,7 +318,10 @@ class Assembler:
         self._operate_on_gb(operation="update_discretization", filt=new_filt)
 
     def discretize(
-        self, filt: Optional[pp.assembler_filters.AssemblerFilter] = None
+        self,
+        filt: Optional[pp.assembler_filters.AssemblerFilter] = None,
+        num_workers: int = 1,
+        executor: str = "thread",
     ) -> None:
         """Run the discretization operation on discretizations specified in
         the mixed-dimensional grid.
@@ -324,13 +330,26 @@ class Assembler:
         in the GridBucket by passing an appropriate filter. See pp.assembler_filters
         for details, in particular the class ListFilter.
 
+        The discretizations on nodes and edges are executed by a
+        pp.DiscretizationScheduler, which runs coupling discretizations after the
+        discretizations on the neighboring nodes. Independent discretizations can be
+        run concurrently. The time spent on each discretization is stored in the
+        attribute discretization_timings.
+
         Parameters:
             filt (pp.assembler_filters.AssemblerFilter, optional): Filter to invoke
                 selected discretizations. Defaults to a PassAllFilter, which will
                 lead to discretization of all terms in the entire GridBucket.
+            num_workers (int, optional): Number of discretizations to run
+                concurrently. Defaults to 1.
+            executor (str, optional): Type of worker pool used if num_workers > 1,
+                either 'thread' or 'process'. See pp.DiscretizationScheduler for
+                details. Defaults to 'thread'.
 
         """
-        self._operate_on_gb("discretize", filt=filt)
+        scheduler = pp.DiscretizationScheduler(self.gb, num_workers, executor)
+        self._operate_on_gb("discretize", filt=filt, scheduler=scheduler)
+        self.discretization_timings = scheduler.run()
 
     def _operate_on_gb(
         self,
@@ -380,7 +399,7 @@ class Assembler:
             matrix = None  # type:ignore
             rhs = None  # type:ignore
             sps_matrix = None
-            extra_args = {}
+            extra_args = {"scheduler": kwargs.get("scheduler", None)}
         else:
             # We will only reach this if someone has invoked this private method
             # from the outside.
@@ -408,6 +427,7 @@ class Assembler:
         rhs: Optional[Dict[str, np.ndarray]] = None,
         assemble_matrix_only: Optional[bool] = False,
         assemble_rhs_only: Optional[bool] = False,
+        scheduler: Optional[pp.DiscretizationScheduler] = None,
     ):
         for combination in self._grid_variable_term_combinations:
             # Coupling terms should not be considered here
@@ -440,10 +460,13 @@ class Assembler:
 
             # Either discretize (full or update) or assemble
             if operation == "discretize":
+                assert scheduler is not None
                 if is_node:
-                    discr.discretize(grid, data)
+                    scheduler.add(
+                        discr.discretize, (grid, data), [grid], combination.term
+                    )
                 else:
-                    discr.discretize(data)
+                    scheduler.add(discr.discretize, (data,), [grid], combination.term)
             elif operation == "update_discretization":
                 if is_node:
                     discr.update_discretization(grid, data)
@@ -497,6 +520,7 @@ class Assembler:
         sps_matrix: Type[csc_or_csr_matrix],
         assemble_matrix_only: Optional[bool] = False,
         assemble_rhs_only: Optional[bool] = False,
+        scheduler: Optional[pp.DiscretizationScheduler] = None,
     ) -> None:
         """Perform operation on all edge-node couplings.
 
@@ -635,8 +659,19 @@ class Assembler:
             # considered valid, and raises an error message.
             if primary_idx is not None and secondary_idx is not None:
                 if operation == "discretize":
-                    edge_discr.discretize(
-                        g_primary, g_secondary, data_primary, data_secondary, data_edge
+                    assert scheduler is not None
+                    scheduler.add(
+                        edge_discr.discretize,
+                        (
+                            g_primary,
+                            g_secondary,
+                            data_primary,
+                            data_secondary,
+                            data_edge,
+                        ),
+                        [e, g_primary, g_secondary],
+                        term_key,
+                        coupling=True,
                     )
 
                 elif operation == "update_discretization":
@@ -739,7 +774,16 @@ class Assembler:
                 # TODO: Term filters are not applied to this case
                 # secondary_idx is None
                 # The operation is a simplified version of the full option above.
-                if operation in ("discretize", "update_discretization"):
+                if operation == "discretize":
+                    assert scheduler is not None
+                    scheduler.add(
+                        edge_discr.discretize,
+                        (g_primary, data_primary, data_edge),
+                        [e, g_primary],
+                        term_key,
+                        coupling=True,
+                    )
+                elif operation == "update_discretization":
                     edge_discr.discretize(g_primary, data_primary, data_edge)
                 elif operation == "assemble":
 
@@ -786,7 +830,16 @@ class Assembler:
                 # TODO: Term filters are not applied to this case
                 # primary_idx is None
                 # The operation is a simplified version of the full option above.
-                if operation in ("discretize", "update_discretization"):
+                if operation == "discretize":
+                    assert scheduler is not None
+                    scheduler.add(
+                        edge_discr.discretize,
+                        (g_secondary, data_secondary, data_edge),
+                        [e, g_secondary],
+                        term_key,
+                        coupling=True,
+                    )
+                elif operation == "update_discretization":
                     edge_discr.discretize(g_secondary, data_secondary, data_edge)
                 elif operation == "assemble":
 
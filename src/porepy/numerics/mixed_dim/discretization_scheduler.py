@@ -0,0 +1,304 @@
+"""
+Scheduling of discretization operations on the nodes and edges of a GridBucket.
+
+The discretizations on the individual grids and mortar interfaces of a GridBucket are
+to a large degree independent, and can be run concurrently. The exceptions are:
+
+    1) Coupling discretizations on edges, which may use the discretization matrices of
+       the neighboring nodes; these should be discretized after the nodes.
+    2) Discretizations that store matrices in the same data dictionary; these should
+       not modify the dictionary at the same time.
+
+The class DiscretizationScheduler collects discretization tasks, orders them so that
+coupling discretizations come after all other discretizations, and lets each task
+depend on the preceding tasks that access the same grid or edge. Tasks are then
+executed, in serial or on a pool of threads or processes, as soon as their
+dependencies are finished. The wall clock time of each task is recorded in a
+DiscretizationTimings object.
+
+Threads share memory with the calling process, but the gain from parallelism depends
+on how much of the discretization runs outside the Python interpreter lock (numpy,
+scipy and numba code mostly does). Processes avoid the lock, but the arguments of each
+task are pickled and sent to the worker, and only the discretization matrices, that
+is, the contents of data[pp.DISCRETIZATION_MATRICES], are transferred back. Other
+modifications of the data dictionaries made by the discretization are lost.
+
+"""
+import logging
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import porepy as pp
+
+# Module-wide logger
+logger = logging.getLogger(__name__)
+
+
+class DiscretizationTimings:
+    """Wall clock time spent on discretization, per grid and per term.
+
+    Attributes:
+        entries (list of tuples): One item (grid name, term, time in seconds) per
+            discretization task, in the order of completion.
+
+    """
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[str, str, float]] = []
+
+    def __repr__(self) -> str:
+        s = f"Discretization timings for {len(self.entries)} tasks\n"
+        s += "Grid" + " " * 28 + "Term" + " " * 28 + "Time [s]\n"
+        for name, term, elapsed in self.entries:
+            s += f"{name:<32}{term:<32}{elapsed:>8.3f}\n"
+        s += f"Total time: {self.total():.3f} s\n"
+        return s
+
+    def per_grid(self) -> Dict[str, float]:
+        """Time spent on discretization, summed over all terms on each grid."""
+        return self._accumulate(0)
+
+    def per_term(self) -> Dict[str, float]:
+        """Time spent on discretization, summed over all grids for each term."""
+        return self._accumulate(1)
+
+    def total(self) -> float:
+        """Total time spent on discretization, summed over all tasks.
+
+        If the tasks are run in parallel, this will exceed the wall clock time of the
+        full discretization.
+
+        """
+        return sum(e[2] for e in self.entries)
+
+    def _accumulate(self, ind: int) -> Dict[str, float]:
+        times: Dict[str, float] = {}
+        for entry in self.entries:
+            times[entry[ind]] = times.get(entry[ind], 0.0) + entry[2]
+        return times
+
+
+class _DiscretizationTask:
+    # A single call to a discretization method.
+    def __init__(
+        self,
+        func: Callable,
+        args: Tuple,
+        grid_likes: Sequence[Hashable],
+        name: str,
+        term: str,
+        coupling: bool,
+    ) -> None:
+        self.func = func
+        self.args = args
+        self.grid_likes = grid_likes
+        self.name = name
+        self.term = term
+        self.coupling = coupling
+        # Indices of the tasks that must be finished before this task can start
+        self.dependencies: List[int] = []
+
+
+class DiscretizationScheduler:
+    """Execute discretization tasks on a GridBucket, with respect to dependencies.
+
+    Usage:
+        >>> scheduler = DiscretizationScheduler(gb, num_workers=4)
+        >>> scheduler.add(discr.discretize, (g, data), [g], "diffusion")
+        >>> timings = scheduler.run()
+
+    Attributes:
+        num_workers (int): Number of workers.
+        executor (str): Either 'thread' or 'process'.
+        timings (DiscretizationTimings): Time spent on each task, filled by run().
+
+    """
+
+    def __init__(
+        self,
+        gb: Optional[pp.GridBucket] = None,
+        num_workers: int = 1,
+        executor: str = "thread",
+    ) -> None:
+        """Set up the scheduler.
+
+        Parameters:
+            gb (pp.GridBucket, optional): Used to give names to grids and edges in the
+                timing report. If not provided, the dimension of the grids is used.
+            num_workers (int, optional): Number of tasks to execute concurrently.
+                Defaults to 1, in which case the tasks are run in serial.
+            executor (str, optional): Type of the worker pool, should be 'thread' or
+                'process'. Defaults to 'thread'.
+
+        Raises:
+            ValueError: If the executor is not 'thread' or 'process'.
+
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type {executor}")
+        self.gb = gb
+        self.num_workers = num_workers
+        self.executor = executor
+        self.timings = DiscretizationTimings()
+
+        self._tasks: List[_DiscretizationTask] = []
+
+    def add(
+        self,
+        func: Callable,
+        args: Tuple,
+        grid_likes: Sequence[Hashable],
+        term: str,
+        coupling: bool = False,
+    ) -> None:
+        """Add a discretization task.
+
+        Parameters:
+            func (Callable): Discretization method, typically discr.discretize. Must
+                be picklable if the executor is 'process'.
+            args (tuple): Arguments to func. The data dictionaries among the arguments
+                receive the discretization matrices.
+            grid_likes (sequence): Grids and edges accessed by the task. Tasks that
+                share a grid or edge are executed in the order they are added.
+            term (str): Name of the discretized term, used in the timing report.
+            coupling (bool, optional): If True, the task is a coupling discretization,
+                which is executed after all tasks that are not couplings and share a
+                grid or edge with it. Defaults to False.
+
+        """
+        name = self._name(grid_likes[0])
+        self._tasks.append(
+            _DiscretizationTask(func, args, grid_likes, name, term, coupling)
+        )
+
+    def run(self) -> DiscretizationTimings:
+        """Execute all tasks added to the scheduler.
+
+        Returns:
+            DiscretizationTimings: Time spent on each task. Also available as the
+                attribute timings.
+
+        """
+        # Coupling tasks are placed after the other tasks, otherwise, the order in
+        # which the tasks were added is preserved.
+        tasks = [t for t in self._tasks if not t.coupling] + [
+            t for t in self._tasks if t.coupling
+        ]
+        self._tasks = []
+
+        # Each task depends on the last preceding task that accessed the same grid or
+        # edge. Since the preceding task has the same kind of dependencies, tasks on
+        # the same grid are ordered as they would be in a serial execution.
+        last_task: Dict[Hashable, int] = {}
+        for ind, task in enumerate(tasks):
+            for gl in task.grid_likes:
+                if gl in last_task and last_task[gl] not in task.dependencies:
+                    task.dependencies.append(last_task[gl])
+                last_task[gl] = ind
+
+        if self.num_workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                _, elapsed = _timed_call(task.func, task.args)
+                self.timings.entries.append((task.name, task.term, elapsed))
+        else:
+            self._run_parallel(tasks)
+
+        logger.info(str(self.timings))
+        return self.timings
+
+    def _run_parallel(self, tasks: List[_DiscretizationTask]) -> None:
+        num_dependencies = [len(t.dependencies) for t in tasks]
+        dependents: List[List[int]] = [[] for _ in tasks]
+        for ind, task in enumerate(tasks):
+            for dep in task.dependencies:
+                dependents[dep].append(ind)
+
+        ready = [ind for ind, num in enumerate(num_dependencies) if num == 0]
+        running: Dict[Any, int] = {}
+
+        pool: Executor
+        if self.executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=self.num_workers)
+        else:
+            # Use spawn for the same reason as in pp.fvutils.map_subproblems.
+            context = multiprocessing.get_context("spawn")
+            pool = ProcessPoolExecutor(max_workers=self.num_workers, mp_context=context)
+
+        with pool:
+            while ready or running:
+                while ready:
+                    ind = ready.pop(0)
+                    task = tasks[ind]
+                    if self.executor == "thread":
+                        future = pool.submit(_timed_call, task.func, task.args)
+                    else:
+                        future = pool.submit(_call_in_process, task.func, task.args)
+                    running[future] = ind
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ind = running.pop(future)
+                    task = tasks[ind]
+                    result, elapsed = future.result()
+                    if self.executor == "process":
+                        _merge_matrices(task.args, result)
+                    self.timings.entries.append((task.name, task.term, elapsed))
+
+                    for dep in dependents[ind]:
+                        num_dependencies[dep] -= 1
+                        if num_dependencies[dep] == 0:
+                            ready.append(dep)
+
+    def _name(self, grid_like: Hashable) -> str:
+        # Name of a grid or edge, for the timing report
+        if isinstance(grid_like, tuple):
+            name = f"Edge ({grid_like[0].dim}, {grid_like[1].dim})"
+            try:
+                if self.gb is not None:
+                    name += f" {self.gb.edge_props(grid_like)['edge_number']}"
+            except KeyError:
+                pass
+        else:
+            name = f"Grid (dim {grid_like.dim})"  # type:ignore
+            try:
+                if self.gb is not None:
+                    name += f" {self.gb.node_props(grid_like, 'node_number')}"
+            except KeyError:
+                pass
+        return name
+
+
+def _timed_call(func: Callable, args: Tuple) -> Tuple[Any, float]:
+    tic = time.time()
+    result = func(*args)
+    return result, time.time() - tic
+
+
+def _call_in_process(func: Callable, args: Tuple) -> Tuple[List, float]:
+    # Run a task in a worker process, and return the discretization matrices of the
+    # data dictionaries among the arguments.
+    _, elapsed = _timed_call(func, args)
+    matrices = [
+        a.get(pp.DISCRETIZATION_MATRICES, None) if isinstance(a, dict) else None
+        for a in args
+    ]
+    return matrices, elapsed
+
+
+def _merge_matrices(args: Tuple, matrices: List) -> None:
+    # Transfer discretization matrices computed in a worker process to the data
+    # dictionaries of the calling process.
+    for a, mat_dict in zip(args, matrices):
+        if mat_dict is None:
+            continue
+        target = a.setdefault(pp.DISCRETIZATION_MATRICES, {})
+        for keyword, matrices_of_keyword in mat_dict.items():
+            target.setdefault(keyword, {}).update(matrices_of_keyword)
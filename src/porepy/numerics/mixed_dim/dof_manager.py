@@ -43,6 +43,14 @@ class DofManager:
               len(full_dof) == len(block_dof).
             The total size of the global system is self.num_dofs() = full_dof.sum().
 
+    The values of the variables, at the previous time step (pp.STATE) and at the
+    previous iterate (pp.ITERATE), are kept in two global vectors owned by the
+    DofManager. When gathered or distributed by the DofManager, the entries in the
+    data dictionaries of the nodes and edges are replaced by views into these vectors,
+    so that assembly and distribution of the variables reduce to slicing of the global
+    vectors. Entries that have been reassigned by the user since the last gathering
+    or distribution are copied into the global vectors before use.
+
     """
 
     def __init__(self, gb: pp.GridBucket) -> None:
@@ -65,6 +73,11 @@ class DofManager:
         # to the ordering specified in block_dof
         full_dof: List[int] = []
 
+        # Data dictionary and variable name of each block, used to access the state
+        # without lookups in the GridBucket.
+        block_data: List[Dict] = []
+        block_variables: List[str] = []
+
         for g, d in gb:
             if pp.PRIMARY_VARIABLES not in d:
                 continue
@@ -75,6 +88,8 @@ class DofManager:
                 # and a variable name (str)
                 block_dof[(g, local_var)] = block_dof_counter
                 block_dof_counter += 1
+                block_data.append(d)
+                block_variables.append(local_var)
 
                 # Count number of dofs for this variable on this grid and store it.
                 # The number of dofs for each grid entitiy type defaults to zero.
@@ -97,6 +112,8 @@ class DofManager:
                 # identifier here is a tuple of the edge and a variable str.
                 block_dof[(e, local_var)] = block_dof_counter
                 block_dof_counter += 1
+                block_data.append(d)
+                block_variables.append(local_var)
 
                 # We only allow for cell variables on the mortar grid.
                 # This will not change in the foreseeable future
@@ -107,6 +124,20 @@ class DofManager:
         self.full_dof: np.ndarray = np.array(full_dof)
         self.block_dof: Dict[Tuple[GridLike, str], int] = block_dof
 
+        self._block_data: List[Dict] = block_data
+        self._block_variables: List[str] = block_variables
+
+        # Global vectors of the state and the iterate, and the views of each block
+        # into these vectors which have been assigned to the data dictionaries.
+        self._block_slices: List[slice] = []
+        self._state_values: np.ndarray = np.zeros(0)
+        self._iterate_values: np.ndarray = np.zeros(0)
+        self._state_views: List[Optional[np.ndarray]] = []
+        self._iterate_views: List[Optional[np.ndarray]] = []
+        # The number of dofs per block for which the global vectors were allocated.
+        self._allocated_dof: np.ndarray = np.zeros(0, dtype=int)
+        self._allocate_values()
+
     def grid_and_variable_to_dofs(self, g: GridLike, variable: str) -> np.ndarray:
         """Get the indices in the global system of variables associated with a
         given node / edge (in the GridBucket sense) and a given variable.
@@ -402,46 +433,31 @@ class DofManager:
                 at the end of a time step.
 
         """
-        if grids is None:
-            grids = list(set([key[0] for key in self.block_dof]))
-
-        if variables is None:
-            variables = list(set([key[1] for key in self.block_dof]))
+        blocks = self._block_indices(grids, variables)
+        dofs = self._block_dofs(blocks)
 
-        # Loop over grid-variable combinations and update data in pp.STATE or pp.ITERATE
-        for g, var in itertools.product(grids, variables):
-            if (g, var) not in self.block_dof:
-                continue
+        # Make sure the global vector is up to date with the data dictionaries
+        found = self._synchronize_values(to_iterate)
+        if to_iterate:
+            global_values, views = self._iterate_values, self._iterate_views
+        else:
+            global_values, views = self._state_values, self._state_views
 
-            dof_ind = self.grid_and_variable_to_dofs(g, var)
+        missing = blocks[~found[blocks]]
+        if additive:
+            if missing.size > 0:
+                raise KeyError(self._block_variables[missing[0]])
+            global_values[dofs] += values[dofs]
+        else:
+            global_values[dofs] = values[dofs]
 
-            if isinstance(g, tuple):
-                # This is really an edge
-                data = self.gb.edge_props(g)
-            else:
-                data = self.gb.node_props(g)
-
-            if pp.STATE not in data:
-                data[pp.STATE] = {}
-            if to_iterate and pp.ITERATE not in data[pp.STATE]:
-                data[pp.STATE][pp.ITERATE] = {}
-
-            vals = values[dof_ind]
-            if additive:
-                if to_iterate:
-                    data[pp.STATE][pp.ITERATE][var] = (
-                        data[pp.STATE][pp.ITERATE][var] + vals
-                    )
-                else:
-                    data[pp.STATE][var] = data[pp.STATE][var] + vals
-            else:
-                if to_iterate:
-                    # Make a copy of the array to avoid nasty bugs
-                    # Not sure if this can happen in practice, but better safe than
-                    # sorry.
-                    data[pp.STATE][pp.ITERATE][var] = vals.copy()
-                else:
-                    data[pp.STATE][var] = vals.copy()
+        # Add entries for the grid-variable combinations that did not have a value.
+        for block in missing:
+            state = self._block_data[block].setdefault(pp.STATE, {})
+            if to_iterate:
+                state = state.setdefault(pp.ITERATE, {})
+            views[block] = global_values[self._block_slices[block]]
+            state[self._block_variables[block]] = views[block]
 
     def assemble_variable(
         self,
@@ -469,33 +485,158 @@ class DofManager:
                 combination. Other values are set to zero.
 
         """
-        if grids is None:
-            grids = list(set([key[0] for key in self.block_dof]))
+        blocks = self._block_indices(grids, variables)
+        dofs = self._block_dofs(blocks)
 
-        if variables is None:
-            variables = list(set([key[1] for key in self.block_dof]))
+        found = self._synchronize_values(from_iterate)
+        if not np.all(found[blocks]):
+            raise KeyError(self._block_variables[blocks[~found[blocks]][0]])
 
+        global_values = self._iterate_values if from_iterate else self._state_values
         values = np.zeros(self.num_dofs())
+        values[dofs] = global_values[dofs]
+        return values
 
-        for g, var in itertools.product(grids, variables):
-            if (g, var) not in self.block_dof:
-                continue
+    def assemble_iterate(self) -> np.ndarray:
+        """Assemble a vector of the most recent values of all variables.
 
-            dof_ind = self.grid_and_variable_to_dofs(g, var)
+        The values are taken from the iterates stored in the nodes and edges of the
+        GridBucket. For grid-variable combinations without an iterate, the state is
+        used instead.
 
-            if isinstance(g, tuple):
-                # This is really an edge
-                data = self.gb.edge_props(g)
-            else:
-                data = self.gb.node_props(g)
+        Returns:
+            np.ndarray: Vector, size equal to self.num_dofs().
 
-            if from_iterate:
-                # Use copy to avoid nasty bugs.
-                values[dof_ind] = data[pp.STATE][pp.ITERATE][var].copy()
-            else:
-                values[dof_ind] = data[pp.STATE][var].copy()
+        Raises:
+            KeyError: If neither an iterate nor a state is available for a
+                grid-variable combination.
 
-        return values
+        """
+        has_iterate = self._synchronize_values(True)
+        has_state = self._synchronize_values(False)
+        if not np.all(has_iterate | has_state):
+            raise KeyError(self._block_variables[np.argmin(has_iterate | has_state)])
+
+        use_iterate = np.repeat(has_iterate, self.full_dof)
+        return np.where(use_iterate, self._iterate_values, self._state_values)
+
+    def _block_indices(
+        self, grids: Optional[List[GridLike]], variables: Optional[List[str]]
+    ) -> np.ndarray:
+        """Helper function to get the block indices of combinations of grids and
+        variables.
+
+        Parameters:
+            grids (list of grids or grid tuples (interfaces), optional): If not
+                provided, all grids and interfaces are considered.
+            variables (list of str, optional): If not provided, all variables are
+                considered.
+
+        Returns:
+            np.ndarray: Sorted block indices of the combinations found in
+                self.block_dof.
+
+        """
+        if grids is None and variables is None:
+            return np.arange(len(self._block_variables))
+
+        grid_set = None if grids is None else set(grids)
+        variable_set = None if variables is None else set(variables)
+        blocks = [
+            ind
+            for (g, var), ind in self.block_dof.items()
+            if (grid_set is None or g in grid_set)
+            and (variable_set is None or var in variable_set)
+        ]
+        return np.sort(np.array(blocks, dtype=int))
+
+    def _block_dofs(self, blocks: np.ndarray) -> Union[slice, np.ndarray]:
+        """Helper function to get the degrees of freedom of a set of blocks.
+
+        Parameters:
+            blocks (np.ndarray): Sorted block indices, as returned from
+                self._block_indices().
+
+        Returns:
+            slice or np.ndarray of bool: Index of the degrees of freedom in the
+                global ordering. A slice is returned if all blocks are included.
+
+        """
+        num_blocks = len(self._block_variables)
+        if blocks.size == num_blocks:
+            return slice(0, self.num_dofs())
+        active = np.zeros(num_blocks, dtype=bool)
+        active[blocks] = True
+        return np.repeat(active, self.full_dof)
+
+    def _allocate_values(self) -> None:
+        """Helper function to allocate the global vectors of states and iterates.
+
+        The vectors are sized according to self.full_dof. The views into the previous
+        vectors are discarded, thus the values are copied from the data dictionaries
+        on the next synchronization.
+
+        """
+        dof_start = np.hstack((0, np.cumsum(self.full_dof, dtype=int)))
+        num_blocks = self.full_dof.size
+        self._block_slices = [
+            slice(dof_start[i], dof_start[i + 1]) for i in range(num_blocks)
+        ]
+        self._state_values = np.zeros(dof_start[-1])
+        self._iterate_values = np.zeros(dof_start[-1])
+        # A view is None if the value of the block has not been found in the data
+        # dictionary.
+        self._state_views = [None] * num_blocks
+        self._iterate_views = [None] * num_blocks
+        self._allocated_dof = self.full_dof.copy()
+
+    def _synchronize_values(self, iterate: bool) -> np.ndarray:
+        """Helper function to make the values stored in the data dictionaries views
+        into the global vector of states or iterates.
+
+        Values which have been assigned to the data dictionaries since the last
+        synchronization, that is, which are not the views handed out by this
+        DofManager, are copied into the global vector, and replaced by views.
+
+        Parameters:
+            iterate (bool): If True, the iterates are synchronized, if False, the
+                states.
+
+        Returns:
+            np.ndarray of bool: For each block, whether a value was found in the
+                data dictionary.
+
+        """
+        # The number of dofs may have been changed since the global vectors were
+        # allocated, e.g. by Assembler.update_dof_count() after fracture propagation.
+        if not np.array_equal(self.full_dof, self._allocated_dof):
+            self._allocate_values()
+
+        if iterate:
+            global_values, views = self._iterate_values, self._iterate_views
+        else:
+            global_values, views = self._state_values, self._state_views
+
+        found = np.ones(len(views), dtype=bool)
+        for block, (data, var) in enumerate(
+            zip(self._block_data, self._block_variables)
+        ):
+            storage = data.get(pp.STATE)
+            if iterate and storage is not None:
+                storage = storage.get(pp.ITERATE)
+            value = None if storage is None else storage.get(var)
+
+            if value is None:
+                views[block] = None
+                found[block] = False
+            elif value is not views[block]:
+                # The value has been set from outside the DofManager.
+                local_slice = self._block_slices[block]
+                global_values[local_slice] = value
+                views[block] = global_values[local_slice]
+                storage[var] = views[block]
+
+        return found
 
     def __str__(self) -> str:
         grid_likes = [key[0] for key in self.block_dof]
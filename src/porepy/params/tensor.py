@@ -7,6 +7,8 @@ Created on Sat Feb 27 20:22:25 2016
 The tensor module contains classes for second and fourth order tensors,
 intended e.g. for representation of permeability and stiffness, respectively.
 """
+from typing import Iterator
+
 import numpy as np
 
 import porepy as pp
@@ -21,6 +23,13 @@ class SecondOrderTensor(object):
     The permeability is always 3-dimensional (since the geometry is always 3D),
     however, 1D and 2D problems are accomodated by assigning unit values to kzz
     and kyy, and no cross terms.
+
+    Only the components given to the constructor are stored; the (3, 3, Nc)-array
+    is formed the first time the attribute values is accessed. From then on, the
+    array represents the tensor, so that modifications of it are kept. Discretizations
+    that can work directly with the components (e.g. for isotropic tensors, see
+    is_isotropic) should avoid accessing the values of the full tensor, and rather
+    form the values on subsets of cells by the method restrict().
     """
 
     @pp.time_logger(sections=module_sections)
@@ -41,8 +50,16 @@ class SecondOrderTensor(object):
         Raises:
             ValueError if the permeability is not positive definite.
         """
-        Nc = kxx.size
-        perm = np.zeros((3, 3, Nc))
+        # Store copies of the components that were given, the default values are
+        # filled in when the full tensor is formed.
+        components = {
+            name: np.array(val, dtype=float)
+            for name, val in zip(
+                ["kxx", "kyy", "kzz", "kxy", "kxz", "kyz"],
+                [kxx, kyy, kzz, kxy, kxz, kyz],
+            )
+            if val is not None
+        }
 
         if np.any(kxx < 0):
             raise ValueError(
@@ -50,13 +67,6 @@ class SecondOrderTensor(object):
                 "components in x-direction"
             )
 
-        perm[0, 0, ::] = kxx
-
-        # Assign unit values to the diagonal, these are overwritten later if
-        # the specified data
-        perm[1, 1, ::] = 1
-        perm[2, 2, ::] = 1
-
         if kyy is None:
             kyy = kxx
         if kxy is None:
@@ -68,12 +78,6 @@ class SecondOrderTensor(object):
                 "components in y-direction"
             )
 
-        perm[1, 0, ::] = kxy
-        perm[0, 1, ::] = kxy
-        perm[1, 1, ::] = kyy
-
-        if kyy is None:
-            kyy = kxx
         if kzz is None:
             kzz = kxx
         if kxy is None:
@@ -96,13 +100,75 @@ class SecondOrderTensor(object):
                 "components in z-direction"
             )
 
-        perm[2, 0, ::] = kxz
-        perm[0, 2, ::] = kxz
-        perm[2, 1, ::] = kyz
-        perm[1, 2, ::] = kyz
-        perm[2, 2, ::] = kzz
+        self._components = components
+        self._values = None
+
+    @property
+    def values(self) -> np.ndarray:
+        """np.ndarray (3, 3, Nc): Cell-wise values of the tensor.
+
+        The array is formed from the components on first access, and is thereafter
+        kept as the representation of the tensor.
+        """
+        if self._values is None:
+            self._values = self._assemble_values()
+        return self._values
+
+    @values.setter
+    def values(self, values: np.ndarray) -> None:
+        self._values = values
 
-        self.values = perm
+    @property
+    def is_isotropic(self) -> bool:
+        """bool: True if the tensor is known to be kxx times the identity.
+
+        This is the case if only kxx was given to the constructor, and the full
+        tensor has not yet been formed (since it may have been modified afterwards).
+        """
+        return self._values is None and len(self._components) == 1
+
+    def isotropic_values(self) -> np.ndarray:
+        """Get the cell-wise values of an isotropic tensor.
+
+        Returns:
+            np.ndarray (Nc): The value kxx of the tensor.
+
+        Raises:
+            ValueError if the tensor is not known to be isotropic, see is_isotropic.
+        """
+        if not self.is_isotropic:
+            raise ValueError("The tensor is not isotropic")
+        return self._components["kxx"]
+
+    def _assemble_values(self) -> np.ndarray:
+        kxx = self._components["kxx"]
+        perm = np.zeros((3, 3, kxx.size))
+        perm[0, 0] = kxx
+        perm[1, 1] = self._components.get("kyy", kxx)
+        perm[2, 2] = self._components.get("kzz", kxx)
+        for (i, j), name in zip([(1, 0), (2, 0), (2, 1)], ["kxy", "kxz", "kyz"]):
+            if name in self._components:
+                perm[i, j] = self._components[name]
+                perm[j, i] = self._components[name]
+        return perm
+
+    def _iter_values(self) -> Iterator[np.ndarray]:
+        """Iterate over the cell-wise values values[i, j], in the order of the
+        entries (i, j) of the full tensor, without forming the full tensor.
+        """
+        if self._values is not None:
+            yield from _iter_formed_values(self._values)
+            return
+        kxx = self._components["kxx"]
+        zero = np.zeros(kxx.size)
+        names = [["kxx", "kxy", "kxz"], ["kxy", "kyy", "kyz"], ["kxz", "kyz", "kzz"]]
+        for row in names:
+            for name in row:
+                if name in ("kyy", "kzz"):
+                    val = self._components.get(name, kxx)
+                else:
+                    val = self._components.get(name, zero)
+                yield np.broadcast_to(val, (kxx.size,)).astype(float)
 
     @pp.time_logger(sections=module_sections)
     def copy(self):
@@ -113,16 +179,34 @@ class SecondOrderTensor(object):
             SecondOrderTensor: New tensor with identical fields, but separate
                 arrays (in the memory sense).
         """
+        return self.restrict(slice(None))
 
-        kxx = self.values[0, 0, :].copy()
-        kxy = self.values[1, 0, :].copy()
-        kyy = self.values[1, 1, :].copy()
+    def restrict(self, cells) -> "SecondOrderTensor":
+        """Restrict the tensor to a subset of the cells.
 
-        kxz = self.values[2, 0, :].copy()
-        kyz = self.values[2, 1, :].copy()
-        kzz = self.values[2, 2, :].copy()
+        If the full tensor has not been formed, only the components are restricted.
 
-        return SecondOrderTensor(kxx, kxy=kxy, kxz=kxz, kyy=kyy, kyz=kyz, kzz=kzz)
+        Parameters:
+            cells (np.ndarray or slice): Index of the cells to keep.
+
+        Returns:
+            SecondOrderTensor: New tensor on the given cells, with arrays separate
+                from those of this tensor.
+        """
+        if self._values is None:
+            # Components given as scalars apply to all cells
+            return SecondOrderTensor(
+                **{
+                    name: val[cells] if val.ndim > 0 else val
+                    for name, val in self._components.items()
+                }
+            )
+        # The values need not be on the form assumed by the constructor (e.g. they
+        # may have been reduced to 2d), bypass it.
+        loc_k = SecondOrderTensor.__new__(SecondOrderTensor)
+        loc_k._components = {}
+        loc_k._values = _restrict_values(self._values, cells)
+        return loc_k
 
     @pp.time_logger(sections=module_sections)
     def rotate(self, R):
@@ -153,6 +237,11 @@ class FourthOrderTensor(object):
     Primary usage for the class is for mpsa discretizations. Other applications
     have not been tested.
 
+    Only the Lame parameters (and phi) are stored; the (3^2, 3^2, nc) array is formed
+    the first time the attribute values is accessed, and thereafter represents the
+    tensor. Discretizations should form the values on subsets of cells by the method
+    restrict(), rather than access the values of the full tensor.
+
     Attributes:
         values - numpy.ndarray, dimensions (3^2, 3^2, nc), cell-wise
             representation of the stiffness matrix.
@@ -184,70 +273,137 @@ class FourthOrderTensor(object):
         if mu.size != lmbda.size:
             raise ValueError("Mu and lmbda should have the same length")
 
-        if phi is None:
-            phi = 0 * mu  # Default value for phi is zero
-        elif not isinstance(phi, np.ndarray):
-            raise ValueError("Phi should be a numpy array")
-        elif not phi.ndim == 1:
-            raise ValueError("Phi should be 1-D")
-        elif phi.size != lmbda.size:
-            raise ValueError("Phi and Lmbda should have the same length")
+        # The default value for phi is zero, this is represented by None
+        if phi is not None:
+            if not isinstance(phi, np.ndarray):
+                raise ValueError("Phi should be a numpy array")
+            elif not phi.ndim == 1:
+                raise ValueError("Phi should be 1-D")
+            elif phi.size != lmbda.size:
+                raise ValueError("Phi and Lmbda should have the same length")
 
         # Save lmbda and mu, can be useful to have in some cases
-        self.lmbda = lmbda
-        self.mu = mu
-
-        # Basis for the contributions of mu, lmbda and phi is hard-coded
-        mu_mat = np.array(
-            [
-                [2, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 1, 0, 1, 0, 0, 0, 0, 0],
-                [0, 0, 1, 0, 0, 0, 1, 0, 0],
-                [0, 1, 0, 1, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 2, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 1, 0, 1, 0],
-                [0, 0, 1, 0, 0, 0, 1, 0, 0],
-                [0, 0, 0, 0, 0, 1, 0, 1, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 2],
-            ]
-        )
-        lmbda_mat = np.array(
-            [
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-            ]
-        )
-        phi_mat = np.array(
-            [
-                [0, 1, 1, 1, 0, 1, 1, 1, 0],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [0, 1, 1, 1, 0, 1, 1, 1, 0],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [1, 0, 0, 0, 1, 0, 0, 0, 1],
-                [0, 1, 1, 1, 0, 1, 1, 1, 0],
-            ]
-        )
+        self.lmbda = lmbda.copy()
+        self.mu = mu.copy()
+        self._phi = None if phi is None else phi.copy()
+        self._values = None
+
+    @property
+    def values(self) -> np.ndarray:
+        """np.ndarray (3^2, 3^2, nc): Cell-wise values of the stiffness tensor.
+
+        The array is formed from the Lame parameters on first access, and is
+        thereafter kept as the representation of the tensor.
+        """
+        if self._values is None:
+            self._values = self._assemble_values()
+        return self._values
+
+    @values.setter
+    def values(self, values: np.ndarray) -> None:
+        self._values = values
+
+    def _assemble_values(self) -> np.ndarray:
+        mu, lmbda, phi = self.mu, self.lmbda, self._phi
 
         # Expand dimensions to prepare for cell-wise representation
-        mu_mat = mu_mat[:, :, np.newaxis]
-        lmbda_mat = lmbda_mat[:, :, np.newaxis]
-        phi_mat = phi_mat[:, :, np.newaxis]
+        c = _MU_BASIS[:, :, np.newaxis] * mu + _LMBDA_BASIS[:, :, np.newaxis] * lmbda
+        if phi is None:
+            return c
 
-        c = mu_mat * mu + lmbda_mat * lmbda + phi_mat * phi
-        self.values = c
+        return c + _PHI_BASIS[:, :, np.newaxis] * phi
+
+    def _iter_values(self) -> Iterator[np.ndarray]:
+        """Iterate over the cell-wise values values[i, j], in the order of the
+        entries (i, j) of the full tensor, without forming the full tensor.
+        """
+        if self._values is not None:
+            yield from _iter_formed_values(self._values)
+            return
+        for i in range(9):
+            for j in range(9):
+                c = _MU_BASIS[i, j] * self.mu + _LMBDA_BASIS[i, j] * self.lmbda
+                if self._phi is not None:
+                    c = c + _PHI_BASIS[i, j] * self._phi
+                yield c
 
     @pp.time_logger(sections=module_sections)
     def copy(self):
-        C = FourthOrderTensor(mu=self.mu, lmbda=self.lmbda)
-        C.values = self.values.copy()
+        return self.restrict(slice(None))
+
+    def restrict(self, cells) -> "FourthOrderTensor":
+        """Restrict the tensor to a subset of the cells.
+
+        If the full tensor has not been formed, only the Lame parameters (and phi)
+        are restricted.
+
+        Parameters:
+            cells (np.ndarray or slice): Index of the cells to keep.
+
+        Returns:
+            FourthOrderTensor: New tensor on the given cells, with arrays separate
+                from those of this tensor.
+        """
+        phi = None if self._phi is None else self._phi[cells]
+        C = FourthOrderTensor(mu=self.mu[cells], lmbda=self.lmbda[cells], phi=phi)
+        if self._values is not None:
+            C.values = _restrict_values(self._values, cells)
         return C
+
+
+# Basis for the contributions of mu, lmbda and phi to the fourth order tensor
+_MU_BASIS = np.array(
+    [
+        [2, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 1, 0, 0, 0, 1, 0, 0],
+        [0, 1, 0, 1, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 2, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 1, 0, 1, 0],
+        [0, 0, 1, 0, 0, 0, 1, 0, 0],
+        [0, 0, 0, 0, 0, 1, 0, 1, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 2],
+    ]
+)
+_LMBDA_BASIS = np.array(
+    [
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+    ]
+)
+_PHI_BASIS = np.array(
+    [
+        [0, 1, 1, 1, 0, 1, 1, 1, 0],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [0, 1, 1, 1, 0, 1, 1, 1, 0],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 1, 0, 0, 0, 1],
+        [0, 1, 1, 1, 0, 1, 1, 1, 0],
+    ]
+)
+
+
+def _iter_formed_values(values: np.ndarray) -> Iterator[np.ndarray]:
+    # The full tensor need not be on the standard form, e.g. it may have been reduced
+    # to 2d, thus iterate over the actual shape
+    for i in range(values.shape[0]):
+        for j in range(values.shape[1]):
+            yield values[i, j]
+
+
+def _restrict_values(values: np.ndarray, cells) -> np.ndarray:
+    # Fancy indexing gives a copy, a slice must be copied explicitly
+    loc_values = values[::, ::, cells]
+    if isinstance(cells, slice):
+        loc_values = loc_values.copy()
+    return loc_values
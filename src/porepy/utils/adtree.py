@@ -61,8 +61,14 @@ To avoid floating point problems, all the "points" are rescaled in [0, 1].
 A search in the tree gives a list of all possible nodes that may
 intersect the given one.
 
+The nodes of the tree are stored as arrays of bounding boxes, children and parents,
+rather than as individual objects. When the tree is constructed from a grid, all
+cells are inserted at once, level by level, which gives the same tree as inserting
+the cells one by one. Several boxes can be searched at once by search_many(), which
+traverses the tree level by level for all boxes simultaneously.
+
 """
-from typing import Any, List, Optional, Tuple
+from typing import Any, Iterator, List, Optional, Union
 
 import numpy as np
 from scipy import sparse as sps
@@ -138,12 +144,17 @@ class ADTree:
     possible intersections. The implementation does not include some features, like removing a
     node, that are not used so far. Possible extensions in the future.
 
+    The nodes are stored in arrays, with one row per node, in the order they were added to
+    the tree. The attribute nodes gives access to the nodes in the form of ADTNode objects.
+
     Attributes:
         tree_dim (int): search dimension of the tree, typically (e.g., when a pp.Grid is
             given) the double of the phys_dim
         phys_dim (int): physical dimension of nodes in the tree, e.g., a 2d grid will have
             phys_dim = 2
-        nodes (list): the list of nodes as ADTNode
+        nodes (sequence): the nodes as ADTNode, constructed on access from the arrays
+            of the tree
+        keys (list): the key of each node
         region_min (float): to scale the bounding box of all the elements in [0, 1]^phys_dim
             we need the minimum corner point of the all region
         delta (float): a paramenter to scale and get all the bounding box of the elements in
@@ -167,9 +178,16 @@ class ADTree:
         self.tree_dim: int = tree_dim
         self.phys_dim: int = phys_dim
 
-        self.nodes: List[ADTNode] = []
-        self.region_min: float = 0.0
-        self.delta: float = 1.0
+        self.region_min: Union[float, np.ndarray] = 0.0
+        self.delta: Union[float, np.ndarray] = 1.0
+
+        # Storage of the nodes. The arrays may be larger than the number of nodes, to
+        # allow for insertion of new nodes without reallocation.
+        self.keys: List[Any] = []
+        self._num_nodes: int = 0
+        self._boxes: np.ndarray = np.empty((0, tree_dim), dtype=float)
+        self._child: np.ndarray = np.empty((0, 2), dtype=int)
+        self._parent: np.ndarray = np.empty(0, dtype=int)
 
     def __str__(self) -> str:
         """Implementation of __str__"""
@@ -210,6 +228,15 @@ class ADTree:
 
         return s
 
+    @property
+    def nodes(self) -> "_ADTNodeView":
+        """Sequence of the nodes in the tree, as ADTNode objects.
+
+        The ADTNode objects are constructed on access, modifying them does not change
+        the tree.
+        """
+        return _ADTNodeView(self)
+
     def add_node(self, node: ADTNode) -> None:
         """Add a new node to the tree. We traverse the tree as previously specified and
         assign the new node accordingly.
@@ -218,14 +245,21 @@ class ADTree:
             node (ADTNode): the new node to be added.
 
         """
+        node_id = self._num_nodes
+        self._reserve(node_id + 1)
+        self._boxes[node_id] = node.box
+        self._child[node_id] = -1
+        self.keys.append(node.key)
+        self._num_nodes += 1
+
         # When the tree is empty just add the node as root
-        if len(self.nodes) == 0:
-            self.nodes.append(node)
+        if node_id == 0:
+            self._parent[node_id] = -1
             return
 
         # Current level for the dimension to check
         level = 0
-        # Get the first node id, the position in the self.nodes list
+        # Get the first node id, the position in the node arrays
         next_node_id = 0
         box = node.box.copy()
         while next_node_id != -1:
@@ -242,15 +276,75 @@ class ADTree:
                 edge = self.RIGHT
                 box[search_dim] -= 1.0
             # Take the new node
-            next_node_id = self.nodes[current_node_id].child[edge]
+            next_node_id = self._child[current_node_id, edge]
             level += 1
 
         # The correct position has been found, add informations to its parent
-        self.nodes[current_node_id].child[edge] = len(self.nodes)
-
-        # Add the new node to the list
+        self._child[current_node_id, edge] = node_id
+        self._parent[node_id] = current_node_id
         node.parent = current_node_id
-        self.nodes.append(node)
+
+    def add_nodes(self, keys: List[Any], boxes: np.ndarray) -> None:
+        """Add several nodes to the tree at once.
+
+        The resulting tree is the same as if the nodes were added one by one by
+        add_node(), in the given order. Rather than descending the tree for each node,
+        all nodes are moved one level down at a time: At each level, the nodes that
+        arrive at the same free position compete for it, and the first of them in the
+        given order takes it.
+
+        Parameters:
+            keys (list): The key of each of the new nodes.
+            boxes (np.ndarray, num_nodes x tree_dim): The bounding boxes of the new
+                nodes, scaled to [0, 1].
+
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape((-1, self.tree_dim))
+        num_new = boxes.shape[0]
+        if num_new == 0:
+            return
+        first_id = self._num_nodes
+        self._reserve(first_id + num_new)
+        self._boxes[first_id : first_id + num_new] = boxes
+        self._child[first_id : first_id + num_new] = -1
+        self.keys += list(keys)
+        self._num_nodes += num_new
+
+        # Nodes not yet placed in the tree, and their current node in the tree
+        pending = np.arange(first_id, first_id + num_new)
+        if first_id == 0:
+            # The first node is the root
+            self._parent[0] = -1
+            pending = pending[1:]
+        current = np.zeros(pending.size, dtype=int)
+        box = self._boxes[pending].copy()
+
+        level = 0
+        while pending.size > 0:
+            # Same operations as in add_node, for all the pending nodes
+            search_dim = level % self.tree_dim
+            box[:, search_dim] *= 2.0
+            edge = (box[:, search_dim] >= 1.0).astype(int)
+            box[edge == self.RIGHT, search_dim] -= 1.0
+            level += 1
+
+            occupant = self._child[current, edge]
+            # Nodes arriving at an empty position. Since pending is sorted, the first
+            # occurrence of each position is the first node in the given order.
+            free = np.where(occupant == -1)[0]
+            position = current[free] * 2 + edge[free]
+            _, first = np.unique(position, return_index=True)
+            placed = free[first]
+            self._child[current[placed], edge[placed]] = pending[placed]
+            self._parent[pending[placed]] = current[placed]
+
+            # The other nodes continue to the next level
+            occupant = self._child[current, edge]
+            keep = np.ones(pending.size, dtype=bool)
+            keep[placed] = False
+            pending = pending[keep]
+            current = occupant[keep]
+            box = box[keep]
 
     def search(self, node: ADTNode, tol: float = 2.0e-6) -> np.ndarray:
         """Search all possible nodes in the tree that might intersect with the input node.
@@ -263,93 +357,100 @@ class ADTree:
         Returns:
             nodes (np.ndarray): Sorted, by id, list of nodes id that might intersect the node
         """
+        return self.search_many(node.box.reshape((1, -1)), tol).indices
 
-        # Enlarge the region to avoid floating point problems
-        box = node.box.copy()
-        box[: self.phys_dim] = self._scale(box[: self.phys_dim]) - tol
-        box[self.phys_dim :] = self._scale(box[self.phys_dim :]) + tol
+    def search_many(self, boxes: np.ndarray, tol: float = 2.0e-6) -> sps.csr_matrix:
+        """Search all possible nodes in the tree that might intersect with each of a set
+        of boxes. The boxes are not added to the tree.
 
-        # Origin of the sub-tree
-        origin = np.zeros(self.tree_dim, dtype=float)
+        The tree is traversed level by level, for all boxes at the same time. A sub-tree
+        is considered only if the part of [0, 1]^tree_dim it covers may contain boxes
+        that intersect the search box.
+
+        Parameters:
+            boxes (np.ndarray, num_boxes x tree_dim): Bounding boxes to search for, one
+                per row, in the format (xmin, ymin, zmin, xmax, ymax, zmax), for the
+                relevant physical dimensions. The boxes are given in physical coordinates.
+            tol (float, optional): Geometrical tolerance to avoid floating point problems
+
+        Returns:
+            sps.csr_matrix, num_boxes x num_nodes: Boolean map from boxes to nodes of the
+                tree. The nodes that might intersect a box are the column indices in the
+                corresponding row, sorted by id.
+        """
+        # Enlarge the region to avoid floating point problems
+        boxes = np.array(boxes, dtype=float).reshape((-1, self.tree_dim))
+        num_boxes = boxes.shape[0]
+        pd = self.phys_dim
+        boxes[:, :pd] = self._scale(boxes[:, :pd]) - tol
+        boxes[:, pd:] = self._scale(boxes[:, pd:]) + tol
+
+        node_boxes = self._boxes[: self._num_nodes]
+        found_box: List[np.ndarray] = []
+        found_node: List[np.ndarray] = []
+
+        # The nodes to visit at the current level, together with the index of the
+        # search box and the origin of the part of [0, 1]^tree_dim covered by the
+        # sub-tree of the node.
+        if self._num_nodes > 0:
+            box_id = np.arange(num_boxes)
+            node_id = np.zeros(num_boxes, dtype=int)
+        else:
+            box_id = np.empty(0, dtype=int)
+            node_id = np.empty(0, dtype=int)
+        origin = np.zeros((box_id.size, self.tree_dim), dtype=float)
 
         level = 0
-        node_id = 0
-        # List of possible intersections
-        found: List[int] = []
-        # List of right parts of the tree that need to be checked.
-        # Each element contains the node_id (position in self.nodes)
-        # the (shifted) origin at the current level and the current
-        # level
-        stack: List[Tuple[int, np.ndarray, int]] = []
-
-        # To traverse a non-empty binary tree in preorder,
-        # perform the following operations recursively at each node,
-        # starting with the root node:
-        # > visit the root;
-        # > traverse the left subtree;
-        # > traverse the right subtree.
-        while node_id != -1:
-            # check the left part
-            next_node_id = -1
-            while True:
-                # Intersect with the search box, add in case
-                if self._box_intersect(box, self.nodes[node_id].box):
-                    found.append(node_id)
-                # Go to the left part of the sub-tree, and check if
-                # it intersects the box. The right part is considered later.
-                next_node_id = self.nodes[node_id].child[self.LEFT]
-                if next_node_id != -1:
-                    search_dim = level % self.tree_dim
-                    if search_dim < self.phys_dim:
-                        if origin[search_dim] > box[search_dim + self.phys_dim]:
-                            next_node_id = -1
-                    else:
-                        delta = self._delta(level, self.tree_dim)
-                        if origin[search_dim] + delta < box[search_dim - self.phys_dim]:
-                            next_node_id = -1
-                # Left sub-tree is neither null nor external, push info onto the stack
-                if next_node_id != -1:
-                    stack.append((node_id, origin.copy(), level))
-                    node_id = next_node_id
-                    level += 1
+        while box_id.size > 0:
+            # Intersect with the search boxes
+            b = boxes[box_id]
+            nb = node_boxes[node_id]
+            hit = np.logical_not(
+                np.any(b[:, :pd] > nb[:, pd:], axis=1)
+                | np.any(b[:, pd:] < nb[:, :pd], axis=1)
+            )
+            found_box.append(box_id[hit])
+            found_node.append(node_id[hit])
+
+            # Size of the sub-trees at the next level, in the search dimension
+            search_dim = level % self.tree_dim
+            delta = self._delta(level, self.tree_dim)
+
+            # The right sub-tree is shifted by delta in the search dimension
+            origin_right = origin.copy()
+            origin_right[:, search_dim] += delta
+
+            next_box, next_node, next_origin = [], [], []
+            for edge, orig in zip((self.LEFT, self.RIGHT), (origin, origin_right)):
+                child = self._child[node_id, edge]
+                # Check if the sub-tree can intersect the box
+                if search_dim < pd:
+                    keep = orig[:, search_dim] <= b[:, search_dim + pd]
                 else:
-                    break
-
-            # Check the right part that are stored in the stack
+                    keep = orig[:, search_dim] + delta >= b[:, search_dim - pd]
+                keep = np.logical_and(keep, child != -1)
+                next_box.append(box_id[keep])
+                next_node.append(child[keep])
+                next_origin.append(orig[keep])
+
+            box_id = np.concatenate(next_box)
+            node_id = np.concatenate(next_node)
+            origin = np.vstack(next_origin)
             level += 1
-            node_id = self.nodes[node_id].child[self.RIGHT]
-            while True:
-                while node_id == -1:
-                    if len(stack) == 0:
-                        return np.sort(found)
-                    info = stack.pop()
-                    node_id = self.nodes[info[0]].child[self.RIGHT]
-                    origin = info[1]
-                    level = info[2] + 1
-
-                # Check if the subtree intersects the box. Otherwise set right_link = -1,
-                # pop new node from the stack and adjourn level.
-                #
-                # lev-1 is the level of the parent node, which directs the search.
-                search_dim = (level - 1) % self.tree_dim
-                delta = self._delta(level - 1, self.tree_dim)
-                # reset origin (we have just traversed the tree to the right)
-                origin[search_dim] += delta
-                if search_dim < self.phys_dim:
-                    if origin[search_dim] > box[search_dim + self.phys_dim]:
-                        node_id = -1
-                else:
-                    if origin[search_dim] + delta < box[search_dim - self.phys_dim]:
-                        node_id = -1
 
-                if node_id != -1:
-                    break
-
-        # nothing is found, return an empty array
-        return np.empty(0)
+        rows = np.concatenate(found_box) if found_box else np.empty(0, dtype=int)
+        cols = np.concatenate(found_node) if found_node else np.empty(0, dtype=int)
+        candidates = sps.csr_matrix(
+            (np.ones(rows.size, dtype=bool), (rows, cols)),
+            shape=(num_boxes, self._num_nodes),
+        )
+        candidates.sort_indices()
+        return candidates
 
     def from_grid(self, g: pp.Grid, only_cells: Optional[np.ndarray] = None) -> None:
-        """Function that constructs the tree from a grid by adding one cell at a time.
+        """Function that constructs the tree from a grid, with one node per cell.
+
+        The nodes are added in the order of the cells, with the cell index as key.
 
         Parameters:
             g (pp.Grid): The grid to be used to construct the tree
@@ -359,20 +460,21 @@ class ADTree:
         """
         self.g = g
         # Get the goemetrical informations cell to nodes
-        g_cell_nodes = self.g.cell_nodes()
-        g_nodes, g_cells, _ = sps.find(g_cell_nodes)
+        g_cell_nodes = sps.csc_matrix(self.g.cell_nodes())
+        indptr = g_cell_nodes.indptr
+        g_nodes = g_cell_nodes.indices
 
         # select which cells to add to the tree
         if only_cells is not None:
-            which_cells = np.asarray(only_cells)
+            which_cells = np.atleast_1d(np.asarray(only_cells, dtype=int))
 
             # to compute the min and max of the region, and get a more balanced tree,
             # we need to consider only the cells involved
-            which_nodes = np.empty(0, dtype=int)
-            for c in which_cells:
-                loc = slice(g_cell_nodes.indptr[c], g_cell_nodes.indptr[c + 1])
-                which_nodes = np.append(which_nodes, g_nodes[loc])
-            which_nodes = np.unique(which_nodes)
+            which_nodes = np.unique(
+                g_nodes[
+                    pp.utils.mcolon.mcolon(indptr[which_cells], indptr[which_cells + 1])
+                ]
+            )
 
         else:
             # if only_cells is not specified consider all the cells and nodes of the mesh
@@ -384,24 +486,44 @@ class ADTree:
         region_max = self.g.nodes[: self.phys_dim, which_nodes].max(axis=1)
         self.delta = 1.0 / (region_max - self.region_min)
 
-        # loop over the considered cells of the grid
-        for c in which_cells:
-            # get the nodes of the current cell
-            loc = slice(g_cell_nodes.indptr[c], g_cell_nodes.indptr[c + 1])
-            c_nodes = self.g.nodes[: self.phys_dim, g_nodes[loc]]
-            # compute the scaled bounding box
-            c_min = self._scale(c_nodes.min(axis=1))
-            c_max = self._scale(c_nodes.max(axis=1))
+        # compute the scaled bounding boxes of all the cells
+        coords = self.g.nodes[: self.phys_dim, g_nodes]
+        num_cell_nodes = np.diff(indptr)
+        has_nodes = num_cell_nodes > 0
+        c_min = np.zeros((self.g.num_cells, self.phys_dim))
+        c_max = np.zeros((self.g.num_cells, self.phys_dim))
+        if np.any(has_nodes):
+            start = indptr[:-1][has_nodes]
+            c_min[has_nodes] = np.minimum.reduceat(coords, start, axis=1).T
+            c_max[has_nodes] = np.maximum.reduceat(coords, start, axis=1).T
+        boxes = np.hstack(
+            (self._scale(c_min[which_cells]), self._scale(c_max[which_cells]))
+        )
+
+        self.add_nodes(which_cells.tolist(), boxes)
+
+    def _reserve(self, size: int) -> None:
+        # Make room for at least size nodes in the node arrays
+        capacity = self._parent.size
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        num = self._num_nodes
+
+        boxes = np.empty((capacity, self.tree_dim), dtype=float)
+        boxes[:num] = self._boxes[:num]
+        child = np.empty((capacity, 2), dtype=int)
+        child[:num] = self._child[:num]
+        parent = np.empty(capacity, dtype=int)
+        parent[:num] = self._parent[:num]
 
-            # create the new node
-            new_node = ADTNode(c, np.hstack((c_min, c_max)))
-            self.add_node(new_node)
+        self._boxes, self._child, self._parent = boxes, child, parent
 
     def _scale(self, x: np.ndarray) -> np.ndarray:
         """Scale the input point to be in the interval [0, 1]
 
         Parameters:
-            x (np.ndarray): the point to be scaled
+            x (np.ndarray): the point to be scaled, or several points, one per row
 
         Returns:
             (np.ndarray): the scaled point
@@ -433,3 +555,28 @@ class ADTree:
             (float): current portion of the interval according to the level
         """
         return np.prod(0.5 * np.ones(int(level / dim) + 1, dtype=float))
+
+
+class _ADTNodeView:
+    # Read-only sequence of the nodes of an ADTree, as ADTNode objects
+
+    def __init__(self, tree: ADTree) -> None:
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self._tree._num_nodes
+
+    def __getitem__(self, ind: int) -> ADTNode:
+        tree = self._tree
+        if ind < 0:
+            ind += tree._num_nodes
+        if ind < 0 or ind >= tree._num_nodes:
+            raise IndexError("Node index out of range")
+        node = ADTNode(tree.keys[ind], tree._boxes[ind].copy())
+        node.child = tree._child[ind].tolist()
+        node.parent = int(tree._parent[ind])
+        return node
+
+    def __iter__(self) -> Iterator[ADTNode]:
+        for ind in range(len(self)):
+            yield self[ind]
@@ -0,0 +1,70 @@
+""" Hashing of the content of nested data structures.
+
+The hashes are used as keys of caches stored on disk, see
+porepy.numerics.discretization_cache and FractureNetwork3d.prepare_for_gmsh(), and
+should thus be stable between Python processes.
+"""
+from typing import Any
+
+import numpy as np
+import scipy.sparse as sps
+
+from porepy.params.tensor import FourthOrderTensor, SecondOrderTensor
+
+
+def update_hash(h, value: Any) -> None:
+    """Feed a representation of a value to a hash object.
+
+    Arrays, sparse matrices, containers and objects are traversed recursively. Values
+    that cannot be represented by their content, like functions, are represented by
+    their identity.
+
+    Parameters:
+        h: Hash object, e.g. from hashlib, which is updated in place.
+        value: The value to be represented.
+
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (np.ndarray, np.generic)):
+        arr = np.ascontiguousarray(value)
+        if arr.dtype == object:
+            update_hash(h, arr.tolist())
+        else:
+            h.update(f"array:{arr.dtype.str}:{arr.shape};".encode())
+            h.update(arr.tobytes())
+    elif sps.issparse(value):
+        mat = value.tocsr(copy=True)
+        mat.sum_duplicates()
+        mat.sort_indices()
+        h.update(f"sparse:{mat.shape};".encode())
+        for arr in (mat.data, mat.indices, mat.indptr):
+            update_hash(h, arr)
+    elif isinstance(value, dict):
+        h.update(b"dict{")
+        for k in sorted(value, key=str):
+            update_hash(h, k)
+            update_hash(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}[".encode())
+        for v in value:
+            update_hash(h, v)
+        h.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        update_hash(h, sorted(value, key=repr))
+    elif isinstance(value, (SecondOrderTensor, FourthOrderTensor)):
+        # The attributes of the tensors depend on whether the full tensor has been
+        # formed. Represent the tensors by the values of the full tensor, which are
+        # computed one entry (i, j) at a time, so that the full tensor is not formed.
+        h.update(f"tensor:{type(value).__qualname__}[".encode())
+        for component in value._iter_values():
+            update_hash(h, component)
+        h.update(b"]")
+        if isinstance(value, FourthOrderTensor):
+            update_hash(h, (value.mu, value.lmbda))
+    elif hasattr(value, "__dict__") and not callable(value):
+        h.update(f"object:{type(value).__qualname__}".encode())
+        update_hash(h, vars(value))
+    else:
+        h.update(f"{type(value).__name__}:{value!r};".encode())
@@ -21,7 +21,10 @@ constant approximations of derivatives.
 
 """
 import itertools
-from typing import Callable, Iterator, List, Tuple
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple, Union
 
 import numpy as np
 
@@ -65,8 +68,7 @@ class InterpolationTable:
         self._set_sizes(low, high, npt, dim)
 
         # Evaluate the function values in all coordinate points.
-        for i, c in enumerate(zip(*self._coord)):
-            self._values[:, i] = function(*c)
+        self._values[:] = function(*self._coord)
 
     def _set_sizes(
         self, low: np.ndarray, high: np.ndarray, npt: np.ndarray, dim: int
@@ -207,17 +209,14 @@ class InterpolationTable:
 
         ind = np.zeros(coord.shape, dtype=int)
 
-        # For each dimension, find the first index where coordinate in the
-        # interpolation grid is higher than that of the point to be evaluated.
-        # https://stackoverflow.com/questions/16243955/numpy-first-occurrence-of-value-greater-than-existing-value
-        for i in range(ind.shape[1]):
-            ind[:, i] = [np.argmax(pt > c) for (c, pt) in zip(coord[:, i], self._pt)]
-
-        # Adjust to get the last interpolation point with a lower coordinate
-        ind -= 1
-        # If a point is outside the interpolation grid, the argmax will return 0
-        # (either because the point is to the left, or it is to the right, which case
-        # the entire array to argmax is zero, thus the first value is 0)
+        # For each dimension, find the last interpolation point with a coordinate
+        # lower than or equal to that of the point to be evaluated.
+        for i, pt in enumerate(self._pt):
+            ind[i] = np.searchsorted(pt, coord[i], side="right") - 1
+            # Points at or to the right of the last interpolation point are outside
+            # the grid.
+            ind[i, ind[i] >= pt.size - 1] = -1
+
         if np.any(ind < 0):
             raise ValueError(
                 f"Point outside coordinate range [{self._low}, {self._high}]"
@@ -247,9 +246,6 @@ class InterpolationTable:
         # For each dimension, find the interpolation weights to the right
         # and left sides
 
-        # Find corners of interpolation hypercube
-        base_ind = self._find_base_vertex(x)
-
         right_weight = np.array(
             [
                 (x[i] - self._pt[i][base_ind[i]])
@@ -277,6 +273,11 @@ class AdaptiveInterpolationTable(InterpolationTable):
     parameter space is accessed, and the computation of function values
     is costly.
 
+    All missing function values needed in a call to interpolate() or diff() are
+    computed by a single call to the function, or, if num_workers > 1, by one call
+    per worker. The computed values can be stored to file by save(), and be read
+    into a table for the same function by load().
+
     """
 
     def __init__(
@@ -286,6 +287,8 @@ class AdaptiveInterpolationTable(InterpolationTable):
         npt: np.ndarray,
         function: Callable[[np.ndarray], np.ndarray],
         dim: int = 1,
+        num_workers: int = 1,
+        executor: str = "thread",
     ) -> None:
         """Constructor for the interpolation Table.
 
@@ -299,8 +302,23 @@ class AdaptiveInterpolationTable(InterpolationTable):
                 coordinates can be evaluated at the same time.
             dim (int): Dimension of the range of the function. Values above one
                 have not been much tested, use with care.
+            num_workers (int, optional): Number of workers among which the
+                evaluation of missing function values is split. Defaults to 1, in
+                which case the function is called directly. A pool of workers is
+                only worthwhile for expensive functions.
+            executor (str, optional): Type of the worker pool, should be 'thread' or
+                'process'. Defaults to 'thread'. With 'process', the function must be
+                picklable.
+
+        Raises:
+            ValueError: If the executor is not 'thread' or 'process'.
 
         """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor type {executor}")
+        self._num_workers = num_workers
+        self._executor = executor
+
         # Construct grid for interpolation
         self._set_sizes(low, high, npt, dim)
 
@@ -354,19 +372,97 @@ class AdaptiveInterpolationTable(InterpolationTable):
         base_ind = self._find_base_vertex(x)
 
         # Loop over all vertexes in the hypercube, store linear index.
-        ind = []
-        for _, eval_ind in self._generate_indices(base_ind):
-            ind.append(eval_ind)
+        ind = [eval_ind for _, eval_ind in self._generate_indices(base_ind)]
 
         # Uniquify indices to avoid computing values for the same vertex twice.
         unique_ind = np.unique(np.hstack(ind))
         # Find which vertexes has not been used before.
         values_needed = unique_ind[np.logical_not(self._has_value[unique_ind])]
+        if values_needed.size == 0:
+            return
 
         # Compute and store function values.
-        for ind in values_needed:
-            coord = np.array([self._coord[d][ind] for d in range(x.shape[0])])
-            self._values[:, ind] = self._function(*coord)
+        coord = [c[values_needed] for c in self._coord]
+        self._values[:, values_needed] = self._evaluate_function(coord)
 
         # Update list of funcions with known values.
-        self._has_value[values_needed] = 1
+        self._has_value[values_needed] = True
+
+    def _evaluate_function(self, coord: List[np.ndarray]) -> np.ndarray:
+        # Evaluate the function in a set of points, either by a single call, or split
+        # among a pool of workers.
+        num_pt = coord[0].size
+        if self._num_workers <= 1 or num_pt < 2:
+            return self._function(*coord)
+
+        chunks = np.array_split(np.arange(num_pt), min(self._num_workers, num_pt))
+        pool: Executor
+        if self._executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=self._num_workers)
+        else:
+            context = multiprocessing.get_context("spawn")
+            pool = ProcessPoolExecutor(
+                max_workers=self._num_workers, mp_context=context
+            )
+        with pool:
+            results = pool.map(
+                self._function, *[[c[chunk] for chunk in chunks] for c in coord]
+            )
+            # The function may return arrays of shape (dim, num_pt) or (num_pt,),
+            # or a scalar.
+            values = np.hstack(
+                [
+                    np.broadcast_to(res, (self.dim, chunk.size))
+                    for res, chunk in zip(results, chunks)
+                ]
+            )
+        return values
+
+    def save(self, file_name: Union[str, Path]) -> None:
+        """Save the function values computed so far to file.
+
+        The values can be read into a new table, for the same function and
+        interpolation grid, by load().
+
+        Parameters:
+            file_name (str or Path): Name of the file. The file is written in the numpy
+                .npz format, but the file name is used as given.
+
+        """
+        with open(file_name, "wb") as f:
+            np.savez(
+                f,
+                low=self._low,
+                high=self._high,
+                npt=self._npt,
+                dim=self.dim,
+                values=self._values,
+                has_value=self._has_value,
+            )
+
+    def load(self, file_name: Union[str, Path]) -> None:
+        """Load function values stored by save().
+
+        The loaded values are added to those already computed by this table. It is
+        up to the user to make sure the stored values are for the same function.
+
+        Parameters:
+            file_name (str or Path): Name of the file.
+
+        Raises:
+            ValueError: If the stored values are for a different interpolation grid.
+
+        """
+        with np.load(file_name, allow_pickle=False) as stored:
+            if not (
+                int(stored["dim"]) == self.dim
+                and np.array_equal(stored["npt"], self._npt)
+                and np.allclose(stored["low"], self._low)
+                and np.allclose(stored["high"], self._high)
+            ):
+                raise ValueError(
+                    f"The values in {file_name} are for another interpolation grid"
+                )
+            has_value = stored["has_value"]
+            self._values[:, has_value] = stored["values"][:, has_value]
+        self._has_value |= has_value
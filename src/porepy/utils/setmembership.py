@@ -136,6 +136,12 @@ def unique_columns_tol(
     Resembles Matlab's uniquetol function, as applied to columns. To rather
     work on rows, use a transpose.
 
+    The columns are treated in order: A column is kept if its distance to all
+    previously kept columns is at least tol, otherwise it is represented by the
+    closest of the kept columns. Pairs of columns closer than the tolerance are
+    identified by a KDTree, thus the cost scales close to linearly with the number
+    of columns, as long as few columns are closer than the tolerance.
+
     Parameters:
         mat (np.ndarray, nd x n_pts): Columns to be uniquified.
         tol (double, optional): Tolerance for when columns are considered equal.
@@ -177,57 +183,87 @@ def unique_columns_tol(
         )
         return un_ar, new_2_old, old_2_new
 
-    @numba.jit("Tuple((b1[:],i8[:],i8[:]))(f8[:, :],f8)", nopython=True, cache=True)
-    def _numba_distance(mat, tol):
-        """Helper function for numba acceleration of unique_columns_tol.
-
-        IMPLEMENTATION NOTE: Calling this function many times (it is unclear
-        what this really means, but likely >=100s of thousands of times) may
-        lead to enhanced memory consumption and significant reductions in
-        performance. This could be related to this GH issue
+    mat_t = np.atleast_2d(mat.T).astype(float)
+    num_cols = mat_t.shape[0]
 
-            https://github.com/numba/numba/issues/1361
+    # Use a KDTree to find all pairs of points that may be closer than the tolerance.
+    # The search radius is slightly enlarged, the precise criterion is applied below.
+    tree = KDTree(mat_t)
+    pairs = tree.query_pairs(abs(tol) * (1 + 1e-10), output_type="ndarray")
 
-        However, it is not clear this is really the error. No solution is known
-        at the time of writing, the only viable options seem to be algorithmic
-        modifications that reduce the number of calls to this function.
+    if pairs.size > 0:
+        # Squared distances, computed as in the original point by point comparison
+        dist = np.sum((mat_t[pairs[:, 0]] - mat_t[pairs[:, 1]]) ** 2, axis=1)
+        pairs = pairs[dist < tol**2]
+        dist = dist[dist < tol**2]
 
-        """
-        num_cols = mat.shape[0]
-        keep = np.zeros(num_cols, dtype=numba.types.bool_)
-        keep[0] = True
-        keep_counter = 1
+    if pairs.size == 0:
+        # All points are unique
+        return mat.copy(), np.arange(num_cols), np.arange(num_cols)
+
+    # For each point, store the neighbors with lower index in a csr-type structure,
+    # sorted by the index of the neighbor.
+    high = np.max(pairs, axis=1)
+    low = np.min(pairs, axis=1)
+    order = np.lexsort((low, high))
+    indptr = np.zeros(num_cols + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(high, minlength=num_cols))
+    keep, old_2_new = _unique_columns_tol_numba(
+        indptr, low[order].astype(np.int64), dist[order].astype(float)
+    )
+    new_2_old = np.nonzero(keep)[0]
 
-        # Map from old points to the unique subspace. Defaults to map to itself.
-        old_2_new = np.arange(num_cols)
+    return mat[:, keep], new_2_old, old_2_new
 
-        # Loop over all points, check if it is already represented in the kept list
-        for i in range(1, num_cols):
-            d = np.sum((mat[i] - mat[keep]) ** 2, axis=1)
-            condition = d < tol**2
 
-            if np.any(condition):
-                # We will not keep this point
-                old_2_new[i] = np.argmin(d)
-            else:
-                # We have found a new point
-                keep[i] = True
-                old_2_new[i] = keep_counter
-                keep_counter += 1
+@numba.njit(cache=True)
+def _unique_columns_tol_numba(
+    indptr: np.ndarray, neighbors: np.ndarray, dist: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Helper function for numba acceleration of unique_columns_tol.
 
-        # Finally find which elements we kept
-        new_2_old = np.nonzero(keep)[0]
+    Loop over the points in order, and keep a point if none of its neighbors with lower
+    index, that is, points closer than the tolerance, has been kept. Points that are
+    not kept are mapped to the closest kept neighbor; in the case of ties, the one with
+    the lowest index is chosen.
 
-        return keep, new_2_old, old_2_new
+    The function is defined on the module level, so that it is compiled, or read from
+    the cache, only once, regardless of how many times unique_columns_tol is called.
 
-    mat_t = np.atleast_2d(mat.T).astype(float)
+    Parameters:
+        indptr (np.ndarray): Start of the neighbors of each point in neighbors.
+        neighbors (np.ndarray): Neighbors of the points with lower index than the
+            point itself, sorted for each point.
+        dist (np.ndarray): Squared distance to the neighbors.
 
-    # IMPLEMENTATION NOTE: It could pay off to make a pure Python implementation
-    # to be used for small arrays, however, attempts on making this work in
-    # practice failed.
-    keep, new_2_old, old_2_new = _numba_distance(mat_t, tol)
+    Returns:
+        np.ndarray of bool: Whether the points are kept.
+        np.ndarray of int: Index of each point in the set of kept points.
 
-    return mat[:, keep], new_2_old, old_2_new
+    """
+    num_cols = indptr.size - 1
+    keep = np.ones(num_cols, dtype=numba.types.bool_)
+    old_2_new = np.zeros(num_cols, dtype=np.int64)
+
+    keep_counter = 0
+    for i in range(num_cols):
+        closest = -1
+        closest_dist = np.inf
+        for k in range(indptr[i], indptr[i + 1]):
+            j = neighbors[k]
+            if keep[j] and dist[k] < closest_dist:
+                closest = j
+                closest_dist = dist[k]
+        if closest < 0:
+            # We have found a new point
+            old_2_new[i] = keep_counter
+            keep_counter += 1
+        else:
+            # We will not keep this point
+            keep[i] = False
+            old_2_new[i] = old_2_new[closest]
+
+    return keep, old_2_new
 
 
 def uniquify_point_set(
@@ -6,11 +6,17 @@ associated data to the vtu format. For grid buckets with multiple grids, one
 vtu file is printed for each grid. For transient simulations with multiple
 time steps, a single pvd file takes care of the ordering of all printed vtu
 files.
+
+Alternatively, transient simulations on a fixed grid can be exported as a time series
+in the XDMF format: The geometry is written once, while the field data of each time
+step is appended to a single binary file, by a background thread.
 """
 import logging
 import os
 import sys
-from typing import Dict, Generator, Iterable, List, Optional, Tuple, Union
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple, Union
 
 import meshio
 import numpy as np
@@ -92,6 +98,163 @@ class Fields:
         return [f.name for f in self]
 
 
+class _TimeSeriesWriter:
+    """
+    Internal class to write a time series of cell data on a fixed grid to the XDMF
+    format.
+
+    The geometry and the field data are stored in a single binary file, which is
+    referred to from an XML file (extension .xdmf) by offsets. The geometry is
+    written on construction, and the fields of each time step are appended by
+    write(). A field is only appended if its values differ from those of the
+    previous time step; otherwise the previous values are referred to. The XML
+    file is (re)written by write_xml().
+    """
+
+    # Identifiers of cell types in mixed XDMF topologies. Lines and polygons are
+    # followed by the number of nodes.
+    _cell_types: Dict[str, List[int]] = {
+        "line": [2, 2],
+        "triangle": [4],
+        "quad": [5],
+        "tetra": [6],
+        "hexahedron": [9],
+    }
+
+    def __init__(self, file_name: str, meshio_geom) -> None:
+        self.file_name = file_name
+        self.bin_file_name = os.path.splitext(file_name)[0] + ".bin"
+        # Position at the end of the binary file
+        self._offset = 0
+        # Description of the data items written for each time step: time step index,
+        # and a list of (field name, shape, data item attributes).
+        self._steps: List[Tuple[Any, List[Tuple[str, Tuple[int, ...], Dict]]]] = []
+        # Most recently written values of each field, with the data item attributes
+        self._last: Dict[str, Tuple[np.ndarray, Dict]] = {}
+
+        # Truncate the binary file, and write the geometry
+        open(self.bin_file_name, "wb").close()
+        points, cells, cell_id = meshio_geom
+        self._cell_id = np.hstack(cell_id).astype(int)
+        self._num_points = points.shape[0]
+        self._num_cells = self._cell_id.size
+        self._points = self._append(np.asarray(points, dtype=float))
+        topology = self._topology(cells)
+        self._topology_item = self._append(topology)
+
+    def write(self, time_step: Any, fields: List[Tuple[str, np.ndarray]]) -> None:
+        """Append the values of the fields at a time step. The values should be
+        ordered as the cells of the geometry, with one row per cell.
+        """
+        items = []
+        for name, values in fields:
+            last = self._last.get(name, None)
+            if last is not None and np.array_equal(last[0], values):
+                item = last[1]
+            else:
+                item = self._append(values)
+                self._last[name] = (values, item)
+            items.append((name, values.shape, item))
+        self._steps.append((time_step, items))
+
+    def write_xml(self, times: Optional[Dict[Any, float]] = None) -> None:
+        """Write the XML file, assigning a time to each time step.
+
+        Parameters:
+            times (dict, optional): Time associated with each time step index. If not
+                provided, or if a time step is missing, the index is used as time.
+
+        """
+        xdmf = ET.Element("Xdmf", Version="3.0")
+        domain = ET.SubElement(xdmf, "Domain")
+        collection = ET.SubElement(
+            domain,
+            "Grid",
+            Name="TimeSeries",
+            GridType="Collection",
+            CollectionType="Temporal",
+        )
+        file_name = os.path.basename(self.bin_file_name)
+        for time_step, items in self._steps:
+            time = time_step if times is None else times.get(time_step, time_step)
+            grid = ET.SubElement(collection, "Grid", Name="mesh", GridType="Uniform")
+            ET.SubElement(grid, "Time", Value=str(time))
+            topology = ET.SubElement(
+                grid,
+                "Topology",
+                TopologyType="Mixed",
+                NumberOfElements=str(self._num_cells),
+            )
+            self._data_item(topology, self._topology_item, file_name)
+            geometry = ET.SubElement(grid, "Geometry", GeometryType="XYZ")
+            self._data_item(geometry, self._points, file_name)
+            for name, shape, item in items:
+                if len(shape) == 1:
+                    attribute_type = "Scalar"
+                elif shape[1] == 3:
+                    attribute_type = "Vector"
+                else:
+                    attribute_type = "Matrix"
+                attribute = ET.SubElement(
+                    grid,
+                    "Attribute",
+                    Name=name,
+                    AttributeType=attribute_type,
+                    Center="Cell",
+                )
+                self._data_item(attribute, item, file_name)
+
+        ET.ElementTree(xdmf).write(self.file_name, xml_declaration=True)
+
+    def _data_item(self, parent: ET.Element, item: Dict, file_name: str) -> None:
+        data_item = ET.SubElement(parent, "DataItem", Format="Binary", **item)
+        data_item.text = file_name
+
+    def _append(self, values: np.ndarray) -> Dict:
+        # Append an array to the binary file, and return the attributes of the
+        # corresponding data item.
+        if np.issubdtype(values.dtype, np.floating):
+            values = values.astype(np.float64, copy=False)
+            number_type = "Float"
+        else:
+            values = values.astype(np.int64, copy=False)
+            number_type = "Int"
+        item = {
+            "DataType": number_type,
+            "Precision": "8",
+            "Dimensions": " ".join(str(n) for n in values.shape),
+            "Endian": "Little" if sys.byteorder == "little" else "Big",
+            "Seek": str(self._offset),
+        }
+        with open(self.bin_file_name, "ab") as f:
+            np.ascontiguousarray(values).tofile(f)
+        self._offset += values.nbytes
+        return item
+
+    def _topology(self, cells) -> np.ndarray:
+        # Mixed XDMF topology: For each cell, the cell type, followed by the nodes.
+        topology: List[np.ndarray] = []
+        for block in cells:
+            if block.type.startswith("polyhedron"):
+                # Polyhedra are represented by the number of faces, followed by the
+                # number of nodes and the nodes of each face.
+                for faces in block.data:
+                    cell = [16, len(faces)]
+                    for face in faces:
+                        cell += [len(face)] + list(face)
+                    topology.append(np.array(cell, dtype=int))
+                continue
+
+            data = np.asarray(block.data, dtype=int)
+            if block.type == "polygon":
+                prefix = [3, data.shape[1]]
+            else:
+                prefix = self._cell_types[block.type]
+            prefix_array = np.tile(np.array(prefix, dtype=int), (data.shape[0], 1))
+            topology.append(np.hstack((prefix_array, data)).ravel())
+        return np.hstack(topology)
+
+
 class Exporter:
     def __init__(
         self,
@@ -113,6 +276,14 @@ class Exporter:
         fixed_grid: (optional) in a time dependent simulation specify if the
             grid changes in time or not. The default is True.
         binary: export in binary format, default is True.
+        time_series: export all time steps as a time series in the XDMF format, which
+            can be opened in e.g. ParaView. For each grid dimension, the geometry is
+            written once to a binary file, and the data of each time step is appended
+            to the same file, skipping fields that are unchanged since the previous
+            time step. The writing is done on a background thread, so that the
+            simulation can continue meanwhile. The XDMF file (extension .xdmf) is
+            written by write_pvd() or close(). Requires fixed_grid to be True.
+            Default is False.
 
         How to use:
         If you need to export a single grid:
@@ -135,6 +306,13 @@ class Exporter:
             save.write_vtu(["conc"], time_step=i)
         save.write_pvd(steps*deltaT)
 
+        As a time series:
+        save = Exporter(gb, "solution", folder_name="results", time_series=True)
+        while time:
+            save.write_vtu(["conc"], time_step=i)
+        save.write_pvd(steps*deltaT)
+        save.close()
+
         In the case of different keywords, change the file name with
         "change_name".
 
@@ -155,9 +333,12 @@ class Exporter:
         self.folder_name = folder_name
         self.fixed_grid: bool = kwargs.pop("fixed_grid", True)
         self.binary: bool = kwargs.pop("binary", True)
+        self.time_series: bool = kwargs.pop("time_series", False)
         if kwargs:
             msg = "Exporter() got unexpected keyword argument '{}'"
             raise TypeError(msg.format(kwargs.popitem()[0]))
+        if self.time_series and not self.fixed_grid:
+            raise ValueError("Time series export requires a fixed grid")
 
         self.cell_id_key = "cell_id"
 
@@ -186,6 +367,14 @@ class Exporter:
         # Storage for file name extensions for time steps
         self._exported_time_step_file_names: List[int] = []
 
+        # Writers of time series, identified by file name, and the thread which runs
+        # them, together with the result of the last submitted write.
+        self._time_series_writers: Dict[str, _TimeSeriesWriter] = {}
+        self._writer_thread: Optional[ThreadPoolExecutor] = None
+        self._last_write: Optional[Future] = None
+        # Time step index of the ongoing time series export
+        self._time_series_step: Any = None
+
     def change_name(self, file_name: str) -> None:
         """
         Change the root name of the files, useful when different keywords are
@@ -233,8 +422,9 @@ class Exporter:
 
             self._update_meshio_geom()
 
-        # If the problem is time dependent, but no time step is set, we set one
-        if time_dependent and time_step is None:
+        # If the problem is time dependent, but no time step is set, we set one. A time
+        # series is always time dependent.
+        if (time_dependent or self.time_series) and time_step is None:
             time_step = self._time_step_counter
             self._time_step_counter += 1
 
@@ -243,6 +433,13 @@ class Exporter:
         if time_step is not None:
             self._exported_time_step_file_names.append(time_step)
 
+        if self.time_series:
+            # All time steps are written to the same files, thus the time step should
+            # not enter the file names.
+            self._check_last_write()
+            self._time_series_step = time_step
+            time_step = None
+
         if self.is_GridBucket:
             self._export_gb(data, time_step)  # type: ignore
         else:
@@ -278,6 +475,11 @@ class Exporter:
 
         assert file_extension is not None  # make mypy happy
 
+        if self.time_series:
+            # The times are stored in the XDMF files, no pvd file is needed.
+            self._write_time_series_xml(dict(zip(file_extension, timestep)))
+            return
+
         o_file = open(self._make_folder(self.folder_name, self.file_name) + ".pvd", "w")
         b = "LittleEndian" if sys.byteorder == "little" else "BigEndian"
         c = ' compressor="vtkZLibDataCompressor"'
@@ -303,6 +505,56 @@ class Exporter:
         o_file.write("</Collection>\n" + "</VTKFile>")
         o_file.close()
 
+    def close(self) -> None:
+        """
+        Finish the export of a time series: Wait for the background writing to
+        complete, and write the XDMF files, unless this was already done by
+        write_pvd(). Without time series export, this method has no effect.
+        """
+        if self._writer_thread is None:
+            return
+        self._check_last_write(wait=True)
+        if self._last_write is not None:
+            # Data was written after the last call to write_pvd
+            self._write_time_series_xml(None)
+        self._writer_thread.shutdown()
+        self._writer_thread = None
+
+    def _write_time_series_xml(self, times: Optional[Dict[Any, float]]) -> None:
+        self._check_last_write(wait=True)
+        for writer in self._time_series_writers.values():
+            writer.write_xml(times)
+        self._last_write = None
+
+    def _check_last_write(self, wait: bool = False) -> None:
+        # Raise errors from the background writing. The writes are done in order,
+        # thus it suffices to check the last one.
+        if self._last_write is not None and (wait or self._last_write.done()):
+            self._last_write.result()
+
+    def _write_time_series(
+        self, fields: List[Tuple[str, np.ndarray]], file_name: str, meshio_geom
+    ) -> None:
+        file_name = os.path.splitext(file_name)[0] + ".xdmf"
+        if self._writer_thread is None:
+            self._writer_thread = ThreadPoolExecutor(max_workers=1)
+
+        # Add the cell ids, as in the vtu export
+        fields = fields + [(self.cell_id_key, np.hstack(meshio_geom[2]))]
+
+        time_step = self._time_series_step
+
+        def write():
+            # The writer is created on the first call, by the writer thread, since
+            # this involves writing of the geometry.
+            if file_name not in self._time_series_writers:
+                self._time_series_writers[file_name] = _TimeSeriesWriter(
+                    file_name, meshio_geom
+                )
+            self._time_series_writers[file_name].write(time_step, fields)
+
+        self._last_write = self._writer_thread.submit(write)
+
     def _export_g(self, data: Dict[str, np.ndarray], time_step):
         """
         Export a single grid (not grid bucket) to a vtu file.
@@ -467,9 +719,12 @@ class Exporter:
             if self.m_meshio_geom[dim] is not None:
                 self._write(edge_fields, file_name, self.m_meshio_geom[dim])
 
-        file_name = self._make_file_name(self.file_name, time_step, extension=".pvd")
-        file_name = self._make_folder(self.folder_name, file_name)
-        self._export_pvd_gb(file_name, time_step)
+        if not self.time_series:
+            file_name = self._make_file_name(
+                self.file_name, time_step, extension=".pvd"
+            )
+            file_name = self._make_folder(self.folder_name, file_name)
+            self._export_pvd_gb(file_name, time_step)
 
         self.gb.remove_edge_props(extra_edge_names)
 
@@ -789,6 +1044,23 @@ class Exporter:
 
     def _write(self, fields: Iterable[Field], file_name: str, meshio_geom) -> None:
 
+        if self.time_series:
+            # Order the values as the cells in the geometry. This also makes a copy of
+            # the values, which can then safely be written in the background.
+            series_fields = []
+            ids = np.hstack(meshio_geom[2]).astype(int)
+            for field in fields:
+                if field.values is None:
+                    continue
+                if field.values.ndim == 1:
+                    series_fields.append((field.name, field.values[ids]))
+                elif field.values.ndim == 2:
+                    series_fields.append((field.name, field.values[:, ids].T))
+                else:
+                    raise ValueError
+            self._write_time_series(series_fields, file_name, meshio_geom)
+            return
+
         cell_data = {}
 
         # we need to split the data for each group of geometrically uniform cells
@@ -830,6 +830,12 @@ class VariableMappingInitializationUnderPropagation(unittest.TestCase):
             # Update variables
             x_new = model._map_variables(x)
 
+            # The DofManager should account for the new number of dofs, both when
+            # assembling and distributing the variables.
+            self.assertTrue(np.allclose(dof_manager.assemble_variable(), x_new))
+            dof_manager.distribute_variable(x_new)
+            self.assertTrue(np.allclose(dof_manager.assemble_variable(), x_new))
+
             # The values of the 2d cell should not change
             self.assertTrue(
                 np.all(
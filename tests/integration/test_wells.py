@@ -222,3 +222,35 @@ def test_add_one_well_with_matrix() -> None:
             ]
         )
         assert np.allclose(mg.mortar_to_primary_int().A.flatten(), known)
+
+
+def test_wells_in_cartesian_matrix() -> None:
+    """Compute intersections between two wells and a Cartesian rock matrix grid.
+
+    The first well crosses two cells, the second well has two segments, where the
+    first lies in a single cell and the second lies along the face of two cells.
+    """
+    g = pp.CartGrid([2, 2, 2], [1, 1, 1])
+    g.compute_geometry()
+
+    w_0 = pp.CartGrid([1], 1.0)
+    w_0.nodes = np.array([[0.2, 0.8], [0.2, 0.2], [0.1, 0.1]])
+    w_1 = pp.CartGrid([2], 1.0)
+    w_1.nodes = np.array([[0.6, 0.7, 0.9], [0.6, 0.5, 0.5], [0.6, 0.7, 0.7]])
+    for w in [w_0, w_1]:
+        w.compute_geometry()
+
+    gb = pp.GridBucket()
+    gb.add_nodes([g, w_0, w_1])
+    pp.fracs.wells_3d.compute_well_rock_matrix_intersections(gb)
+    assert gb.num_graph_edges() == 2
+
+    known_0 = np.zeros((1, g.num_cells))
+    known_0[0, [0, 1]] = [0.5, 0.5]
+    known_1 = np.zeros((2, g.num_cells))
+    known_1[0, 7] = 1
+    known_1[1, [5, 7]] = 1
+
+    for w, known in zip([w_0, w_1], [known_0, known_1]):
+        mg = gb.edge_props((g, w), "mortar_grid")
+        assert np.allclose(mg.primary_to_mortar_int().A, known)
@@ -521,6 +521,280 @@ def test_variable_combinations(grids, variables):
                 assert expr.jac.shape[1] == dof_manager.num_dofs()
 
 
+def test_repeated_evaluation():
+    # Test that repeated evaluation of an operator, which reuses the information
+    # that does not depend on the state, gives the same result as a first evaluation.
+    g = pp.CartGrid([3, 2])
+    gb = pp.GridBucket()
+    gb.add_nodes([g])
+    for _, d in gb:
+        d[pp.PRIMARY_VARIABLES] = {"foo": {"cells": 1}, "bar": {"cells": 1}}
+        d[pp.STATE] = {
+            "foo": np.random.rand(g.num_cells),
+            "bar": np.random.rand(g.num_cells),
+        }
+
+    dof_manager = pp.DofManager(gb)
+    eq_manager = pp.ad.EquationManager(gb, dof_manager)
+    foo = eq_manager.variable(g, "foo")
+    bar = eq_manager.variable(g, "bar")
+
+    # The subexpression foo * bar is shared between the two terms
+    prod = foo * bar
+    eq = prod + pp.ad.Scalar(2) * prod - foo.previous_timestep()
+
+    state = np.random.rand(dof_manager.num_dofs())
+    ind_foo = dof_manager.grid_and_variable_to_dofs(g, "foo")
+    ind_bar = dof_manager.grid_and_variable_to_dofs(g, "bar")
+
+    def _check(expr, state):
+        val_foo = gb.node_props(g, pp.STATE)["foo"]
+        assert np.allclose(expr.val, 3 * state[ind_foo] * state[ind_bar] - val_foo)
+        jac = expr.jac.toarray()
+        assert np.allclose(jac[:, ind_foo], np.diag(3 * state[ind_bar]))
+        assert np.allclose(jac[:, ind_bar], np.diag(3 * state[ind_foo]))
+
+    _check(eq.evaluate(dof_manager, state), state)
+    plan = eq._evaluation_plan
+
+    # The plan should be reused for a new state
+    new_state = np.random.rand(dof_manager.num_dofs())
+    _check(eq.evaluate(dof_manager, new_state), new_state)
+    assert eq._evaluation_plan is plan
+
+    # A new DofManager should give a new plan
+    _check(eq.evaluate(pp.DofManager(gb), state), state)
+    assert eq._evaluation_plan is not plan
+
+
+def test_dof_manager_state_views():
+    # The DofManager keeps the state and iterate in global vectors. Check that
+    # values set directly in the data dictionaries are picked up, and that values
+    # distributed by the DofManager are seen in the data dictionaries.
+    gb = pp.meshing.cart_grid([np.array([[1, 3], [1, 1]])], [4, 2])
+    for g, d in gb:
+        d[pp.PRIMARY_VARIABLES] = {"foo": {"cells": 1}}
+        d[pp.STATE] = {"foo": np.random.rand(g.num_cells)}
+    for e, d in gb.edges():
+        d[pp.PRIMARY_VARIABLES] = {"bar": {"cells": 1}}
+        d[pp.STATE] = {"bar": np.random.rand(d["mortar_grid"].num_cells)}
+
+    dof_manager = pp.DofManager(gb)
+    g = gb.grids_of_dimension(2)[0]
+    e = list(gb.edges())[0][0]
+    data = gb.node_props(g)
+    data_edge = gb.edge_props(e)
+    ind_g = dof_manager.grid_and_variable_to_dofs(g, "foo")
+    ind_e = dof_manager.grid_and_variable_to_dofs(e, "bar")
+
+    state = dof_manager.assemble_variable()
+    assert np.allclose(state[ind_g], data[pp.STATE]["foo"])
+    assert np.allclose(state[ind_e], data_edge[pp.STATE]["bar"])
+
+    # There are no iterates, the state should be used instead.
+    assert np.allclose(dof_manager.assemble_iterate(), state)
+    with pytest.raises(KeyError):
+        dof_manager.assemble_variable(from_iterate=True)
+
+    # Values distributed by the DofManager are visible through references to the
+    # stored values.
+    foo = data[pp.STATE]["foo"]
+    new_state = np.random.rand(dof_manager.num_dofs())
+    dof_manager.distribute_variable(new_state)
+    assert np.allclose(foo, new_state[ind_g])
+    assert np.allclose(data_edge[pp.STATE]["bar"], new_state[ind_e])
+
+    # Distribute to the iterates of a subset of the grids and variables
+    dof_manager.distribute_variable(new_state, grids=[g], to_iterate=True)
+    assert np.allclose(data[pp.STATE][pp.ITERATE]["foo"], new_state[ind_g])
+    assert pp.ITERATE not in data_edge[pp.STATE]
+    iterate = dof_manager.assemble_variable(grids=[g], from_iterate=True)
+    assert np.allclose(iterate[ind_g], new_state[ind_g])
+    assert np.allclose(np.delete(iterate, ind_g), 0)
+    dof_manager.distribute_variable(
+        new_state, grids=[g], variables=["foo"], additive=True, to_iterate=True
+    )
+    assert np.allclose(data[pp.STATE][pp.ITERATE]["foo"], 2 * new_state[ind_g])
+
+    # Values assigned directly in the data dictionaries replace those stored by
+    # the DofManager.
+    data[pp.STATE]["foo"] = np.arange(g.num_cells, dtype=float)
+    data_edge[pp.STATE][pp.ITERATE] = {"bar": np.ones(ind_e.size)}
+    state = dof_manager.assemble_variable()
+    assert np.allclose(state[ind_g], np.arange(g.num_cells))
+    # The old reference is a view of the same block in the global vector
+    assert np.allclose(foo, np.arange(g.num_cells))
+    iterate = dof_manager.assemble_iterate()
+    assert np.allclose(iterate[ind_g], 2 * new_state[ind_g])
+    assert np.allclose(iterate[ind_e], 1)
+
+    eq_manager = pp.ad.EquationManager(gb, dof_manager)
+    foo_ad = eq_manager.variable(g, "foo")
+    bar_ad = eq_manager.variable(e, "bar")
+    assert np.allclose(foo_ad.evaluate(dof_manager).val, 2 * new_state[ind_g])
+    assert np.allclose(bar_ad.evaluate(dof_manager).val, 1)
+    prev_foo = foo_ad.previous_timestep().evaluate(dof_manager)
+    assert np.allclose(prev_foo, np.arange(g.num_cells))
+
+
+def test_block_jacobian_operations():
+    # Operations on block Jacobians should give the same result as on the
+    # corresponding full matrices.
+    block_sizes = np.array([2, 3, 1, 2])
+    a = np.arange(24).reshape((3, 8)) % 5
+    a[:, 5] = 0
+    b = np.arange(8)[::-1] * np.ones((3, 1))
+    b[:, :5] = 0
+    A = sps.csr_matrix(a)
+    B = sps.csr_matrix(b)
+
+    jac_a = pp.ad.BlockJacobian.from_matrix(A, block_sizes)
+    jac_b = pp.ad.BlockJacobian.from_matrix(B, block_sizes)
+    # Only blocks with non-zeros should be active
+    assert np.all(jac_a.block_indices == [0, 1, 3])
+    assert np.all(jac_b.block_indices == [2, 3])
+    assert np.allclose(jac_a.blocks[1].toarray(), A[:, 2:5].toarray())
+
+    assert np.allclose(jac_a.toarray(), A.toarray())
+    assert np.allclose((jac_a + jac_b).toarray(), (A + B).toarray())
+    assert np.allclose((jac_b - jac_a).toarray(), (B - A).toarray())
+    assert np.allclose((-jac_a).toarray(), -A.toarray())
+    assert np.allclose((2 * jac_a).toarray(), 2 * A.toarray())
+    assert np.allclose((jac_a * 2).toarray(), 2 * A.toarray())
+
+    M = sps.csr_matrix(np.arange(6).reshape((2, 3)))
+    prod = M * jac_b
+    assert isinstance(prod, pp.ad.BlockJacobian)
+    assert np.allclose(prod.toarray(), (M * B).toarray())
+
+    # Operations with a full sparse matrix gives a sparse matrix
+    mixed = jac_a + B
+    assert sps.issparse(mixed)
+    assert np.allclose(mixed.toarray(), (A + B).toarray())
+
+    with pytest.raises(ValueError):
+        M.T * jac_a
+
+
+def test_block_jacobian_evaluation():
+    # Evaluation of an operator with a block representation of the Jacobian should
+    # give the same result as the standard representation.
+    g = pp.CartGrid([3, 2])
+    h = pp.CartGrid([2, 2])
+    gb = pp.GridBucket()
+    gb.add_nodes([g, h])
+    for sd, d in gb:
+        d[pp.PRIMARY_VARIABLES] = {"foo": {"cells": 1}, "bar": {"cells": 1}}
+        d[pp.STATE] = {
+            "foo": np.random.rand(sd.num_cells),
+            "bar": np.random.rand(sd.num_cells),
+        }
+
+    dof_manager = pp.DofManager(gb)
+    eq_manager = pp.ad.EquationManager(gb, dof_manager, block_jacobian=True)
+    foo = eq_manager.merge_variables([(g, "foo"), (h, "foo")])
+    bar_g = eq_manager.variable(g, "bar")
+    bar_h = eq_manager.variable(h, "bar")
+
+    # Project the variables on h to the cells of g, and combine with variables on g
+    P = pp.ad.Matrix(sps.csr_matrix(np.ones((g.num_cells, h.num_cells))))
+    R = pp.ad.Matrix(sps.hstack([sps.eye(g.num_cells), sps.csr_matrix((6, 4))]))
+    eq_g = R * foo * bar_g + P * bar_h - bar_g.previous_timestep()
+    eq_h = bar_h * bar_h
+
+    state = np.random.rand(dof_manager.num_dofs())
+    for eq in [eq_g, eq_h]:
+        known = eq.evaluate(dof_manager, state)
+        block = eq.evaluate(dof_manager, state, block_jacobian=True)
+        assert isinstance(block.jac, pp.ad.BlockJacobian)
+        assert np.allclose(known.val, block.val)
+        assert np.allclose(known.jac.toarray(), block.jac.toarray())
+
+    # The Jacobian of eq_h only involves the block of bar_h.
+    block = eq_h.evaluate(dof_manager, state, block_jacobian=True)
+    assert block.jac.block_indices.size == 1
+
+    # Assembly in the EquationManager gives a standard sparse matrix
+    eq_manager.equations.update({"eq_g": eq_g, "eq_h": eq_h})
+    A, b = eq_manager.assemble(state)
+    eq_manager.block_jacobian = False
+    A_known, b_known = eq_manager.assemble(state)
+    assert sps.issparse(A)
+    assert np.allclose(A.toarray(), A_known.toarray())
+    assert np.allclose(b, b_known)
+
+
+@pytest.mark.parametrize(
+    "rows, cols, weights",
+    [
+        # Restriction
+        ([0, 1, 2], [4, 1, 2], [1, 1, 1]),
+        # Weighted projection with several non-zeros per row, unsorted rows
+        ([2, 0, 2, 1, 0], [0, 3, 4, 1, 2], [0.5, 1, 0.5, -1, 2]),
+        # Empty rows
+        ([1], [2], [3]),
+    ],
+)
+def test_index_projection(rows, cols, weights):
+    # Products with an index projection should give the same result as with the
+    # corresponding sparse matrix.
+    P = pp.ad.IndexProjection(rows, cols, weights, (3, 5))
+    A = sps.csr_matrix((weights, (rows, cols)), shape=(3, 5))
+    assert np.allclose(P.toarray(), A.toarray())
+    assert np.allclose(P.T.toarray(), A.T.toarray())
+
+    x = np.arange(5) + 1.0
+    J = sps.csr_matrix(np.arange(20).reshape((5, 4)) % 3)
+    assert np.allclose(P * x, A * x)
+    assert np.allclose((P * J).toarray(), (A * J).toarray())
+
+    ad = P * Ad_array(x, J)
+    assert np.allclose(ad.val, A * x)
+    assert np.allclose(ad.jac.toarray(), (A * J).toarray())
+
+    jac = pp.ad.BlockJacobian.from_matrix(J, np.array([1, 3]))
+    prod = P * jac
+    assert isinstance(prod, pp.ad.BlockJacobian)
+    assert np.allclose(prod.toarray(), (A * J).toarray())
+
+    # Other operations are done on the sparse matrix
+    M = sps.csr_matrix(np.ones((2, 3)))
+    assert np.allclose((M * P).toarray(), (M * A).toarray())
+    assert np.allclose((P + A).toarray(), 2 * A.toarray())
+    assert np.allclose((2 * P).toarray(), 2 * A.toarray())
+
+    with pytest.raises(ValueError):
+        P * np.ones(3)
+
+
+def test_projection_evaluation():
+    # Evaluation of an operator with a projection should give the same result as with
+    # the corresponding matrix.
+    g = pp.CartGrid([3, 2])
+    gb = pp.GridBucket()
+    gb.add_nodes([g])
+    for _, d in gb:
+        d[pp.PRIMARY_VARIABLES] = {"foo": {"cells": 1}}
+        d[pp.STATE] = {"foo": np.random.rand(g.num_cells)}
+
+    dof_manager = pp.DofManager(gb)
+    eq_manager = pp.ad.EquationManager(gb, dof_manager)
+    foo = eq_manager.variable(g, "foo")
+
+    rows, cols, weights = [0, 1, 1, 3], [5, 2, 0, 2], [1.0, 2.0, 3.0, 4.0]
+    P = pp.ad.Projection(rows, cols, weights, (4, g.num_cells))
+    A = pp.ad.Matrix(sps.csr_matrix((weights, (rows, cols)), shape=P.shape))
+
+    for eq_known, eq in [
+        (A * foo, P * foo),
+        (A.transpose() * (A * foo), P.transpose() * (P * foo)),
+    ]:
+        known = eq_known.evaluate(dof_manager)
+        computed = eq.evaluate(dof_manager)
+        assert np.allclose(known.val, computed.val)
+        assert np.allclose(known.jac.toarray(), computed.jac.toarray())
+
+
 def test_ad_discretization_class():
     # Test of the mother class of all discretizations (pp.ad.Discretization)
 
@@ -342,6 +342,70 @@ class ADTreeTest(unittest.TestCase):
         self.assertTrue(tree.nodes[4].child[0] == -1)
         self.assertTrue(tree.nodes[4].child[1] == -1)
 
+    def test_add_nodes(self):
+        """Add the nodes of test_simple_adtree at once, and some of them twice.
+        The tree should be the same as if the nodes were added one by one.
+        """
+        values = [0.4, 0.6, 0.7, 0.8, 0.2, 0.1, 0.6, 0.1]
+
+        tree = pp.adtree.ADTree(1, 1)
+        for key, v in enumerate(values):
+            tree.add_node(pp.adtree.ADTNode(key, v))
+
+        tree_bulk = pp.adtree.ADTree(1, 1)
+        tree_bulk.add_nodes(list(range(6)), np.array(values[:6]))
+        tree_bulk.add_nodes([6, 7], np.array(values[6:]))
+
+        self.assertTrue(tree_bulk.keys == tree.keys)
+        for n, n_bulk in zip(tree.nodes, tree_bulk.nodes):
+            self.assertTrue(n.child == n_bulk.child)
+            self.assertTrue(n.parent == n_bulk.parent)
+
+    def test_search_many(self):
+        """Search several boxes at once in a 3d grid, compare with a brute force
+        intersection of the boxes with the bounding boxes of the cells."""
+        g = pp.StructuredTetrahedralGrid([3, 2, 2], [1, 1, 1])
+        g.compute_geometry()
+
+        tree = pp.adtree.ADTree(6, 3)
+        tree.from_grid(g)
+
+        boxes = np.array(
+            [
+                [0.1, 0.1, 0.1, 0.5, 0.5, 0.5],
+                [0.1, 0.1, 0.1, 0.1, 0.1, 0.1],
+                [1.1, 0.1, 0.1, 1.2, 0.1, 0.1],
+                [0.5, 0.5, 0.5, 0.5, 0.5, 0.5],
+                [-1.0, -1.0, -1.0, 2.0, 2.0, 2.0],
+            ]
+        )
+        cand = tree.search_many(boxes)
+        self.assertTrue(cand.shape == (boxes.shape[0], g.num_cells))
+
+        # Bounding boxes of the cells. The grid covers the unit cube, thus the
+        # tolerance of the search applies also in physical coordinates.
+        tol = 2.0e-6
+        cell_nodes = g.cell_nodes().tocsc()
+        cell_boxes = np.zeros((g.num_cells, 6))
+        for c in range(g.num_cells):
+            nodes = g.nodes[
+                :, cell_nodes.indices[cell_nodes.indptr[c] : cell_nodes.indptr[c + 1]]
+            ]
+            cell_boxes[c] = np.hstack((nodes.min(axis=1), nodes.max(axis=1)))
+
+        for i, box in enumerate(boxes):
+            overlap = np.logical_and(
+                np.all(box[:3] - tol <= cell_boxes[:, 3:], axis=1),
+                np.all(box[3:] + tol >= cell_boxes[:, :3], axis=1),
+            )
+            known = np.where(overlap)[0]
+            self.assertTrue(np.array_equal(cand[i].indices, known))
+            self.assertTrue(
+                np.array_equal(tree.search(pp.adtree.ADTNode(99, box)), known)
+            )
+        self.assertTrue(cand[2].nnz == 0)
+        self.assertTrue(cand[4].nnz == g.num_cells)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -720,6 +720,51 @@ class ContactConditionColoumb2d(unittest.TestCase):
         self.verify(model)
 
 
+class TestSlidingCoefficients(unittest.TestCase):
+    """The coefficients for sliding cells are computed for all cells simultaneously.
+    Check that the coefficients of a cell do not depend on the other cells, by
+    comparison with the computation for one cell at a time.
+    """
+
+    def _check(self, nd):
+        discr = pp.ColoumbContact("mechanics", nd, pp.Mpsa("mechanics"))
+
+        np.random.seed(0)
+        num_cells = 8
+        Tt = np.random.rand(nd - 1, num_cells) - 0.5
+        ut = np.random.rand(nd - 1, num_cells) - 0.5
+        bf = np.random.rand(num_cells)
+        c = 10 * np.random.rand(num_cells)
+        # Zero friction bound, zero tangential force, and tangential force and jump
+        # in opposite directions (gives the regularization parameter beta != 1)
+        bf[0] = 0
+        Tt[:, 1] = 0
+        Tt[:, 2] = -ut[:, 2]
+
+        L, r, v = discr._sliding_coefficients(Tt, ut, bf, c)
+        self.assertEqual(L.shape, (num_cells, nd - 1, nd - 1))
+        self.assertEqual(r.shape, (num_cells, nd - 1))
+        self.assertEqual(v.shape, (num_cells, nd - 1))
+
+        for i in range(num_cells):
+            L_i, r_i, v_i = discr._sliding_coefficients(
+                Tt[:, i : i + 1], ut[:, i : i + 1], bf[i : i + 1], c[i : i + 1]
+            )
+            self.assertTrue(np.allclose(L_i[0], L[i]))
+            self.assertTrue(np.allclose(r_i[0], r[i]))
+            self.assertTrue(np.allclose(v_i[0], v[i]))
+
+        # Zero friction bound gives zero coefficients for the displacement
+        self.assertTrue(np.allclose(L[0], 0))
+        self.assertTrue(np.allclose(r[0], 0))
+
+    def test_2d(self):
+        self._check(2)
+
+    def test_3d(self):
+        self._check(3)
+
+
 class ContactModel2d(ContactMechanics):
     def __init__(self, angle, u_mortar, contact_force, pos_tangent, pos_normal):
         super().__init__({})
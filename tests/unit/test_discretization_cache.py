@@ -0,0 +1,166 @@
+"""Tests of the on-disk cache of discretization matrices.
+"""
+import numpy as np
+import pytest
+
+import porepy as pp
+
+
+@pytest.fixture
+def grid():
+    g = pp.CartGrid([3, 2])
+    g.compute_geometry()
+    return g
+
+
+def _flow_data(g, perm=1.0, time_step=1.0):
+    specified_parameters = {
+        "second_order_tensor": pp.SecondOrderTensor(perm * np.ones(g.num_cells)),
+        "bc": pp.BoundaryCondition(g, g.get_all_boundary_faces(), "dir"),
+        "time_step": time_step,
+    }
+    return pp.initialize_default_data(g, {}, "flow", specified_parameters)
+
+
+def _biot_data(g, mu=1.0):
+    constit = pp.FourthOrderTensor(mu * np.ones(g.num_cells), np.ones(g.num_cells))
+    specified_parameters = {
+        "fourth_order_tensor": constit,
+        "bc": pp.BoundaryConditionVectorial(g, g.get_all_boundary_faces(), "dir"),
+        "biot_alpha": 1.0,
+    }
+    data = pp.initialize_default_data(g, {}, "mechanics", specified_parameters)
+    return pp.initialize_default_data(g, data, "flow")
+
+
+def _compare_matrices(d1, d2, keyword):
+    m1 = d1[pp.DISCRETIZATION_MATRICES][keyword]
+    m2 = d2[pp.DISCRETIZATION_MATRICES][keyword]
+    assert m1.keys() == m2.keys()
+    for key in m1:
+        assert np.allclose(m1[key].toarray(), m2[key].toarray())
+
+
+def test_reuse_discretization(grid, tmp_path):
+    cache = pp.DiscretizationCache(tmp_path)
+    d1 = _flow_data(grid)
+    cache.discretize(pp.Mpfa("flow"), grid, d1)
+    assert cache.num_misses == 1
+
+    # The time step does not enter the discretization matrices, thus the cached
+    # matrices should be used. Use a new cache object, to mimic a new run.
+    cache = pp.DiscretizationCache(tmp_path)
+    d2 = _flow_data(grid, time_step=0.1)
+    cache.discretize(pp.Mpfa("flow"), grid, d2)
+    assert cache.num_hits == 1
+    assert cache.num_misses == 0
+    _compare_matrices(d1, d2, "flow")
+
+    # Modified permeability
+    d3 = _flow_data(grid, perm=2.0)
+    cache.discretize(pp.Mpfa("flow"), grid, d3)
+    assert cache.num_misses == 1
+    flux_1 = d1[pp.DISCRETIZATION_MATRICES]["flow"]["flux"]
+    flux_3 = d3[pp.DISCRETIZATION_MATRICES]["flow"]["flux"]
+    assert np.allclose(2 * flux_1.toarray(), flux_3.toarray())
+
+    # A different discretization scheme should not be confused with Mpfa
+    d4 = _flow_data(grid)
+    cache.discretize(pp.Tpfa("flow"), grid, d4)
+    assert cache.num_misses == 2
+
+
+def test_modified_grid(grid, tmp_path):
+    cache = pp.DiscretizationCache(tmp_path)
+    cache.discretize(pp.Mpfa("flow"), grid, _flow_data(grid))
+
+    g = grid.copy()
+    g.nodes[0] *= 2
+    g.compute_geometry()
+    d = _flow_data(g)
+    cache.discretize(pp.Mpfa("flow"), g, d)
+    assert cache.num_misses == 2
+
+    d_known = _flow_data(g)
+    pp.Mpfa("flow").discretize(g, d_known)
+    _compare_matrices(d, d_known, "flow")
+
+
+def test_coupled_keywords(grid, tmp_path):
+    # Biot stores matrices under both the mechanics and the flow keyword. Only the
+    # matrices computed by Biot should be stored in the cache.
+    cache = pp.DiscretizationCache(tmp_path)
+    d1 = _biot_data(grid)
+    pp.Mpfa("flow").discretize(grid, d1)
+    cache.discretize(pp.Biot(), grid, d1)
+
+    d2 = _biot_data(grid)
+    cache.discretize(pp.Biot(), grid, d2)
+    assert cache.num_hits == 1
+    assert "flux" not in d2[pp.DISCRETIZATION_MATRICES]["flow"]
+    _compare_matrices(d1, d2, "mechanics")
+    for key in ["div_u", "bound_div_u", "biot_stabilization"]:
+        m1 = d1[pp.DISCRETIZATION_MATRICES]["flow"][key]
+        m2 = d2[pp.DISCRETIZATION_MATRICES]["flow"][key]
+        assert np.allclose(m1.toarray(), m2.toarray())
+
+    # Modified stiffness
+    cache.discretize(pp.Biot(), grid, _biot_data(grid, mu=2.0))
+    assert cache.num_misses == 2
+
+
+def test_cached_discretization_assembler(grid, tmp_path):
+    cache = pp.DiscretizationCache(tmp_path)
+    gb = pp.meshing._assemble_in_bucket([[grid]])
+    for _, d in gb:
+        d.update(_flow_data(grid))
+        d[pp.PRIMARY_VARIABLES] = {"p": {"cells": 1}}
+        d[pp.DISCRETIZATION] = {
+            "p": {"diffusion": pp.CachedDiscretization(pp.Mpfa("flow"), cache)}
+        }
+    assembler = pp.Assembler(gb)
+    assembler.discretize()
+    A, b = assembler.assemble_matrix_rhs()
+    assembler.discretize()
+    A_cached, b_cached = assembler.assemble_matrix_rhs()
+
+    assert cache.num_misses == 1
+    assert cache.num_hits == 1
+    assert np.allclose(A.toarray(), A_cached.toarray())
+    assert np.allclose(b, b_cached)
+
+
+@pytest.mark.parametrize("biot", [False, True])
+def test_key_independent_of_tensor_values_access(grid, tmp_path, biot):
+    # The tensors form their full values on first access. This should not change
+    # the key, nor should computing the key form the values.
+    cache = pp.DiscretizationCache(tmp_path)
+    if biot:
+        discr, data = pp.Biot("mechanics", "flow"), _biot_data(grid)
+        tensor = data[pp.PARAMETERS]["mechanics"]["fourth_order_tensor"]
+    else:
+        discr, data = pp.Mpfa("flow"), _flow_data(grid)
+        tensor = data[pp.PARAMETERS]["flow"]["second_order_tensor"]
+
+    key = cache.key(discr, grid, data)
+    assert tensor._values is None
+    tensor.values
+    assert cache.key(discr, grid, data) == key
+
+    # Modification of the values changes the key
+    tensor.values[0, 0, 0] *= 2
+    assert cache.key(discr, grid, data) != key
+
+
+def test_key_does_not_form_tensor_values(grid, tmp_path, monkeypatch):
+    # The cache key should be computed without forming the full tensors, which are
+    # large for large grids.
+    def fail(self):
+        raise AssertionError("The full tensor should not be formed")
+
+    monkeypatch.setattr(pp.SecondOrderTensor, "_assemble_values", fail)
+    monkeypatch.setattr(pp.FourthOrderTensor, "_assemble_values", fail)
+
+    cache = pp.DiscretizationCache(tmp_path)
+    cache.key(pp.Mpfa("flow"), grid, _flow_data(grid))
+    cache.key(pp.Biot("mechanics", "flow"), grid, _biot_data(grid))
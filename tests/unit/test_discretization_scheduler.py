@@ -0,0 +1,130 @@
+"""Tests of the scheduling of discretization tasks on the nodes and edges of a
+GridBucket, as used by the Assembler and the EquationManager.
+"""
+import time
+
+import numpy as np
+import pytest
+
+import porepy as pp
+
+
+def _gb():
+    # Two intersecting fractures, giving grids of dimension 2, 1 and 0
+    f_1 = np.array([[1, 3], [2, 2]])
+    f_2 = np.array([[2, 2], [1, 3]])
+    gb = pp.meshing.cart_grid([f_1, f_2], [4, 4])
+    return gb
+
+
+def _set_flow_problem(gb, node_discr=pp.Mpfa):
+    for g, d in gb:
+        specified_parameters = {
+            "second_order_tensor": pp.SecondOrderTensor(np.ones(g.num_cells)),
+            "bc": pp.BoundaryCondition(
+                g, np.where(g.tags["domain_boundary_faces"])[0], "dir"
+            ),
+            "bc_values": np.arange(g.num_faces, dtype=float),
+        }
+        pp.initialize_default_data(g, d, "flow", specified_parameters)
+        d[pp.PRIMARY_VARIABLES] = {"p": {"cells": 1}}
+        d[pp.DISCRETIZATION] = {"p": {"diffusion": node_discr("flow")}}
+        p = np.ones(g.num_cells)
+        d[pp.STATE] = {"p": p, pp.ITERATE: {"p": p.copy()}}
+
+    for e, d in gb.edges():
+        g_l, g_h = gb.nodes_of_edge(e)
+        pp.initialize_data(d["mortar_grid"], d, "flow", {"normal_diffusivity": 1.0})
+        d[pp.PRIMARY_VARIABLES] = {"lambda": {"cells": 1}}
+        lam = np.ones(d["mortar_grid"].num_cells)
+        d[pp.STATE] = {"lambda": lam, pp.ITERATE: {"lambda": lam.copy()}}
+        d[pp.COUPLING_DISCRETIZATION] = {
+            "coupling": {
+                g_h: ("p", "diffusion"),
+                g_l: ("p", "diffusion"),
+                e: ("lambda", pp.RobinCoupling("flow", node_discr("flow"))),
+            }
+        }
+
+
+class _SlowNodeDiscretization(pp.Tpfa):
+    # Tpfa which takes time, so that the edge discretizations would be run before the
+    # node discretizations, if the dependencies were not respected.
+    def discretize(self, g, data):
+        time.sleep(0.01 * g.dim)
+        super().discretize(g, data)
+
+
+class _NodeCheckingCoupling(pp.RobinCoupling):
+    def discretize(self, g_h, g_l, data_h, data_l, data_edge):
+        for d in (data_h, data_l):
+            assert "flux" in d[pp.DISCRETIZATION_MATRICES]["flow"]
+        super().discretize(g_h, g_l, data_h, data_l, data_edge)
+
+
+@pytest.mark.parametrize("num_workers", [1, 4])
+def test_nodes_before_edges(num_workers):
+    gb = _gb()
+    _set_flow_problem(gb, _SlowNodeDiscretization)
+    for e, d in gb.edges():
+        coupling = d[pp.COUPLING_DISCRETIZATION]["coupling"]
+        coupling[e] = ("lambda", _NodeCheckingCoupling("flow", pp.Tpfa("flow")))
+
+    assembler = pp.Assembler(gb)
+    assembler.discretize(num_workers=num_workers)
+
+    timings = assembler.discretization_timings
+    assert len(timings.entries) == gb.num_graph_nodes() + gb.num_graph_edges()
+    assert set(timings.per_term().keys()) == {"diffusion", "coupling"}
+    assert len(timings.per_grid()) == gb.num_graph_nodes() + gb.num_graph_edges()
+
+
+@pytest.mark.parametrize("num_workers, executor", [(4, "thread"), (2, "process")])
+def test_parallel_assembler(num_workers, executor):
+    gb = _gb()
+    _set_flow_problem(gb)
+    assembler = pp.Assembler(gb)
+    assembler.discretize()
+    A_known, b_known = assembler.assemble_matrix_rhs()
+
+    gb = _gb()
+    _set_flow_problem(gb)
+    assembler = pp.Assembler(gb)
+    assembler.discretize(num_workers=num_workers, executor=executor)
+    A, b = assembler.assemble_matrix_rhs()
+
+    assert np.allclose(A.toarray(), A_known.toarray())
+    assert np.allclose(b, b_known)
+
+
+def test_parallel_equation_manager():
+    systems = []
+    for num_workers in (1, 4):
+        gb = _gb()
+        _set_flow_problem(gb)
+        dof_manager = pp.DofManager(gb)
+        manager = pp.ad.EquationManager(gb, dof_manager)
+        grids = [g for g, _ in gb]
+        edges = [e for e, _ in gb.edges()]
+        mpfa = pp.ad.MpfaAd("flow", grids)
+        robin = pp.ad.RobinCouplingAd("flow", edges)
+        manager.equations["flux"] = mpfa.flux * manager.merge_variables(
+            [(g, "p") for g in grids]
+        )
+        manager.equations["mortar"] = robin.mortar_discr * manager.merge_variables(
+            [(e, "lambda") for e in edges]
+        )
+        manager.discretize(gb, num_workers=num_workers)
+        assert len(manager.discretization_timings.entries) == len(grids) + len(edges)
+        systems.append(manager.assemble())
+
+    for known, computed in zip(systems[0], systems[1]):
+        if isinstance(known, np.ndarray):
+            assert np.allclose(known, computed)
+        else:
+            assert np.allclose(known.toarray(), computed.toarray())
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        pp.DiscretizationScheduler(num_workers=2, executor="mpi")
@@ -6,6 +6,7 @@ The tests focus on various assembly methods:
     * test_assemble_subsystem: Assemble blocks of the full set of equations.
     * test_extract_subsystem: Extract a new EquationManager for a subset of equations.
     * test_schur_complement: Assemble a subsystem, using a Schur complement reduction.
+    * test_linear_equations: Reuse of the Jacobian matrix of linear equations.
 
 """
 import pytest
@@ -488,3 +489,54 @@ def test_schur_complement(setup, eq_var_to_exclude):
     assert np.allclose(
         expected_blocks, setup.eq_manager.row_block_indices_last_assembled
     )
+
+
+def test_linear_equations():
+    # Equations which are linear in the variables should be identified, and their
+    # Jacobian matrices reused, without changing the assembled system.
+    g = pp.CartGrid([3, 1])
+    gb = pp.meshing._assemble_in_bucket([[g]])
+    for _, d in gb:
+        d[pp.PRIMARY_VARIABLES] = {"x": {"cells": 1}, "y": {"cells": 1}}
+        x, y = np.arange(1, 4, dtype=float), 2 * np.ones(3)
+        d[pp.STATE] = {"x": x, "y": y, pp.ITERATE: {"x": x.copy(), "y": y.copy()}}
+
+    dof_manager = pp.DofManager(gb)
+    eq_manager = pp.ad.EquationManager(gb, dof_manager)
+    x = eq_manager.variable(g, "x")
+    y = eq_manager.variable(g, "y")
+    mat = pp.ad.Matrix(sps.diags(np.arange(3, dtype=float)))
+
+    eq_manager.equations.update(
+        {
+            "linear": mat * x - 2 * y + pp.ad.Array(np.ones(3)),
+            "nonlinear": x * y,
+            "lagged": x.previous_iteration() * y,
+        }
+    )
+    assert eq_manager.identify_linear_equations() == ["linear"]
+
+    def known_system():
+        manager = pp.ad.EquationManager(gb, dof_manager, eq_manager.equations)
+        return manager.assemble()
+
+    A_0, b_0 = eq_manager.assemble()
+    assert _compare_matrices(A_0, known_system()[0])
+    assert np.allclose(b_0, known_system()[1])
+
+    # Update the state. The cached Jacobian is used for the linear equation, but the
+    # residual should be updated.
+    state = np.random.rand(dof_manager.num_dofs())
+    dof_manager.distribute_variable(state, to_iterate=True)
+    A, b = eq_manager.assemble()
+    A_known, b_known = known_system()
+    assert _compare_matrices(A, A_known)
+    assert np.allclose(b, b_known)
+    assert not np.allclose(b, b_0)
+
+    # Also for a subsystem
+    A, b = eq_manager.assemble_subsystem(["linear", "nonlinear"], [x])
+    manager = pp.ad.EquationManager(gb, dof_manager, eq_manager.equations)
+    A_known, b_known = manager.assemble_subsystem(["linear", "nonlinear"], [x])
+    assert _compare_matrices(A, A_known)
+    assert np.allclose(b, b_known)
@@ -0,0 +1,70 @@
+"""Tests of the sparse LU factorization cache used by the direct solvers in the models.
+"""
+import numpy as np
+import pytest
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+
+import porepy as pp
+
+
+def _matrix(n=12):
+    # Non-symmetric matrix, so that the column ordering matters
+    tridiag = sps.diags([-1.3, 2.5, -1], [-1, 0, 1], shape=(n, n))
+    return (sps.kron(tridiag, sps.eye(n)) + sps.kron(sps.eye(n), tridiag)).tocsr()
+
+
+def test_reuse_factorization():
+    A = _matrix()
+    b = np.arange(A.shape[0], dtype=float)
+    cache = pp.SparseLUCache()
+
+    x = cache.solve(A, b)
+    assert np.allclose(x, spla.spsolve(A.tocsc(), b))
+    assert cache.num_full_factorizations == 1
+
+    # Same matrix, new right hand side: The factorization should be reused.
+    x = cache.solve(A.copy(), 2 * b)
+    assert np.allclose(x, spla.spsolve(A.tocsc(), 2 * b))
+    assert cache.num_reused_factorizations == 1
+    assert cache.num_full_factorizations == 1
+
+
+def test_reuse_ordering():
+    A = _matrix()
+    b = np.arange(A.shape[0], dtype=float)
+    cache = pp.SparseLUCache()
+    cache.solve(A, b)
+
+    # Change the values, but not the sparsity pattern.
+    B = A.copy()
+    B.data *= np.linspace(1, 2, B.nnz)
+    x = cache.solve(B, b)
+    assert np.allclose(x, spla.spsolve(B.tocsc(), b))
+    assert cache.num_numerical_factorizations == 1
+    assert cache.num_full_factorizations == 1
+
+    # Repeated solve with the numerically refactorized matrix
+    x = cache.solve(B, -b)
+    assert np.allclose(x, spla.spsolve(B.tocsc(), -b))
+    assert cache.num_reused_factorizations == 1
+
+
+def test_new_pattern():
+    A = _matrix()
+    b = np.arange(A.shape[0], dtype=float)
+    cache = pp.SparseLUCache()
+    cache.solve(A, b)
+
+    B = _matrix(n=10)
+    x = cache.solve(B, b[: B.shape[0]])
+    assert np.allclose(x, spla.spsolve(B.tocsc(), b[: B.shape[0]]))
+    assert cache.num_full_factorizations == 2
+
+
+def test_singular_matrix():
+    A = sps.csr_matrix(np.ones((2, 2)))
+    cache = pp.SparseLUCache()
+    with pytest.warns(spla.MatrixRankWarning):
+        x = cache.solve(A, np.ones(2))
+    assert np.all(np.isnan(x))
@@ -9,6 +9,7 @@ Created on Wed Dec 12 09:05:31 2018
 import unittest
 from tests import test_utils
 
+import meshio
 import numpy as np
 
 import porepy as pp
@@ -328,5 +329,81 @@ class TestImportDFN1d(unittest.TestCase):
                 self.assertTrue(False)
 
 
+class TestImportBinaryGmsh(unittest.TestCase):
+    """Compare the reading of binary .msh files of version 4.1, which is done without
+    meshio, with reading of the same mesh from an ascii file.
+    """
+
+    def write_mesh(self, file_name, binary):
+        # Tetrahedral mesh of the unit cube, with a fracture at x=0.5
+        g = pp.StructuredTetrahedralGrid([4, 2, 2], [1, 1, 1])
+        g.compute_geometry()
+        pts = g.nodes.T
+        tetra = g.cell_nodes().tocsc().indices.reshape((-1, 4))
+        face_nodes = g.face_nodes.tocsc().indices.reshape((-1, 3))
+        frac_faces = np.where(np.all(np.isclose(pts[face_nodes, 0], 0.5), axis=1))[0]
+        triangle = face_nodes[frac_faces]
+
+        # The geometric entities of the nodes are used by meshio to write the
+        # entities, with their physical tags.
+        dim_tags = np.tile([3, 1], (pts.shape[0], 1))
+        dim_tags[np.unique(triangle)] = [2, 1]
+
+        mesh = meshio.Mesh(
+            pts,
+            [("tetra", tetra), ("triangle", triangle)],
+            cell_data={
+                "gmsh:physical": [
+                    np.full(tetra.shape[0], 1),
+                    np.full(triangle.shape[0], 2),
+                ],
+                "gmsh:geometrical": [
+                    np.full(tetra.shape[0], 1),
+                    np.full(triangle.shape[0], 1),
+                ],
+            },
+            field_data={"DOMAIN_0": np.array([1, 3]), "FRACTURE_0": np.array([2, 2])},
+            point_data={"gmsh:dim_tags": dim_tags},
+        )
+        meshio.write(file_name, mesh, file_format="gmsh", binary=binary)
+
+    def test_read_file(self):
+        self.write_mesh("binary.msh", True)
+        self.write_mesh("ascii.msh", False)
+
+        known = pp.fracs.simplex._read_gmsh_file("ascii.msh")
+        computed = pp.fracs.simplex._read_gmsh_file("binary.msh")
+
+        self.assertTrue(np.allclose(known[0], computed[0]))
+        for cells_known, cells_computed in zip(known[1:3], computed[1:3]):
+            self.assertEqual(cells_known.keys(), cells_computed.keys())
+            for key, val in cells_known.items():
+                self.assertTrue(np.all(val == cells_computed[key]))
+        self.assertEqual(known[3], computed[3])
+
+        test_utils.delete_file("binary.msh")
+        test_utils.delete_file("ascii.msh")
+
+    def test_dfm_from_gmsh(self):
+        self.write_mesh("binary.msh", True)
+        self.write_mesh("ascii.msh", False)
+
+        gb_known = pp.fracture_importer.dfm_from_gmsh("ascii.msh", 3)
+        gb = pp.fracture_importer.dfm_from_gmsh("binary.msh", 3)
+
+        for dim in range(4):
+            grids_known = gb_known.grids_of_dimension(dim)
+            grids = gb.grids_of_dimension(dim)
+            self.assertEqual(len(grids_known), len(grids))
+            for g_known, g in zip(grids_known, grids):
+                self.assertTrue(np.allclose(g_known.nodes, g.nodes))
+                self.assertTrue(np.all(g_known.global_point_ind == g.global_point_ind))
+                self.assertEqual((g_known.cell_faces != g.cell_faces).nnz, 0)
+        self.assertEqual(gb_known.num_graph_edges(), gb.num_graph_edges())
+
+        test_utils.delete_file("binary.msh")
+        test_utils.delete_file("ascii.msh")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -211,6 +211,36 @@ class TestBoundingBoxIntersection(unittest.TestCase):
 
         self.assertTrue(np.allclose(pairs_1, combined_pairs))
 
+    def test_random_rectangles(self):
+        # Compare with a brute force search. Integer coordinates give many cases where
+        # rectangles touch, which should be counted as overlaps.
+        np.random.seed(0)
+        x = np.sort(np.random.randint(0, 20, (2, 50)), axis=0)
+        y = np.sort(np.random.randint(0, 20, (2, 50)), axis=0)
+
+        overlap = np.logical_and.reduce(
+            (
+                x[1].reshape((-1, 1)) >= x[0],
+                x[0].reshape((-1, 1)) <= x[1],
+                y[1].reshape((-1, 1)) >= y[0],
+                y[0].reshape((-1, 1)) <= y[1],
+            )
+        )
+        known = np.vstack(np.where(np.triu(overlap, 1)))
+
+        pairs = pp.intersections._identify_overlapping_rectangles(
+            x[0], x[1], y[0], y[1]
+        )
+        self.assertTrue(pairs.shape == known.shape)
+        self.assertTrue(test_utils.compare_arrays(pairs, known))
+
+        # Chunked processing of the candidates should not change the result
+        chunked = pp.intersections._sweep_overlapping_boxes(
+            [x[0], y[0]], [x[1], y[1]], max_candidates=10
+        )
+        full = pp.intersections._sweep_overlapping_boxes([x[0], y[0]], [x[1], y[1]])
+        self.assertTrue(np.all(chunked == full))
+
 
 class TestFractureIntersectionRemoval(unittest.TestCase):
     """Tests for functions used to remove intersections between 1d fractures."""
@@ -223,7 +253,9 @@ class TestFractureIntersectionRemoval(unittest.TestCase):
             p, lines
         )
 
-        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(p, lines)
+        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(
+            p, lines
+        )
 
         p_known = np.hstack((p, np.array([[0], [0]])))
 
@@ -237,7 +269,9 @@ class TestFractureIntersectionRemoval(unittest.TestCase):
 
         lines = np.array([[0, 1], [2, 3]])
         box = np.array([[2], [2]])
-        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(p, lines)
+        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(
+            p, lines
+        )
         self.assertTrue(np.allclose(new_pts, p))
         self.assertTrue(np.allclose(new_lines, lines))
 
@@ -248,7 +282,9 @@ class TestFractureIntersectionRemoval(unittest.TestCase):
         )
         lines = np.array([[0, 3], [1, 4], [2, 5]]).T
 
-        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(p, lines)
+        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(
+            p, lines
+        )
         p_known = p
         self.assertTrue(np.allclose(new_pts, p_known))
         self.assertTrue(np.allclose(new_lines, lines))
@@ -260,7 +296,9 @@ class TestFractureIntersectionRemoval(unittest.TestCase):
         )
         lines = np.array([[0, 3], [2, 5], [1, 4]]).T
 
-        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(p, lines)
+        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(
+            p, lines
+        )
         p_known = np.hstack((p, np.array([[0.4], [0.4]])))
         lines_known = np.array([[0, 3], [2, 6], [6, 5], [1, 6], [6, 4]]).T
         self.assertTrue(np.allclose(new_pts, p_known))
@@ -269,8 +307,10 @@ class TestFractureIntersectionRemoval(unittest.TestCase):
     def test_overlapping_lines(self):
         p = np.array([[-0.6, 0.4, 0.4, -0.6, 0.4], [-0.5, -0.5, 0.5, 0.5, 0.0]])
         lines = np.array([[0, 0, 1, 1, 2], [1, 3, 2, 4, 3]])
-        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(p, lines)
-        
+        new_pts, new_lines, _ = pp.intersections.split_intersecting_segments_2d(
+            p, lines
+        )
+
         lines_known = np.array([[0, 1], [0, 3], [1, 4], [2, 4], [2, 3]]).T
         self.assertTrue(np.allclose(new_pts, p))
         self.assertTrue(test_utils.compare_arrays(new_lines, lines_known))
@@ -4,7 +4,10 @@ Various checks of the FractureNetwork2d and 3d class
 Also test unitily function for generation of defalut domains.
 """
 
+import tempfile
 import unittest
+from pathlib import Path
+
 from tests import test_utils
 
 import numpy as np
@@ -310,6 +313,54 @@ class TestFractureNetwork3dBoundingBox(unittest.TestCase):
         self.assertTrue(d["zmax"] == external_boundary["zmax"])
 
 
+class TestFractureNetwork3dGeometryCache(unittest.TestCase):
+    def network(self):
+        f_1 = pp.Fracture(np.array([[0, 1, 1, 0], [0.5, 0.5, 0.5, 0.5], [0, 0, 1, 1]]))
+        f_2 = pp.Fracture(np.array([[0.5, 0.5, 0.5, 0.5], [0, 1, 1, 0], [0, 0, 1, 1]]))
+        return pp.FractureNetwork3d([f_1, f_2])
+
+    def compare_gmsh_data(self, a, b):
+        self.assertTrue(np.allclose(a.pts, b.pts))
+        self.assertTrue(np.all(a.lines == b.lines))
+        self.assertTrue(np.allclose(a.mesh_size, b.mesh_size))
+        # The polygons are represented by their lines, and the orientation of these
+        for la, lb in zip(a.polygons, b.polygons):
+            self.assertEqual(len(la), len(lb))
+            for pa, pb in zip(la, lb):
+                self.assertTrue(np.all(pa == pb))
+        self.assertEqual(a.physical_points, b.physical_points)
+        self.assertEqual(a.physical_surfaces, b.physical_surfaces)
+
+    def test_cached_geometry(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for mesh_size_frac in [0.3, 0.3, 0.2, 0.2]:
+                mesh_args = {"mesh_size_frac": mesh_size_frac, "mesh_size_min": 0.1}
+                known = self.network().prepare_for_gmsh(mesh_args, dfn=True)
+                network = self.network()
+                computed = network.prepare_for_gmsh(
+                    mesh_args, dfn=True, cache_dir=cache_dir
+                )
+                self.compare_gmsh_data(known, computed)
+                self.assertTrue(network.has_checked_intersections)
+
+            # One entry for the intersections, one for each fracture mesh size
+            self.assertEqual(len(list(Path(cache_dir).iterdir())), 3)
+
+    def test_change_of_boundary_mesh_size(self):
+        # The boundary mesh size does not enter the key, but should still be used
+        with tempfile.TemporaryDirectory() as cache_dir:
+            mesh_args = {"mesh_size_frac": 0.3, "mesh_size_min": 0.1}
+            self.network().prepare_for_gmsh(mesh_args, dfn=True, cache_dir=cache_dir)
+
+            mesh_args["mesh_size_bound"] = 0.05
+            known = self.network().prepare_for_gmsh(mesh_args, dfn=True)
+            computed = self.network().prepare_for_gmsh(
+                mesh_args, dfn=True, cache_dir=cache_dir
+            )
+            self.compare_gmsh_data(known, computed)
+            self.assertEqual(len(list(Path(cache_dir).iterdir())), 2)
+
+
 class TestDomain(unittest.TestCase):
     def check_key_value(self, domain, keys, values):
         tol = 1e-12
@@ -145,5 +145,97 @@ def test_fv_cart_2d_periodic(method):
     return a
 
 
+def _fv_discretization_and_data(method, g, parameters):
+    """Set up discretization object and data dictionary for comparison of full and
+    partitioned discretization."""
+    if method == "mpfa":
+        key = "flow"
+        discr = pp.Mpfa(key)
+        specified_parameters = {
+            "second_order_tensor": pp.SecondOrderTensor(np.ones(g.num_cells)),
+            "bc": pp.BoundaryCondition(g, g.get_all_boundary_faces(), "dir"),
+        }
+        specified_parameters.update(parameters)
+        data = pp.initialize_default_data(g, {}, key, specified_parameters)
+    else:
+        key = "mechanics"
+        specified_parameters = {
+            "fourth_order_tensor": pp.FourthOrderTensor(
+                np.ones(g.num_cells), np.ones(g.num_cells)
+            ),
+            "bc": pp.BoundaryConditionVectorial(g, g.get_all_boundary_faces(), "dir"),
+            "biot_alpha": 1,
+        }
+        specified_parameters.update(parameters)
+        data = pp.initialize_default_data(g, {}, key, specified_parameters)
+        if method == "mpsa":
+            discr = pp.Mpsa(key)
+        else:
+            discr = pp.Biot(key, "flow")
+            pp.initialize_default_data(g, data, "flow", {})
+
+    return discr, data
+
+
+@pytest.mark.parametrize("method", ["mpfa", "mpsa", "biot"])
+@pytest.mark.parametrize("parameters", [{"max_memory": 3e4}, {"num_workers": 2}])
+def test_partitioned_discretization(method, parameters):
+    """Discretization of the grid in partition regions, in serial or on a pool of
+    worker processes, should give the same matrices as a discretization of the whole
+    grid in one go."""
+    g = pp.CartGrid([4, 5])
+    g.compute_geometry()
+
+    discr, data_full = _fv_discretization_and_data(method, g, {})
+    discr.discretize(g, data_full)
+
+    discr, data_partitioned = _fv_discretization_and_data(method, g, parameters)
+    discr.discretize(g, data_partitioned)
+
+    for key, matrices in data_full[pp.DISCRETIZATION_MATRICES].items():
+        for name, mat in matrices.items():
+            other = data_partitioned[pp.DISCRETIZATION_MATRICES][key][name]
+            assert np.allclose(mat.toarray(), other.toarray())
+
+
+@pytest.mark.parametrize("method", ["mpfa", "mpsa", "biot"])
+def test_peak_memory_report(method):
+    """The estimated and measured peak memory should be reported for all partition
+    regions, separately for each grid discretized by the same object."""
+    g = pp.CartGrid([4, 5])
+    g.compute_geometry()
+    # The estimate is in bytes, and should be larger for vector problems.
+    assert pp.fvutils.estimate_peak_memory(g, 2) > pp.fvutils.estimate_peak_memory(g)
+
+    discr, data = _fv_discretization_and_data(
+        method, g, {"max_memory": 5e4, "report_memory": True}
+    )
+    discr.discretize(g, data)
+    key = "flow" if method == "mpfa" else "mechanics"
+
+    report = data[pp.DISCRETIZATION_MATRICES][key]["peak_memory_report"]
+    assert len(report.estimated) > 1
+    assert len(report.measured) == len(report.estimated)
+    assert all(m >= 0 for m in report.measured)
+    assert all(e > 0 for e in report.estimated)
+
+    # The discretization of another grid by the same object has its own report
+    g_other = pp.CartGrid([2, 2])
+    g_other.compute_geometry()
+    _, data_other = _fv_discretization_and_data(
+        method, g_other, {"report_memory": True}
+    )
+    discr.discretize(g_other, data_other)
+    report_other = data_other[pp.DISCRETIZATION_MATRICES][key]["peak_memory_report"]
+    assert report_other is not report
+    assert len(report_other.estimated) == 1
+    assert data[pp.DISCRETIZATION_MATRICES][key]["peak_memory_report"] is report
+
+    # Without the report_memory flag, no report is made
+    discr, data = _fv_discretization_and_data(method, g, {"max_memory": 5e4})
+    discr.discretize(g, data)
+    assert "peak_memory_report" not in data[pp.DISCRETIZATION_MATRICES][key]
+
+
 if __name__ == "__main__":
     unittest.main()
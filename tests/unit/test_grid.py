@@ -33,6 +33,25 @@ class TestDiameterComputation(unittest.TestCase):
         known = np.repeat(np.sqrt(3), g.num_cells)
         self.assertTrue(np.allclose(cell_diameters, known))
 
+    def test_cell_diameters_mixed_cells(self):
+        # Merge the first two cells of a Cartesian grid, to get cells with six and
+        # four nodes.
+        g = pp.CartGrid([3, 1])
+        cell_faces = g.cell_faces * sps.csc_matrix(
+            (np.ones(3), (np.arange(3), np.array([0, 0, 1]))), shape=(3, 2)
+        )
+        g = pp.Grid(2, g.nodes, g.face_nodes, cell_faces, "merged")
+        cell_diameters = g.cell_diameters()
+        self.assertTrue(np.allclose(cell_diameters, [np.sqrt(5), np.sqrt(2)]))
+
+    def test_cell_diameters_update(self):
+        g = pp.CartGrid([3, 2])
+        g.compute_geometry()
+        self.assertTrue(np.allclose(g.cell_diameters(), np.sqrt(2)))
+        g.nodes[0] *= 2
+        g.compute_geometry()
+        self.assertTrue(np.allclose(g.cell_diameters(), np.sqrt(5)))
+
 
 class TestReprAndStr(unittest.TestCase):
     def test_repr(self):
@@ -66,6 +85,59 @@ class TestClosestCell(unittest.TestCase):
         self.assertTrue(ind[0] == 0)
         self.assertTrue(ind.size == 1)
 
+    def test_compare_brute_force(self):
+        g = pp.StructuredTetrahedralGrid([3, 3, 3])
+        g.compute_geometry()
+        p = np.random.RandomState(0).rand(3, 20) * 4 - 0.5
+
+        ind, dist = g.closest_cell(p, return_distance=True)
+        for i in range(p.shape[1]):
+            d = np.linalg.norm(g.cell_centers - p[:, i].reshape((3, 1)), axis=0)
+            self.assertTrue(np.isclose(dist[i], d.min()))
+            self.assertTrue(np.isclose(d[ind[i]], d.min()))
+
+    def test_modified_geometry(self):
+        # The cell centers change, the search structure should be updated
+        g = pp.CartGrid([2, 1])
+        g.compute_geometry()
+        p = np.array([[1.2], [0.5], [0]])
+        self.assertTrue(g.closest_cell(p)[0] == 1)
+
+        g.nodes[0] *= 2
+        g.compute_geometry()
+        self.assertTrue(g.closest_cell(p)[0] == 0)
+
+
+class TestTopologyCache(unittest.TestCase):
+    def test_returned_maps_are_copies(self):
+        g = pp.CartGrid([2, 2])
+        cn = g.cell_nodes()
+        cn.data[:] = False
+        self.assertTrue(np.all(g.cell_nodes().data))
+        c2c = g.cell_connection_map()
+        c2c.data[:] = False
+        self.assertTrue(np.all(g.cell_connection_map().data))
+
+    def test_modified_topology(self):
+        # Remove the connection between the first cell and its faces, the cached maps
+        # should be updated.
+        g = pp.CartGrid([2, 1])
+        self.assertTrue(np.allclose(g.num_cell_nodes(), [4, 4]))
+        self.assertTrue(g.cell_connection_map().nnz == 4)
+
+        cell_faces = g.cell_faces.tolil()
+        cell_faces[:, 0] = 0
+        g.cell_faces = cell_faces.tocsc()
+        g.cell_faces.eliminate_zeros()
+        self.assertTrue(np.allclose(g.num_cell_nodes(), [0, 4]))
+        self.assertTrue(g.cell_nodes()[:, 0].nnz == 0)
+        self.assertTrue(g.cell_connection_map().nnz == 1)
+
+        # Modify the sparsity pattern of face_nodes in place, by adding a node to a
+        # face of the second cell.
+        g.face_nodes[0, 2] = True
+        self.assertTrue(np.allclose(g.num_cell_nodes(), [0, 5]))
+
 
 class TestCellFaceAsDense(unittest.TestCase):
     def test_cart_grid(self):
@@ -586,6 +658,52 @@ class TestStructuredSimplexGridCoverage(unittest.TestCase):
         self.assertTrue(np.abs(domain.prod() - np.sum(g.cell_volumes)) < 1e-10)
 
 
+class TestSimplexGridTopology(unittest.TestCase):
+    """Verify the face-node and cell-face relations of unstructured simplex grids."""
+
+    def check_topology(self, g):
+        g.compute_geometry()
+        nodes_per_face = g.dim
+        face_nodes = g.face_nodes.indices.reshape((nodes_per_face, -1), order="F")
+        # All faces should be unique
+        self.assertEqual(
+            np.unique(np.sort(face_nodes, axis=0), axis=1).shape[1], g.num_faces
+        )
+
+        # The normal vectors, multiplied with the signs in cell_faces, should point
+        # out of the cells.
+        fi, ci, sgn = sps.find(g.cell_faces)
+        direction = g.face_centers[:, fi] - g.cell_centers[:, ci]
+        self.assertTrue(np.all(sgn * np.sum(direction * g.face_normals[:, fi], 0) > 0))
+
+        # Interior faces have one cell on each side
+        num_occ = np.bincount(fi, minlength=g.num_faces)
+        self.assertTrue(np.all(num_occ[g.get_internal_faces()] == 2))
+
+    def test_triangles(self):
+        np.random.seed(0)
+        p = np.random.rand(2, 500)
+        self.check_topology(simplex.TriangleGrid(p))
+
+    def test_tetrahedra(self):
+        np.random.seed(0)
+        p = np.random.rand(3, 500)
+        g_32 = simplex.TetrahedralGrid(p)
+        self.check_topology(g_32)
+
+        # The numbering of faces depends on the integer type of the cells, but the
+        # topology should be the same
+        tet = g_32.cell_nodes().tocsc().indices.reshape((4, -1), order="F")
+        g_64 = simplex.TetrahedralGrid(p, tet.astype(np.int64))
+        self.check_topology(g_64)
+
+        fn_32 = np.sort(g_32.face_nodes.indices.reshape((3, -1), order="F"), axis=0)
+        fn_64 = np.sort(g_64.face_nodes.indices.reshape((3, -1), order="F"), axis=0)
+        ismem, ind = setmembership.ismember_rows(fn_32, fn_64)
+        self.assertTrue(np.all(ismem))
+        self.assertTrue(np.allclose(g_32.face_areas, g_64.face_areas[ind]))
+
+
 class TestGridMappings1d(unittest.TestCase):
     def test_merge_single_grid(self):
         """
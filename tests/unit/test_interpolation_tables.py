@@ -105,3 +105,80 @@ def test_interpolation(dim, factory):
         # Quadractic function (due to diff_tol)
         assert np.max(np.abs(diff - known_diff)) < function.diff_tol
         assert np.allclose(diff, adaptive_diff, atol=1e-10)
+
+
+class _CountingFunc:
+    # Function which counts the number of calls and evaluated points
+    def __init__(self):
+        self.num_calls = 0
+        self.num_pts = 0
+
+    def __call__(self, x, y):
+        self.num_calls += 1
+        self.num_pts += np.asarray(x).size
+        return np.sin(x) * y
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_adaptive_table_batched_evaluation(num_workers):
+    # All missing function values should be computed in one call per worker
+    low, high, resolution = np.zeros(2), np.ones(2), np.array([10, 12])
+    function = _CountingFunc()
+    table = pp.AdaptiveInterpolationTable(
+        low, high, resolution, function, num_workers=num_workers
+    )
+    full_table = pp.InterpolationTable(low, high, resolution, _CountingFunc())
+
+    pts = 0.99 * np.random.rand(2, 50)
+    assert np.allclose(table.interpolate(pts), full_table.interpolate(pts))
+    assert function.num_calls == num_workers
+    assert function.num_pts == table._has_value.sum()
+
+    # No new values are needed for the same points
+    table.diff(pts, axis=0)
+    assert function.num_calls == num_workers
+
+
+def test_adaptive_table_process_pool():
+    low, high, resolution = np.zeros(2), np.ones(2), np.array([5, 6])
+    table = pp.AdaptiveInterpolationTable(
+        low, high, resolution, np.hypot, num_workers=2, executor="process"
+    )
+    pts = 0.99 * np.random.rand(2, 20)
+    full_table = pp.InterpolationTable(low, high, resolution, np.hypot)
+    assert np.allclose(table.interpolate(pts), full_table.interpolate(pts))
+
+    with pytest.raises(ValueError):
+        pp.AdaptiveInterpolationTable(
+            low, high, resolution, np.hypot, num_workers=2, executor="mpi"
+        )
+
+
+def test_adaptive_table_save_load(tmp_path):
+    low, high, resolution = np.zeros(2), np.ones(2), np.array([10, 12])
+    table = pp.AdaptiveInterpolationTable(low, high, resolution, _CountingFunc())
+    pts = 0.99 * np.random.rand(2, 30)
+    vals = table.interpolate(pts)
+    table.save(tmp_path / "table")
+
+    # A table which has loaded the values should not evaluate the function again
+    function = _CountingFunc()
+    new_table = pp.AdaptiveInterpolationTable(low, high, resolution, function)
+    new_table.load(tmp_path / "table")
+    assert np.allclose(new_table.interpolate(pts), vals)
+    assert function.num_calls == 0
+
+    # Values stored for another interpolation grid are rejected
+    other_table = pp.AdaptiveInterpolationTable(
+        low, high, 2 * resolution, _CountingFunc()
+    )
+    with pytest.raises(ValueError):
+        other_table.load(tmp_path / "table")
+
+
+def test_point_outside_table():
+    table = pp.InterpolationTable(np.zeros(1), np.ones(1), np.array([4]), np.sin)
+    with pytest.raises(ValueError):
+        table.interpolate(np.array([[0.5, 1.5]]))
+    with pytest.raises(ValueError):
+        table.interpolate(np.array([[-0.5]]))
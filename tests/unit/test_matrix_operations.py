@@ -400,5 +400,30 @@ def test_optimized_storage(mat):
         assert optimized.getformat() == "csr"
 
 
+@pytest.mark.parametrize("method", ["python", "batched"])
+def test_invert_diagonal_blocks(method):
+    # Blocks of varying size, in no particular order, with some zero elements that are
+    # not represented in the sparse storage, and columns not sorted within the rows.
+    sz = np.array([2, 3, 1, 2, 3], dtype="i8")
+    np.random.seed(0)
+    blocks = [np.random.rand(n, n) + n * np.eye(n) for n in sz]
+    blocks[1][0, 2] = 0
+    blocks[4][1, 0] = 0
+    mat = sps.csr_matrix(sps.block_diag(blocks))
+    mat.eliminate_zeros()
+    mat.indices[:2], mat.data[:2] = mat.indices[1::-1].copy(), mat.data[1::-1].copy()
+    mat.has_sorted_indices = False
+
+    inv = pp.matrix_operations.invert_diagonal_blocks(mat, sz, method=method)
+    assert np.allclose(inv.toarray(), np.linalg.inv(mat.toarray()))
+
+    # A singular block should raise an error
+    blocks[2][0, 0] = 0
+    with pytest.raises((ValueError, np.linalg.LinAlgError)):
+        pp.matrix_operations.invert_diagonal_blocks(
+            sps.csr_matrix(sps.block_diag(blocks)), sz, method=method
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -16,6 +16,8 @@ The module contains the following groups of tests:
 
     test_pickle_mortar_grid: Method to verify that MortarGrids can be pickled.
 
+    test_vector_projections_cached: Caching of the projections for vector quantities.
+
 """
 import pickle
 import pytest
@@ -1246,5 +1248,24 @@ def test_pickle_mortar_grid(g):
     test_utils.delete_file(fn)
 
 
+def test_vector_projections_cached():
+    # Projections for vector quantities are computed once, and recomputed when the
+    # projections of the mortar grid are updated.
+    f = np.array([[0, 2], [1, 1]])
+    gb = pp.meshing.cart_grid([f], [2, 2])
+    e, d = next(gb.edges())
+    mg = d["mortar_grid"]
+
+    proj = mg.mortar_to_primary_int(nd=2)
+    assert mg.mortar_to_primary_int(nd=2) is proj
+    known = sps.kron(mg.mortar_to_primary_int(), sps.eye(2))
+    assert np.allclose(proj.toarray(), known.toarray())
+
+    # Replace the secondary grid with an identical grid
+    mg.update_secondary(e[1].copy())
+    assert mg.mortar_to_primary_int(nd=2) is not proj
+    assert np.allclose(mg.mortar_to_primary_int(nd=2).toarray(), known.toarray())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -116,6 +116,18 @@ class TestIntersectionPolygonsEmbeddedIn3d(unittest.TestCase):
         self.assertTrue(seg_vert.size == 1)
         self.assertTrue(len(seg_vert[0]) == 0)
 
+    def test_degenerate_fracture(self):
+        # A fracture with collinear vertexes has no normal vector, and should give an
+        # error also if it does not overlap with any other fracture.
+        f_1 = np.array([[-1, 1, 1, -1], [0, 0, 0, 0], [-1, -1, 1, 1]])
+        f_2 = np.array([[3, 4, 5, 4], [3, 3, 3, 3], [3, 4, 5, 4]])
+        with self.assertRaises(RuntimeError):
+            pp.intersections.polygons_3d([f_1, f_2])
+
+        # Less than three vertexes
+        with self.assertRaises(ValueError):
+            pp.intersections.polygons_3d([f_1, f_2[:, :2]])
+
     def test_two_intersecting_fractures(self):
 
         f_1 = np.array([[-1, 1, 1, -1], [0, 0, 0, 0], [-1, -1, 1, 1]])
@@ -180,6 +180,26 @@ class TestUniqueColumns(unittest.TestCase):
                 np.min(np.sum(np.abs(p_known[:, i] - p_unique), axis=0)) == 0
             )
 
+    def test_chain_of_points(self):
+        # The first and third points are further apart than the tolerance, while the
+        # second is close to both. The second point should be merged with the first,
+        # and the third point kept.
+        p = np.array([[0, 0.08, 0.16, 0.001], [0, 0, 0, 0]])
+        p_unique, new_2_old, old_2_new = setmembership.unique_columns_tol(p, tol=0.1)
+
+        self.assertTrue(np.allclose(p_unique, p[:, [0, 2]]))
+        self.assertTrue(np.all(new_2_old == np.array([0, 2])))
+        self.assertTrue(np.all(old_2_new == np.array([0, 0, 1, 0])))
+
+    def test_map_to_closest_point(self):
+        # The last point is within the tolerance of the two first, and should be
+        # mapped to the closest of them.
+        p = np.array([[0, 0.15, 0.1], [0, 0, 0]])
+        p_unique, new_2_old, old_2_new = setmembership.unique_columns_tol(p, tol=0.12)
+
+        self.assertTrue(np.all(new_2_old == np.array([0, 1])))
+        self.assertTrue(np.all(old_2_new == np.array([0, 1, 1])))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,124 @@
+"""Tests of the second and fourth order tensors, in particular the forming of the
+full tensor from the parameters that define it.
+"""
+import numpy as np
+import pytest
+
+import porepy as pp
+
+
+def _anisotropic_tensor(num_cells):
+    kxx = 2 + np.random.rand(num_cells)
+    kxy = 0.1 * np.random.rand(num_cells)
+    return pp.SecondOrderTensor(kxx, kyy=2 * kxx, kzz=1, kxy=kxy)
+
+
+def test_second_order_tensor_values():
+    kxx = np.arange(1, 4, dtype=float)
+    kxy = np.array([0.1, 0, 0.2])
+    k = pp.SecondOrderTensor(kxx, kxy=kxy, kzz=1)
+    assert not k.is_isotropic
+
+    known = np.zeros((3, 3, 3))
+    known[0, 0] = kxx
+    known[1, 1] = kxx
+    known[2, 2] = 1
+    known[0, 1] = kxy
+    known[1, 0] = kxy
+    assert np.allclose(k.values, known)
+
+    # The tensor should not depend on the arrays given to the constructor
+    kxx[:] = 0
+    assert np.allclose(k.copy().values, known)
+
+
+def test_second_order_tensor_isotropic():
+    kxx = np.arange(1, 4, dtype=float)
+    k = pp.SecondOrderTensor(kxx)
+    assert k.is_isotropic
+    assert np.allclose(k.isotropic_values(), kxx)
+
+    # Restriction to a subset of cells keeps the isotropic representation
+    sub_k = k.restrict(np.array([2, 0]))
+    assert sub_k.is_isotropic
+    assert np.allclose(sub_k.isotropic_values(), kxx[[2, 0]])
+
+    # Once the values are formed, they may be modified, and the tensor is no
+    # longer known to be isotropic
+    k.values[0, 1] = 1
+    assert not k.is_isotropic
+    with pytest.raises(ValueError):
+        k.isotropic_values()
+    assert np.allclose(k.copy().values, k.values)
+
+
+@pytest.mark.parametrize("form_values", [False, True])
+def test_second_order_tensor_restrict(form_values):
+    k = _anisotropic_tensor(5)
+    known = k.copy().values
+    if form_values:
+        k.values
+    cells = np.array([4, 1, 1])
+    sub_k = k.restrict(cells)
+    assert np.allclose(sub_k.values, known[:, :, cells])
+
+    # The restricted tensor has separate arrays
+    sub_k.values[:] = 0
+    assert np.allclose(k.values, known)
+
+
+@pytest.mark.parametrize("phi", [None, np.array([0.1, 0.2, 0.3, 0.4])])
+@pytest.mark.parametrize("form_values", [False, True])
+def test_fourth_order_tensor_restrict(phi, form_values):
+    mu = np.arange(1, 5, dtype=float)
+    lmbda = 2 * np.arange(1, 5, dtype=float)
+    C = pp.FourthOrderTensor(mu, lmbda, phi)
+    known = C.copy().values
+    assert known.shape == (9, 9, 4)
+    assert np.allclose(known[0, 0], 2 * mu + lmbda)
+    assert np.allclose(known[0, 4], lmbda)
+    if phi is not None:
+        assert np.allclose(known[0, 1], phi)
+
+    if form_values:
+        C.values
+    cells = np.array([3, 0])
+    sub_C = C.restrict(cells)
+    assert np.allclose(sub_C.values, known[:, :, cells])
+    assert np.allclose(sub_C.mu, mu[cells])
+    assert np.allclose(sub_C.lmbda, lmbda[cells])
+
+
+@pytest.mark.parametrize(
+    "tensor",
+    [
+        _anisotropic_tensor(4),
+        pp.FourthOrderTensor(np.arange(1, 5.0), np.arange(2, 6.0)),
+        pp.FourthOrderTensor(np.arange(1, 5.0), np.arange(2, 6.0), 0.1 * np.ones(4)),
+    ],
+)
+def test_iter_values(tensor):
+    # Iteration over the entries of the full tensor, with and without forming it,
+    # should give exactly the values of the full tensor.
+    known = tensor.copy().values
+    known = known.reshape((-1, known.shape[-1]))
+    assert np.array_equal(np.array(list(tensor._iter_values())), known)
+    tensor.values
+    assert np.array_equal(np.array(list(tensor._iter_values())), known)
+
+
+def test_tpfa_isotropic_tensor():
+    # The discretization of an isotropic tensor, which does not form the full
+    # tensor, should equal that of the same tensor given on full form.
+    g = pp.StructuredTriangleGrid([3, 2])
+    g.compute_geometry()
+    kxx = 1 + np.random.rand(g.num_cells)
+
+    matrices = []
+    for k in [pp.SecondOrderTensor(kxx), pp.SecondOrderTensor(kxx, kyy=kxx)]:
+        data = pp.initialize_default_data(g, {}, "flow", {"second_order_tensor": k})
+        pp.Tpfa("flow").discretize(g, data)
+        matrices.append(data[pp.DISCRETIZATION_MATRICES]["flow"]["flux"])
+        assert k.is_isotropic == (len(matrices) == 1)
+
+    assert np.allclose(matrices[0].toarray(), matrices[1].toarray())
@@ -242,6 +242,56 @@ class MeshioExporterTest(unittest.TestCase):
             content = self.sliceout(content_file.read())
         self.assertTrue(content == self._test_fractures_3d_vtu())
 
+    def test_time_series(self):
+        g = pp.CartGrid([3, 2, 2])
+        g.compute_geometry()
+
+        save = pp.Exporter(g, self.file_name, self.folder, time_series=True)
+        for step in range(3):
+            scalar = step * np.arange(g.num_cells, dtype=float)
+            vector = np.ones((3, g.num_cells))
+            save.write_vtu({"dummy_scalar": scalar, "dummy_vector": vector})
+        save.write_pvd(np.array([0, 0.5, 1]))
+        save.close()
+
+        steps = self._read_xdmf(self.folder + self.file_name + ".xdmf")
+        self.assertTrue(len(steps) == 3)
+        for step, (time, fields) in enumerate(steps):
+            self.assertTrue(time == 0.5 * step)
+            known = step * np.arange(g.num_cells)
+            self.assertTrue(np.allclose(fields["dummy_scalar"], known))
+            self.assertTrue(np.allclose(fields["dummy_vector"], 1))
+            self.assertTrue(fields["dummy_vector"].shape == (g.num_cells, 3))
+
+        # Unchanged fields should only be written once
+        seek = [f["dummy_vector_seek"] for _, f in steps]
+        self.assertTrue(len(set(seek)) == 1)
+
+    def _read_xdmf(self, file_name):
+        # Read the time and cell data of all time steps in an XDMF file written by
+        # the time series export.
+        import xml.etree.ElementTree as ET
+
+        steps = []
+        for grid in ET.parse(file_name).getroot().iter("Grid"):
+            if grid.get("GridType") != "Uniform":
+                continue
+            fields = {}
+            for attribute in grid.findall("Attribute"):
+                item = attribute.find("DataItem")
+                dtype = np.float64 if item.get("DataType") == "Float" else np.int64
+                shape = [int(n) for n in item.get("Dimensions").split()]
+                values = np.fromfile(
+                    os.path.join(os.path.dirname(file_name), item.text),
+                    dtype=dtype,
+                    count=int(np.prod(shape)),
+                    offset=int(item.get("Seek")),
+                )
+                fields[attribute.get("Name")] = values.reshape(shape)
+                fields[attribute.get("Name") + "_seek"] = item.get("Seek")
+            steps.append((float(grid.find("Time").get("Value")), fields))
+        return steps
+
     ## Below follows functions that return strings that reproduce the exact output of
     # the test functions at a time when the code was considered trustworthy.
 